@@ -3,6 +3,7 @@
 
 import time
 import math
+import threading
 import smbus2 as smbus
 import RPi.GPIO as GPIO
 
@@ -11,6 +12,11 @@ Dir = [
     'backward',
 ]
 
+# 影子寄存器按 (总线, 地址) 在进程内共享：多个 PCA9685 / LOBOROBOT 实例驱动的是同一块芯片，
+# 各自记一份会把别的实例已改过的通道当成未变化而跳过
+_shadows = {}
+_shadow_locks = {}
+
 class PCA9685:
 
   # Registers/etc.
@@ -27,14 +33,23 @@ class PCA9685:
   __ALLLED_ON_H        = 0xFB
   __ALLLED_OFF_L       = 0xFC
   __ALLLED_OFF_H       = 0xFD
+  __MODE1_AI           = 0x20   # 寄存器地址自动递增
+  __BLOCK_MAX          = 32     # SMBus 单次块写最多32字节，即8个通道
 
   def __init__(self, address, debug=False):
     self.bus = smbus.SMBus(1)
     self.address = address
     self.debug = debug
+    # 影子寄存器：通道 -> (on, off)，记录最后写入的值，相同的值不再重复写总线
+    self.shadow = _shadows.setdefault((1, address), {})
+    self.lock = _shadow_locks.setdefault((1, address), threading.RLock())
     if (self.debug):
       print("Reseting PCA9685")
-    self.write(self.__MODE1, 0x00)
+    with self.lock:
+      # 打开自动递增，一个通道的4个寄存器（或相邻多个通道）可以一次块写完成
+      self.write(self.__MODE1, self.__MODE1_AI)
+      # 芯片可能已被其他进程（如本目录下的脚本）改写过，旧的影子值不再可信
+      self.shadow.clear()
 
   def write(self, reg, value):
     "Writes an 8-bit value to the specified register/address"
@@ -42,6 +57,12 @@ class PCA9685:
     if (self.debug):
       print("I2C: Write 0x%02X to register 0x%02X" % (value, reg))
 
+  def writeBlock(self, reg, values):
+    "Writes consecutive registers starting at reg in one I2C transaction"
+    self.bus.write_i2c_block_data(self.address, reg, values)
+    if (self.debug):
+      print("I2C: Write %d bytes from register 0x%02X" % (len(values), reg))
+
   def read(self, reg):
     "Read an unsigned byte from the I2C device"
     result = self.bus.read_byte_data(self.address, reg)
@@ -72,21 +93,72 @@ class PCA9685:
 
   def setPWM(self, channel, on, off):
     "Sets a single PWM channel"
-    self.write(self.__LED0_ON_L + 4*channel, on & 0xFF)
-    self.write(self.__LED0_ON_H + 4*channel, on >> 8)
-    self.write(self.__LED0_OFF_L + 4*channel, off & 0xFF)
-    self.write(self.__LED0_OFF_H + 4*channel, off >> 8)
-    if (self.debug):
-      print("channel: %d  LED_ON: %d LED_OFF: %d" % (channel,on,off))
+    self.set_pwm_many({channel: (on, off)})
+
+  def set_pwm_many(self, values):
+    """Sets several PWM channels, values: {channel: (on, off)}
+
+    跳过与影子寄存器相同的通道，其余按通道号连续的区段合并成块写。区段中间夹着未变化
+    但值已知的通道时一并重写，减少事务数；PCA9685 在 I2C STOP 时统一更新输出，
+    同一块内的通道同时生效。返回实际的 I2C 事务数。
+    """
+    with self.lock:
+      return self._set_pwm_many(values)
+
+  def _set_pwm_many(self, values):
+    changed = sorted(ch for ch, value in values.items() if self.shadow.get(ch) != value)
+    if not changed:
+      return 0
+
+    new_values = dict(self.shadow)
+    new_values.update(values)
+    transactions = 0
+    start = 0
+    while start < len(changed):
+      first = last = changed[start]
+      start += 1
+      # 向后扩展区段：下一个待写通道之间的通道值都已知，且不超过单次块写长度
+      while start < len(changed):
+        nxt = changed[start]
+        if (nxt - first + 1) * 4 > self.__BLOCK_MAX:
+          break
+        if any(ch not in new_values for ch in range(last + 1, nxt)):
+          break
+        last = nxt
+        start += 1
+      data = []
+      for ch in range(first, last + 1):
+        on, off = new_values[ch]
+        data += [on & 0xFF, on >> 8, off & 0xFF, off >> 8]
+      self.writeBlock(self.__LED0_ON_L + 4*first, data)
+      transactions += 1
+      if (self.debug):
+        print("channel: %d-%d  LED: %s" % (first, last, [new_values[ch] for ch in range(first, last + 1)]))
+
+    for ch in changed:
+      self.shadow[ch] = values[ch]
+    return transactions
+
+  def setAllPWM(self, on, off):
+    "Sets all PWM channels through the ALL_LED registers in one transaction"
+    with self.lock:
+      self.writeBlock(self.__ALLLED_ON_L, [on & 0xFF, on >> 8, off & 0xFF, off >> 8])
+      for ch in range(16):
+        self.shadow[ch] = (on, off)
+
+  def dutycycle(self, pulse):
+    "PWM value (on, off) for a duty cycle in percent"
+    return (0, int(pulse * (4096 / 100)))
+
+  def level(self, value):
+    "PWM value (on, off) for a digital level"
+    return (0, 4095) if value == 1 else (0, 0)
 
   def setDutycycle(self, channel, pulse):
-    self.setPWM(channel, 0, int(pulse * (4096 / 100)))
+    self.setPWM(channel, *self.dutycycle(pulse))
 
   def setLevel(self, channel, value):
-    if (value == 1):
-      self.setPWM(channel, 0, 4095)
-    else:
-      self.setPWM(channel, 0, 0)
+    self.setPWM(channel, *self.level(value))
   
 
 
@@ -116,139 +188,120 @@ class LOBOROBOT():
         GPIO.setup(self.DIN1,GPIO.OUT)
         GPIO.setup(self.DIN2,GPIO.OUT)
 
-    def MotorRun(self, motor, index, speed):
-        if speed > 100:
-            return
-        if(motor == 0):
-            self.pwm.setDutycycle(self.PWMA, speed)
-            if(index == Dir[0]):
-                self.pwm.setLevel(self.AIN1, 0)
-                self.pwm.setLevel(self.AIN2, 1)
-            else:
-                self.pwm.setLevel(self.AIN1, 1)
-                self.pwm.setLevel(self.AIN2, 0)
+    def _motorValues(self, values, motor, index, speed):
+        "把一个电机的 PWM 通道值放入 values，index 为 None 表示停止；D 电机方向由 GPIO 直接输出"
+        if (motor == 0):
+            pwm, in1, in2 = self.PWMA, self.AIN1, self.AIN2
+            forward = (0, 1)
         elif(motor == 1):
-            self.pwm.setDutycycle(self.PWMB, speed)
-            if(index == Dir[0]):
-                self.pwm.setLevel(self.BIN1, 1)
-                self.pwm.setLevel(self.BIN2, 0)
-            else:
-                self.pwm.setLevel(self.BIN1, 0)
-                self.pwm.setLevel(self.BIN2, 1)
+            pwm, in1, in2 = self.PWMB, self.BIN1, self.BIN2
+            forward = (1, 0)
         elif(motor == 2):
-            self.pwm.setDutycycle(self.PWMC,speed)
-            if(index == Dir[0]):
-                self.pwm.setLevel(self.CIN1,1)
-                self.pwm.setLevel(self.CIN2,0)
-            else:
-                self.pwm.setLevel(self.CIN1,0)
-                self.pwm.setLevel(self.CIN2,1)
+            pwm, in1, in2 = self.PWMC, self.CIN1, self.CIN2
+            forward = (1, 0)
         elif(motor == 3):
-            self.pwm.setDutycycle(self.PWMD,speed)
-            if (index == Dir[0]):
-                GPIO.output(self.DIN1,0)
-                GPIO.output(self.DIN2,1)
-            else:
-                GPIO.output(self.DIN1,1)
-                GPIO.output(self.DIN2,0)
+            if (index is not None):
+                if (index == Dir[0]):
+                    GPIO.output(self.DIN1,0)
+                    GPIO.output(self.DIN2,1)
+                else:
+                    GPIO.output(self.DIN1,1)
+                    GPIO.output(self.DIN2,0)
+            values[self.PWMD] = self.pwm.dutycycle(0 if index is None else speed)
+            return
+        else:
+            return
+
+        if (index is None):
+            values[pwm] = self.pwm.dutycycle(0)
+            return
+        values[pwm] = self.pwm.dutycycle(speed)
+        level1, level2 = forward if index == Dir[0] else (forward[1], forward[0])
+        values[in1] = self.pwm.level(level1)
+        values[in2] = self.pwm.level(level2)
+
+    def drive(self, directions, speed):
+        """四个电机一次更新，directions 依次为电机0-3的方向，None 表示停止该电机
+
+        所有 PWM 通道合并为一次总线突发写入，四个车轮同时启动
+        """
+        if speed > 100:
+            return
+        values = {}
+        for motor, index in enumerate(directions):
+            self._motorValues(values, motor, index, speed)
+        self.pwm.set_pwm_many(values)
+
+    def MotorRun(self, motor, index, speed):
+        if speed > 100:
+            return
+        values = {}
+        self._motorValues(values, motor, index, speed)
+        self.pwm.set_pwm_many(values)
 
     def MotorStop(self, motor):
-        if (motor == 0):
-            self.pwm.setDutycycle(self.PWMA, 0)
-        elif(motor == 1):
-            self.pwm.setDutycycle(self.PWMB, 0)
-        elif(motor == 2):
-            self.pwm.setDutycycle(self.PWMC, 0)
-        elif(motor == 3):
-            self.pwm.setDutycycle(self.PWMD, 0)
+        values = {}
+        self._motorValues(values, motor, None, 0)
+        self.pwm.set_pwm_many(values)
     # 前进
     def t_up(self,speed,t_time):
-        self.MotorRun(0,'forward',speed)
-        self.MotorRun(1,'forward',speed)
-        self.MotorRun(2,'forward',speed)
-        self.MotorRun(3,'forward',speed)
+        self.drive(['forward', 'forward', 'forward', 'forward'], speed)
         time.sleep(t_time)
     #后退
     def t_down(self,speed,t_time):
-        self.MotorRun(0,'backward',speed)
-        self.MotorRun(1,'backward',speed)
-        self.MotorRun(2,'backward',speed)
-        self.MotorRun(3,'backward',speed)
+        self.drive(['backward', 'backward', 'backward', 'backward'], speed)
         time.sleep(t_time)
 
     # 左移
     def moveLeft(self,speed,t_time):
-        self.MotorRun(0,'backward',speed)
-        self.MotorRun(1,'forward',speed)
-        self.MotorRun(2,'forward',speed)
-        self.MotorRun(3,'backward',speed)
+        self.drive(['backward', 'forward', 'forward', 'backward'], speed)
         time.sleep(t_time)
 
     #右移
     def moveRight(self,speed,t_time):
-        self.MotorRun(0,'forward',speed)
-        self.MotorRun(1,'backward',speed)
-        self.MotorRun(2,'backward',speed)
-        self.MotorRun(3,'forward',speed)
+        self.drive(['forward', 'backward', 'backward', 'forward'], speed)
         time.sleep(t_time)
 
     # 左转
     def turnLeft(self,speed,t_time):
-        self.MotorRun(0,'backward',speed)
-        self.MotorRun(1,'forward',speed)
-        self.MotorRun(2,'backward',speed)
-        self.MotorRun(3,'forward',speed)
+        self.drive(['backward', 'forward', 'backward', 'forward'], speed)
         time.sleep(t_time)
     
     # 右转
     def turnRight(self,speed,t_time):
-        self.MotorRun(0,'forward',speed)
-        self.MotorRun(1,'backward',speed)
-        self.MotorRun(2,'forward',speed)
-        self.MotorRun(3,'backward',speed)
+        self.drive(['forward', 'backward', 'forward', 'backward'], speed)
         time.sleep(t_time)
     
     # 前左斜
     def forward_Left(self,speed,t_time):
-        self.MotorStop(0)
-        self.MotorRun(1,'forward',speed)
-        self.MotorRun(2,'forward',speed)
-        self.MotorStop(0)
+        self.drive([None, 'forward', 'forward', None], speed)
         time.sleep(t_time)
 
     # 前右斜
     def forward_Right(self,speed,t_time):
-        self.MotorRun(0,'forward',speed)
-        self.MotorStop(1)
-        self.MotorStop(2)
-        self.MotorRun(3,'forward',speed)
+        self.drive(['forward', None, None, 'forward'], speed)
         time.sleep(t_time)
 
     # 后左斜
     def backward_Left(self,speed,t_time):
-        self.MotorRun(0,'backward',speed)
-        self.MotorStop(1)
-        self.MotorStop(2)
-        self.MotorRun(3,'backward',speed)
+        self.drive(['backward', None, None, 'backward'], speed)
         time.sleep(t_time)
     
     # 后右斜
     def backward_Right(self,speed,t_time):
-        self.MotorStop(0)
-        self.MotorRun(1,'backward',speed)
-        self.MotorRun(2,'backward',speed)
-        self.MotorStop(3)
+        self.drive([None, 'backward', 'backward', None], speed)
         time.sleep(t_time)
 
 
     # 停止
     def t_stop(self,t_time):
-        self.MotorStop(0)
-        self.MotorStop(1)
-        self.MotorStop(2)
-        self.MotorStop(3)
+        self.drive([None, None, None, None], 0)
         time.sleep(t_time)
 
+    # 紧急停止：通过 ALL_LED 寄存器一次关闭全部16个通道，舵机通道也会停止输出
+    def emergency_stop(self):
+        self.pwm.setAllPWM(0, 0)
+
         # 辅助功能，使设置舵机脉冲宽度更简单。
     def set_servo_pulse(self,channel,pulse):
         pulse_length = 1000000    # 1,000,000 us per second
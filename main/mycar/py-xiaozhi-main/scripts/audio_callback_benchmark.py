@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+音频回调耗时基准测试 对比重采样缓冲区使用 deque 逐个样本搬运与使用预分配环形缓冲区整块拷贝时，
+模拟的输入/输出/AEC参考信号回调每次占用的CPU时间.
+
+用法: python scripts/audio_callback_benchmark.py [--rate 48000] [--frame-ms 20] [--channels 2]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到Python路径 - 必须在导入src模块之前
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.audio_codecs.ring_buffer import AudioRingBuffer  # noqa: E402
+
+INPUT_SAMPLE_RATE = 16000
+OUTPUT_SAMPLE_RATE = 24000
+WEBRTC_FRAME_SIZE = 160
+
+
+class DequePaths:
+    """
+    原实现：deque 逐个样本 extend/popleft，每次回调新建数组.
+    """
+
+    def __init__(self, input_frame, output_channels):
+        self.input_frame = input_frame
+        self.output_channels = output_channels
+        self.input_buffer = deque()
+        self.output_buffer = deque()
+        self.reference_buffer = deque()
+
+    def input_callback(self, resampled):
+        self.input_buffer.extend(resampled)
+        if len(self.input_buffer) < self.input_frame:
+            return None
+        frame_data = []
+        for _ in range(self.input_frame):
+            frame_data.append(self.input_buffer.popleft())
+        frame = np.array(frame_data, dtype=np.float32)
+        return (frame * 32768.0).astype(np.int16)
+
+    def output_callback(self, outdata, decoded, resample):
+        frames = len(outdata)
+        while len(self.output_buffer) < frames:
+            self.output_buffer.extend(resample(decoded.astype(np.float32) / 32768.0))
+        frame_data = []
+        for _ in range(frames):
+            frame_data.append(self.output_buffer.popleft())
+        mono = np.array(frame_data, dtype=np.float32)
+        outdata[:] = np.tile(mono.reshape(-1, 1), (1, self.output_channels))
+
+    def reference_callback(self, reference):
+        self.reference_buffer.extend(reference)
+        while len(self.reference_buffer) > WEBRTC_FRAME_SIZE * 20:
+            self.reference_buffer.popleft()
+        frame_data = []
+        for _ in range(WEBRTC_FRAME_SIZE):
+            frame_data.append(self.reference_buffer.popleft())
+        return np.array(frame_data, dtype=np.int16)
+
+
+class RingPaths:
+    """
+    新实现：环形缓冲区整块读写，回调复用预分配的数组.
+    """
+
+    def __init__(self, input_frame, output_frame):
+        self.input_buffer = AudioRingBuffer(input_frame * 8)
+        self.output_buffer = AudioRingBuffer(output_frame * 8)
+        self.reference_buffer = AudioRingBuffer(WEBRTC_FRAME_SIZE * 20, dtype=np.int16)
+        self.input_frame = np.zeros(input_frame, dtype=np.float32)
+        self.input_scaled = np.zeros(input_frame, dtype=np.float32)
+        self.input_int16 = np.zeros(input_frame, dtype=np.int16)
+        self.output_mono = np.zeros(output_frame, dtype=np.float32)
+        self.decoded = None
+        self.reference_frame = np.zeros(WEBRTC_FRAME_SIZE, dtype=np.int16)
+
+    def input_callback(self, resampled):
+        self.input_buffer.write(resampled)
+        if self.input_buffer.read_into(self.input_frame) == 0:
+            return None
+        np.multiply(self.input_frame, 32768.0, out=self.input_scaled)
+        np.clip(self.input_scaled, -32768, 32767, out=self.input_scaled)
+        self.input_int16[:] = self.input_scaled
+        return self.input_int16
+
+    def output_callback(self, outdata, decoded, resample):
+        if self.decoded is None:
+            self.decoded = np.zeros(len(decoded), dtype=np.float32)
+        while len(self.output_buffer) < len(outdata):
+            np.multiply(decoded, 1.0 / 32768.0, out=self.decoded)
+            self.output_buffer.write(resample(self.decoded))
+        self.output_buffer.read_into(self.output_mono)
+        outdata[:] = self.output_mono[:, np.newaxis]
+
+    def reference_callback(self, reference):
+        self.reference_buffer.write(reference)
+        self.reference_buffer.read_into(self.reference_frame)
+        return self.reference_frame
+
+
+def make_resampler(ratio):
+    """
+    优先使用 soxr 真实重采样，未安装时用线性插值近似，两种实现使用同一个重采样器.
+    """
+    try:
+        import soxr
+
+        stream = soxr.ResampleStream(
+            OUTPUT_SAMPLE_RATE,
+            int(OUTPUT_SAMPLE_RATE * ratio),
+            num_channels=1,
+            dtype="float32",
+            quality="QQ",
+        )
+        return lambda x: stream.resample_chunk(x, last=False), "soxr"
+    except ImportError:
+        positions = None
+
+        def resample(x):
+            nonlocal positions
+            if positions is None:
+                positions = np.arange(0, len(x), 1 / ratio)
+            return np.interp(positions, np.arange(len(x)), x).astype(np.float32)
+
+        return resample, "np.interp"
+
+
+def measure(callback, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        callback()
+        samples.append((time.perf_counter_ns() - start) / 1000)
+    samples.sort()
+    return statistics.mean(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="音频回调耗时基准测试")
+    parser.add_argument("--rate", type=int, default=48000, help="设备采样率")
+    parser.add_argument("--frame-ms", type=int, default=20, help="帧长(毫秒)")
+    parser.add_argument("--channels", type=int, default=2, help="输出声道数")
+    parser.add_argument("--iterations", type=int, default=5000, help="每项回调次数")
+    args = parser.parse_args()
+
+    input_frame = INPUT_SAMPLE_RATE * args.frame_ms // 1000
+    output_frame = args.rate * args.frame_ms // 1000
+    decoded_frame = OUTPUT_SAMPLE_RATE * args.frame_ms // 1000
+    resample, resampler_name = make_resampler(args.rate / OUTPUT_SAMPLE_RATE)
+
+    rng = np.random.default_rng(0)
+    resampled_input = (rng.standard_normal(input_frame) * 0.1).astype(np.float32)
+    decoded = (rng.standard_normal(decoded_frame) * 3000).astype(np.int16)
+    reference = (rng.standard_normal(WEBRTC_FRAME_SIZE) * 3000).astype(np.int16)
+    outdata = np.zeros((output_frame, args.channels), dtype=np.float32)
+
+    old = DequePaths(input_frame, args.channels)
+    new = RingPaths(input_frame, output_frame)
+    cases = [
+        ("输入重采样", lambda p: p.input_callback(resampled_input)),
+        ("输出重采样", lambda p: p.output_callback(outdata, decoded, resample)),
+        ("AEC参考信号", lambda p: p.reference_callback(reference)),
+    ]
+
+    print(
+        f"设备 {args.rate}Hz {args.channels}ch | 帧长 {args.frame_ms}ms | "
+        f"重采样: {resampler_name} | 每项 {args.iterations} 次回调\n"
+    )
+    print(
+        f"{'回调':<12}{'deque均值':>12}{'deque P99':>12}{'环形均值':>12}{'环形P99':>12}{'加速':>8}"
+    )
+    for name, case in cases:
+        old_mean, old_p99 = measure(lambda: case(old), args.iterations)
+        new_mean, new_p99 = measure(lambda: case(new), args.iterations)
+        print(
+            f"{name:<12}{old_mean:>10.1f}us{old_p99:>10.1f}us"
+            f"{new_mean:>10.1f}us{new_p99:>10.1f}us{old_mean / new_mean:>7.1f}x"
+        )
+    print(f"\n回调周期为 {args.frame_ms * 1000}us，耗时占比越低越不容易出现欠载")
+
+
+if __name__ == "__main__":
+    main()
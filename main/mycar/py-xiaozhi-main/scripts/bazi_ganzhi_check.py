@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+干支历表校验脚本 用 lunar-python 逐项核对预计算干支历表，并与原逐年逐月逐日的八字反推结果对比耗时和结果.
+
+用法: python scripts/bazi_ganzhi_check.py [--samples 2000] [--reverse 3]
+"""
+
+import argparse
+import calendar
+import importlib
+import random
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+from lunar_python import Solar
+
+# 添加项目根目录到Python路径 - 必须在导入src模块之前
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# 八字工具位于 src/mcp/tools/11 下，目录名不是合法标识符，只能按模块路径导入
+ganzhi_table = importlib.import_module("src.mcp.tools.11.bazi.ganzhi_table")
+
+
+def lunar_bazi(year, month, day, hour, minute=0, second=0):
+    eight_char = (
+        Solar.fromYmdHms(year, month, day, hour, minute, second)
+        .getLunar()
+        .getEightChar()
+    )
+    return (
+        eight_char.getYear(),
+        eight_char.getMonth(),
+        eight_char.getDay(),
+        eight_char.getTime(),
+    )
+
+
+def brute_force_solar_times(bazi):
+    """
+    原 get_solar_times 的搜索过程：年、月按抽样日期宽松匹配，再逐日逐时辰核对日柱、时柱.
+    """
+    year_pillar, month_pillar, day_pillar, hour_pillar = bazi
+    results = []
+    for year in range(1900, 2100):
+        year_samples = [
+            (year, 1, 1, 0, 0, 0),
+            (year, 6, 1, 0, 0, 0),
+            (year, 12, 31, 23, 59, 59),
+        ]
+        if year_pillar not in {lunar_bazi(*t)[0] for t in year_samples}:
+            continue
+        for month in range(1, 13):
+            max_day = calendar.monthrange(year, month)[1]
+            month_samples = {min(d, max_day) for d in (1, 8, 15, 22, 28)}
+            if month_pillar not in {
+                lunar_bazi(year, month, d, 12)[1] for d in month_samples
+            }:
+                continue
+            for day in range(1, max_day + 1):
+                if lunar_bazi(year, month, day, 0)[2] != day_pillar:
+                    continue
+                for hour in range(0, 24, 2):
+                    if lunar_bazi(year, month, day, hour)[3] == hour_pillar:
+                        results.append(f"{year}-{month:02d}-{day:02d} {hour:02d}:00:00")
+    return results
+
+
+def random_moment(rng):
+    start = ganzhi_table.START_DATE.toordinal()
+    d = date.fromordinal(rng.randint(start, start + ganzhi_table.DAY_COUNT - 1))
+    return (
+        d.year,
+        d.month,
+        d.day,
+        rng.randrange(24),
+        rng.randrange(60),
+        rng.randrange(60),
+    )
+
+
+def check_pillars(table, samples, rng):
+    print(f"\n[1] 随机时刻四柱核对: {samples} 个")
+    mismatches = 0
+    for _ in range(samples):
+        moment = random_moment(rng)
+        expected = lunar_bazi(*moment)
+        actual = tuple(ganzhi_table.pillar_name(i) for i in table.pillars_at(*moment))
+        if expected != actual:
+            mismatches += 1
+            print(f"  不一致: {moment} lunar={expected} table={actual}")
+    print(f"  不一致数量: {mismatches}")
+
+    print("[2] 节交接时刻前后1秒核对")
+    mismatches = 0
+    for seconds in table.jie_seconds:
+        for offset in (-1, 0):
+            moment_seconds = int(seconds) + offset
+            d = date.fromordinal(
+                moment_seconds // 86400 + ganzhi_table.START_DATE.toordinal()
+            )
+            if not table.covers(d.year, d.month, d.day):
+                continue
+            rest = moment_seconds % 86400
+            moment = (
+                d.year,
+                d.month,
+                d.day,
+                rest // 3600,
+                rest % 3600 // 60,
+                rest % 60,
+            )
+            actual = tuple(
+                ganzhi_table.pillar_name(i) for i in table.pillars_at(*moment)
+            )
+            if lunar_bazi(*moment) != actual:
+                mismatches += 1
+                print(f"  不一致: {moment}")
+    print(f"  不一致数量: {mismatches}")
+
+
+def check_reverse(table, count, rng):
+    print(f"\n[3] 八字反推对比: {count} 个")
+    for _ in range(count):
+        year, month, day, hour, _, _ = random_moment(rng)
+        bazi = lunar_bazi(year, month, day, hour)
+        indexes = [ganzhi_table.pillar_index(p) for p in bazi]
+
+        start = time.perf_counter()
+        results = table.find_solar_times(*indexes, limit=1000)
+        table_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        old_results = brute_force_solar_times(bazi)
+        old_ms = (time.perf_counter() - start) * 1000
+
+        # 原实现的年、月为宽松匹配，只保留四柱确实一致的时间参与对比
+        exact = [t for t in old_results if lunar_bazi(*_parse(t)) == bazi]
+        status = (
+            "一致" if exact == [t for t in results if int(t[:4]) < 2100] else "不一致"
+        )
+        print(
+            f"  {' '.join(bazi)}: 查表 {table_ms:.2f}ms / 原实现 {old_ms:.0f}ms | "
+            f"查表 {len(results)} 个, 原实现 {len(old_results)} 个(四柱一致 {len(exact)} 个) | {status}"
+        )
+
+
+def _parse(text):
+    day_part, time_part = text.split(" ")
+    year, month, day = map(int, day_part.split("-"))
+    return year, month, day, int(time_part[:2])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="干支历表校验")
+    parser.add_argument("--samples", type=int, default=2000, help="随机核对的时刻数")
+    parser.add_argument(
+        "--reverse", type=int, default=3, help="与原实现对比反推的八字数"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    table = ganzhi_table.get_ganzhi_table()
+    print(f"加载干支历表耗时: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    check_pillars(table, args.samples, rng)
+    check_reverse(table, args.reverse, rng)
+
+
+if __name__ == "__main__":
+    main()
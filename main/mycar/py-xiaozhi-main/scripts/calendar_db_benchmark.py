@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+日程数据库基准测试 在临时目录生成大量历史事件，对比原实现（每次操作新建连接、无索引）
+与长连接+索引实现的批量写入、区间查询、分类查询和提醒扫描耗时.
+
+用法: python scripts/calendar_db_benchmark.py [--events 100000] [--repeat 50]
+"""
+
+import argparse
+import importlib
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到Python路径 - 必须在导入src模块之前
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# 日程工具位于 src/mcp/tools/11 下，目录名不是合法标识符，只能按模块路径导入
+database = importlib.import_module("src.mcp.tools.11.calendar.database")
+
+CATEGORIES = ["默认", "工作", "个人", "会议", "提醒"]
+
+
+def make_events(count, now, rng):
+    """
+    生成过去约两年到未来一个月的事件，绝大部分为已发送提醒的历史事件.
+    """
+    events = []
+    span_minutes = 760 * 24 * 60
+    for _ in range(count):
+        start = (
+            now - timedelta(minutes=rng.randrange(span_minutes)) + timedelta(days=30)
+        )
+        reminder_minutes = rng.choice([5, 15, 30])
+        events.append(
+            {
+                "id": str(uuid.uuid4()),
+                "title": f"事件{rng.randrange(10000)}",
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(minutes=30)).isoformat(),
+                "description": "",
+                "category": rng.choice(CATEGORIES),
+                "reminder_minutes": reminder_minutes,
+                "reminder_time": (
+                    start - timedelta(minutes=reminder_minutes)
+                ).isoformat(),
+                "reminder_sent": start < now,
+                "created_at": now.isoformat(),
+                "updated_at": now.isoformat(),
+            }
+        )
+    return events
+
+
+class LegacyStore:
+    """
+    原实现：每次操作新建并关闭连接，events 表上没有索引.
+    """
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+
+    def query(self, sql, params):
+        conn = sqlite3.connect(self.db_file)
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+        finally:
+            conn.close()
+
+    def add_event(self, event_data):
+        conn = sqlite3.connect(self.db_file)
+        try:
+            conflict = conn.execute(
+                database.CONFLICT_SQL,
+                (
+                    event_data["id"],
+                    event_data["end_time"],
+                    event_data["start_time"],
+                    event_data["start_time"],
+                    event_data["end_time"],
+                ),
+            ).fetchall()
+            if not conflict:
+                conn.execute(
+                    database.INSERT_EVENT_SQL,
+                    database.CalendarDatabase._event_params(event_data),
+                )
+                conn.commit()
+        finally:
+            conn.close()
+
+
+class CurrentStore:
+    """
+    新实现：CalendarDatabase 的线程长连接和索引.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def query(self, sql, params):
+        with self.db._get_connection() as conn:
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+
+    def add_event(self, event_data):
+        self.db.add_event(event_data)
+
+
+def measure(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="日程数据库基准测试")
+    parser.add_argument("--events", type=int, default=100000, help="历史事件数")
+    parser.add_argument("--repeat", type=int, default=50, help="每项查询次数")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    now = datetime.now().replace(microsecond=0)
+    events = make_events(args.events, now, rng)
+    workdir = Path(tempfile.mkdtemp(prefix="calendar_bench_"))
+
+    try:
+        db = database.CalendarDatabase(str(workdir / "calendar.db"))
+        start = time.perf_counter()
+        result = db.add_events_batch(events, check_conflict=False)
+        print(
+            f"批量写入 {result['added_count']} 个事件: "
+            f"{(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+
+        update_rows = [(event["id"], {"category": "工作"}) for event in events[:1000]]
+        start = time.perf_counter()
+        db.update_events_batch(update_rows)
+        print(f"批量更新 1000 个事件: {(time.perf_counter() - start) * 1000:.0f}ms")
+
+        # 复制一份并删除索引作为原实现的数据库
+        with db._get_connection() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        legacy_file = workdir / "legacy.db"
+        shutil.copy(workdir / "calendar.db", legacy_file)
+        conn = sqlite3.connect(legacy_file)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'events' "
+            "AND sql IS NOT NULL"
+        ).fetchall():
+            conn.execute(f"DROP INDEX {name}")
+        conn.commit()
+        conn.close()
+
+        week_start = (now - timedelta(days=now.weekday())).replace(
+            hour=0, minute=0, second=0
+        )
+        week_end = week_start + timedelta(days=7)
+        cases = [
+            (
+                "本周日程",
+                "SELECT * FROM events WHERE 1=1 AND start_time >= ? AND start_time <= ? "
+                "ORDER BY start_time",
+                (week_start.isoformat(), week_end.isoformat()),
+            ),
+            (
+                "本周会议",
+                "SELECT * FROM events WHERE 1=1 AND start_time >= ? AND start_time <= ? "
+                "AND category = ? ORDER BY start_time",
+                (week_start.isoformat(), week_end.isoformat(), "会议"),
+            ),
+            (
+                "提醒扫描",
+                "SELECT * FROM events WHERE reminder_sent = 0 AND reminder_time IS NOT NULL "
+                "AND reminder_time <= ? AND start_time > ? ORDER BY reminder_time",
+                (now.isoformat(), (now - timedelta(hours=1)).isoformat()),
+            ),
+            ("按ID查询", database.SELECT_EVENT_SQL, (events[len(events) // 2]["id"],)),
+        ]
+
+        legacy = LegacyStore(str(legacy_file))
+        current = CurrentStore(db)
+        print(
+            f"\n{'操作':<10}{'结果数':>8}{'原实现':>12}{'长连接+索引':>14}{'加速':>8}"
+        )
+        for name, sql, params in cases:
+            rows = len(current.query(sql, params))
+            if rows != len(legacy.query(sql, params)):
+                print(f"  {name}: 两种实现结果数不一致")
+            old_ms = measure(lambda: legacy.query(sql, params), args.repeat)
+            new_ms = measure(lambda: current.query(sql, params), args.repeat)
+            print(
+                f"{name:<10}{rows:>8}{old_ms:>10.2f}ms{new_ms:>12.2f}ms{old_ms / new_ms:>7.1f}x"
+            )
+
+        # 新增事件包含冲突检查，每次使用新事件避免主键重复
+        new_events = make_events(args.repeat * 2, now + timedelta(days=3650), rng)
+        old_ms = measure(lambda: legacy.add_event(new_events.pop()), args.repeat)
+        new_ms = measure(lambda: current.add_event(new_events.pop()), args.repeat)
+        print(
+            f"{'新增事件':<10}{'-':>8}{old_ms:>10.2f}ms{new_ms:>12.2f}ms{old_ms / new_ms:>7.1f}x"
+        )
+        db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+PCA9685 写入基准测试 对比原逐寄存器写入（每通道4次 write_byte_data）与块写+影子寄存器的
+总线事务数、字节数、运动指令更新率和四轮启动时间差.
+
+在树莓派上直接运行使用真实 I2C 总线；--simulate 时使用计数总线，按 I2C 时钟和单次事务开销估算耗时.
+
+用法: python scripts/pca9685_benchmark.py [--simulate] [--repeat 200] [--clock 100000]
+"""
+
+import argparse
+import sys
+import time
+import types
+from pathlib import Path
+
+# CLBROBOT 与 py-xiaozhi-main 同级
+clbrobot_dir = Path(__file__).resolve().parents[2] / "CLBROBOT"
+sys.path.insert(0, str(clbrobot_dir))
+
+MOVES = [
+    ["forward", "forward", "forward", "forward"],
+    ["backward", "forward", "backward", "forward"],
+    ["backward", "backward", "backward", "backward"],
+    ["forward", "backward", "backward", "forward"],
+]
+STOP = [None, None, None, None]
+
+
+class SimulatedBus:
+    """
+    记录事务的 I2C 总线，按时钟频率估算耗时：每字节9个时钟，另加起止位和单次事务开销.
+    """
+
+    def __init__(self, clock, overhead_us):
+        self.clock = clock
+        self.overhead = overhead_us / 1e6
+        self.reset()
+
+    def reset(self):
+        self.transactions = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+        # (完成时刻, 寄存器, 数据)
+        self.log = []
+
+    def _transfer(self, reg, data):
+        # 地址字节 + 寄存器字节 + 数据
+        nbytes = 2 + len(data)
+        self.transactions += 1
+        self.bytes += len(data)
+        self.elapsed += self.overhead + (nbytes * 9 + 2) / self.clock
+        self.log.append((self.elapsed, reg, data))
+
+    def write_byte_data(self, address, reg, value):
+        self._transfer(reg, [value])
+
+    def write_i2c_block_data(self, address, reg, values):
+        self._transfer(reg, list(values))
+
+    def read_byte_data(self, address, reg):
+        return 0
+
+
+def install_simulated_hardware(bus):
+    """
+    没有 smbus2 / RPi.GPIO 的环境下注入模拟模块后再导入 LOBOROBOT.
+    """
+    smbus = types.ModuleType("smbus2")
+    smbus.SMBus = lambda _: bus
+    gpio = types.ModuleType("RPi.GPIO")
+    gpio.BCM = gpio.OUT = 0
+    for name in ("setwarnings", "setmode", "setup", "output"):
+        setattr(gpio, name, lambda *args: None)
+    rpi = types.ModuleType("RPi")
+    rpi.GPIO = gpio
+    sys.modules.update({"smbus2": smbus, "RPi": rpi, "RPi.GPIO": gpio})
+
+
+class LegacyPath:
+    """
+    原实现：每个电机依次 setDutycycle/setLevel，每个通道4次单字节写.
+    """
+
+    def __init__(self, robot):
+        self.robot = robot
+        self.pwm = robot.pwm
+
+    def set_pwm(self, channel, on, off):
+        base = 0x06 + 4 * channel
+        self.pwm.write(base, on & 0xFF)
+        self.pwm.write(base + 1, on >> 8)
+        self.pwm.write(base + 2, off & 0xFF)
+        self.pwm.write(base + 3, off >> 8)
+
+    def drive(self, directions, speed):
+        for motor, index in enumerate(directions):
+            values = {}
+            # 通道顺序与原实现一致：先 PWM，再两个方向通道
+            self.robot._motorValues(values, motor, index, speed)
+            for channel, (on, off) in values.items():
+                self.set_pwm(channel, on, off)
+
+
+class BatchedPath:
+    """
+    新实现：LOBOROBOT.drive 一次突发写入.
+    """
+
+    def __init__(self, robot):
+        self.robot = robot
+
+    def drive(self, directions, speed):
+        self.robot.drive(directions, speed)
+
+
+def run(path, sequence, repeat, bus):
+    """
+    依次执行指令序列，返回每条指令的平均耗时（秒）.
+    """
+    if bus is not None:
+        bus.reset()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for directions, speed in sequence:
+            path.drive(directions, speed)
+    wall = time.perf_counter() - start
+    count = repeat * len(sequence)
+    elapsed = bus.elapsed if bus is not None else wall
+    return elapsed / count
+
+
+def written_channels(reg, data):
+    """
+    一次写入完成的通道：块写覆盖的全部通道，单字节写仅在写到 OFF_H 时算完成.
+    """
+    offset = reg - 0x06
+    if len(data) == 1:
+        return [offset // 4] if offset % 4 == 3 else []
+    return range(offset // 4, offset // 4 + len(data) // 4)
+
+
+def start_skew(robot, path, directions, bus):
+    """
+    从停车切换到运动时，第一个与最后一个车轮 PWM 通道写入完成的时间差（仅模拟总线）.
+    """
+    path.drive(STOP, 0)
+    bus.reset()
+    path.drive(directions, 60)
+    wheels = {robot.PWMA, robot.PWMB, robot.PWMC, robot.PWMD}
+    times = [
+        finished
+        for finished, reg, data in bus.log
+        if wheels.intersection(written_channels(reg, data))
+    ]
+    return (max(times) - min(times)) * 1000 if times else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PCA9685 写入基准测试")
+    parser.add_argument("--simulate", action="store_true", help="使用模拟总线")
+    parser.add_argument("--repeat", type=int, default=200, help="指令序列重复次数")
+    parser.add_argument("--clock", type=int, default=100000, help="模拟 I2C 时钟(Hz)")
+    parser.add_argument(
+        "--overhead", type=float, default=60.0, help="模拟单次事务开销(微秒)"
+    )
+    args = parser.parse_args()
+
+    bus = None
+    if args.simulate:
+        bus = SimulatedBus(args.clock, args.overhead)
+        install_simulated_hardware(bus)
+
+    from LOBOROBOT import LOBOROBOT
+
+    robot = LOBOROBOT()
+    legacy = LegacyPath(robot)
+    batched = BatchedPath(robot)
+
+    cases = [
+        ("方向切换", [(moves, 60) for moves in MOVES]),
+        ("重复同一指令", [(MOVES[0], 60)]),
+        ("运动/停车交替", [(MOVES[0], 60), (STOP, 0)]),
+    ]
+    mode = f"模拟总线 {args.clock // 1000}kHz" if bus else "真实总线"
+    print(f"{mode}，每项 {args.repeat} 轮")
+    print(f"{'场景':<12}{'事务/次':>14}{'原实现':>12}{'块写':>12}{'更新率':>20}")
+    for name, sequence in cases:
+        counts = []
+        times = []
+        for path in (legacy, batched):
+            robot.pwm.shadow.clear()
+            per_update = run(path, sequence, args.repeat, bus)
+            updates = args.repeat * len(sequence)
+            counts.append(bus.transactions / updates if bus else float("nan"))
+            times.append(per_update)
+        print(
+            f"{name:<12}{counts[0]:>7.1f} → {counts[1]:<4.1f}"
+            f"{times[0] * 1000:>10.2f}ms{times[1] * 1000:>10.2f}ms"
+            f"{1 / times[0]:>9.0f} → {1 / times[1]:.0f} 次/秒"
+        )
+
+    if bus:
+        robot.pwm.shadow.clear()
+        old_skew = start_skew(robot, legacy, MOVES[0], bus)
+        new_skew = start_skew(robot, batched, MOVES[0], bus)
+        print(f"\n四轮 PWM 写入时间差: 原实现 {old_skew:.2f}ms → 块写 {new_skew:.2f}ms")
+
+    robot.t_stop(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,10 @@
 import platform
-from collections import deque
 from typing import Any, Dict, Optional
 
 import numpy as np
 import sounddevice as sd
 
+from src.audio_codecs.ring_buffer import AudioRingBuffer
 from src.constants.constants import AudioConfig
 from src.utils.logging_config import get_logger
 
@@ -36,12 +36,15 @@ class AECProcessor:
 
         # 参考信号重采样器（仅 macOS 使用）
         self.reference_resampler = None
-        self._resample_reference_buffer = deque()
 
         # 缓冲区
-        self._reference_buffer = deque()
         self._webrtc_frame_size = 160  # WebRTC标准：16kHz, 10ms = 160 samples
         self._system_frame_size = AudioConfig.INPUT_FRAME_SIZE  # 系统配置的帧大小
+        # 参考信号环形缓冲区，保持约200ms的数据，写满时丢弃最旧的样本
+        self._reference_buffer = AudioRingBuffer(
+            self._webrtc_frame_size * 20, dtype=np.int16
+        )
+        self._reference_frame = np.zeros(self._webrtc_frame_size, dtype=np.int16)
 
         # 状态标志
         self._is_initialized = False
@@ -232,7 +235,8 @@ class AECProcessor:
             return
 
         try:
-            audio_data = indata.copy().flatten()
+            # 单声道输入，取视图不拷贝
+            audio_data = indata[:, 0]
 
             # 使用soxr高质量重采样
             if self.reference_resampler:
@@ -241,24 +245,10 @@ class AECProcessor:
                     audio_data, last=False
                 )
                 if len(resampled_data) > 0:
-                    self._resample_reference_buffer.extend(
-                        resampled_data.astype(np.int16)
-                    )
-
-                # 从缓冲区提取WebRTC标准帧
-                while len(self._resample_reference_buffer) >= self._webrtc_frame_size:
-                    for _ in range(self._webrtc_frame_size):
-                        self._reference_buffer.append(
-                            self._resample_reference_buffer.popleft()
-                        )
+                    self._reference_buffer.write(resampled_data)
             else:
                 # 无需重采样，直接使用
-                self._reference_buffer.extend(audio_data)
-
-            # 保持缓冲区大小合理
-            max_buffer_size = self._webrtc_frame_size * 20  # 保持约200ms的数据
-            while len(self._reference_buffer) > max_buffer_size:
-                self._reference_buffer.popleft()
+                self._reference_buffer.write(audio_data)
 
         except Exception as e:
             logger.error(f"参考信号回调错误: {e}")
@@ -387,18 +377,16 @@ class AECProcessor:
 
     def _get_reference_frame(self, frame_size: int) -> np.ndarray:
         """
-        获取指定大小的参考信号帧.
+        获取指定大小的参考信号帧，返回复用的数组，调用方需在下一帧前用完.
         """
-        # 如果没有参考信号或缓冲区不足，返回静音
-        if len(self._reference_buffer) < frame_size:
-            return np.zeros(frame_size, dtype=np.int16)
+        if len(self._reference_frame) != frame_size:
+            self._reference_frame = np.zeros(frame_size, dtype=np.int16)
 
-        # 从缓冲区提取一帧
-        frame_data = []
-        for _ in range(frame_size):
-            frame_data.append(self._reference_buffer.popleft())
+        # 如果没有参考信号或缓冲区不足，返回静音
+        if self._reference_buffer.read_into(self._reference_frame) == 0:
+            self._reference_frame.fill(0)
 
-        return np.array(frame_data, dtype=np.int16)
+        return self._reference_frame
 
     async def close(self):
         """
@@ -450,7 +438,6 @@ class AECProcessor:
 
             # 清理缓冲区
             self._reference_buffer.clear()
-            self._resample_reference_buffer.clear()
 
             self._is_initialized = False
             logger.info("AEC处理器已关闭")
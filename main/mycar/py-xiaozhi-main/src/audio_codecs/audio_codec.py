@@ -1,6 +1,5 @@
 import asyncio
 import gc
-from collections import deque
 from typing import Callable, List, Optional, Protocol
 
 import numpy as np
@@ -9,12 +8,11 @@ import sounddevice as sd
 import soxr
 
 from src.audio_codecs.aec_processor import AECProcessor
+from src.audio_codecs.ring_buffer import AudioRingBuffer
 from src.constants.constants import AudioConfig
 from src.utils.audio_utils import (
-    downmix_to_mono,
     safe_queue_put,
     select_audio_device,
-    upmix_mono_to_channels,
 )
 from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
@@ -79,9 +77,17 @@ class AudioCodec:
         self.input_resampler = None
         self.output_resampler = None
 
-        # 重采样缓冲区
-        self._resample_input_buffer = deque()
-        self._resample_output_buffer = deque()
+        # 重采样缓冲区（预分配的环形缓冲区，创建重采样器时按设备采样率分配）
+        self._resample_input_buffer: Optional[AudioRingBuffer] = None
+        self._resample_output_buffer: Optional[AudioRingBuffer] = None
+
+        # 实时回调中复用的数组，避免每次回调都分配内存
+        self._input_mono = None  # 设备采样率下混后的单声道
+        self._input_frame = np.zeros(AudioConfig.INPUT_FRAME_SIZE, dtype=np.float32)
+        self._input_scaled = np.zeros(AudioConfig.INPUT_FRAME_SIZE, dtype=np.float32)
+        self._input_frame_int16 = np.zeros(AudioConfig.INPUT_FRAME_SIZE, dtype=np.int16)
+        self._output_mono = None  # 设备采样率的单声道输出
+        self._decoded_frame = np.zeros(AudioConfig.OUTPUT_FRAME_SIZE, dtype=np.float32)
 
         # 转换标记
         self._need_input_downmix = False
@@ -280,7 +286,7 @@ class AudioCodec:
 
     async def _create_resamplers(self):
         """
-        根据设备与服务端的差异，按需创建重采样器和转换标记.
+        根据设备与服务端的差异，按需创建重采样器、转换标记和回调复用的缓冲区.
         """
         # 输入转换器配置
         # 1. 声道下混标记
@@ -297,6 +303,10 @@ class AudioCodec:
                 dtype="float32",
                 quality="QQ",  # 快速质量（低延迟）
             )
+            # 每次回调约产生一帧，留出几帧余量
+            self._resample_input_buffer = AudioRingBuffer(
+                AudioConfig.INPUT_FRAME_SIZE * 8
+            )
             logger.info(f"输入重采样: {self.device_input_sample_rate}Hz → 16kHz")
 
         # 输出转换器配置
@@ -309,6 +319,15 @@ class AudioCodec:
                 dtype="float32",
                 quality="QQ",
             )
+            # 容纳一个设备帧加一个解码帧重采样后的样本，留出几倍余量
+            resampled_frame_size = -(
+                -AudioConfig.OUTPUT_FRAME_SIZE
+                * self.device_output_sample_rate
+                // AudioConfig.OUTPUT_SAMPLE_RATE
+            )
+            self._resample_output_buffer = AudioRingBuffer(
+                (self._device_output_frame_size + resampled_frame_size) * 4
+            )
             logger.info(
                 f"输出重采样: {AudioConfig.OUTPUT_SAMPLE_RATE}Hz → "
                 f"{self.device_output_sample_rate}Hz"
@@ -319,6 +338,9 @@ class AudioCodec:
         if self._need_output_upmix:
             logger.info(f"输出声道上混: 1ch → {self.output_channels}ch")
 
+        self._input_mono = np.zeros(self._device_input_frame_size, dtype=np.float32)
+        self._output_mono = np.zeros(self._device_output_frame_size, dtype=np.float32)
+
     async def _create_streams(self):
         """
         创建音频流（完全使用设备原生格式）
@@ -373,10 +395,13 @@ class AudioCodec:
         try:
             # 步骤1: 声道下混（立体声/多声道 → 单声道）
             if self._need_input_downmix:
-                # indata shape: (frames, channels)
-                audio_data = downmix_to_mono(indata, keepdims=False)
+                # indata shape: (frames, channels)，直接求平均写入复用的数组
+                if self._input_mono is None or len(self._input_mono) < frames:
+                    self._input_mono = np.zeros(frames, dtype=np.float32)
+                audio_data = self._input_mono[:frames]
+                np.mean(indata, axis=1, out=audio_data)
             else:
-                audio_data = indata.flatten()  # 已经是单声道
+                audio_data = indata[:, 0]  # 已经是单声道，取视图不拷贝
 
             # 步骤2: 采样率转换（设备采样率 → 16kHz）
             if self.input_resampler is not None:
@@ -389,12 +414,17 @@ class AudioCodec:
                 return
 
             # 步骤4: 转换为 int16 供 Opus 编码和 AEC 处理
-            audio_data_int16 = (audio_data * 32768.0).astype(np.int16)
+            np.multiply(audio_data, 32768.0, out=self._input_scaled)
+            np.clip(self._input_scaled, -32768, 32767, out=self._input_scaled)
+            audio_data_int16 = self._input_frame_int16
+            audio_data_int16[:] = self._input_scaled
 
             # 步骤5: AEC处理（如果启用）
             if self._aec_enabled and self.audio_processor._is_macos:
                 try:
-                    audio_data_int16 = self.audio_processor.process_audio(audio_data_int16)
+                    audio_data_int16 = self.audio_processor.process_audio(
+                        audio_data_int16
+                    )
                 except Exception as e:
                     logger.warning(f"AEC处理失败，使用原始音频: {e}")
 
@@ -423,23 +453,19 @@ class AudioCodec:
     def _process_input_resampling(self, audio_data):
         """
         输入重采样处理：设备采样率 → 16kHz 使用缓冲区累积数据，凑够一帧再返回.
+
+        返回的是复用的帧数组，下一次回调会被覆盖.
         """
         try:
             resampled_data = self.input_resampler.resample_chunk(audio_data, last=False)
             if len(resampled_data) > 0:
-                self._resample_input_buffer.extend(resampled_data)
+                self._resample_input_buffer.write(resampled_data)
 
-            # 累积到目标帧大小
-            expected_frame_size = AudioConfig.INPUT_FRAME_SIZE
-            if len(self._resample_input_buffer) < expected_frame_size:
+            # 累积到目标帧大小后整块取出一帧
+            if self._resample_input_buffer.read_into(self._input_frame) == 0:
                 return None
 
-            # 取出一帧
-            frame_data = []
-            for _ in range(expected_frame_size):
-                frame_data.append(self._resample_input_buffer.popleft())
-
-            return np.array(frame_data, dtype=np.float32)
+            return self._input_frame
 
         except Exception as e:
             logger.error(f"输入重采样失败: {e}")
@@ -480,27 +506,15 @@ class AudioCodec:
             audio_data = self._output_buffer.get_nowait()
 
             # audio_data 是单声道数据,长度通常 = OUTPUT_FRAME_SIZE
-            # 截取或填充到所需帧数
-            if len(audio_data) >= frames:
-                mono_samples = audio_data[:frames]
-            else:
-                # 数据不足,填充静音
-                mono_samples = np.zeros(frames, dtype=np.int16)
-                mono_samples[: len(audio_data)] = audio_data
-
-            # 转换为 float32 用于播放
-            mono_samples_float = mono_samples.astype(np.float32) / 32768.0
-
-            # 声道处理
-            if self._need_output_upmix:
-                # 单声道 → 多声道（复制到所有声道）
-                multi_channel = upmix_mono_to_channels(
-                    mono_samples_float, self.output_channels
-                )
-                outdata[:] = multi_channel
-            else:
-                # 单声道输出
-                outdata[:, 0] = mono_samples_float
+            # 截取到所需帧数并转换为 float32，数据不足的部分填充静音
+            mono_samples_float = self._output_frame(frames)
+            count = min(len(audio_data), frames)
+            np.multiply(
+                audio_data[:count], 1.0 / 32768.0, out=mono_samples_float[:count]
+            )
+            mono_samples_float[count:] = 0
+
+            self._write_mono_output(outdata, mono_samples_float)
 
         except asyncio.QueueEmpty:
             # 无数据时输出静音
@@ -521,34 +535,25 @@ class AudioCodec:
             while len(self._resample_output_buffer) < frames:
                 try:
                     audio_data = self._output_buffer.get_nowait()
-                    # 转换 int16 → float32
-                    audio_data_float = audio_data.astype(np.float32) / 32768.0
-                    # 24kHz单声道 → 设备采样率单声道重采样
-                    resampled_data = self.output_resampler.resample_chunk(
-                        audio_data_float, last=False
-                    )
-                    if len(resampled_data) > 0:
-                        self._resample_output_buffer.extend(resampled_data)
                 except asyncio.QueueEmpty:
                     break
-
-            # 取出所需帧数的单声道数据
-            if len(self._resample_output_buffer) >= frames:
-                frame_data = []
-                for _ in range(frames):
-                    frame_data.append(self._resample_output_buffer.popleft())
-                mono_data = np.array(frame_data, dtype=np.float32)
-
-                # 声道处理
-                if self._need_output_upmix:
-                    # 单声道 → 多声道（复制到所有声道）
-                    multi_channel = upmix_mono_to_channels(
-                        mono_data, self.output_channels
-                    )
-                    outdata[:] = multi_channel
+                # 转换 int16 → float32，常规长度的帧复用同一个数组
+                if len(audio_data) == len(self._decoded_frame):
+                    audio_data_float = self._decoded_frame
                 else:
-                    # 单声道输出
-                    outdata[:, 0] = mono_data
+                    audio_data_float = np.empty(len(audio_data), dtype=np.float32)
+                np.multiply(audio_data, 1.0 / 32768.0, out=audio_data_float)
+                # 24kHz单声道 → 设备采样率单声道重采样
+                resampled_data = self.output_resampler.resample_chunk(
+                    audio_data_float, last=False
+                )
+                if len(resampled_data) > 0:
+                    self._resample_output_buffer.write(resampled_data)
+
+            # 整块取出所需帧数的单声道数据
+            mono_data = self._output_frame(frames)
+            if self._resample_output_buffer.read_into(mono_data):
+                self._write_mono_output(outdata, mono_data)
             else:
                 # 数据不足时输出静音
                 outdata.fill(0)
@@ -557,6 +562,23 @@ class AudioCodec:
             logger.warning(f"重采样输出失败: {e}")
             outdata.fill(0)
 
+    def _output_frame(self, frames: int) -> np.ndarray:
+        """
+        输出回调复用的单声道数组.
+        """
+        if self._output_mono is None or len(self._output_mono) < frames:
+            self._output_mono = np.zeros(frames, dtype=np.float32)
+        return self._output_mono[:frames]
+
+    def _write_mono_output(self, outdata, mono_data: np.ndarray):
+        """
+        单声道数据写入输出缓冲，多声道设备通过广播复制到所有声道.
+        """
+        if self._need_output_upmix:
+            outdata[:] = mono_data[:, np.newaxis]
+        else:
+            outdata[:, 0] = mono_data
+
     def _input_finished_callback(self):
         """
         输入流结束回调.
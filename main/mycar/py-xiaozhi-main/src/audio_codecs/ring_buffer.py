@@ -0,0 +1,90 @@
+import threading
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    预分配的音频环形缓冲区.
+
+    替代逐个样本 append/popleft 的 deque：写入和读取都按切片整块拷贝，
+    实时音频回调中不产生新的数组。写满时覆盖最旧的数据，缓冲区长度即最大积压延迟。
+    """
+
+    def __init__(self, capacity: int, dtype=np.float32):
+        """
+        Args:
+            capacity: 最多缓存的样本数
+            dtype: 样本类型，重采样链路为 float32，AEC参考信号为 int16
+        """
+        self._buffer = np.zeros(max(1, int(capacity)), dtype=dtype)
+        self._capacity = len(self._buffer)
+        self._read_pos = 0
+        self._size = 0
+        # 读写可能分别在不同的音频回调线程，clear 还可能来自事件循环线程
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def dtype(self):
+        return self._buffer.dtype
+
+    def __len__(self) -> int:
+        return self._size
+
+    def write(self, data: np.ndarray) -> int:
+        """写入一段样本，空间不足时丢弃最旧的样本.
+
+        Returns:
+            被覆盖丢弃的样本数
+        """
+        count = len(data)
+        if count == 0:
+            return 0
+        with self._lock:
+            if count >= self._capacity:
+                # 只保留最新的 capacity 个样本
+                dropped = self._size + count - self._capacity
+                self._buffer[:] = data[count - self._capacity :]
+                self._read_pos = 0
+                self._size = self._capacity
+                return dropped
+
+            dropped = max(0, self._size + count - self._capacity)
+            if dropped:
+                self._read_pos = (self._read_pos + dropped) % self._capacity
+                self._size -= dropped
+
+            write_pos = (self._read_pos + self._size) % self._capacity
+            first = min(count, self._capacity - write_pos)
+            self._buffer[write_pos : write_pos + first] = data[:first]
+            if first < count:
+                self._buffer[: count - first] = data[first:]
+            self._size += count
+            return dropped
+
+    def read_into(self, out: np.ndarray) -> int:
+        """读取 len(out) 个样本到调用方预分配的数组中，数据不足时不读取.
+
+        Returns:
+            读取的样本数，0 或 len(out)
+        """
+        count = len(out)
+        with self._lock:
+            if count == 0 or self._size < count:
+                return 0
+            first = min(count, self._capacity - self._read_pos)
+            out[:first] = self._buffer[self._read_pos : self._read_pos + first]
+            if first < count:
+                out[first:] = self._buffer[: count - first]
+            self._read_pos = (self._read_pos + count) % self._capacity
+            self._size -= count
+            return count
+
+    def clear(self):
+        with self._lock:
+            self._read_pos = 0
+            self._size = 0
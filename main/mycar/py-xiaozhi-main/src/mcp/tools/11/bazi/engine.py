@@ -6,8 +6,10 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 import pendulum
-from lunar_python import Lunar, Solar
+from lunar_python import Solar
 
+from .ganzhi_table import get_ganzhi_table, pillar_name
+from .lunar_cache import get_lunar_cache
 from .models import (
     ChineseCalendar,
     EarthBranch,
@@ -136,78 +138,19 @@ class BaziEngine:
 
     def solar_to_lunar(self, solar_time: SolarTime) -> LunarTime:
         """
-        公历转农历 - 增强闰月处理.
+        公历转农历 - 查农历月表缓存，闰月以 is_leap 标记.
         """
         try:
-            # 使用lunar-python进行真正的公历农历转换
-            solar = Solar.fromYmdHms(
-                solar_time.year,
-                solar_time.month,
-                solar_time.day,
-                solar_time.hour,
-                solar_time.minute,
-                solar_time.second,
-            )
-            lunar = solar.getLunar()
-
-            # 判断是否为闰月
-            is_leap = lunar.isLeap() if hasattr(lunar, "isLeap") else False
-
-            # 如果lunar-python没有isLeap方法，使用其他方式判断
-            if not hasattr(lunar, "isLeap"):
-                # 通过月份字符串判断（如果包含"闰"字）
-                month_str = lunar.getMonthInChinese()
-                is_leap = "闰" in month_str
-
-            return LunarTime(
-                year=lunar.getYear(),
-                month=lunar.getMonth(),
-                day=lunar.getDay(),
-                hour=lunar.getHour(),
-                minute=lunar.getMinute(),
-                second=lunar.getSecond(),
-                is_leap=is_leap,
-            )
+            return get_lunar_cache().solar_to_lunar(solar_time)
         except Exception as e:
             raise ValueError(f"公历转农历失败: {e}")
 
     def lunar_to_solar(self, lunar_time: LunarTime) -> SolarTime:
         """
-        农历转公历 - 增强闰月处理.
+        农历转公历 - 查农历月表缓存，is_leap 为真时按闰月处理.
         """
         try:
-            # 处理闰月
-            if lunar_time.is_leap:
-                # 如果是闰月，使用特殊方法创建农历对象
-                lunar = Lunar.fromYmdHms(
-                    lunar_time.year,
-                    -lunar_time.month,  # 闰月用负数表示
-                    lunar_time.day,
-                    lunar_time.hour,
-                    lunar_time.minute,
-                    lunar_time.second,
-                )
-            else:
-                # 普通月份
-                lunar = Lunar.fromYmdHms(
-                    lunar_time.year,
-                    lunar_time.month,
-                    lunar_time.day,
-                    lunar_time.hour,
-                    lunar_time.minute,
-                    lunar_time.second,
-                )
-
-            solar = lunar.getSolar()
-
-            return SolarTime(
-                year=solar.getYear(),
-                month=solar.getMonth(),
-                day=solar.getDay(),
-                hour=solar.getHour(),
-                minute=solar.getMinute(),
-                second=solar.getSecond(),
-            )
+            return get_lunar_cache().lunar_to_solar(lunar_time)
         except Exception as e:
             raise ValueError(f"农历转公历失败: {e}")
 
@@ -215,6 +158,24 @@ class BaziEngine:
         """
         构建八字.
         """
+        # 1900-2100年直接查预计算的干支历表
+        table = get_ganzhi_table()
+        if table.covers(solar_time.year, solar_time.month, solar_time.day):
+            year, month, day, hour = table.pillars_at(
+                solar_time.year,
+                solar_time.month,
+                solar_time.day,
+                solar_time.hour,
+                solar_time.minute,
+                solar_time.second,
+            )
+            return EightChar(
+                year=self._create_sixty_cycle_by_index(year),
+                month=self._create_sixty_cycle_by_index(month),
+                day=self._create_sixty_cycle_by_index(day),
+                hour=self._create_sixty_cycle_by_index(hour),
+            )
+
         try:
             # 使用lunar-python计算八字
             solar = Solar.fromYmdHms(
@@ -254,6 +215,13 @@ class BaziEngine:
         except Exception as e:
             raise ValueError(f"构建八字失败: {e}")
 
+    def _create_sixty_cycle_by_index(self, index: int) -> SixtyCycle:
+        """
+        按六十甲子序号创建干支对象.
+        """
+        name = pillar_name(index)
+        return self._create_sixty_cycle(name[0], name[1])
+
     def _create_sixty_cycle(self, gan_name: str, zhi_name: str) -> SixtyCycle:
         """
         创建六十甲子对象.
@@ -378,15 +346,8 @@ class BaziEngine:
             )
 
         try:
-            solar = Solar.fromYmdHms(
-                solar_time.year,
-                solar_time.month,
-                solar_time.day,
-                solar_time.hour,
-                solar_time.minute,
-                solar_time.second,
-            )
-            lunar = solar.getLunar()
+            lunar = get_lunar_cache().get_lunar(solar_time)
+            solar = lunar.getSolar()
 
             # 获取详细信息
             bazi = lunar.getEightChar()
@@ -457,15 +418,8 @@ class BaziEngine:
         获取详细的农历信息.
         """
         try:
-            solar = Solar.fromYmdHms(
-                solar_time.year,
-                solar_time.month,
-                solar_time.day,
-                solar_time.hour,
-                solar_time.minute,
-                solar_time.second,
-            )
-            lunar = solar.getLunar()
+            lunar = get_lunar_cache().get_lunar(solar_time)
+            solar = lunar.getSolar()
 
             # 获取节气信息
             current_jieqi = lunar.getJieQi()
@@ -0,0 +1,263 @@
+"""
+干支历预计算表.
+
+覆盖1900-2100年，首次使用时借助 lunar-python 生成并保存到用户缓存目录，之后以只读内存映射方式加载：
+- 日柱索引：按日柱分组的日期序号，反查某个日柱的所有日期无需逐日计算
+- 每日日柱：按日期序号直接取日柱
+- 节表：每个“节”的精确时刻及其后的年柱、月柱（年柱以立春为界，月柱以节为界）
+时柱由日干和时辰按五鼠遁推算。所有柱用六十甲子序号 0-59 表示（0为甲子）。
+"""
+
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.logging_config import get_logger
+from src.utils.resource_finder import get_user_cache_dir
+
+from .professional_data import GAN, ZHI
+
+logger = get_logger(__name__)
+
+TABLE_VERSION = 1
+START_DATE = date(1900, 1, 1)
+END_DATE = date(2100, 12, 31)
+_START_ORDINAL = START_DATE.toordinal()
+DAY_COUNT = END_DATE.toordinal() - _START_ORDINAL + 1
+# 每个日柱在表覆盖范围内最多出现的天数
+_DAYS_PER_PILLAR = -(-DAY_COUNT // 60)
+
+# 十二节，月柱在这些时刻切换
+JIE_NAMES = {
+    "小寒": "XIAO_HAN",
+    "立春": "LI_CHUN",
+    "惊蛰": "JING_ZHE",
+    "清明": "QING_MING",
+    "立夏": "LI_XIA",
+    "芒种": "MANG_ZHONG",
+    "小暑": "XIAO_SHU",
+    "立秋": "LI_QIU",
+    "白露": "BAI_LU",
+    "寒露": "HAN_LU",
+    "立冬": "LI_DONG",
+    "大雪": "DA_XUE",
+}
+_JIE_KEYS = set(JIE_NAMES) | set(JIE_NAMES.values())
+
+# 反查时每个时辰取的代表时刻，与原逐时辰搜索一致
+HOUR_OF_BRANCH = [branch * 2 for branch in range(12)]
+
+
+def pillar_index(pillar: str) -> Optional[int]:
+    """
+    干支名称转六十甲子序号，非法组合（如甲丑）返回None.
+    """
+    if len(pillar) != 2 or pillar[0] not in GAN or pillar[1] not in ZHI:
+        return None
+    gan, zhi = GAN.index(pillar[0]), ZHI.index(pillar[1])
+    if gan % 2 != zhi % 2:
+        return None
+    return (6 * gan - 5 * zhi) % 60
+
+
+def pillar_name(index: int) -> str:
+    """
+    六十甲子序号转干支名称.
+    """
+    return GAN[index % 10] + ZHI[index % 12]
+
+
+def hour_pillar(day_gan: int, hour: int) -> int:
+    """
+    五鼠遁推算时柱，day_gan 为子时所属日的日干序号.
+    """
+    branch = (hour + 1) // 2 % 12
+    gan = (day_gan % 5 * 2 + branch) % 10
+    return (6 * gan - 5 * branch) % 60
+
+
+def _day_number(year: int, month: int, day: int) -> int:
+    return date(year, month, day).toordinal() - _START_ORDINAL
+
+
+def _seconds(year, month, day, hour=0, minute=0, second=0) -> int:
+    """
+    距1900-01-01 00:00:00（北京时间）的秒数.
+    """
+    return _day_number(year, month, day) * 86400 + hour * 3600 + minute * 60 + second
+
+
+class GanzhiTable:
+    """
+    干支历表，数组均为只读内存映射.
+    """
+
+    def __init__(self, table_dir: Path):
+        self.day_pillars = np.load(table_dir / "day_pillars.npy", mmap_mode="r")
+        self.day_index = np.load(table_dir / "day_index.npy", mmap_mode="r")
+        jie = np.load(table_dir / "jie.npy", mmap_mode="r")
+        self.jie_seconds = jie[:, 0]
+        self.jie_month = jie[:, 1]
+        self.jie_year = jie[:, 2]
+
+    @staticmethod
+    def covers(year: int, month: int, day: int) -> bool:
+        return START_DATE <= date(year, month, day) <= END_DATE
+
+    def pillars_at(
+        self,
+        year: int,
+        month: int,
+        day: int,
+        hour: int,
+        minute: int = 0,
+        second: int = 0,
+    ) -> Tuple[int, int, int, int]:
+        """
+        指定北京时间的年、月、日、时柱序号，日柱以0点为界.
+        """
+        number = _day_number(year, month, day)
+        moment = number * 86400 + hour * 3600 + minute * 60 + second
+        jie = int(np.searchsorted(self.jie_seconds, moment, side="right")) - 1
+        day_pillar = int(self.day_pillars[number])
+        # 23点起为次日子时，时干按次日日干推算
+        day_gan = day_pillar + 1 if hour == 23 else day_pillar
+        return (
+            int(self.jie_year[jie]),
+            int(self.jie_month[jie]),
+            day_pillar,
+            hour_pillar(day_gan % 10, hour),
+        )
+
+    def find_solar_times(
+        self,
+        year_pillar: int,
+        month_pillar: int,
+        day_pillar: int,
+        time_pillar: int,
+        limit: int = 20,
+    ) -> List[str]:
+        """
+        反查四柱完全一致的公历时间，每个时辰取代表时刻，按时间先后返回.
+        """
+        branch = time_pillar % 12
+        hour = HOUR_OF_BRANCH[branch]
+        # 时干由日干决定，先排除不可能的组合
+        if hour_pillar(day_pillar % 10, hour) != time_pillar:
+            return []
+
+        days = self.day_index[day_pillar]
+        days = days[days >= 0]
+        moments = days.astype(np.int64) * 86400 + hour * 3600
+        jie = np.searchsorted(self.jie_seconds, moments, side="right") - 1
+        matched = days[
+            (self.jie_year[jie] == year_pillar) & (self.jie_month[jie] == month_pillar)
+        ][:limit]
+        return [
+            f"{date.fromordinal(int(number) + _START_ORDINAL).isoformat()} {hour:02d}:00:00"
+            for number in matched
+        ]
+
+
+def _generate(table_dir: Path):
+    """
+    借助 lunar-python 生成干支历表.
+    """
+    from lunar_python import Solar
+
+    started = datetime.now()
+
+    # 日柱六十天一循环，以表起始日的日柱为基准推算，再抽样核对
+    def lunar_day_pillar(number):
+        d = date.fromordinal(number + _START_ORDINAL)
+        eight_char = (
+            Solar.fromYmdHms(d.year, d.month, d.day, 12, 0, 0).getLunar().getEightChar()
+        )
+        return pillar_index(eight_char.getDay())
+
+    base = lunar_day_pillar(0)
+    day_pillars = ((np.arange(DAY_COUNT) + base) % 60).astype(np.int8)
+    for number in range(0, DAY_COUNT, 997):
+        if lunar_day_pillar(number) != day_pillars[number]:
+            raise RuntimeError(f"日柱推算与lunar-python不一致: 第{number}天")
+
+    day_index = np.full((60, _DAYS_PER_PILLAR), -1, dtype=np.int32)
+    for pillar in range(60):
+        numbers = np.flatnonzero(day_pillars == pillar)
+        day_index[pillar, : len(numbers)] = numbers
+
+    # 收集覆盖范围前后各一年的节，节表中同一节气可能以中文和拼音两种键出现
+    moments = {}
+    for year in range(START_DATE.year - 1, END_DATE.year + 2):
+        table = Solar.fromYmd(year, 6, 1).getLunar().getJieQiTable()
+        for name, solar in table.items():
+            if name in _JIE_KEYS:
+                moment = (
+                    solar.getYear(),
+                    solar.getMonth(),
+                    solar.getDay(),
+                    solar.getHour(),
+                    solar.getMinute(),
+                    solar.getSecond(),
+                )
+                moments[moment] = name in ("立春", "LI_CHUN")
+
+    def lunar_pillars(moment):
+        eight_char = Solar.fromYmdHms(*moment).getLunar().getEightChar()
+        return pillar_index(eight_char.getMonth()), pillar_index(eight_char.getYear())
+
+    # 每过一个节月柱顺延一位，过立春年柱顺延一位，同样抽样核对
+    rows = []
+    month_pillar = year_pillar = None
+    for number, moment in enumerate(sorted(moments)):
+        if number == 0:
+            month_pillar, year_pillar = lunar_pillars(moment)
+        else:
+            month_pillar = (month_pillar + 1) % 60
+            if moments[moment]:
+                year_pillar = (year_pillar + 1) % 60
+            if number % 97 == 0 and lunar_pillars(moment) != (
+                month_pillar,
+                year_pillar,
+            ):
+                raise RuntimeError(f"月柱推算与lunar-python不一致: {moment}")
+        rows.append((_seconds(*moment), month_pillar, year_pillar))
+    jie = np.array(rows, dtype=np.int64)
+
+    table_dir.mkdir(parents=True, exist_ok=True)
+    for name, array in (
+        ("day_pillars", day_pillars),
+        ("day_index", day_index),
+        ("jie", jie),
+    ):
+        # 先写临时文件再改名，避免中途退出留下不完整的表
+        tmp_path = table_dir / f"{name}.tmp.npy"
+        np.save(tmp_path, array)
+        tmp_path.replace(table_dir / f"{name}.npy")
+
+    logger.info(
+        f"干支历表已生成: {table_dir}，{DAY_COUNT}天/{len(jie)}个节，"
+        f"耗时{(datetime.now() - started).total_seconds():.1f}s"
+    )
+
+
+_ganzhi_table = None
+_ganzhi_table_lock = threading.Lock()
+
+
+def get_ganzhi_table() -> GanzhiTable:
+    """
+    获取干支历表单例，缓存目录中没有时先生成.
+    """
+    global _ganzhi_table
+    if _ganzhi_table is None:
+        with _ganzhi_table_lock:
+            if _ganzhi_table is None:
+                table_dir = get_user_cache_dir() / f"ganzhi_v{TABLE_VERSION}"
+                if not (table_dir / "jie.npy").exists():
+                    _generate(table_dir)
+                _ganzhi_table = GanzhiTable(table_dir)
+    return _ganzhi_table
@@ -0,0 +1,250 @@
+"""
+公历农历转换缓存.
+
+lunar-python 的 LunarYear 只缓存最近一个农历年，交替查询不同年份（如合婚时男女双方）
+每次都要重新计算整年节气和朔望，单次转换十几毫秒。这里按公历年缓存农历月表：
+- 农历月表：每个农历月初一的日期序号、天数和所属年月，公历农历互转只需查表
+- Lunar 对象：黄历、节气等需要完整 Lunar 对象的查询走有界 LRU
+
+两者都按需填充，超出容量时淘汰最久未用的条目。
+"""
+
+import bisect
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import List, Tuple
+
+from lunar_python import Lunar, Solar
+
+from .models import LunarTime, SolarTime
+
+# 儒略日与 date.toordinal() 的差值（按正午计）
+_JULIAN_DAY_OFFSET = 1721425
+# 1582年10月之前 lunar-python 按儒略历计，date 为外推格里历，直接交给 lunar-python
+_GREGORIAN_START = date(1583, 1, 1)
+
+
+class _MonthTable:
+    """
+    一个公历年所在 LunarYear 的农历月表，含前后相邻年份的月份.
+    """
+
+    def __init__(self, year: int):
+        from lunar_python import LunarYear
+
+        self.first_ordinals = []
+        self.months = []
+        for month in LunarYear.fromYear(year).getMonths():
+            first_ordinal = int(month.getFirstJulianDay()) - _JULIAN_DAY_OFFSET
+            self.first_ordinals.append(first_ordinal)
+            self.months.append((month.getYear(), month.getMonth(), month.getDayCount()))
+
+    def lunar_date(self, ordinal: int):
+        """
+        日期序号转农历年、月（闰月为负数）、日，不在表内返回None.
+        """
+        index = bisect.bisect_right(self.first_ordinals, ordinal) - 1
+        if index < 0:
+            return None
+        year, month, day_count = self.months[index]
+        day = ordinal - self.first_ordinals[index] + 1
+        if day > day_count:
+            return None
+        return year, month, day
+
+    def first_ordinal(self, lunar_year: int, lunar_month: int):
+        """
+        农历某月初一的日期序号和当月天数，不在表内返回None.
+        """
+        for ordinal, (year, month, day_count) in zip(self.first_ordinals, self.months):
+            if year == lunar_year and month == lunar_month:
+                return ordinal, day_count
+        return None
+
+
+class LunarCache:
+    """
+    公历农历转换缓存.
+    """
+
+    def __init__(self, maxsize: int = 1024, max_years: int = 64):
+        """
+        Args:
+            maxsize: 缓存的 Lunar 对象数量上限
+            max_years: 缓存的农历月表年数上限
+        """
+        self.maxsize = maxsize
+        self.max_years = max_years
+        self._tables = OrderedDict()
+        self._lunars = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lru_get(self, cache: OrderedDict, key):
+        with self._lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return value
+
+    def _lru_put(self, cache: OrderedDict, key, value, limit: int):
+        with self._lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > limit:
+                cache.popitem(last=False)
+
+    def _month_table(self, year: int) -> _MonthTable:
+        table = self._lru_get(self._tables, year)
+        if table is None:
+            # 计算在锁外进行，并发时可能重复计算同一年，结果相同
+            table = _MonthTable(year)
+            self._lru_put(self._tables, year, table, self.max_years)
+        return table
+
+    def lunar_date(self, year: int, month: int, day: int) -> Tuple[int, int, int]:
+        """
+        公历日期转农历年、月、日，闰月的月份为负数（与 lunar-python 一致）.
+        """
+        d = date(year, month, day)
+        if d >= _GREGORIAN_START:
+            result = self._month_table(year).lunar_date(d.toordinal())
+            if result is not None:
+                return result
+        lunar = Solar.fromYmd(year, month, day).getLunar()
+        return lunar.getYear(), lunar.getMonth(), lunar.getDay()
+
+    def solar_to_lunar(self, solar_time: SolarTime) -> LunarTime:
+        """
+        公历转农历.
+        """
+        year, month, day = self.lunar_date(
+            solar_time.year, solar_time.month, solar_time.day
+        )
+        return LunarTime(
+            year=year,
+            month=abs(month),
+            day=day,
+            hour=solar_time.hour,
+            minute=solar_time.minute,
+            second=solar_time.second,
+            is_leap=month < 0,
+        )
+
+    def lunar_to_solar(self, lunar_time: LunarTime) -> SolarTime:
+        """
+        农历转公历，月份或日期不存在时抛出ValueError.
+        """
+        month = -lunar_time.month if lunar_time.is_leap else lunar_time.month
+        found = self._month_table(lunar_time.year).first_ordinal(lunar_time.year, month)
+        if found is None:
+            # 月表按公历年组织，农历年末的月份也可能在下一公历年的表中
+            found = self._month_table(lunar_time.year + 1).first_ordinal(
+                lunar_time.year, month
+            )
+        if found is None:
+            leap_text = "闰" if month < 0 else ""
+            raise ValueError(f"农历{lunar_time.year}年没有{leap_text}{abs(month)}月")
+
+        first_ordinal, day_count = found
+        if not 1 <= lunar_time.day <= day_count:
+            raise ValueError(f"农历{lunar_time.year}年{abs(month)}月只有{day_count}天")
+        if first_ordinal < _GREGORIAN_START.toordinal():
+            solar = Lunar.fromYmd(lunar_time.year, month, lunar_time.day).getSolar()
+            d = date(solar.getYear(), solar.getMonth(), solar.getDay())
+        else:
+            d = date.fromordinal(first_ordinal + lunar_time.day - 1)
+        return SolarTime(
+            year=d.year,
+            month=d.month,
+            day=d.day,
+            hour=lunar_time.hour,
+            minute=lunar_time.minute,
+            second=lunar_time.second,
+        )
+
+    def solar_to_lunar_range(
+        self, start: date, end: date
+    ) -> List[Tuple[date, LunarTime]]:
+        """
+        批量转换公历日期区间（含首尾），逐月推进，不为每天创建 Lunar 对象.
+        """
+        if start < _GREGORIAN_START:
+            raise ValueError(f"批量转换仅支持{_GREGORIAN_START.year}年以后的日期")
+
+        results = []
+        ordinal = start.toordinal()
+        end_ordinal = end.toordinal()
+        while ordinal <= end_ordinal:
+            d = date.fromordinal(ordinal)
+            table = self._month_table(d.year)
+            index = bisect.bisect_right(table.first_ordinals, ordinal) - 1
+            year, month, day_count = table.months[index]
+            first = table.first_ordinals[index]
+            # 同一农历月内的日期直接顺延
+            stop = min(first + day_count - 1, end_ordinal)
+            for current in range(ordinal, stop + 1):
+                results.append(
+                    (
+                        d + timedelta(days=current - ordinal),
+                        LunarTime(
+                            year=year,
+                            month=abs(month),
+                            day=current - first + 1,
+                            hour=0,
+                            minute=0,
+                            second=0,
+                            is_leap=month < 0,
+                        ),
+                    )
+                )
+            ordinal = stop + 1
+        return results
+
+    def get_lunar(self, solar_time: SolarTime) -> Lunar:
+        """
+        获取完整的 lunar-python Lunar 对象，用于黄历、节气等查询.
+
+        键精确到秒：节气交接、起运计算都依赖具体时刻，只按日期和小时缓存会取到错误的节气.
+        """
+        key = (
+            solar_time.year,
+            solar_time.month,
+            solar_time.day,
+            solar_time.hour,
+            solar_time.minute,
+            solar_time.second,
+        )
+        lunar = self._lru_get(self._lunars, key)
+        if lunar is None:
+            lunar = Solar.fromYmdHms(*key).getLunar()
+            self._lru_put(self._lunars, key, lunar, self.maxsize)
+        return lunar
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+            self._lunars.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_lunar_cache = None
+_lunar_cache_lock = threading.Lock()
+
+
+def get_lunar_cache() -> LunarCache:
+    """
+    获取公历农历转换缓存单例.
+    """
+    global _lunar_cache
+    if _lunar_cache is None:
+        with _lunar_cache_lock:
+            if _lunar_cache is None:
+                _lunar_cache = LunarCache()
+    return _lunar_cache
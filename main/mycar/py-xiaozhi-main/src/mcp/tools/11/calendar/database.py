@@ -4,9 +4,10 @@
 
 import os
 import sqlite3
+import threading
 from contextlib import contextmanager
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from src.utils.logging_config import get_logger
 from src.utils.resource_finder import get_user_data_dir
@@ -27,14 +28,64 @@ def _get_database_file_path() -> str:
 # 数据库文件路径 - 使用函数获取确保可写
 DATABASE_FILE = _get_database_file_path()
 
+# 可更新的事件字段
+UPDATABLE_FIELDS = (
+    "title",
+    "start_time",
+    "end_time",
+    "description",
+    "category",
+    "reminder_minutes",
+)
+
+# 固定的SQL语句，长连接上 sqlite3 按语句文本缓存预编译结果，重复执行无需再次解析
+INSERT_EVENT_SQL = """
+    INSERT INTO events (
+        id, title, start_time, end_time, description,
+        category, reminder_minutes, reminder_time, reminder_sent,
+        created_at, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+SELECT_EVENT_SQL = "SELECT * FROM events WHERE id = ?"
+DELETE_EVENT_SQL = "DELETE FROM events WHERE id = ?"
+CONFLICT_SQL = """
+    SELECT title FROM events
+    WHERE id != ? AND (
+        (start_time < ? AND end_time > ?) OR
+        (start_time < ? AND end_time > ?)
+    )
+"""
+
+# 事件变更通知的类型，reload 表示变更范围不明确，监听方应整体重新加载
+CHANGE_ADD = "add"
+CHANGE_UPDATE = "update"
+CHANGE_DELETE = "delete"
+CHANGE_RELOAD = "reload"
+
+# 日程区间查询按开始时间，分类查询按分类+开始时间，提醒扫描只索引未发送提醒的事件；
+# 冲突检查的条件 end_time > 新事件开始时间 只命中尚未结束的少量事件，历史再多也不用全表扫描
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_events_start_time ON events (start_time)",
+    "CREATE INDEX IF NOT EXISTS idx_events_end_time ON events (end_time)",
+    "CREATE INDEX IF NOT EXISTS idx_events_category_start "
+    "ON events (category, start_time)",
+    "CREATE INDEX IF NOT EXISTS idx_events_pending_reminder "
+    "ON events (reminder_time) WHERE reminder_sent = 0",
+)
+
 
 class CalendarDatabase:
     """
     日程管理数据库操作类.
     """
 
-    def __init__(self):
-        self.db_file = DATABASE_FILE
+    def __init__(self, db_file: str = None):
+        self.db_file = db_file or DATABASE_FILE
+        # 每个线程一个长连接，sqlite3 连接不宜跨线程共享
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._listeners: List[Callable[[str, List[str]], None]] = []
         self._ensure_database()
 
     def _ensure_database(self):
@@ -45,8 +96,7 @@ class CalendarDatabase:
 
         with self._get_connection() as conn:
             # 创建事件表
-            conn.execute(
-                """
+            conn.execute("""
                 CREATE TABLE IF NOT EXISTS events (
                     id TEXT PRIMARY KEY,
                     title TEXT NOT NULL,
@@ -60,18 +110,15 @@ class CalendarDatabase:
                     created_at TEXT NOT NULL,
                     updated_at TEXT NOT NULL
                 )
-            """
-            )
+            """)
 
             # 创建分类表
-            conn.execute(
-                """
+            conn.execute("""
                 CREATE TABLE IF NOT EXISTS categories (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     name TEXT UNIQUE NOT NULL
                 )
-            """
-            )
+            """)
 
             # 插入默认分类
             default_categories = ["默认", "工作", "个人", "会议", "提醒"]
@@ -85,26 +132,85 @@ class CalendarDatabase:
             # 检查并添加新字段（数据库升级）
             self._upgrade_database(conn)
 
+            # 索引依赖升级后才有的 reminder_time 等字段
+            for index_sql in INDEXES:
+                conn.execute(index_sql)
+            conn.commit()
+
             logger.info("数据库初始化完成")
 
+    def _connect(self) -> sqlite3.Connection:
+        """
+        创建当前线程的长连接.
+        """
+        # 允许 close() 在其他线程关闭连接，使用上仍是每线程独占
+        conn = sqlite3.connect(self.db_file, check_same_thread=False, timeout=5)
+        conn.row_factory = sqlite3.Row  # 使结果可以按列名访问
+        # WAL 模式下读写互不阻塞，提醒服务与工具调用可同时访问
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
     @contextmanager
     def _get_connection(self):
         """
-        获取数据库连接的上下文管理器.
+        获取当前线程数据库长连接的上下文管理器，出错时回滚未提交的修改.
         """
-        conn = None
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
         try:
-            conn = sqlite3.connect(self.db_file)
-            conn.row_factory = sqlite3.Row  # 使结果可以按列名访问
             yield conn
         except Exception as e:
-            if conn:
-                conn.rollback()
+            conn.rollback()
             logger.error(f"数据库操作失败: {e}")
             raise
-        finally:
-            if conn:
+        else:
+            # 与原来关闭连接时一致：未提交的修改不带入下一次操作
+            if conn.in_transaction:
+                conn.rollback()
+
+    def close(self):
+        """
+        关闭所有线程的数据库连接.
+        """
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
                 conn.close()
+            except Exception as e:
+                logger.warning(f"关闭数据库连接失败: {e}")
+        self._local = threading.local()
+
+    def add_change_listener(self, listener: Callable[[str, List[str]], None]):
+        """注册事件变更监听，提交成功后在执行写操作的线程中回调.
+
+        Args:
+            listener: 回调函数，参数为变更类型（CHANGE_*）和事件ID列表
+        """
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_change_listener(self, listener: Callable[[str, List[str]], None]):
+        """
+        移除事件变更监听.
+        """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify_change(self, action: str, event_ids: List[str] = None):
+        """
+        通知所有监听方，监听方异常不影响数据库操作结果.
+        """
+        for listener in list(self._listeners):
+            try:
+                listener(action, list(event_ids or []))
+            except Exception as e:
+                logger.warning(f"事件变更通知失败: {e}")
 
     def add_event(self, event_data: Dict[str, Any]) -> bool:
         """
@@ -116,29 +222,9 @@ class CalendarDatabase:
                 if self._has_conflict(conn, event_data):
                     return False
 
-                conn.execute(
-                    """
-                    INSERT INTO events (
-                        id, title, start_time, end_time, description,
-                        category, reminder_minutes, reminder_time, reminder_sent,
-                        created_at, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        event_data["id"],
-                        event_data["title"],
-                        event_data["start_time"],
-                        event_data["end_time"],
-                        event_data["description"],
-                        event_data["category"],
-                        event_data["reminder_minutes"],
-                        event_data.get("reminder_time"),
-                        event_data.get("reminder_sent", False),
-                        event_data["created_at"],
-                        event_data["updated_at"],
-                    ),
-                )
+                conn.execute(INSERT_EVENT_SQL, self._event_params(event_data))
                 conn.commit()
+                self._notify_change(CHANGE_ADD, [event_data["id"]])
                 logger.info(f"添加事件成功: {event_data['title']}")
                 return True
         except Exception as e:
@@ -188,36 +274,13 @@ class CalendarDatabase:
         """
         try:
             with self._get_connection() as conn:
-                # 构建更新查询
-                set_clauses = []
-                params = []
-
-                for key, value in kwargs.items():
-                    if key in [
-                        "title",
-                        "start_time",
-                        "end_time",
-                        "description",
-                        "category",
-                        "reminder_minutes",
-                    ]:
-                        set_clauses.append(f"{key} = ?")
-                        params.append(value)
-
-                if not set_clauses:
+                updated = self._update_event(conn, event_id, kwargs)
+                if updated is None:
                     return False
-
-                # 添加更新时间
-                set_clauses.append("updated_at = ?")
-                params.append(datetime.now().isoformat())
-                params.append(event_id)
-
-                query = f"UPDATE events SET {', '.join(set_clauses)} WHERE id = ?"
-
-                cursor = conn.execute(query, params)
                 conn.commit()
 
-                if cursor.rowcount > 0:
+                if updated:
+                    self._notify_change(CHANGE_UPDATE, [event_id])
                     logger.info(f"更新事件成功: {event_id}")
                     return True
                 else:
@@ -227,16 +290,177 @@ class CalendarDatabase:
             logger.error(f"更新事件失败: {e}")
             return False
 
+    def add_events_batch(
+        self, events_data: List[Dict[str, Any]], check_conflict: bool = True
+    ) -> Dict[str, Any]:
+        """批量添加事件，全部在一个事务内写入.
+
+        Args:
+            events_data: 事件字典列表，格式同 add_event
+            check_conflict: 是否逐个检查时间冲突，冲突的事件跳过；导入历史数据时可关闭
+
+        Returns:
+            包含添加结果的字典
+        """
+        try:
+            with self._get_connection() as conn:
+                skipped_ids = []
+                if check_conflict:
+                    for event_data in events_data:
+                        # 同一批次内先写入的事件也参与冲突检查
+                        if self._has_conflict(conn, event_data):
+                            skipped_ids.append(event_data["id"])
+                            continue
+                        conn.execute(INSERT_EVENT_SQL, self._event_params(event_data))
+                else:
+                    conn.executemany(
+                        INSERT_EVENT_SQL,
+                        (self._event_params(event_data) for event_data in events_data),
+                    )
+                added_count = len(events_data) - len(skipped_ids)
+                conn.commit()
+
+                skipped = set(skipped_ids)
+                self._notify_change(
+                    CHANGE_ADD,
+                    [e["id"] for e in events_data if e["id"] not in skipped],
+                )
+
+                logger.info(
+                    f"批量添加事件成功，共添加 {added_count} 个，"
+                    f"因冲突跳过 {len(skipped_ids)} 个"
+                )
+                return {
+                    "success": True,
+                    "added_count": added_count,
+                    "skipped_ids": skipped_ids,
+                    "message": f"成功添加 {added_count} 个事件",
+                }
+        except Exception as e:
+            logger.error(f"批量添加事件失败: {e}")
+            return {
+                "success": False,
+                "added_count": 0,
+                "skipped_ids": [],
+                "message": f"批量添加失败: {str(e)}",
+            }
+
+    def update_events_batch(
+        self, updates: List[Tuple[str, Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """批量更新事件，全部在一个事务内写入.
+
+        Args:
+            updates: (事件ID, 更新字段字典) 列表，字段同 update_event
+
+        Returns:
+            包含更新结果的字典
+        """
+        try:
+            with self._get_connection() as conn:
+                updated_ids = []
+                missing_ids = []
+                for event_id, fields in updates:
+                    updated = self._update_event(conn, event_id, fields)
+                    if updated:
+                        updated_ids.append(event_id)
+                    elif updated is not None:
+                        missing_ids.append(event_id)
+                conn.commit()
+
+                self._notify_change(CHANGE_UPDATE, updated_ids)
+                updated_count = len(updated_ids)
+
+                logger.info(f"批量更新事件成功，共更新 {updated_count} 个事件")
+                return {
+                    "success": True,
+                    "updated_count": updated_count,
+                    "missing_ids": missing_ids,
+                    "message": f"成功更新 {updated_count} 个事件",
+                }
+        except Exception as e:
+            logger.error(f"批量更新事件失败: {e}")
+            return {
+                "success": False,
+                "updated_count": 0,
+                "missing_ids": [],
+                "message": f"批量更新失败: {str(e)}",
+            }
+
+    def _update_event(
+        self, conn: sqlite3.Connection, event_id: str, fields: Dict[str, Any]
+    ) -> Optional[bool]:
+        """
+        在当前事务中更新单个事件，返回是否更新成功，没有可更新字段时返回None.
+        """
+        fields = {key: fields[key] for key in UPDATABLE_FIELDS if key in fields}
+        if not fields:
+            return None
+
+        # 开始时间或提前分钟数变化时同步提醒时间，并重新等待提醒
+        if "start_time" in fields or "reminder_minutes" in fields:
+            row = conn.execute(
+                "SELECT start_time, reminder_minutes FROM events WHERE id = ?",
+                (event_id,),
+            ).fetchone()
+            if row is None:
+                return False
+            fields["reminder_time"] = self._calculate_reminder_time(
+                fields.get("start_time", row["start_time"]),
+                fields.get("reminder_minutes", row["reminder_minutes"]),
+            )
+            fields["reminder_sent"] = False
+
+        # 添加更新时间
+        fields["updated_at"] = datetime.now().isoformat()
+        set_clause = ", ".join(f"{key} = ?" for key in fields)
+        cursor = conn.execute(
+            f"UPDATE events SET {set_clause} WHERE id = ?",
+            (*fields.values(), event_id),
+        )
+        return cursor.rowcount > 0
+
+    @staticmethod
+    def _calculate_reminder_time(start_time: str, reminder_minutes: int) -> str:
+        """
+        计算提醒时间，与 CalendarEvent 的计算方式一致.
+        """
+        try:
+            start_dt = datetime.fromisoformat(start_time)
+            return (start_dt - timedelta(minutes=reminder_minutes)).isoformat()
+        except Exception:
+            return start_time
+
+    @staticmethod
+    def _event_params(event_data: Dict[str, Any]) -> tuple:
+        """
+        INSERT_EVENT_SQL 的参数.
+        """
+        return (
+            event_data["id"],
+            event_data["title"],
+            event_data["start_time"],
+            event_data["end_time"],
+            event_data["description"],
+            event_data["category"],
+            event_data["reminder_minutes"],
+            event_data.get("reminder_time"),
+            event_data.get("reminder_sent", False),
+            event_data["created_at"],
+            event_data["updated_at"],
+        )
+
     def delete_event(self, event_id: str) -> bool:
         """
         删除事件.
         """
         try:
             with self._get_connection() as conn:
-                cursor = conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
+                cursor = conn.execute(DELETE_EVENT_SQL, (event_id,))
                 conn.commit()
 
                 if cursor.rowcount > 0:
+                    self._notify_change(CHANGE_DELETE, [event_id])
                     logger.info(f"删除事件成功: {event_id}")
                     return True
                 else:
@@ -280,6 +504,7 @@ class CalendarDatabase:
 
                     cursor = conn.execute("DELETE FROM events")
                     conn.commit()
+                    self._notify_change(CHANGE_RELOAD)
 
                     logger.info(f"删除所有事件成功，共删除 {total_count} 个事件")
                     return {
@@ -335,6 +560,9 @@ class CalendarDatabase:
                     cursor = conn.execute(delete_query, delete_params)
                     deleted_count = cursor.rowcount
                     conn.commit()
+                    self._notify_change(
+                        CHANGE_DELETE, [event[0] for event in events_to_delete]
+                    )
 
                     # 记录删除的事件标题
                     deleted_titles = [event[1] for event in events_to_delete]
@@ -365,7 +593,7 @@ class CalendarDatabase:
         """
         try:
             with self._get_connection() as conn:
-                cursor = conn.execute("SELECT * FROM events WHERE id = ?", (event_id,))
+                cursor = conn.execute(SELECT_EVENT_SQL, (event_id,))
                 row = cursor.fetchone()
 
                 if row:
@@ -443,13 +671,7 @@ class CalendarDatabase:
         检查时间冲突.
         """
         cursor = conn.execute(
-            """
-            SELECT title FROM events
-            WHERE id != ? AND (
-                (start_time < ? AND end_time > ?) OR
-                (start_time < ? AND end_time > ?)
-            )
-        """,
+            CONFLICT_SQL,
             (
                 event_data["id"],
                 event_data["end_time"],
@@ -479,24 +701,22 @@ class CalendarDatabase:
                 total_events = cursor.fetchone()[0]
 
                 # 按分类统计
-                cursor = conn.execute(
-                    """
+                cursor = conn.execute("""
                     SELECT category, COUNT(*)
                     FROM events
                     GROUP BY category
                     ORDER BY COUNT(*) DESC
-                """
-                )
+                """)
                 category_stats = dict(cursor.fetchall())
 
-                # 今天的事件数
-                today = datetime.now().strftime("%Y-%m-%d")
+                # 今天的事件数，按开始时间区间查询以使用索引
+                today = datetime.now().date()
                 cursor = conn.execute(
                     """
                     SELECT COUNT(*) FROM events
-                    WHERE date(start_time) = ?
+                    WHERE start_time >= ? AND start_time < ?
                 """,
-                    (today,),
+                    (today.isoformat(), (today + timedelta(days=1)).isoformat()),
                 )
                 today_events = cursor.fetchone()[0]
 
@@ -557,6 +777,7 @@ class CalendarDatabase:
                     )
 
                 conn.commit()
+                self._notify_change(CHANGE_RELOAD)
                 logger.info(
                     f"成功迁移 {len(events_data)} 个事件和 {len(categories_data)} 个分类"
                 )
@@ -597,8 +818,6 @@ class CalendarDatabase:
             for event in events_to_update:
                 event_id, start_time, reminder_minutes = event
                 try:
-                    from datetime import timedelta
-
                     start_dt = datetime.fromisoformat(start_time)
                     reminder_dt = start_dt - timedelta(minutes=reminder_minutes)
 
@@ -1,18 +1,28 @@
 """
-日程提醒服务 定期检查数据库中的事件，当到达提醒时间时通过TTS播报提醒.
+日程提醒服务 启动时加载一次待发送的提醒放入按提醒时间排序的堆，休眠到最近一个提醒到期时
+通过TTS播报；事件增删改由数据库变更通知实时更新堆，空闲时不轮询数据库.
 """
 
 import asyncio
+import heapq
 import json
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from src.utils.logging_config import get_logger
 
-from .database import get_calendar_database
+from .database import CHANGE_DELETE, CHANGE_RELOAD, get_calendar_database
 
 logger = get_logger(__name__)
 
+# 待发送提醒：未发送、有提醒时间且事件未过期
+PENDING_REMINDERS_SQL = """
+    SELECT id, start_time, reminder_time, reminder_sent FROM events
+    WHERE reminder_sent = 0
+    AND reminder_time IS NOT NULL
+    AND start_time > ?
+"""
+
 
 class CalendarReminderService:
     """
@@ -23,7 +33,17 @@ class CalendarReminderService:
         self.db = get_calendar_database()
         self.is_running = False
         self._task: Optional[asyncio.Task] = None
-        self.check_interval = 30  # 检查间隔（秒）
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        # 提醒堆 (提醒时间, 事件ID)；事件变更后旧条目留在堆中，出堆时与 _scheduled 比对丢弃
+        self._heap: List[Tuple[datetime, str]] = []
+        self._scheduled: Dict[str, datetime] = {}
+        # 数据库变更通知，可能来自其他线程，统一在事件循环中处理
+        self._changes: List[Tuple[str, List[str]]] = []
+        # 单次休眠上限（秒），系统校时后据此重新计算等待时间，醒来时不访问数据库
+        self.max_sleep = 300
+        # 事件开始超过该时长后不再补发提醒
+        self.expire_after = timedelta(hours=1)
 
     def _get_application(self):
         """
@@ -46,11 +66,19 @@ class CalendarReminderService:
             return
 
         self.is_running = True
-        self._task = asyncio.create_task(self._reminder_loop())
-        logger.info("日程提醒服务已启动")
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
 
-        # 程序启动时重置未来事件的提醒标志
+        # 程序启动时重置未来事件的提醒标志，并清理过期事件的提醒标志
         await self.reset_reminder_flags_for_future_events()
+        await self._cleanup_expired_reminders()
+
+        # 先注册变更通知再加载，加载期间的变更也会在循环中重新核对
+        self.db.add_change_listener(self._on_database_change)
+        self._load_pending_reminders()
+
+        self._task = asyncio.create_task(self._reminder_loop())
+        logger.info("日程提醒服务已启动")
 
     async def stop(self):
         """
@@ -60,6 +88,7 @@ class CalendarReminderService:
             return
 
         self.is_running = False
+        self.db.remove_change_listener(self._on_database_change)
         if self._task:
             self._task.cancel()
             try:
@@ -68,61 +97,194 @@ class CalendarReminderService:
                 pass
             self._task = None
 
+        self._heap.clear()
+        self._scheduled.clear()
+        self._changes.clear()
         logger.info("日程提醒服务已停止")
 
     async def _reminder_loop(self):
         """
-        提醒检查循环.
+        提醒调度循环：休眠到最近的提醒时间或收到变更通知.
         """
-        logger.info("开始日程提醒检查循环")
+        logger.info("开始日程提醒调度循环")
 
         while self.is_running:
             try:
-                await self._check_and_send_reminders()
-                # 定期清理过期事件的提醒标志
-                await self._cleanup_expired_reminders()
-                await asyncio.sleep(self.check_interval)
+                await self._wait_next()
+                self._apply_changes()
+                await self._send_due_reminders()
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"提醒检查循环出错: {e}", exc_info=True)
-                await asyncio.sleep(self.check_interval)
+                logger.error(f"提醒调度循环出错: {e}", exc_info=True)
+                await asyncio.sleep(1)
 
-    async def _check_and_send_reminders(self):
+    async def _wait_next(self):
         """
-        检查并发送提醒.
+        等待最近一个提醒到期或收到数据库变更通知.
         """
+        timeout = self.max_sleep
+        if self._heap:
+            seconds = (self._heap[0][0] - datetime.now()).total_seconds()
+            if seconds <= 0:
+                return
+            timeout = min(seconds, self.max_sleep)
+
         try:
-            now = datetime.now()
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
 
-            # 查询所有未发送提醒且提醒时间已到的事件
-            # 同时确保事件还没有过期（开始时间在当前时间之后或者在合理的过期时间内）
-            with self.db._get_connection() as conn:
+    def _on_database_change(self, action: str, event_ids: List[str]):
+        """
+        数据库变更回调，可能在任意线程中调用.
+        """
+        loop = self._loop
+        if not self.is_running or loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._queue_change, action, event_ids)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+    def _queue_change(self, action: str, event_ids: List[str]):
+        self._changes.append((action, event_ids))
+        if self._wakeup:
+            self._wakeup.set()
+
+    def _apply_changes(self):
+        """
+        按变更通知更新提醒堆，新增和修改的事件重新读取后排期.
+        """
+        if not self._changes:
+            return
+        changes, self._changes = self._changes, []
+
+        changed_ids = set()
+        for action, event_ids in changes:
+            if action == CHANGE_RELOAD:
+                self._load_pending_reminders()
+                return
+            if action == CHANGE_DELETE:
+                for event_id in event_ids:
+                    self._scheduled.pop(event_id, None)
+                    changed_ids.discard(event_id)
+            else:
+                changed_ids.update(event_ids)
+
+        if not changed_ids:
+            return
+        now = datetime.now()
+        rows = self._fetch_events(changed_ids)
+        for event_id in changed_ids:
+            row = rows.get(event_id)
+            if row is None:
+                self._scheduled.pop(event_id, None)
+            else:
+                self._schedule(row, now)
+
+    def _fetch_events(self, event_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量读取事件的提醒相关字段.
+        """
+        event_ids = list(event_ids)
+        rows = {}
+        with self.db._get_connection() as conn:
+            # 分批查询，避免超出SQLite参数个数限制
+            for i in range(0, len(event_ids), 500):
+                chunk = event_ids[i : i + 500]
                 cursor = conn.execute(
-                    """
-                    SELECT * FROM events
-                    WHERE reminder_sent = 0
-                    AND reminder_time IS NOT NULL
-                    AND reminder_time <= ?
-                    AND start_time > ?
-                    ORDER BY reminder_time
-                """,
-                    (now.isoformat(), (now - timedelta(hours=1)).isoformat()),
+                    "SELECT id, start_time, reminder_time, reminder_sent FROM events "
+                    f"WHERE id IN ({', '.join('?' * len(chunk))})",
+                    chunk,
                 )
+                for row in cursor.fetchall():
+                    rows[row["id"]] = dict(row)
+        return rows
 
-                pending_reminders = cursor.fetchall()
+    def _load_pending_reminders(self):
+        """
+        从数据库加载全部待发送的提醒，重建提醒堆.
+        """
+        now = datetime.now()
+        with self.db._get_connection() as conn:
+            cursor = conn.execute(
+                PENDING_REMINDERS_SQL, ((now - self.expire_after).isoformat(),)
+            )
+            rows = cursor.fetchall()
+
+        self._heap = []
+        self._scheduled = {}
+        for row in rows:
+            self._schedule(dict(row), now)
+        logger.info(f"已加载 {len(self._scheduled)} 个待发送的提醒")
+
+    def _schedule(self, row: Dict[str, Any], now: datetime):
+        """
+        按事件当前状态加入或移出提醒堆.
+        """
+        event_id = row["id"]
+        reminder_dt = self._parse_time(row.get("reminder_time"))
+        start_dt = self._parse_time(row.get("start_time"))
+        if (
+            row.get("reminder_sent")
+            or reminder_dt is None
+            or start_dt is None
+            or start_dt <= now - self.expire_after
+        ):
+            self._scheduled.pop(event_id, None)
+            return
 
-            if not pending_reminders:
-                return
+        if self._scheduled.get(event_id) == reminder_dt:
+            return
+        self._scheduled[event_id] = reminder_dt
+        heapq.heappush(self._heap, (reminder_dt, event_id))
 
-            logger.info(f"发现 {len(pending_reminders)} 个待发送的提醒")
+    @staticmethod
+    def _parse_time(value: Optional[str]) -> Optional[datetime]:
+        """
+        解析ISO时间，带时区的转换为本地时间，与 datetime.now() 比较.
+        """
+        if not value:
+            return None
+        try:
+            dt = datetime.fromisoformat(value)
+        except ValueError:
+            logger.warning(f"无法解析提醒时间: {value}")
+            return None
+        if dt.tzinfo is not None:
+            dt = dt.astimezone().replace(tzinfo=None)
+        return dt
 
-            # 处理每个提醒
-            for reminder in pending_reminders:
-                await self._send_reminder(dict(reminder))
+    async def _send_due_reminders(self):
+        """
+        发送所有已到期的提醒.
+        """
+        now = datetime.now()
+        due_ids = []
+        while self._heap and self._heap[0][0] <= now:
+            reminder_dt, event_id = heapq.heappop(self._heap)
+            # 已被修改或删除的旧条目
+            if self._scheduled.get(event_id) != reminder_dt:
+                continue
+            del self._scheduled[event_id]
+            due_ids.append(event_id)
+
+        if not due_ids:
+            return
 
-        except Exception as e:
-            logger.error(f"检查提醒失败: {e}", exc_info=True)
+        logger.info(f"发现 {len(due_ids)} 个待发送的提醒")
+        expire_dt = now - self.expire_after
+        for event_id in due_ids:
+            event = self.db.get_event_by_id(event_id)
+            if not event or event.get("reminder_sent"):
+                continue
+            start_dt = self._parse_time(event["start_time"])
+            if start_dt is None or start_dt <= expire_dt:
+                continue
+            await self._send_reminder(event)
 
     async def _send_reminder(self, event_data: dict):
         """
@@ -5,6 +5,7 @@ Camera tool for MCP.
 from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
 
+from .frame_gate import jpeg_signature
 from .normal_camera import NormalCamera
 from .vl_camera import VLCamera
 
@@ -45,6 +46,19 @@ def take_photo(arguments: dict) -> str:
         logger.error("Failed to capture photo")
         return '{"success": false, "message": "Failed to capture photo"}'
 
+    # 启用了结果缓存时，画面与近期分析过的画面几乎相同且问题相同则直接返回缓存结果
+    signature = None
+    if camera.analysis_cache.enabled:
+        signature = jpeg_signature(camera.get_jpeg_data()["buf"])
+    if signature is not None:
+        cached = camera.analysis_cache.get(signature, question)
+        if cached is not None:
+            logger.info(f"Scene unchanged (hash={signature.key}), reusing analysis")
+            return cached
+
     # 分析图片
     logger.info("Photo captured, starting analysis...")
-    return camera.analyze(question)
+    result = camera.analyze(question)
+    if signature is not None and result and '"success": false' not in result:
+        camera.analysis_cache.put(signature, question, result)
+    return result
@@ -9,6 +9,8 @@ from typing import Dict
 from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
 
+from .frame_gate import AnalysisCache
+
 logger = get_logger(__name__)
 
 
@@ -32,6 +34,12 @@ class BaseCamera(ABC):
         self.frame_width = config.get_config("CAMERA.frame_width", 640)
         self.frame_height = config.get_config("CAMERA.frame_height", 480)
 
+        # 近期识别结果缓存：画面几乎不变且问题相同时不再重复请求远程分析。
+        # 用户主动拍照通常就是想看新变化，默认不缓存（ttl=0），需要时在配置中设置有效秒数
+        self.analysis_cache = AnalysisCache(
+            maxsize=16, ttl=config.get_config("CAMERA.analysis_cache_ttl", 0)
+        )
+
     @abstractmethod
     def capture(self) -> bool:
         """
@@ -6,6 +6,8 @@ import requests
 from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
 
+from .capture_service import get_capture_service
+
 logger = get_logger(__name__)
 
 
@@ -61,21 +63,9 @@ class Camera:
         try:
             logger.info("Accessing camera...")
 
-            # 尝试打开摄像头
-            cap = cv2.VideoCapture(self.camera_index)
-            if not cap.isOpened():
-                logger.error(f"Cannot open camera at index {self.camera_index}")
-                return False
-
-            # 设置摄像头参数
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_height)
-
-            # 读取图像
-            ret, frame = cap.read()
-            cap.release()
-
-            if not ret:
+            # 从常驻采集服务取最新帧，无需每次打开摄像头
+            frame = get_capture_service().read()
+            if frame is None:
                 logger.error("Failed to capture image")
                 return False
 
@@ -0,0 +1,265 @@
+"""
+常驻摄像头采集服务.
+
+原先每次拍照都新建 cv2.VideoCapture、探测索引、设置分辨率、读一帧再释放，设备预热要几百毫秒；
+搜索工具又单独打开一次摄像头。这里由一个后台线程持续读帧，只保留最新一帧：
+- 多个使用方通过 subscribe() 订阅，各自记录读到的帧序号，互不影响
+- 帧以只读 numpy 数组的引用交给使用方，不做拷贝；需要修改时由使用方自行 copy()
+- 最后一个订阅者退出后设备继续保持 keep_alive 秒，连续拍照无需重新打开
+"""
+
+import threading
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class FrameSubscription:
+    """
+    采集服务的订阅，记录自己读到的最新帧序号.
+    """
+
+    def __init__(self, service: "CaptureService", name: str):
+        self._service = service
+        self.name = name
+        self.seq = 0
+        self._closed = False
+
+    @property
+    def failures(self) -> int:
+        return self._service.failures
+
+    def latest(self, timeout: Optional[float] = 3.0) -> Optional[np.ndarray]:
+        """
+        获取当前最新帧，还没有任何帧时等待，超时返回None.
+        """
+        seq, frame = self._service.wait_frame(0, timeout)
+        if frame is not None:
+            self.seq = seq
+        return frame
+
+    def next(self, timeout: Optional[float] = 1.0) -> Optional[np.ndarray]:
+        """
+        获取比上次读到的更新的一帧，超时返回None.
+        """
+        seq, frame = self._service.wait_frame(self.seq, timeout)
+        if frame is not None:
+            self.seq = seq
+        return frame
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._service._unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CaptureService:
+    """
+    常驻摄像头采集服务.
+    """
+
+    def __init__(
+        self,
+        camera_index: Optional[int] = None,
+        frame_width: Optional[int] = None,
+        frame_height: Optional[int] = None,
+        keep_alive: Optional[float] = None,
+    ):
+        config = ConfigManager.get_instance()
+        self.camera_index = (
+            camera_index
+            if camera_index is not None
+            else config.get_config("CAMERA.camera_index", 0)
+        )
+        self.frame_width = frame_width or config.get_config("CAMERA.frame_width", 640)
+        self.frame_height = frame_height or config.get_config(
+            "CAMERA.frame_height", 480
+        )
+        self.keep_alive = (
+            keep_alive
+            if keep_alive is not None
+            else config.get_config("CAMERA.keep_alive", 60)
+        )
+
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        # 每次启动采集线程递增，旧线程发现代数变化后退出
+        self._generation = 0
+        self._frame = None
+        self._seq = 0
+        self._failures = 0
+        self._subscribers = set()
+        self._idle_since = time.monotonic()
+
+    @property
+    def failures(self) -> int:
+        """
+        连续读帧失败次数.
+        """
+        return self._failures
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def subscribe(self, name: str = "") -> FrameSubscription:
+        """
+        订阅帧流，必要时启动采集线程，用完需 close()（或使用 with 语句）.
+        """
+        subscription = FrameSubscription(self, name)
+        with self._cond:
+            self._subscribers.add(subscription)
+            if not self._running:
+                self._running = True
+                self._frame = None
+                self._generation += 1
+                self._thread = threading.Thread(
+                    target=self._run,
+                    args=(self._generation, self._thread),
+                    name="CameraCapture",
+                    daemon=True,
+                )
+                self._thread.start()
+        return subscription
+
+    def _unsubscribe(self, subscription: FrameSubscription):
+        with self._cond:
+            self._subscribers.discard(subscription)
+            if not self._subscribers:
+                self._idle_since = time.monotonic()
+
+    def read(self, timeout: float = 3.0) -> Optional[np.ndarray]:
+        """
+        一次性获取最新帧（拍照用）.
+        """
+        with self.subscribe("read") as subscription:
+            return subscription.latest(timeout)
+
+    def wait_frame(
+        self, after: int, timeout: Optional[float]
+    ) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        等待序号大于 after 的帧，返回(序号, 帧)，超时或采集停止时帧为None.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: (self._seq > after and self._frame is not None)
+                or not self._running,
+                timeout=timeout,
+            )
+            if self._seq > after and self._frame is not None:
+                return self._seq, self._frame
+            return self._seq, None
+
+    def stop(self, timeout: float = 2.0):
+        """
+        停止采集并释放设备.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _open(self):
+        """
+        打开摄像头，配置的索引不可用时依次尝试 0、1、2.
+        """
+        for index in dict.fromkeys([self.camera_index, 0, 1, 2]):
+            cap = cv2.VideoCapture(index)
+            if cap.isOpened():
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_height)
+                # 驱动只缓存一帧，读到的总是最新画面
+                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                ret, _ = cap.read()
+                if ret:
+                    if index != self.camera_index:
+                        logger.info(
+                            f"摄像头索引 {self.camera_index} 不可用，改用 {index}"
+                        )
+                        self.camera_index = index
+                    return cap
+            cap.release()
+        return None
+
+    def _run(self, generation: int, previous: Optional[threading.Thread]):
+        # 上一个采集线程可能还没释放设备
+        if previous is not None and previous.is_alive():
+            previous.join(2.0)
+
+        started = time.monotonic()
+        cap = self._open()
+        if cap is None:
+            logger.error("未找到可用摄像头")
+            with self._cond:
+                if generation == self._generation:
+                    self._running = False
+                    self._cond.notify_all()
+            return
+        logger.info(
+            f"摄像头采集服务已启动 (index={self.camera_index}, "
+            f"耗时 {(time.monotonic() - started) * 1000:.0f}ms)"
+        )
+
+        try:
+            while True:
+                with self._cond:
+                    if not self._running or generation != self._generation:
+                        break
+                    if (
+                        not self._subscribers
+                        and time.monotonic() - self._idle_since > self.keep_alive
+                    ):
+                        logger.info("摄像头空闲超时，释放设备")
+                        self._running = False
+                        self._cond.notify_all()
+                        break
+
+                ret, frame = cap.read()
+                with self._cond:
+                    if generation != self._generation:
+                        break
+                    if not ret:
+                        self._failures += 1
+                        self._cond.wait(0.1)
+                        continue
+                    # 使用方拿到的是同一数组的引用，设为只读防止被意外修改
+                    frame.flags.writeable = False
+                    self._failures = 0
+                    self._frame = frame
+                    self._seq += 1
+                    self._cond.notify_all()
+        finally:
+            cap.release()
+
+
+_capture_service = None
+_capture_service_lock = threading.Lock()
+
+
+def get_capture_service() -> CaptureService:
+    """
+    获取摄像头采集服务单例.
+    """
+    global _capture_service
+    if _capture_service is None:
+        with _capture_service_lock:
+            if _capture_service is None:
+                _capture_service = CaptureService()
+    return _capture_service
@@ -0,0 +1,248 @@
+"""
+本地帧差过滤与识别结果缓存.
+
+机器人静止时连续的画面几乎相同，每帧都上传远程视觉服务既浪费上行带宽也增加服务端负载。
+上传前先在本地计算廉价的画面签名：
+- 差值哈希（dHash）：缩小到 9x8 灰度图，比较相邻像素得到64位指纹，汉明距离衡量差异
+- 灰度直方图：32档归一化直方图，巴氏距离衡量亮度分布变化
+- 可选 ORB 特征点匹配（与 CLBROBOT/mypg/nav.py 相同的 cv2.ORB_create），
+  用于确认小物体出现等哈希不敏感的变化
+哈希和直方图都相近才视为同一画面。与上一次分析的画面相近则跳过；
+AnalysisCache 在会话内按签名和问题缓存识别结果，命中条件与帧差过滤相同。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 汉明距离不超过该值视为同一画面（64位中约10%）
+HASH_THRESHOLD = 6
+# 直方图巴氏距离不超过该值视为亮度分布未变化
+HIST_THRESHOLD = 0.1
+# ORB 匹配点占比不低于该值视为同一画面
+ORB_MATCH_RATIO = 0.6
+
+
+@dataclass
+class FrameSignature:
+    """
+    画面签名.
+    """
+
+    hash: int
+    hist: np.ndarray
+    gray: Optional[np.ndarray] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.hash:016x}"
+
+    def distance(self, other: "FrameSignature") -> int:
+        """
+        与另一签名的哈希汉明距离.
+        """
+        return bin(self.hash ^ other.hash).count("1")
+
+    def hist_distance(self, other: "FrameSignature") -> float:
+        return float(cv2.compareHist(self.hist, other.hist, cv2.HISTCMP_BHATTACHARYYA))
+
+    def similar(
+        self,
+        other: "FrameSignature",
+        hash_threshold: int = HASH_THRESHOLD,
+        hist_threshold: float = HIST_THRESHOLD,
+    ) -> bool:
+        """
+        哈希和直方图都相近时视为同一画面（亮度变化或新物体会改变直方图）.
+        """
+        return (
+            self.distance(other) <= hash_threshold
+            and self.hist_distance(other) <= hist_threshold
+        )
+
+
+def frame_signature(frame: np.ndarray, keep_gray: bool = False) -> FrameSignature:
+    """计算画面签名.
+
+    Args:
+        frame: BGR 或灰度图像
+        keep_gray: 是否保留 160 宽的灰度图供 ORB 比较
+    """
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    value = int(np.packbits(bits).view(">u8")[0])
+
+    hist = cv2.calcHist([gray], [0], None, [32], [0, 256])
+    cv2.normalize(hist, hist, alpha=1.0, norm_type=cv2.NORM_L1)
+
+    orb_gray = None
+    if keep_gray:
+        height, width = gray.shape[:2]
+        scale = 160 / width if width > 160 else 1.0
+        orb_gray = cv2.resize(
+            gray,
+            (int(width * scale), int(height * scale)),
+            interpolation=cv2.INTER_AREA,
+        )
+    return FrameSignature(value, hist, orb_gray)
+
+
+def jpeg_signature(jpeg_bytes: bytes) -> Optional[FrameSignature]:
+    """
+    从 JPEG 数据计算画面签名，解码失败返回None.
+    """
+    if not jpeg_bytes:
+        return None
+    gray = cv2.imdecode(np.frombuffer(jpeg_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return None
+    return frame_signature(gray)
+
+
+class FrameGate:
+    """
+    帧差过滤器：与上一次分析的画面相近的帧不再上传.
+    """
+
+    def __init__(
+        self,
+        hash_threshold: int = HASH_THRESHOLD,
+        hist_threshold: float = HIST_THRESHOLD,
+        use_orb: bool = False,
+        orb_match_ratio: float = ORB_MATCH_RATIO,
+    ):
+        self.hash_threshold = hash_threshold
+        self.hist_threshold = hist_threshold
+        self.use_orb = use_orb
+        self.orb_match_ratio = orb_match_ratio
+        self._orb = cv2.ORB_create(nfeatures=300) if use_orb else None
+        self._matcher = (
+            cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True) if use_orb else None
+        )
+        self._reference: Optional[FrameSignature] = None
+        self._reference_descriptors = None
+
+    def signature(self, frame: np.ndarray) -> FrameSignature:
+        return frame_signature(frame, keep_gray=self.use_orb)
+
+    def is_similar(self, signature: FrameSignature) -> bool:
+        """
+        是否与上一次分析的画面相近.
+        """
+        reference = self._reference
+        if reference is None:
+            return False
+        if not signature.similar(reference, self.hash_threshold, self.hist_threshold):
+            return False
+        if self.use_orb:
+            return self._orb_similar(signature)
+        return True
+
+    def _orb_similar(self, signature: FrameSignature) -> bool:
+        _, descriptors = self._orb.detectAndCompute(signature.gray, None)
+        reference = self._reference_descriptors
+        if descriptors is None or reference is None:
+            # 纹理太少提取不到特征点时以哈希和直方图的判断为准
+            return descriptors is None and reference is None
+        matches = self._matcher.match(descriptors, reference)
+        ratio = len(matches) / max(len(descriptors), len(reference))
+        return ratio >= self.orb_match_ratio
+
+    def update(self, signature: FrameSignature):
+        """
+        设置参考画面.
+        """
+        self._reference = signature
+        if self.use_orb:
+            _, self._reference_descriptors = self._orb.detectAndCompute(
+                signature.gray, None
+            )
+
+
+class AnalysisCache:
+    """
+    会话内的识别结果缓存，按画面签名和问题查找，哈希和直方图都相近的画面视为命中.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 64,
+        ttl: Optional[float] = None,
+        hash_threshold: int = HASH_THRESHOLD,
+        hist_threshold: float = HIST_THRESHOLD,
+    ):
+        """
+        Args:
+            maxsize: 缓存条目上限
+            ttl: 结果有效秒数，None 表示会话内一直有效，0 表示不缓存
+            hash_threshold: 视为同一画面的哈希汉明距离
+            hist_threshold: 视为同一画面的直方图巴氏距离
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hash_threshold = hash_threshold
+        self.hist_threshold = hist_threshold
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl is None or self.ttl > 0
+
+    def _matches(self, entry, signature: FrameSignature) -> bool:
+        return entry[1].similar(signature, self.hash_threshold, self.hist_threshold)
+
+    def get(self, signature: FrameSignature, question: str = ""):
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            key = (signature.hash, question)
+            entry = self._entries.get(key)
+            if entry is not None and not self._matches(entry, signature):
+                entry = None
+            if entry is None:
+                # 条目数很少，线性查找哈希和直方图都相近的画面
+                for cached_key, candidate in reversed(self._entries.items()):
+                    if cached_key[1] == question and self._matches(
+                        candidate, signature
+                    ):
+                        key, entry = cached_key, candidate
+                        break
+            if entry is not None and self.ttl is not None and now - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, signature: FrameSignature, question: str, result):
+        if not self.enabled:
+            return
+        with self._lock:
+            key = (signature.hash, question)
+            self._entries[key] = (time.monotonic(), signature, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
@@ -181,6 +181,7 @@ from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
 
 from .base_camera import BaseCamera
+from .capture_service import get_capture_service
 
 logger = get_logger(__name__)
 
@@ -240,33 +241,9 @@ class NormalCamera(BaseCamera):
         捕获图像.
         """
         try:
-            # 尝试打开摄像头
-            cap = cv2.VideoCapture(self.camera_index)
-            
-            if not cap.isOpened():
-                # 自动搜索可用摄像头
-                for idx in [0, 1, 2]:
-                    test_cap = cv2.VideoCapture(idx)
-                    if test_cap.isOpened():
-                        ret, test_frame = test_cap.read()
-                        if ret:
-                            cap = test_cap
-                            self.camera_index = idx
-                            break
-                        else:
-                            test_cap.release()
-                
-                if not cap.isOpened():
-                    print(">>> ✗ 未找到可用摄像头")
-                    return False
-
-            # 设置参数并读取
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_height)
-            ret, frame = cap.read()
-            cap.release()
-
-            if not ret:
+            # 从常驻采集服务取最新帧，无需每次打开摄像头
+            frame = get_capture_service().read()
+            if frame is None:
                 print(">>> ✗ 无法读取图像")
                 return False
             
@@ -3,6 +3,8 @@ VL camera implementation using Zhipu AI.
 """
 
 import base64
+import time
+from pathlib import Path
 
 import cv2
 from openai import OpenAI
@@ -11,6 +13,7 @@ from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
 
 from .base_camera import BaseCamera
+from .capture_service import get_capture_service
 
 logger = get_logger(__name__)
 
@@ -58,21 +61,9 @@ class VLCamera(BaseCamera):
         try:
             logger.info("Accessing camera...")
 
-            # 尝试打开摄像头
-            cap = cv2.VideoCapture(self.camera_index)
-            if not cap.isOpened():
-                logger.error(f"Cannot open camera at index {self.camera_index}")
-                return False
-
-            # 设置摄像头参数
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_height)
-
-            # 读取图像
-            ret, frame = cap.read()
-            cap.release()
-
-            if not ret:
+            # 从常驻采集服务取最新帧，无需每次打开摄像头
+            frame = get_capture_service().read()
+            if frame is None:
                 logger.error("Failed to capture image")
                 return False
 
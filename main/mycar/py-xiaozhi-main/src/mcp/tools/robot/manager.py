@@ -43,6 +43,7 @@ except ImportError as e:
 # 下面才是你原来的 import 和代码
 # ================================================
 
+import asyncio
 import re
 from typing import Any, Dict
 
@@ -50,12 +51,15 @@ from typing import Any, Dict
 from src.utils.logging_config import get_logger
 logger = get_logger(__name__)
 
+from .motion_controller import ACTIONS, STOP_ACTION, MotionController
+
 
 
 
 class RobotManager:
     def __init__(self):
         self._robot = None
+        self._controller = None
         self._init_robot()
 
     def _init_robot(self):
@@ -70,12 +74,19 @@ class RobotManager:
         try:
             # 根据你的实际库修改初始化方式
             self._robot = LOBOROBOT()           # 可能需要端口、IP、串口等参数
+            # 运动指令在控制器线程中执行，LOBOROBOT 的 sleep 不会阻塞事件循环
+            self._controller = MotionController(self._robot)
             logger.info("机器人初始化成功")
         except Exception as e:
             logger.error("机器人初始化失败", exc_info=True)
             self._robot = None
             raise RuntimeError(f"机器人初始化失败: {e}")
 
+    def get_motion_controller(self):
+        """获取运动控制器，搜索等其他工具通过它驱动机器人，不再各自创建 LOBOROBOT"""
+        self._init_robot()
+        return self._controller
+
     def init_tools(self, add_tool, PropertyList, Property, PropertyType):
         """注册统一的机器人控制工具"""
         props = PropertyList([
@@ -192,39 +203,46 @@ class RobotManager:
             return number / 60.0  
         return 1.0
 
-    async def _execute_action(self, action: str, speed: int, duration: float) -> str:  
-        """实际执行机器人动作"""  
-        if self._robot is None:  
-            return "机器人对象不可用"  
-
-        # 打印调试信息  
-        print(f"执行动作: {action}, 速度: {speed}, 持续时间: {duration}秒")  
-    
-        action_map = {  
-            "前进": ("前进", lambda s, d: self._robot.t_up(s, d)),  
-            "后退": ("后退", lambda s, d: self._robot.t_down(s, d)),  
-            "左转": ("左转", lambda s, d: self._robot.turnLeft(s, d)),  
-            "右转": ("右转", lambda s, d: self._robot.turnRight(s, d)),  
-            "左移": ("左移", lambda s, d: self._robot.moveLeft(s, d)),  
-            "右移": ("右移", lambda s, d: self._robot.moveRight(s, d)),  
-            "停止": ("停止", lambda s, d: self._robot.t_stop(d))  
-        }  
-    
-        if action not in action_map:  
-            return f"不支持的动作：{action}"  
-    
-        action_name, action_func = action_map[action]  
-    
-        try:  
-            if action == "停止":  
-                action_func(0, 0)  
-                return "机器人已停止"  
-            else:  
-                action_func(speed, duration)  
-                return f"机器人正在{action_name}，速度 {speed}，持续约 {duration:.1f} 秒"  
-        except Exception as e:  
-            logger.error(f"执行 {action_name} 失败", exc_info=True)  
-            return f"{action_name} 执行失败：{str(e)}"
+    async def _execute_action(self, action: str, speed: int, duration: float) -> str:
+        """提交动作到运动控制器，不等待动作结束，避免阻塞事件循环"""
+        if self._robot is None or self._controller is None:
+            return "机器人对象不可用"
+
+        logger.debug(f"执行动作: {action}, 速度: {speed}, 持续时间: {duration}秒")
+
+        if action == STOP_ACTION:
+            try:
+                # 停止指令在控制器线程中立即执行，等待电机确实停下再回复
+                await asyncio.wait_for(
+                    asyncio.wrap_future(self._controller.stop()), timeout=1.0
+                )
+                return "机器人已停止"
+            except Exception as e:
+                logger.error("执行 停止 失败", exc_info=True)
+                return f"停止 执行失败：{str(e)}"
+
+        if action not in ACTIONS:
+            return f"不支持的动作：{action}"
+
+        try:
+            future = self._controller.submit(action, speed, duration)
+        except Exception as e:
+            logger.error(f"执行 {action} 失败", exc_info=True)
+            return f"{action} 执行失败：{str(e)}"
+
+        future.add_done_callback(lambda f: self._on_action_done(action, f))
+        return f"机器人正在{action}，速度 {speed}，持续约 {duration:.1f} 秒"
+
+    @staticmethod
+    def _on_action_done(action: str, future):
+        """动作结束回调（在控制器线程中执行）"""
+        error = future.exception()
+        if error is not None:
+            logger.error(f"[Robot] {action} 执行失败: {error}")
+        else:
+            logger.info(f"[Robot] {action} 结束: {future.result()}")
+
+
 # 全局单例（简单实现，生产环境建议用依赖注入）
 _manager = None
 
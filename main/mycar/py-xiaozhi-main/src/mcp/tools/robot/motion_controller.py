@@ -0,0 +1,222 @@
+"""
+机器人运动控制器.
+
+LOBOROBOT 的运动方法设置电机后 time.sleep(t_time) 阻塞调用方，直接在异步工具中调用会卡住
+整个事件循环（音频、MCP回复）。控制器在独立线程中执行运动指令：
+- 定时指令：运行指定秒数后停车；速度指令（duration=None）：持续运行直到被新指令取代
+- 新指令默认抢占正在执行的指令，停止指令总是立即生效
+- 每条指令返回 concurrent.futures.Future，异步代码可用 asyncio.wrap_future 等待
+所有电机操作都在控制器线程中进行，I2C/GPIO 不会被多个线程同时访问。
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 动作名称到 LOBOROBOT 方法名，t_time 传0只设置电机不等待
+ACTIONS = {
+    "前进": "t_up",
+    "后退": "t_down",
+    "左转": "turnLeft",
+    "右转": "turnRight",
+    "左移": "moveLeft",
+    "右移": "moveRight",
+}
+STOP_ACTION = "停止"
+
+# Future 的结果
+COMPLETED = "completed"  # 定时指令运行结束
+PREEMPTED = "preempted"  # 被新指令取代
+STOPPED = "stopped"  # 被停止指令或关闭控制器打断
+
+
+@dataclass
+class MotionCommand:
+    """
+    运动指令，duration 为 None 表示速度指令.
+    """
+
+    action: str
+    speed: int = 0
+    duration: Optional[float] = None
+    future: Future = field(default_factory=Future)
+
+
+class MotionController:
+    """
+    在独立线程中执行运动指令的控制器.
+    """
+
+    def __init__(self, robot: Any):
+        self._robot = robot
+        self._queue = deque()
+        self._current: Optional[MotionCommand] = None
+        # 打断当前指令的原因，None 表示未被打断
+        self._interrupt: Optional[str] = None
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="MotionController", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def current(self) -> Optional[MotionCommand]:
+        return self._current
+
+    def submit(
+        self,
+        action: str,
+        speed: int,
+        duration: Optional[float] = None,
+        preempt: bool = True,
+    ) -> Future:
+        """提交运动指令.
+
+        Args:
+            action: 动作名称，见 ACTIONS
+            speed: 速度 0-100
+            duration: 运行秒数，None 表示持续运行直到被取代
+            preempt: 是否抢占正在执行和排队的指令，False 时排在队尾依次执行
+
+        Returns:
+            指令结束时完成的 Future，结果为 COMPLETED/PREEMPTED/STOPPED
+        """
+        if action == STOP_ACTION:
+            return self.stop()
+        if action not in ACTIONS:
+            raise ValueError(f"不支持的动作：{action}")
+
+        command = MotionCommand(action, speed, duration)
+        with self._cond:
+            self._ensure_running()
+            if preempt:
+                self._cancel_pending(PREEMPTED)
+                self._interrupt_current(PREEMPTED)
+            self._queue.append(command)
+            self._cond.notify_all()
+        return command.future
+
+    def stop(self) -> Future:
+        """
+        立即停车，清空排队的指令，返回电机停止后完成的 Future.
+        """
+        command = MotionCommand(STOP_ACTION)
+        with self._cond:
+            self._ensure_running()
+            self._cancel_pending(STOPPED)
+            self._interrupt_current(STOPPED)
+            self._queue.append(command)
+            self._cond.notify_all()
+        return command.future
+
+    def shutdown(self, timeout: float = 2.0):
+        """
+        停车并结束控制器线程.
+        """
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cancel_pending(STOPPED)
+            self._interrupt_current(STOPPED)
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _ensure_running(self):
+        if not self._running:
+            raise RuntimeError("运动控制器已关闭")
+
+    def _cancel_pending(self, reason: str):
+        """
+        结束所有排队中的指令，需持有锁.
+        """
+        while self._queue:
+            self._queue.popleft().future.set_result(reason)
+
+    def _interrupt_current(self, reason: str):
+        """
+        打断正在执行的指令，需持有锁.
+        """
+        if self._current is not None and self._interrupt is None:
+            self._interrupt = reason
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._running:
+                    break
+                command = self._queue.popleft()
+                self._current = command
+                self._interrupt = None
+
+            try:
+                self._apply(command)
+            except Exception as e:
+                logger.error(f"执行运动指令失败: {command.action}", exc_info=True)
+                self._finish(command)
+                self._safe_stop()
+                command.future.set_exception(e)
+                continue
+
+            if command.action == STOP_ACTION:
+                self._finish(command)
+                command.future.set_result(COMPLETED)
+                continue
+
+            result = self._wait(command)
+            # 定时指令结束后若没有后续指令则停车，有后续指令直接切换避免顿挫
+            with self._cond:
+                idle = not self._queue
+            if result == COMPLETED and idle:
+                self._safe_stop()
+            self._finish(command)
+            command.future.set_result(result)
+
+        # 线程退出前确保停车
+        self._safe_stop()
+
+    def _wait(self, command: MotionCommand) -> str:
+        """
+        等待指令运行结束或被打断.
+        """
+        deadline = (
+            None if command.duration is None else time.monotonic() + command.duration
+        )
+        with self._cond:
+            while self._interrupt is None:
+                if deadline is None:
+                    self._cond.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return COMPLETED
+                self._cond.wait(remaining)
+            return self._interrupt
+
+    def _finish(self, command: MotionCommand):
+        with self._cond:
+            if self._current is command:
+                self._current = None
+                self._interrupt = None
+
+    def _apply(self, command: MotionCommand):
+        if command.action == STOP_ACTION:
+            self._robot.t_stop(0)
+        else:
+            getattr(self._robot, ACTIONS[command.action])(command.speed, 0)
+
+    def _safe_stop(self):
+        try:
+            self._robot.t_stop(0)
+        except Exception:
+            logger.error("停车失败", exc_info=True)
@@ -0,0 +1,77 @@
+"""
+搜索流水线组件.
+
+原搜索流程在同一线程里依次读帧、显示、同步上传识别、再等待0.5秒，每帧都要等完整的网络往返，
+搜索速度不到每秒一帧。现在画面来自常驻摄像头采集服务（总是最新一帧），识别请求交给
+AnalysisPool：有界的上传线程池，复用 keep-alive 的 requests.Session，限制同时在途的请求数。
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class AnalysisPool:
+    """
+    有界的识别请求上传池.
+    """
+
+    def __init__(self, max_in_flight: int = 3, name: str = "SearchUpload"):
+        self.max_in_flight = max_in_flight
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_in_flight, thread_name_prefix=name
+        )
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._futures = set()
+        self._lock = threading.Lock()
+
+        # 连接池大小与在途请求数一致，所有请求复用 TCP/TLS 连接
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._futures)
+
+    def try_submit(self, func: Callable, *args) -> Optional[Future]:
+        """
+        有空闲名额时提交上传任务，否则返回None（调用方丢弃该帧，稍后用更新的帧重试）.
+        """
+        if not self._slots.acquire(blocking=False):
+            return None
+        try:
+            future = self._executor.submit(func, *args)
+        except RuntimeError:
+            # 线程池已关闭
+            self._slots.release()
+            return None
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Future):
+        with self._lock:
+            self._futures.discard(future)
+        self._slots.release()
+
+    def shutdown(self):
+        """
+        取消尚未开始的请求，不等待在途请求结束.
+        """
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+        self._executor.shutdown(wait=False)
+        self.session.close()
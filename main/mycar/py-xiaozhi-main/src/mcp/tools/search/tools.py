@@ -1,10 +1,3 @@
-try:      
-    from LOBOROBOT import LOBOROBOT      
-    print("[SUCCESS] LOBOROBOT 导入成功")      
-except ImportError as e:      
-    print("[IMPORT ERROR]", str(e))      
-    LOBOROBOT = None      
-      
 # ================================================      
 # 导入日志系统      
 # ================================================      
@@ -21,9 +14,13 @@ from src.utils.logging_config import get_logger
   
 import os    
 import datetime    
-import requests    
 from src.utils.config_manager import ConfigManager   
 from src.mcp.tools.camera import get_camera_instance
+from src.mcp.tools.camera.capture_service import get_capture_service
+from src.mcp.tools.camera.frame_gate import AnalysisCache, FrameGate
+from src.mcp.tools.robot import get_robot_manager
+from src.mcp.tools.robot.motion_controller import COMPLETED
+from .pipeline import AnalysisPool
 
 import uuid  
   
@@ -36,9 +33,11 @@ _search_lock = threading.Lock()
 class ConcurrentSearcher:    
     """并发搜索器 - 高分辨率显示和远程分析"""    
             
-    def __init__(self, camera, clbrobot, target_item, progress_callback=None, task_state=None):  
+    def __init__(self, camera, motion, target_item, progress_callback=None, task_state=None,
+                 max_in_flight=3, submit_interval=0.3, use_orb=False):
         self.camera = camera  
-        self.clbrobot = clbrobot  
+        # 机器人管理器的运动控制器，与语音控制共用同一个控制器线程
+        self.motion = motion
         self.target_item = target_item  
         self.found = False  
         self.search_active = True  
@@ -55,6 +54,17 @@ class ConcurrentSearcher:
         self.progress_callback = progress_callback  
         self.task_state = task_state  
 
+        # 流水线: 采集服务保留最新帧，上传池限制在途识别请求数，运动由控制器线程执行
+        self.submit_interval = submit_interval
+        self._stop_event = threading.Event()
+        self.upload_pool = AnalysisPool(max_in_flight)
+
+        # 帧差过滤和本次搜索的识别结果缓存，静止或回到看过的位置时不重复上传
+        self.frame_gate = FrameGate(use_orb=use_orb)
+        self.result_cache = AnalysisCache(maxsize=256)
+        self.uploaded_frames = 0
+        self.skipped_frames = 0
+
             
         # 创建img目录    
         self.img_dir = os.path.join(os.path.dirname(__file__), "img")    
@@ -62,16 +72,13 @@ class ConcurrentSearcher:
             os.makedirs(self.img_dir)    
             logger.info(f"创建图片保存目录: {self.img_dir}")    
             
-        # 持续打开摄像头 - 高分辨率    
-        self.cap = cv2.VideoCapture(0)    
-        if not self.cap.isOpened():    
-            logger.error("无法打开摄像头")    
-            raise RuntimeError("摄像头初始化失败")    
-                
-        # 设置高分辨率用于显示    
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)    
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)    
-        logger.info("摄像头已持续打开，分辨率设置为640x480")    
+        # 订阅常驻摄像头采集服务，与拍照等工具共用同一个摄像头
+        self.frames = get_capture_service().subscribe("search")
+        if self.frames.latest(timeout=5.0) is None:
+            self.frames.close()
+            logger.error("无法打开摄像头")
+            raise RuntimeError("摄像头初始化失败")
+        logger.info("已订阅摄像头采集服务")
 
         # 在实例化时获取并设置VLLM地址  
         self._setup_vision_service()
@@ -206,7 +213,8 @@ class ConcurrentSearcher:
             print(f"[VLLM计时] 开始发送请求到: {self.explain_url}")  
             
             # 发送请求 - requests会自动设置正确的Content-Type和boundary  
-            response = requests.post(self.explain_url, headers=headers, files=files, timeout=10)  
+            # 复用上传池的 keep-alive 会话，避免每帧重新建立连接
+            response = self.upload_pool.session.post(self.explain_url, headers=headers, files=files, timeout=10)
 
             # 记录结束时间并计算耗时  
             end_time = time.time()  
@@ -259,168 +267,192 @@ class ConcurrentSearcher:
         return False  
         
   
-    def video_capture_thread(self):      
-        """视频捕获线程 - 增强异常处理"""      
-        capture_interval = 0.5   
-
-        frame_count = 0  # ✅ 添加这行   
-        
-        while self.search_active and not self.found:      
-            try:  
-                # 新增: 进度更新逻辑  
-                if self.progress_callback and frame_count % 5 == 0:  
-                    progress = min(50 + frame_count * 2, 90)  # 50-90%  
-                    self.progress_callback(progress)  
-                
-                frame_count += 1  # 新增: 每次循环递增
-
-                
-                # 在循环开始时检查状态  
-                if not self.search_active or self.found:  
-                    break  
-                    
-                ret, frame = self.cap.read()      
-                if not ret:      
-                    logger.warning("无法读取摄像头帧")      
-                    # 改进的等待机制  
-                    for _ in range(int(capture_interval * 10)):  
-                        if not self.search_active or self.found:  
-                            break  
-                        time.sleep(0.1)  
-                    continue    
-                    
-                cv2.imshow("Search Camera", frame)      
-                
-                key = cv2.waitKey(1) & 0xFF      
-                if key == ord('q') or chr(key).lower() == 'q':    
-                    print("\n[键盘输入] 检测到'q'键，正在停止搜索...")      
-                    with self.lock:      
-                        self.search_active = False      
-                    break    
-                
-                print(f"[分析开始] 发送图片到远程服务器识别 {self.target_item}...")      
-                result = self._send_frame_to_analysis(frame)      
-                
-                if result:      
-                    analysis_text = self._parse_result(result)      
-                    if analysis_text:      
-                        print(f"\n[--搜索结果] {analysis_text}")      
-                        
-                        if self._check_found(analysis_text):      
-                            try:    
-                                with self.lock:      
-                                    self.found = True      
-                                    self.search_active = False      
-                                    self.result_message = "成功找到" + str(self.target_item) + "！" + str(analysis_text)  
-                                    
-                                    # 安全停止机器人    
-                                    try:    
-                                        self.clbrobot.t_stop(0)    
-                                    except Exception as robot_error:    
-                                        logger.error(f"机器人停止失败: {robot_error}")    
-                                        print(f"[警告] 机器人停止失败，但搜索完成: {robot_error}")    
-                                    
-                                return self.result_message    
-                            except Exception as lock_error:    
-                                logger.error(f"线程锁操作失败: {lock_error}")    
-                                # 即使锁失败，也尝试返回结果    
-                                return f"成功找到{self.target_item}！{analysis_text}（注意：线程同步异常）"    
-                                
-                else:      
-                    print("[识别失败] 无法获取识别结果")      
-                
-                # 改进的等待机制  
-                for _ in range(int(capture_interval * 10)):  
-                    if not self.search_active or self.found:  
-                        break  
-                    time.sleep(0.1)  
-                    
-            except Exception as e:      
-                logger.error(f"视频捕获线程错误: {e}")      
-                print(f"[异常] 视频捕获错误: {e}")    
-                
-                # 检查是否是关键异常    
-                if "camera" in str(e).lower() or "opencv" in str(e).lower():    
-                    print("[严重] 摄像头相关异常，退出搜索")    
-                    break  
-                
-                # 改进的等待机制  
-                for _ in range(int(capture_interval * 10)):  
-                    if not self.search_active or self.found:  
-                        break  
-                    time.sleep(0.1)  
-        
-        # 安全的循环结束处理    
-        try:    
-            if self.found:      
-                return self.result_message      
-            else:      
-                return f"经过搜索，没有找到{self.target_item}"    
-        except Exception as final_error:    
-            logger.error(f"最终结果处理异常: {final_error}")    
+    def _analyze_frame(self, frame, signature):
+        """上传线程: 识别一帧并解析结果"""
+        result = self._send_frame_to_analysis(frame)
+        if not result:
+            print("[识别失败] 无法获取识别结果")
+            return None
+        analysis_text = self._parse_result(result)
+        if analysis_text:
+            self.result_cache.put(signature, "", analysis_text)
+        return analysis_text
+
+    def _on_analysis_done(self, future):
+        """识别完成回调（在上传线程中执行），任一结果命中即结束搜索"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        analysis_text = future.result()
+        if not analysis_text or self.found:
+            return
+        print(f"\n[--搜索结果] {analysis_text}")
+        if self._check_found(analysis_text):
+            with self.lock:
+                if self.found:
+                    return
+                self.found = True
+                self.search_active = False
+                self.result_message = "成功找到" + str(self.target_item) + "！" + str(analysis_text)
+            self._stop_event.set()
+            # 立即打断正在执行的运动，不等当前动作结束
+            try:
+                self.motion.stop()
+            except Exception as robot_error:
+                logger.error(f"机器人停止失败: {robot_error}")
+                print(f"[警告] 机器人停止失败，但搜索完成: {robot_error}")
+
+    def stop(self):
+        """结束搜索并停车"""
+        with self.lock:
+            self.search_active = False
+            self.found = True
+        self._stop_event.set()
+        try:
+            self.motion.stop()
+        except Exception as e:
+            logger.error(f"机器人停止失败: {e}")
+
+    def video_capture_thread(self):
+        """视频捕获线程 - 流水线版本
+
+        采集线程持续读取最新帧，本线程负责显示并按 submit_interval 把最新帧交给上传池；
+        上传池满时丢弃该帧，等有空闲名额时发送当时最新的画面。搜索延迟取决于网络往返，
+        不再受逐帧串行处理限制。
+        """
+        frame_count = 0
+        last_submit = 0.0
+
+        while self.search_active and not self.found:
+            try:
+                frame = self.frames.next(timeout=1.0)
+                if frame is None:
+                    if self.frames.failures:
+                        logger.warning("无法读取摄像头帧")
+                    continue
+
+                cv2.imshow("Search Camera", frame)
+
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'):
+                    print("\n[键盘输入] 检测到'q'键，正在停止搜索...")
+                    with self.lock:
+                        self.search_active = False
+                    break
+
+                now = time.monotonic()
+                if now - last_submit < self.submit_interval:
+                    continue
+
+                # 帧差过滤: 与上次上传的画面相近，或本次搜索已分析过相近画面时跳过
+                signature = self.frame_gate.signature(frame)
+                if self.frame_gate.is_similar(signature) or self.result_cache.get(signature) is not None:
+                    self.skipped_frames += 1
+                    last_submit = now
+                    continue
+
+                future = self.upload_pool.try_submit(self._analyze_frame, frame, signature)
+                if future is None:
+                    # 在途请求已满，丢弃该帧
+                    continue
+                self.frame_gate.update(signature)
+                self.uploaded_frames += 1
+                last_submit = now
+                frame_count += 1
+                print(f"[分析开始] 发送图片到远程服务器识别 {self.target_item}...")
+                future.add_done_callback(self._on_analysis_done)
+
+                # 进度更新逻辑
+                if self.progress_callback and frame_count % 5 == 0:
+                    progress = min(50 + frame_count * 2, 90)  # 50-90%
+                    self.progress_callback(progress)
+
+            except Exception as e:
+                logger.error(f"视频捕获线程错误: {e}")
+                print(f"[异常] 视频捕获错误: {e}")
+
+                # 检查是否是关键异常
+                if "camera" in str(e).lower() or "opencv" in str(e).lower():
+                    print("[严重] 摄像头相关异常，退出搜索")
+                    break
+                self._stop_event.wait(0.5)
+
+        # 通知运动线程结束
+        self._stop_event.set()
+        logger.info(
+            f"帧差过滤: 上传 {self.uploaded_frames} 帧，跳过相似画面 {self.skipped_frames} 帧"
+        )
+
+        # 安全的循环结束处理
+        try:
+            if self.found and self.result_message:
+                return self.result_message
+            else:
+                return f"经过搜索，没有找到{self.target_item}"
+        except Exception as final_error:
+            logger.error(f"最终结果处理异常: {final_error}")
             return f"搜索完成，但结果处理异常: {final_error}"
 
 
-    def movement_thread(self):    
-        """机器人运动控制线程 - 改进版本，提高响应性"""    
-        movements = [    
-            ("前进2步", lambda: self.clbrobot.t_up(50, 2)),    
-            ("左转", lambda: self.clbrobot.turnLeft(50, 1)),    
-            ("向右2步", lambda: self.clbrobot.moveRight(50, 2)),    
-            ("左转", lambda: self.clbrobot.turnLeft(50, 1)),    
-            ("后退2步", lambda: self.clbrobot.t_down(50, 2)),    
-            ("左转", lambda: self.clbrobot.turnLeft(50, 1)),    
-            ("向左2步", lambda: self.clbrobot.moveLeft(50, 2)),    
-            ("左转", lambda: self.clbrobot.turnLeft(50, 1)),    
-            ("前进2步", lambda: self.clbrobot.t_up(50, 2))    
-        ]    
-        
-        movement_index = 0    
-        cycle_count = 0    
-        max_cycles = 10  # 限制为一轮循环    
-        action_interval = 3  
-        
-        while self.search_active and not self.found and cycle_count < max_cycles:    
-            try:    
-                # 在获取锁前先检查状态  
-                if not self.search_active or self.found:  
-                    break  
-                    
-                with self.lock:    
-                    if not self.found and self.search_active and cycle_count < max_cycles:    
-                        action_name, action_func = movements[movement_index % len(movements)]    
-                        logger.info(f"执行动作: {action_name}")    
-                        action_func()    
-                        movement_index += 1    
-                        
-                        # 检查是否完成一轮循环    
-                        if movement_index % len(movements) == 0:    
-                            cycle_count += 1    
-                            print(f"[运动控制] 完成第{cycle_count}轮运动循环")    
-                
-                # 改进的等待机制 - 每0.1秒检查一次状态  
-                for _ in range(action_interval * 10):    
-                    if not self.search_active or self.found:  
-                        break  
-                    time.sleep(0.1)    
-                        
-            except Exception as e:    
-                logger.error(f"运动控制线程错误: {e}")    
-                # 出错时也要检查状态  
-                for _ in range(action_interval * 10):    
-                    if not self.search_active or self.found:  
-                        break  
-                    time.sleep(0.1)  
-        
-        # 确保机器人安全停止  
-        try:  
-            self.clbrobot.t_stop(0)  
-            logger.info("机器人已安全停止")  
-        except Exception as e:  
-            logger.error(f"机器人停止失败: {e}")  
-        
+    def movement_thread(self):
+        """机器人运动控制线程 - 动作由运动控制器执行，命中结果可随时打断"""
+        movements = [
+            ("前进2步", "前进", 2),
+            ("左转", "左转", 1),
+            ("向右2步", "右移", 2),
+            ("左转", "左转", 1),
+            ("后退2步", "后退", 2),
+            ("左转", "左转", 1),
+            ("向左2步", "左移", 2),
+            ("左转", "左转", 1),
+            ("前进2步", "前进", 2)
+        ]
+
+        movement_index = 0
+        cycle_count = 0
+        max_cycles = 10  # 限制为一轮循环
+        action_interval = 3
+
+        while not self._stop_event.is_set() and cycle_count < max_cycles:
+            try:
+                action_name, action, duration = movements[movement_index % len(movements)]
+                logger.info(f"执行动作: {action_name}")
+                future = self.motion.submit(action, 50, duration)
+                future.add_done_callback(self._on_motion_done)
+                movement_index += 1
+
+                # 检查是否完成一轮循环
+                if movement_index % len(movements) == 0:
+                    cycle_count += 1
+                    print(f"[运动控制] 完成第{cycle_count}轮运动循环")
+
+                # 动作结束后停车间隔 action_interval 秒，期间画面稳定便于识别；
+                # 命中结果时 _stop_event 立即唤醒
+                self._stop_event.wait(duration + action_interval)
+
+            except Exception as e:
+                logger.error(f"运动控制线程错误: {e}")
+                self._stop_event.wait(action_interval)
+
+        # 确保机器人安全停止
+        try:
+            self.motion.stop().result(timeout=1.0)
+            logger.info("机器人已安全停止")
+        except Exception as e:
+            logger.error(f"机器人停止失败: {e}")
+
         print("运动控制线程已结束")
 
+    def _on_motion_done(self, future):
+        """搜索动作被其他指令打断（如语音“停止”）时结束搜索，不再继续下发动作"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        if future.result() == COMPLETED or self._stop_event.is_set():
+            return
+        logger.info("搜索动作被其他运动指令打断，结束搜索")
+        with self.lock:
+            self.search_active = False
+        self._stop_event.set()
+
     def __del__(self):      
         """清理资源 - 改进版本"""      
         try:  
@@ -430,13 +462,20 @@ class ConcurrentSearcher:
                 self.found = True  # 强制结束线程  
         except:  
             pass  
-        
+        self._stop_event.set()
+
+        # 停止上传流水线，运动控制器属于机器人管理器，不在这里关闭
+        try:
+            self.upload_pool.shutdown()
+        except Exception as e:
+            logger.error(f"搜索流水线停止失败: {e}")
+
         # 释放摄像头资源  
-        if hasattr(self, 'cap') and self.cap is not None:      
-            try:  
-                self.cap.release()      
-                cv2.destroyAllWindows()      
-                logger.info("摄像头资源已释放")  
+        if hasattr(self, 'frames'):
+            try:
+                self.frames.close()
+                cv2.destroyAllWindows()
+                logger.info("已取消摄像头订阅")
             except Exception as e:  
                 logger.error(f"摄像头资源释放失败: {e}")
 
@@ -506,7 +545,7 @@ def _execute_search_sync(target_item: str, task_state: dict) -> str:
     os.environ['OPENCV_LOG_LEVEL'] = 'ERROR'  
     os.environ['QT_QPA_PLATFORM'] = 'offscreen'  # 新增: 无头模式  
       
-    clbrobot = None  
+    motion = None
     searcher = None  
     movement_thread = None  
       
@@ -518,14 +557,15 @@ def _execute_search_sync(target_item: str, task_state: dict) -> str:
     try:  
         print(f"\n=== 开始搜索物品: {target_item} (视频捕获+运动控制) ===")  
           
-        if LOBOROBOT is None:  
-            raise RuntimeError("机器人控制库不可用")  
+        # 与语音控制共用机器人管理器的运动控制器，所有 I2C/GPIO 操作都在同一个控制器线程中
+        motion = get_robot_manager().get_motion_controller()
+        if motion is None:
+            raise RuntimeError("机器人控制库不可用")
           
         # 更新进度: 初始化  
         update_progress(10)  
           
-        clbrobot = LOBOROBOT()  
-        searcher = ConcurrentSearcher(None, clbrobot, target_item,   
+        searcher = ConcurrentSearcher(None, motion, target_item,   
                                      progress_callback=update_progress,  
                                      task_state=task_state)  
           
@@ -558,8 +598,8 @@ def _execute_search_sync(target_item: str, task_state: dict) -> str:
         logger.error(traceback.format_exc())  
           
         try:  
-            if clbrobot is not None:  
-                clbrobot.t_stop(0)  
+            if motion is not None:
+                motion.stop()
         except:  
             pass  
           
@@ -568,9 +608,7 @@ def _execute_search_sync(target_item: str, task_state: dict) -> str:
     finally:  
         try:  
             if searcher is not None:  
-                with searcher.lock:  
-                    searcher.search_active = False  
-                    searcher.found = True  
+                searcher.stop()
               
             if movement_thread and movement_thread.is_alive():  
                 movement_thread.join(timeout=2.0)  
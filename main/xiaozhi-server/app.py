@@ -10,6 +10,14 @@ from core.http_server import SimpleHttpServer
 from core.websocket_server import WebSocketServer
 from core.utils.util import check_ffmpeg_installed
 from core.utils.gc_manager import get_gc_manager
+from core.utils.cache.tts_cache import get_tts_audio_cache
+from core.utils.connection_runtime import get_connection_runtime
+from core.providers.tools.server_mcp.mcp_pool import get_server_mcp_pool
+from core.worker_manager import (
+    WorkerManager,
+    single_process_snapshot,
+    single_process_stats,
+)
 
 TAG = __name__
 logger = setup_logging()
@@ -64,15 +72,54 @@ async def main():
     # 添加 stdin 监控任务
     stdin_task = asyncio.create_task(monitor_stdin())
 
+    mcp_endpoint = config.get("mcp_endpoint", None)
+    if mcp_endpoint is not None and "你" not in mcp_endpoint:
+        # 校验MCP接入点格式
+        if validate_mcp_endpoint(mcp_endpoint):
+            logger.bind(tag=TAG).info("mcp接入点是\t{}", mcp_endpoint)
+            # 将mcp计入点地址转成调用点
+            mcp_endpoint = mcp_endpoint.replace("/mcp/", "/call/")
+            config["mcp_endpoint"] = mcp_endpoint
+        else:
+            logger.bind(tag=TAG).error("mcp接入点不符合规范")
+            config["mcp_endpoint"] = "你的接入点 websocket地址"
+
+    # 多进程模式：websocket连接分散到多个工作进程，本地模型由宿主进程统一加载
+    workers = int(config["server"].get("workers", 1) or 1)
+    if workers > 1 and not WorkerManager.supported():
+        logger.bind(tag=TAG).warning("当前系统不支持SO_REUSEPORT，使用单进程模式")
+        workers = 1
+
     # 启动全局GC管理器（5分钟清理一次）
     gc_manager = get_gc_manager(interval_seconds=300)
     await gc_manager.start()
 
-    # 启动 WebSocket 服务器
-    ws_server = WebSocketServer(config)
-    ws_task = asyncio.create_task(ws_server.start())
+    worker_manager = None
+    connection_runtime = None
+    server_mcp_pool = None
+    mcp_pool_task = None
+    if workers > 1:
+        worker_manager = WorkerManager(config, workers)
+        await worker_manager.start()
+        # 工作进程意外退出时自动拉起
+        ws_task = asyncio.create_task(worker_manager.supervise())
+        stats_provider = worker_manager.snapshot
+    else:
+        # 初始化TTS音频缓存
+        get_tts_audio_cache(config.get("tts_cache"))
+        # 初始化所有连接共享的线程池
+        connection_runtime = get_connection_runtime(config.get("connection_runtime"))
+        # 后台启动所有连接共享的服务端MCP服务
+        server_mcp_pool = get_server_mcp_pool()
+        mcp_pool_task = asyncio.create_task(server_mcp_pool.start())
+
+        # 启动 WebSocket 服务器
+        stats = single_process_stats()
+        ws_server = WebSocketServer(config, stats=stats.view(0))
+        ws_task = asyncio.create_task(ws_server.start())
+        stats_provider = lambda: single_process_snapshot(stats)
     # 启动 Simple http 服务器
-    ota_server = SimpleHttpServer(config)
+    ota_server = SimpleHttpServer(config, stats_provider=stats_provider)
     ota_task = asyncio.create_task(ota_server.start())
 
     read_config_from_api = config.get("read_config_from_api", False)
@@ -88,17 +135,11 @@ async def main():
         get_local_ip(),
         port,
     )
-    mcp_endpoint = config.get("mcp_endpoint", None)
-    if mcp_endpoint is not None and "你" not in mcp_endpoint:
-        # 校验MCP接入点格式
-        if validate_mcp_endpoint(mcp_endpoint):
-            logger.bind(tag=TAG).info("mcp接入点是\t{}", mcp_endpoint)
-            # 将mcp计入点地址转成调用点
-            mcp_endpoint = mcp_endpoint.replace("/mcp/", "/call/")
-            config["mcp_endpoint"] = mcp_endpoint
-        else:
-            logger.bind(tag=TAG).error("mcp接入点不符合规范")
-            config["mcp_endpoint"] = "你的接入点 websocket地址"
+    logger.bind(tag=TAG).info(
+        "运行统计接口是\thttp://{}:{}/xiaozhi/stats",
+        get_local_ip(),
+        port,
+    )
 
     # 获取WebSocket配置，使用安全的默认值
     websocket_port = 8000
@@ -129,6 +170,12 @@ async def main():
     finally:
         # 停止全局GC管理器
         await gc_manager.stop()
+        if worker_manager is not None:
+            worker_manager.stop()
+        else:
+            connection_runtime.shutdown()
+            mcp_pool_task.cancel()
+            await server_mcp_pool.shutdown()
 
         # 取消所有任务（关键修复点）
         stdin_task.cancel()
@@ -1,11 +1,14 @@
 import json
-import copy
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from aiohttp import web
 from config.logger import setup_logging
 from core.utils.util import get_vision_url, is_valid_image_file
 from core.utils.vllm import create_instance
 from config.config_loader import get_private_config_from_api
 from core.utils.auth import AuthToken
+from core.utils.cache.manager import cache_manager, CacheType
 import base64
 from typing import Tuple, Optional
 from plugins_func.register import Action
@@ -23,6 +26,19 @@ class VisionHandler:
         # 初始化认证工具
         self.auth = AuthToken(config["server"]["auth_key"])
 
+        vision_config = config.get("vision_explain") or {}
+        self.max_concurrency = int(vision_config.get("max_concurrency", 4))
+        self.max_pending = int(vision_config.get("max_pending", 16))
+        self.config_cache_ttl = float(vision_config.get("config_cache_ttl", 300))
+        # 视觉模型推理是阻塞调用，放到独立线程池执行，不占用事件循环
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="vision"
+        )
+        # 正在推理和排队的请求数，只在事件循环中修改
+        self.pending = 0
+        # 同一设备并发请求私有配置时只请求一次
+        self._config_requests = {}
+
     def _create_error_response(self, message: str) -> dict:
         """创建统一的错误响应格式"""
         return {"success": False, "message": message}
@@ -39,6 +55,7 @@ class VisionHandler:
     async def handle_post(self, request):
         """处理 MCP Vision POST 请求"""
         response = None  # 初始化response变量
+        admitted = False
         try:
             # 验证token
             is_valid, token_device_id = self._verify_auth_token(request)
@@ -57,6 +74,21 @@ class VisionHandler:
             client_id = request.headers.get("Client-Id", "")
             if device_id != token_device_id:
                 raise ValueError("设备ID与token不匹配")
+
+            # 正在处理的请求过多时直接返回繁忙，由设备稍后重试，避免请求无限堆积
+            if self.pending >= self.max_concurrency + self.max_pending:
+                response = web.Response(
+                    text=json.dumps(
+                        self._create_error_response("视觉分析服务繁忙，请稍后再试")
+                    ),
+                    content_type="application/json",
+                    status=503,
+                    headers={"Retry-After": "1"},
+                )
+                return response
+            self.pending += 1
+            admitted = True
+
             # 解析multipart/form-data请求
             reader = await request.multipart()
 
@@ -89,38 +121,20 @@ class VisionHandler:
                     "不支持的文件格式，请上传有效的图片文件（支持JPEG、PNG、GIF、BMP、TIFF、WEBP格式）"
                 )
 
-            # 将图片转换为base64编码
-            image_base64 = base64.b64encode(image_data).decode("utf-8")
-
-            # 如果开启了智控台，则从智控台获取模型配置
-            current_config = copy.deepcopy(self.config)
-            read_config_from_api = current_config.get("read_config_from_api", False)
-            if read_config_from_api:
-                current_config = await get_private_config_from_api(
-                    current_config,
-                    device_id,
-                    client_id,
-                )
+            current_config = await self._get_device_config(device_id, client_id)
 
             select_vllm_module = current_config["selected_module"].get("VLLM")
             if not select_vllm_module:
                 raise ValueError("您还未设置默认的视觉分析模块")
 
-            vllm_type = (
-                select_vllm_module
-                if "type" not in current_config["VLLM"][select_vllm_module]
-                else current_config["VLLM"][select_vllm_module]["type"]
+            vllm = self._get_vllm(
+                select_vllm_module, current_config["VLLM"][select_vllm_module]
             )
 
-            if not vllm_type:
-                raise ValueError(f"无法找到VLLM模块对应的供应器{vllm_type}")
-
-            vllm = create_instance(
-                vllm_type, current_config["VLLM"][select_vllm_module]
+            result = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._inference, vllm, question, image_data
             )
 
-            result = vllm.response(question, image_base64)
-
             return_json = {
                 "success": True,
                 "action": Action.RESPONSE.name,
@@ -146,10 +160,64 @@ class VisionHandler:
                 content_type="application/json",
             )
         finally:
+            if admitted:
+                self.pending -= 1
             if response:
                 self._add_cors_headers(response)
             return response
 
+    async def _get_device_config(self, device_id: str, client_id: str) -> dict:
+        """获取设备使用的模型配置；开启了智控台时从智控台获取，并按设备缓存"""
+        if not self.config.get("read_config_from_api", False):
+            return self.config
+
+        cache_key = f"{device_id}:{client_id}"
+        private_config = cache_manager.get(CacheType.VISION_CONFIG, cache_key)
+        if private_config is not None:
+            return private_config
+
+        request_task = self._config_requests.get(cache_key)
+        if request_task is None:
+            request_task = asyncio.ensure_future(
+                get_private_config_from_api(self.config, device_id, client_id)
+            )
+            self._config_requests[cache_key] = request_task
+            request_task.add_done_callback(
+                lambda _: self._config_requests.pop(cache_key, None)
+            )
+        private_config = await asyncio.shield(request_task)
+        cache_manager.set(
+            CacheType.VISION_CONFIG,
+            cache_key,
+            private_config,
+            ttl=self.config_cache_ttl,
+        )
+        return private_config
+
+    def _get_vllm(self, module_name: str, module_config: dict):
+        """按模块名和模块配置复用视觉模型实例，配置变化后创建新实例"""
+        config_hash = hashlib.md5(
+            json.dumps(module_config, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        cache_key = f"{module_name}:{config_hash}"
+        vllm = cache_manager.get(CacheType.VLLM_PROVIDER, cache_key)
+        if vllm is not None:
+            return vllm
+
+        vllm_type = module_config.get("type", module_name)
+        if not vllm_type:
+            raise ValueError(f"无法找到VLLM模块对应的供应器{vllm_type}")
+
+        vllm = create_instance(vllm_type, module_config)
+        cache_manager.set(CacheType.VLLM_PROVIDER, cache_key, vllm)
+        return vllm
+
+    @staticmethod
+    def _inference(vllm, question: str, image_data: bytes) -> str:
+        """在线程池中执行：图片转base64后调用视觉模型"""
+        image_base64 = base64.b64encode(image_data).decode("utf-8")
+        return vllm.response(question, image_base64)
+
     async def handle_get(self, request):
         """处理 MCP Vision GET 请求"""
         try:
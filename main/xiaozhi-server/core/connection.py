@@ -1,6 +1,5 @@
 import os
 import sys
-import copy
 import json
 import uuid
 import time
@@ -10,6 +9,7 @@ import threading
 import traceback
 import subprocess
 import websockets
+import numpy as np
 
 from core.utils.util import (
     extract_json_from_string,
@@ -26,7 +26,6 @@ from core.utils.modules_initialize import (
 )
 from core.handle.reportHandle import report
 from core.providers.tts.default import DefaultTTS
-from concurrent.futures import ThreadPoolExecutor
 from core.utils.dialogue import Message, Dialogue
 from core.providers.asr.dto.dto import InterfaceType
 from core.handle.textHandle import handleTextMessage
@@ -41,6 +40,12 @@ from config.manage_api_client import DeviceNotFoundException, DeviceBindExceptio
 from core.utils.prompt_manager import PromptManager
 from core.utils.voiceprint_provider import VoiceprintProvider
 from core.utils import textUtils
+from core.utils.ring_buffer import RingBuffer
+from core.utils.connection_runtime import (
+    LoopQueue,
+    overlay_config,
+    get_connection_runtime,
+)
 
 TAG = __name__
 
@@ -63,7 +68,8 @@ class ConnectionHandler:
         server=None,
     ):
         self.common_config = config
-        self.config = copy.deepcopy(config)
+        # 写时复制的配置视图，不再整份深拷贝
+        self.config = overlay_config(config)
         self.session_id = str(uuid.uuid4())
         self.logger = setup_logging()
         self.server = server  # 保存server实例的引用
@@ -94,11 +100,14 @@ class ConnectionHandler:
         # 线程任务相关
         self.loop = None  # 在 handle_connection 中获取运行中的事件循环
         self.stop_event = threading.Event()
-        self.executor = ThreadPoolExecutor(max_workers=5)
-
-        # 添加上报线程池
-        self.report_queue = queue.Queue()
-        self.report_thread = None
+        # 阻塞任务提交到所有连接共享的线程池
+        self.executor = get_connection_runtime().create_executor()
+        # 连接内的后台协程任务，关闭连接时统一取消
+        self.background_tasks = set()
+
+        # 上报队列，由事件循环上的协程消费
+        self.report_queue = LoopQueue()
+        self.report_task = None
         # 未来可以通过修改此处，调节asr的上报和tts的上报，目前默认都开启
         self.report_asr_enable = self.read_config_from_api
         self.report_tts_enable = self.read_config_from_api
@@ -117,7 +126,8 @@ class ConnectionHandler:
         self.voiceprint_provider = None
 
         # vad相关变量
-        self.client_audio_buffer = bytearray()
+        # 解码后的PCM，VAD按512采样点整块取走，1秒容量足够
+        self.client_audio_buffer = RingBuffer(16000, np.int16)
         self.client_have_voice = False
         self.client_voice_window = deque(maxlen=5)
         self.first_activity_time = 0.0  # 记录首次活动的时间（毫秒）
@@ -128,8 +138,10 @@ class ConnectionHandler:
         # asr相关变量
         # 因为实际部署时可能会用到公共的本地ASR，不能把变量暴露给公共ASR
         # 所以涉及到ASR的变量，需要在这里定义，属于connection的私有变量
-        self.asr_audio = []
-        self.asr_audio_queue = queue.Queue()
+        # 缓存opus包，预分配约90秒（每包60ms）；手动聆听模式下整段录音都要保留，
+        # 超出时扩容而不是丢弃开头
+        self.asr_audio = RingBuffer(1500, object, growable=True)
+        self.asr_audio_queue = LoopQueue()
 
         # llm相关变量
         self.llm_finish_task = True
@@ -172,6 +184,8 @@ class ConnectionHandler:
         try:
             # 获取运行中的事件循环（必须在异步上下文中）
             self.loop = asyncio.get_running_loop()
+            self.asr_audio_queue.bind(self.loop)
+            self.report_queue.bind(self.loop)
 
             # 获取并验证headers
             self.headers = dict(ws.request.headers)
@@ -250,7 +264,7 @@ class ConnectionHandler:
         """保存记忆并关闭连接"""
         try:
             if self.memory:
-                # 使用线程池异步保存记忆
+                # 在共享线程池中异步保存记忆
                 def save_memory_task():
                     try:
                         # 创建新事件循环（避免与主循环冲突）
@@ -267,8 +281,8 @@ class ConnectionHandler:
                         except Exception:
                             pass
 
-                # 启动线程保存记忆，不等待完成
-                threading.Thread(target=save_memory_task, daemon=True).start()
+                # 提交保存任务，不等待完成
+                get_connection_runtime().executor.submit(save_memory_task)
         except Exception as e:
             self.logger.bind(tag=TAG).error(f"保存记忆失败: {e}")
         finally:
@@ -501,17 +515,31 @@ class ConnectionHandler:
             self.logger.bind(tag=TAG).debug("系统提示词已增强更新")
 
     def _init_report_threads(self):
-        """初始化ASR和TTS上报线程"""
+        """初始化ASR和TTS上报任务"""
         if not self.read_config_from_api or self.need_bind:
             return
         if self.chat_history_conf == 0:
             return
-        if self.report_thread is None or not self.report_thread.is_alive():
-            self.report_thread = threading.Thread(
-                target=self._report_worker, daemon=True
-            )
-            self.report_thread.start()
-            self.logger.bind(tag=TAG).info("TTS上报线程已启动")
+        if self.report_task is None or self.report_task.done():
+            self.report_task = self.spawn_task(self._report_worker())
+            self.logger.bind(tag=TAG).info("TTS上报任务已启动")
+
+    def spawn_task(self, coro):
+        """
+        在连接的事件循环上启动后台协程，可在任意线程调用；
+        关闭连接时统一取消
+        """
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self.loop:
+            task = self.loop.create_task(coro)
+        else:
+            task = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+        return task
 
     def _initialize_tts(self):
         """初始化TTS"""
@@ -1066,39 +1094,27 @@ class ConnectionHandler:
 
             self.chat(None, depth=depth + 1)
 
-    def _report_worker(self):
-        """聊天记录上报工作线程"""
+    async def _report_worker(self):
+        """聊天记录上报任务"""
         while not self.stop_event.is_set():
             try:
-                # 从队列获取数据，设置超时以便定期检查停止事件
-                item = self.report_queue.get(timeout=1)
+                item = await self.report_queue.get()
                 if item is None:  # 检测毒丸对象
                     break
-                try:
-                    # 检查线程池状态
-                    if self.executor is None:
-                        continue
-                    # 提交任务到线程池
-                    self.executor.submit(self._process_report, *item)
-                except Exception as e:
-                    self.logger.bind(tag=TAG).error(f"聊天记录上报线程异常: {e}")
-            except queue.Empty:
-                continue
+                await self._process_report(*item)
+            except asyncio.CancelledError:
+                break
             except Exception as e:
-                self.logger.bind(tag=TAG).error(f"聊天记录上报工作线程异常: {e}")
+                self.logger.bind(tag=TAG).error(f"聊天记录上报任务异常: {e}")
 
-        self.logger.bind(tag=TAG).info("聊天记录上报线程已退出")
+        self.logger.bind(tag=TAG).info("聊天记录上报任务已退出")
 
-    def _process_report(self, type, text, audio_data, report_time):
+    async def _process_report(self, type, text, audio_data, report_time):
         """处理上报任务"""
         try:
-            # 执行异步上报（在事件循环中运行）
-            asyncio.run(report(self, type, text, audio_data, report_time))
+            await report(self, type, text, audio_data, report_time)
         except Exception as e:
             self.logger.bind(tag=TAG).error(f"上报处理异常: {e}")
-        finally:
-            # 标记任务完成
-            self.report_queue.task_done()
 
     def clearSpeakStatus(self):
         self.client_is_speaking = False
@@ -1111,6 +1127,13 @@ class ConnectionHandler:
             if hasattr(self, "audio_buffer"):
                 self.audio_buffer.clear()
 
+            # 释放VAD中该连接的状态
+            if self.vad:
+                try:
+                    self.vad.release(self)
+                except Exception as vad_error:
+                    self.logger.bind(tag=TAG).error(f"释放VAD资源时出错: {vad_error}")
+
             # 取消超时任务
             if self.timeout_task and not self.timeout_task.done():
                 self.timeout_task.cancel()
@@ -1133,6 +1156,10 @@ class ConnectionHandler:
             if self.stop_event:
                 self.stop_event.set()
 
+            # 取消连接内的后台任务
+            for task in list(self.background_tasks):
+                task.cancel()
+
             # 停止歌词同步任务
             try:
                 from core.handle.sendLyricsHandle import stop_lyrics_sync
@@ -1182,7 +1209,7 @@ class ConnectionHandler:
             if self.tts:
                 await self.tts.close()
 
-            # 最后关闭线程池（避免阻塞）
+            # 最后取消本连接还未执行的线程池任务（共享线程池本身不关闭）
             if self.executor:
                 try:
                     self.executor.shutdown(wait=False)
@@ -1230,7 +1257,7 @@ class ConnectionHandler:
             )
 
     def reset_vad_states(self):
-        self.client_audio_buffer = bytearray()
+        self.client_audio_buffer.clear()
         self.client_have_voice = False
         self.client_voice_stop = False
         self.logger.bind(tag=TAG).debug("VAD states reset.")
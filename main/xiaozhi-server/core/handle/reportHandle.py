@@ -2,17 +2,19 @@
 TTS上报功能已集成到ConnectionHandler类中。
 
 上报功能包括：
-1. 每个连接对象拥有自己的上报队列和处理线程
-2. 上报线程的生命周期与连接对象绑定
+1. 每个连接对象拥有自己的上报队列，由事件循环上的上报任务消费
+2. 上报任务的生命周期与连接对象绑定，音频转码在共享线程池中执行
 3. 使用ConnectionHandler.enqueue_tts_report方法进行上报
 
 具体实现请参考core/connection.py中的相关代码。
 """
 
 import time
+import asyncio
 import opuslib_next
 
 from config.manage_api_client import report as manage_report
+from core.utils.connection_runtime import get_connection_runtime
 
 TAG = __name__
 
@@ -29,7 +31,10 @@ async def report(conn, type, text, opus_data, report_time):
     """
     try:
         if opus_data:
-            audio_data = opus_to_wav(conn, opus_data)
+            # Opus解码是CPU密集操作，放到共享线程池，避免阻塞事件循环
+            audio_data = await asyncio.get_running_loop().run_in_executor(
+                get_connection_runtime().executor, opus_to_wav, conn, opus_data
+            )
         else:
             audio_data = None
         # 执行异步上报
@@ -284,3 +284,20 @@ async def send_stt_message(conn, text):
         json.dumps({"type": "stt", "text": stt_text, "session_id": conn.session_id})
     )
     await send_tts_message(conn, "start")
+
+
+async def send_stt_partial_message(conn, text):
+    """发送流式识别的中间结果，用户说完后仍由 send_stt_message 发送最终文本"""
+    stt_text = textUtils.get_string_no_punctuation_or_emoji(text)
+    if not stt_text:
+        return
+    await conn.websocket.send(
+        json.dumps(
+            {
+                "type": "stt",
+                "text": stt_text,
+                "session_id": conn.session_id,
+                "is_final": False,
+            }
+        )
+    )
@@ -8,8 +8,10 @@ TAG = __name__
 
 
 class SimpleHttpServer:
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, stats_provider=None):
         self.config = config
+        # 返回运行统计的函数，多进程模式下汇总所有工作进程
+        self.stats_provider = stats_provider
         self.logger = setup_logging()
         self.ota_handler = OTAHandler(config)
         self.vision_handler = VisionHandler(config)
@@ -32,6 +34,10 @@ class SimpleHttpServer:
         else:
             return f"ws://{local_ip}:{port}/xiaozhi/v1/"
 
+    async def _handle_stats(self, request):
+        """运行统计：各进程的连接数、内存、CPU，以及模型宿主进程的推理次数"""
+        return web.json_response(self.stats_provider())
+
     async def start(self):
         server_config = self.config["server"]
         read_config_from_api = self.config.get("read_config_from_api", False)
@@ -58,6 +64,8 @@ class SimpleHttpServer:
                     web.options("/mcp/vision/explain", self.vision_handler.handle_post),
                 ]
             )
+            if self.stats_provider is not None:
+                app.add_routes([web.get("/xiaozhi/stats", self._handle_stats)])
 
             # 运行服务
             runner = web.AppRunner(app)
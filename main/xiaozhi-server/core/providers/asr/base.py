@@ -4,10 +4,8 @@ import wave
 import uuid
 import json
 import time
-import queue
 import asyncio
 import traceback
-import threading
 import opuslib_next
 from abc import ABC, abstractmethod
 from config.logger import setup_logging
@@ -27,23 +25,16 @@ class ASRProviderBase(ABC):
 
     # 打开音频通道
     async def open_audio_channels(self, conn):
-        conn.asr_priority_thread = threading.Thread(
-            target=self.asr_text_priority_thread, args=(conn,), daemon=True
-        )
-        conn.asr_priority_thread.start()
+        conn.asr_priority_task = conn.spawn_task(self.asr_text_priority_task(conn))
 
-    # 有序处理ASR音频
-    def asr_text_priority_thread(self, conn):
+    # 有序处理ASR音频，在事件循环上按顺序消费，不再为每个连接占用一个线程
+    async def asr_text_priority_task(self, conn):
         while not conn.stop_event.is_set():
             try:
-                message = conn.asr_audio_queue.get(timeout=1)
-                future = asyncio.run_coroutine_threadsafe(
-                    handleAudioMessage(conn, message),
-                    conn.loop,
-                )
-                future.result()
-            except queue.Empty:
-                continue
+                message = await conn.asr_audio_queue.get()
+                await handleAudioMessage(conn, message)
+            except asyncio.CancelledError:
+                break
             except Exception as e:
                 logger.bind(tag=TAG).error(
                     f"处理ASR文本失败: {str(e)}, 类型: {type(e).__name__}, 堆栈: {traceback.format_exc()}"
@@ -61,12 +52,13 @@ class ASRProviderBase(ABC):
 
             conn.asr_audio.append(audio)
             if not have_voice and not conn.client_have_voice:
-                conn.asr_audio = conn.asr_audio[-10:]
+                # 只保留最近10个包作为预录音
+                conn.asr_audio.keep_last(10)
                 return
 
             # 自动模式下通过VAD检测到语音停止时触发识别
             if conn.client_voice_stop:
-                asr_audio_task = conn.asr_audio.copy()
+                asr_audio_task = conn.asr_audio.tolist()
                 conn.asr_audio.clear()
                 conn.reset_vad_states()
 
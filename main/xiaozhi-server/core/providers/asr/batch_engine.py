@@ -0,0 +1,144 @@
+"""
+FunASR 跨连接批量识别引擎
+把各连接已经说完的整句音频收集成批，等待几毫秒凑批后在独立线程中调用一次 AutoModel.generate，
+模型内部按批补齐后一次前向推理，结果通过Future返回给各调用方
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+
+from config.logger import setup_logging
+
+TAG = __name__
+logger = setup_logging()
+
+
+class FunASRBatchEngine:
+    """FunASR 批量识别引擎"""
+
+    def __init__(self, model, postprocess, batch_size=8, max_wait_ms=10, **generate_kwargs):
+        """
+        Args:
+            model: funasr.AutoModel 实例
+            postprocess: 识别结果文本的后处理函数，如 rich_transcription_postprocess
+            batch_size: 单批最多包含的句子数
+            max_wait_ms: 批次未满时最多等待的毫秒数
+            generate_kwargs: 透传给 model.generate 的参数
+        """
+        self.model = model
+        self.postprocess = postprocess
+        self.batch_size = max(1, int(batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms) / 1000.0)
+        self.generate_kwargs = generate_kwargs
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+
+        # 统计信息
+        self.batches = 0
+        self.utterances = 0
+
+        self._worker = threading.Thread(
+            target=self._run, name="funasr-batch", daemon=True
+        )
+        self._worker.start()
+        logger.bind(tag=TAG).info(
+            f"ASR批量识别引擎已启动: batch_size={self.batch_size}, max_wait_ms={max_wait_ms}"
+        )
+
+    def submit(self, pcm_data: bytes) -> Future:
+        """
+        提交一句16kHz单声道16bit PCM音频
+
+        Returns:
+            Future: 结果为后处理后的识别文本
+        """
+        future = Future()
+        with self._cond:
+            if self._stopped:
+                future.set_exception(RuntimeError("ASR批量识别引擎已停止"))
+                return future
+            self._queue.append((future, pcm_data))
+            self._cond.notify()
+        return future
+
+    def stop(self):
+        """停止工作线程，未处理的请求会被取消"""
+        with self._cond:
+            self._stopped = True
+            pending = list(self._queue)
+            self._queue.clear()
+            self._cond.notify_all()
+        for future, _ in pending:
+            future.cancel()
+        self._worker.join(timeout=1)
+
+    def _collect(self):
+        with self._cond:
+            while not self._queue and not self._stopped:
+                self._cond.wait()
+            if self._stopped:
+                return None
+            # 批次未满时稍等片刻，让同时说完的其他连接进入本批
+            if len(self._queue) < self.batch_size and self.max_wait > 0:
+                self._cond.wait_for(
+                    lambda: len(self._queue) >= self.batch_size or self._stopped,
+                    timeout=self.max_wait,
+                )
+                if self._stopped:
+                    return None
+            batch = []
+            while self._queue and len(batch) < self.batch_size:
+                future, pcm_data = self._queue.popleft()
+                # 调用方已放弃等待的请求不再识别
+                if future.set_running_or_notify_cancel():
+                    batch.append((future, pcm_data))
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                break
+            if not batch:
+                continue
+            try:
+                texts = self._generate([pcm_data for _, pcm_data in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    self._resolve(batch[0][0], exception=e)
+                    continue
+                # 整批失败时逐句重试，避免一句异常音频拖累同批的其他连接
+                logger.bind(tag=TAG).warning(f"ASR批量识别失败，逐句重试: {e}")
+                for future, pcm_data in batch:
+                    try:
+                        self._resolve(future, result=self._generate([pcm_data])[0])
+                    except Exception as single_error:
+                        self._resolve(future, exception=single_error)
+                continue
+            for (future, _), text in zip(batch, texts):
+                self._resolve(future, result=text)
+
+    def _generate(self, inputs):
+        results = self.model.generate(
+            input=inputs, cache={}, batch_size=len(inputs), **self.generate_kwargs
+        )
+        if len(results) != len(inputs):
+            raise RuntimeError(f"识别结果数量不匹配: {len(results)}/{len(inputs)}")
+        self.batches += 1
+        self.utterances += len(inputs)
+        return [self.postprocess(result["text"]) for result in results]
+
+    @staticmethod
+    def _resolve(future, result=None, exception=None):
+        if future.done():
+            return
+        try:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
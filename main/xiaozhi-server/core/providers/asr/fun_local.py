@@ -11,6 +11,7 @@ from typing import Optional, Tuple, List
 from funasr import AutoModel
 from funasr.utils.postprocess_utils import rich_transcription_postprocess
 from core.providers.asr.base import ASRProviderBase
+from core.providers.asr.batch_engine import FunASRBatchEngine
 from core.providers.asr.dto.dto import InterfaceType
 
 TAG = __name__
@@ -63,6 +64,21 @@ class ASRProvider(ASRProviderBase):
                 # device="cuda:0",  # 启用GPU加速
             )
 
+        # 跨连接批量识别，batch_size大于1时启用
+        self.batch_engine = None
+        batch_size = config.get("batch_size", "0")
+        batch_size = int(batch_size) if batch_size else 0
+        if batch_size > 1:
+            max_wait_ms = config.get("batch_max_wait_ms", "10")
+            self.batch_engine = FunASRBatchEngine(
+                self.model,
+                rich_transcription_postprocess,
+                batch_size=batch_size,
+                max_wait_ms=float(max_wait_ms) if max_wait_ms else 10,
+                language="auto",
+                use_itn=True,
+            )
+
     async def speech_to_text(
         self, opus_data: List[bytes], session_id: str, audio_format="opus"
     ) -> Tuple[Optional[str], Optional[str]]:
@@ -92,17 +108,23 @@ class ASRProvider(ASRProviderBase):
                 else:
                     file_path = self.save_audio_to_file(pcm_data, session_id)
 
-                # 语音识别 - 使用线程池避免阻塞事件循环
                 start_time = time.time()
-                result = await asyncio.to_thread(
-                    self.model.generate,
-                    input=combined_pcm_data,
-                    cache={},
-                    language="auto",
-                    use_itn=True,
-                    batch_size_s=60,
-                )
-                text = await asyncio.to_thread(rich_transcription_postprocess, result[0]["text"])
+                if self.batch_engine is not None:
+                    # 与其他连接同时说完的句子合批识别，在引擎线程中执行
+                    text = await asyncio.wrap_future(
+                        self.batch_engine.submit(combined_pcm_data)
+                    )
+                else:
+                    # 语音识别 - 使用线程池避免阻塞事件循环
+                    result = await asyncio.to_thread(
+                        self.model.generate,
+                        input=combined_pcm_data,
+                        cache={},
+                        language="auto",
+                        use_itn=True,
+                        batch_size_s=60,
+                    )
+                    text = await asyncio.to_thread(rich_transcription_postprocess, result[0]["text"])
                 logger.bind(tag=TAG).debug(
                     f"语音识别耗时: {time.time() - start_time:.3f}s | 结果: {text}"
                 )
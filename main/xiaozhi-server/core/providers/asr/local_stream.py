@@ -0,0 +1,167 @@
+"""
+本地流式语音识别基类
+音频帧到达时即解码送入在线识别器，识别中途把中间结果通过stt消息推送给设备，
+识别器检测到端点后立即结束本句，不必等VAD静默超时，后续意图识别和LLM可以更早开始。
+识别器实例在连接间共享，每个连接的识别流保存在 conn.local_asr_stream 中
+"""
+
+import asyncio
+from abc import abstractmethod
+from typing import Any, List, Optional, Tuple
+
+import opuslib_next
+from config.logger import setup_logging
+from core.providers.asr.base import ASRProviderBase
+from core.handle.sendAudioHandle import send_stt_partial_message
+
+TAG = __name__
+logger = setup_logging()
+
+
+class _StreamSession:
+    """单个连接当前这句话的识别状态"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        # 流式解码需要保留上一帧的状态，每个连接各用一个解码器
+        self.decoder = opuslib_next.Decoder(16000, 1)
+        self.partial_text = ""
+
+
+class LocalStreamASRProviderBase(ASRProviderBase):
+    """streaming 为 False 时完全沿用基类的整句识别流程"""
+
+    def __init__(self):
+        super().__init__()
+        self.streaming = False
+        # 端点处已经得到的最终文本，交给 handle_voice_stop 中调用的 speech_to_text
+        self._final_texts = {}
+
+    @abstractmethod
+    def create_stream(self) -> Any:
+        """创建一个识别流"""
+        pass
+
+    @abstractmethod
+    def accept_pcm(self, stream: Any, pcm_data: bytes) -> Tuple[str, bool]:
+        """
+        送入一段16kHz单声道16bit PCM并解码，在线程池中调用
+
+        Returns:
+            (当前识别文本, 是否检测到端点)
+        """
+        pass
+
+    @abstractmethod
+    def finish_stream(self, stream: Any) -> str:
+        """输入结束，解码剩余音频并返回最终文本，在线程池中调用"""
+        pass
+
+    async def receive_audio(self, conn, audio, audio_have_voice):
+        if not self.streaming:
+            await super().receive_audio(conn, audio, audio_have_voice)
+            return
+
+        conn.asr_audio.append(audio)
+        session: Optional[_StreamSession] = getattr(conn, "local_asr_stream", None)
+        manual = conn.client_listen_mode == "manual"
+        if session is None:
+            if not manual and not audio_have_voice and not conn.client_have_voice:
+                # 只保留最近10个包作为预录音
+                conn.asr_audio.keep_last(10)
+                return
+            try:
+                stream = await asyncio.to_thread(self.create_stream)
+            except Exception as e:
+                logger.bind(tag=TAG).error(f"创建识别流失败: {e}")
+                return
+            session = conn.local_asr_stream = _StreamSession(stream)
+            # 开始说话时连同预录音一起送入
+            frames = conn.asr_audio.tolist()
+        else:
+            frames = [audio]
+
+        try:
+            text, is_endpoint = await asyncio.to_thread(
+                self._accept_frames, session, frames, conn.audio_format
+            )
+        except Exception as e:
+            logger.bind(tag=TAG).error(f"流式识别失败: {e}")
+            conn.local_asr_stream = None
+            return
+
+        if text and text != session.partial_text:
+            session.partial_text = text
+            await send_stt_partial_message(conn, text)
+
+        # 手动模式由设备发送 listen stop 结束本句
+        if manual:
+            return
+        if is_endpoint and not text:
+            # 只有静音或噪声，丢弃这段识别流，等待下次说话
+            conn.local_asr_stream = None
+            conn.asr_audio.keep_last(10)
+            return
+        if is_endpoint or conn.client_voice_stop:
+            asr_audio_task = conn.asr_audio.tolist()
+            conn.asr_audio.clear()
+            conn.reset_vad_states()
+            if is_endpoint or len(asr_audio_task) > 15:
+                await self.handle_voice_stop(conn, asr_audio_task)
+            else:
+                conn.local_asr_stream = None
+
+    def _accept_frames(self, session: _StreamSession, frames: List[bytes], audio_format):
+        text, is_endpoint = session.partial_text, False
+        for frame in frames:
+            if not frame:
+                continue
+            if audio_format == "pcm":
+                pcm_frame = frame
+            else:
+                try:
+                    pcm_frame = session.decoder.decode(frame, 960)
+                except opuslib_next.OpusError as e:
+                    logger.bind(tag=TAG).warning(f"Opus解码错误，跳过数据包: {e}")
+                    continue
+            text, is_endpoint = self.accept_pcm(session.stream, pcm_frame)
+            if is_endpoint:
+                break
+        return text, is_endpoint
+
+    async def handle_voice_stop(self, conn, asr_audio_task: List[bytes]):
+        if not self.streaming:
+            await super().handle_voice_stop(conn, asr_audio_task)
+            return
+
+        session = getattr(conn, "local_asr_stream", None)
+        conn.local_asr_stream = None
+        if session is not None:
+            try:
+                self._final_texts[conn.session_id] = await asyncio.to_thread(
+                    self.finish_stream, session.stream
+                )
+            except Exception as e:
+                logger.bind(tag=TAG).error(f"结束识别流失败: {e}")
+        try:
+            await super().handle_voice_stop(conn, asr_audio_task)
+        finally:
+            self._final_texts.pop(conn.session_id, None)
+
+    async def stream_speech_to_text(
+        self, opus_data: List[bytes], session_id: str, audio_format="opus"
+    ) -> str:
+        """流式模式下的 speech_to_text：优先返回端点处的结果，否则把整段音频送入新的识别流"""
+        text = self._final_texts.pop(session_id, None)
+        if text is not None:
+            return text
+        if audio_format == "pcm":
+            pcm_data = opus_data
+        else:
+            pcm_data = self.decode_opus(opus_data)
+        return await asyncio.to_thread(self._recognize_once, b"".join(pcm_data))
+
+    def _recognize_once(self, pcm_data: bytes) -> str:
+        stream = self.create_stream()
+        self.accept_pcm(stream, pcm_data)
+        return self.finish_stream(stream)
@@ -0,0 +1,47 @@
+import time
+import asyncio
+from typing import Optional, Tuple, List
+
+from config.logger import setup_logging
+from core.providers.asr.base import ASRProviderBase
+from core.providers.asr.dto.dto import InterfaceType
+from core.utils.model_host import get_model_host_client
+
+TAG = __name__
+logger = setup_logging()
+
+
+class ASRProvider(ASRProviderBase):
+    """多进程模式下的本地ASR代理，音频在本进程解码，识别在模型宿主进程中执行"""
+
+    def __init__(self, config: dict, delete_audio_file: bool):
+        super().__init__()
+        # 与本地模型一样，所有连接共用一个实例
+        self.interface_type = InterfaceType.LOCAL
+        self.output_dir = config.get("output_dir")
+        self.delete_audio_file = delete_audio_file
+        self.client = get_model_host_client()
+        if self.client is None:
+            raise RuntimeError("模型宿主进程未启动，无法使用model_host类型的ASR")
+
+    async def speech_to_text(
+        self, opus_data: List[bytes], session_id: str, audio_format="opus"
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """语音转文本主处理逻辑"""
+        try:
+            if audio_format == "pcm":
+                pcm_data = opus_data
+            else:
+                pcm_data = self.decode_opus(opus_data)
+
+            start_time = time.time()
+            text, file_path = await asyncio.wrap_future(
+                self.client.call("asr", b"".join(pcm_data), session_id)
+            )
+            logger.bind(tag=TAG).debug(
+                f"宿主进程语音识别耗时: {time.time() - start_time:.3f}s | 结果: {text}"
+            )
+            return text, file_path
+        except Exception as e:
+            logger.bind(tag=TAG).error(f"语音识别失败: {e}")
+            return "", None
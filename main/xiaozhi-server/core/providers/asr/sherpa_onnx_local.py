@@ -6,7 +6,7 @@ import io
 from config.logger import setup_logging
 from typing import Optional, Tuple, List
 from core.providers.asr.dto.dto import InterfaceType
-from core.providers.asr.base import ASRProviderBase
+from core.providers.asr.local_stream import LocalStreamASRProviderBase
 
 import numpy as np
 import sherpa_onnx
@@ -34,7 +34,7 @@ class CaptureOutput:
             logger.bind(tag=TAG).info(self.output.strip())
 
 
-class ASRProvider(ASRProviderBase):
+class ASRProvider(LocalStreamASRProviderBase):
     def __init__(self, config: dict, delete_audio_file: bool):
         super().__init__()
         self.interface_type = InterfaceType.LOCAL
@@ -42,10 +42,15 @@ class ASRProvider(ASRProviderBase):
         self.output_dir = config.get("output_dir")
         self.model_type = config.get("model_type", "sense_voice")  # 支持 paraformer
         self.delete_audio_file = delete_audio_file
+        self.streaming = str(config.get("streaming", False)).lower() in ("true", "1")
 
         # 确保输出目录存在
         os.makedirs(self.output_dir, exist_ok=True)
 
+        if self.streaming:
+            self._init_online_model(config)
+            return
+
         # 初始化模型文件路径
         model_files = {
             "model.int8.onnx": os.path.join(self.model_dir, "model.int8.onnx"),
@@ -96,6 +101,72 @@ class ASRProvider(ASRProviderBase):
                     use_itn=True,
                 )
 
+    def _init_online_model(self, config: dict):
+        """加载流式模型，模型需手动下载，文件名可在配置中指定"""
+        model_files = {
+            "encoder": config.get("encoder", "encoder.int8.onnx"),
+            "decoder": config.get("decoder", "decoder.int8.onnx"),
+            "tokens": config.get("tokens", "tokens.txt"),
+        }
+        if self.model_type != "paraformer":
+            model_files["joiner"] = config.get("joiner", "joiner.int8.onnx")
+        paths = {}
+        for name, file_name in model_files.items():
+            paths[name] = os.path.join(self.model_dir, file_name)
+            if not os.path.isfile(paths[name]):
+                raise FileNotFoundError(f"流式模型文件不存在: {paths[name]}")
+
+        # 端点检测规则：未识别出文字时尾部静音超过rule1秒，
+        # 已识别出文字时尾部静音超过rule2秒，或整句超过rule3秒，即认为本句结束
+        endpoint_kwargs = dict(
+            enable_endpoint_detection=True,
+            rule1_min_trailing_silence=float(config.get("rule1_min_trailing_silence", 2.4)),
+            rule2_min_trailing_silence=float(config.get("rule2_min_trailing_silence", 0.8)),
+            rule3_min_utterance_length=float(config.get("rule3_min_utterance_length", 20)),
+        )
+        with CaptureOutput():
+            if self.model_type == "paraformer":
+                self.model = sherpa_onnx.OnlineRecognizer.from_paraformer(
+                    tokens=paths["tokens"],
+                    encoder=paths["encoder"],
+                    decoder=paths["decoder"],
+                    num_threads=2,
+                    sample_rate=16000,
+                    feature_dim=80,
+                    decoding_method="greedy_search",
+                    **endpoint_kwargs,
+                )
+            else:  # zipformer 等transducer模型
+                self.model = sherpa_onnx.OnlineRecognizer.from_transducer(
+                    tokens=paths["tokens"],
+                    encoder=paths["encoder"],
+                    decoder=paths["decoder"],
+                    joiner=paths["joiner"],
+                    num_threads=2,
+                    sample_rate=16000,
+                    feature_dim=80,
+                    decoding_method="greedy_search",
+                    **endpoint_kwargs,
+                )
+
+    def create_stream(self):
+        return self.model.create_stream()
+
+    def accept_pcm(self, stream, pcm_data: bytes) -> Tuple[str, bool]:
+        samples = np.frombuffer(pcm_data, dtype=np.int16).astype(np.float32) / 32768
+        stream.accept_waveform(16000, samples)
+        while self.model.is_ready(stream):
+            self.model.decode_stream(stream)
+        return self.model.get_result(stream), self.model.is_endpoint(stream)
+
+    def finish_stream(self, stream) -> str:
+        # 补一段静音，让模型输出最后几帧的识别结果
+        stream.accept_waveform(16000, np.zeros(int(0.3 * 16000), dtype=np.float32))
+        stream.input_finished()
+        while self.model.is_ready(stream):
+            self.model.decode_stream(stream)
+        return self.model.get_result(stream)
+
     def read_wave(self, wave_filename: str) -> Tuple[np.ndarray, int]:
         """
         Args:
@@ -125,6 +196,18 @@ class ASRProvider(ASRProviderBase):
     ) -> Tuple[Optional[str], Optional[str]]:
         """语音转文本主处理逻辑"""
         file_path = None
+        if self.streaming:
+            start_time = time.time()
+            try:
+                text = await self.stream_speech_to_text(opus_data, session_id, audio_format)
+            except Exception as e:
+                logger.bind(tag=TAG).error(f"语音识别失败: {e}", exc_info=True)
+                return "", None
+            logger.bind(tag=TAG).debug(
+                f"流式识别收尾耗时: {time.time() - start_time:.3f}s | 结果: {text}"
+            )
+            return text, None
+
         try:
             # 保存音频文件
             start_time = time.time()
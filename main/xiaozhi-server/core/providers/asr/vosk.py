@@ -2,7 +2,7 @@ import os
 import json
 import time
 from typing import Optional, Tuple, List
-from .base import ASRProviderBase
+from .local_stream import LocalStreamASRProviderBase
 from config.logger import setup_logging
 from core.providers.asr.dto.dto import InterfaceType
 import vosk
@@ -10,13 +10,27 @@ import vosk
 TAG = __name__
 logger = setup_logging()
 
-class ASRProvider(ASRProviderBase):
+
+class _VoskStream:
+    """单个连接的识别器，VOSK识别器带有状态，不能在连接间共享"""
+
+    def __init__(self, model):
+        self.recognizer = vosk.KaldiRecognizer(model, 16000)
+        # 已经结束的分段文本
+        self.texts = []
+
+    def text(self, tail: str = "") -> str:
+        return " ".join(t for t in self.texts + [tail] if t)
+
+
+class ASRProvider(LocalStreamASRProviderBase):
     def __init__(self, config: dict, delete_audio_file: bool = True):
         super().__init__()
         self.interface_type = InterfaceType.LOCAL
         self.model_path = config.get("model_path")
         self.output_dir = config.get("output_dir", "tmp/")
         self.delete_audio_file = delete_audio_file
+        self.streaming = str(config.get("streaming", False)).lower() in ("true", "1")
         
         # 初始化VOSK模型
         self.model = None
@@ -43,11 +57,37 @@ class ASRProvider(ASRProviderBase):
             logger.bind(tag=TAG).error(f"加载VOSK模型失败: {e}")
             raise
 
+    def create_stream(self):
+        return _VoskStream(self.model)
+
+    def accept_pcm(self, stream: _VoskStream, pcm_data: bytes) -> Tuple[str, bool]:
+        is_endpoint = False
+        # VOSK推荐每次送入2000字节左右的数据
+        for i in range(0, len(pcm_data), 2000):
+            if stream.recognizer.AcceptWaveform(pcm_data[i:i + 2000]):
+                # 检测到一段话结束
+                stream.texts.append(json.loads(stream.recognizer.Result()).get("text", ""))
+                is_endpoint = True
+        if is_endpoint:
+            return stream.text(), True
+        partial = json.loads(stream.recognizer.PartialResult()).get("partial", "")
+        return stream.text(partial), False
+
+    def finish_stream(self, stream: _VoskStream) -> str:
+        return stream.text(json.loads(stream.recognizer.FinalResult()).get("text", ""))
+
     async def speech_to_text(
         self, audio_data: List[bytes], session_id: str, audio_format: str = "opus"
     ) -> Tuple[Optional[str], Optional[str]]:
         """将语音数据转换为文本"""
         file_path = None
+        if self.streaming and self.model:
+            try:
+                return await self.stream_speech_to_text(audio_data, session_id, audio_format), None
+            except Exception as e:
+                logger.bind(tag=TAG).error(f"VOSK语音识别失败: {e}")
+                return "", None
+
         try:
             # 检查模型是否加载成功
             if not self.model:
@@ -268,7 +268,7 @@ class ASRProvider(ASRProviderBase):
                 if hasattr(conn, "asr_audio_for_voiceprint"):
                     conn.asr_audio_for_voiceprint = []
                 if hasattr(conn, "asr_audio"):
-                    conn.asr_audio = []
+                    conn.asr_audio.clear()
 
     async def handle_voice_stop(self, conn, asr_audio_task: List[bytes]):
         """处理语音停止，发送最后一帧并处理识别结果"""
@@ -369,4 +369,4 @@ class ASRProvider(ASRProviderBase):
                 if hasattr(conn, "asr_audio_for_voiceprint"):
                     conn.asr_audio_for_voiceprint = []
                 if hasattr(conn, "asr_audio"):
-                    conn.asr_audio = []
+                    conn.asr_audio.clear()
@@ -1,6 +1,6 @@
 from typing import List, Dict
 from ..base import IntentProviderBase
-from plugins_func.functions.play_music import initialize_music_handler
+from plugins_func.functions.play_music import get_music_prompt_names
 from config.logger import setup_logging
 import re
 import json
@@ -158,8 +158,8 @@ class IntentProvider(IntentProviderBase):
 
             self.promot = self.get_intent_system_prompt(functions)
 
-        music_config = initialize_music_handler(conn)
-        music_file_names = music_config["music_file_names"]
+        # 只把与用户输入最相关的几首歌放进提示词，不再带上整个音乐库
+        music_file_names = get_music_prompt_names(conn, text)
         prompt_music = f"{self.promot}\n<musicNames>{music_file_names}\n</musicNames>"
 
         home_assistant_cfg = conn.config["plugins"].get("home_assistant")
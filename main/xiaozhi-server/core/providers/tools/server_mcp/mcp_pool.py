@@ -0,0 +1,309 @@
+"""
+服务端MCP服务池
+进程内每个配置的MCP服务只启动一次，所有连接共享同一个会话；会话按请求ID区分并发请求的响应，
+池在此之上按服务限制并发调用数，定时健康检查并重启崩溃的服务，
+设备连接时不再为每个连接重新读取配置、启动一组MCP子进程
+"""
+
+import os
+import json
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from mcp.types import LoggingMessageNotificationParams
+
+from config.config_loader import get_project_dir
+from config.logger import setup_logging
+from .mcp_client import ServerMCPClient
+
+TAG = __name__
+logger = setup_logging()
+
+# 单个MCP服务同时执行的工具调用上限，可在服务配置中用 max_concurrency 覆盖
+DEFAULT_MAX_CONCURRENCY = 8
+# 健康检查间隔（秒）
+HEALTH_CHECK_INTERVAL = 30
+# 健康检查ping超时（秒）
+PING_TIMEOUT = 10
+# 启动和关闭单个服务的超时（秒）
+START_TIMEOUT = 60
+STOP_TIMEOUT = 20
+
+
+class _ServerSlot:
+    """池中的一个MCP服务"""
+
+    def __init__(self, name: str, config: Dict[str, Any]):
+        self.name = name
+        self.config = config
+        self.client: Optional[ServerMCPClient] = None
+        self.semaphore = asyncio.Semaphore(
+            int(config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY))
+        )
+        # 重启时加锁，多个调用同时失败只重启一次
+        self.lock = asyncio.Lock()
+        # 每次重启加一，用于判断失败的客户端是否已被别人替换
+        self.generation = 0
+        # 最近一次启动成功时的工具名，重启期间仍能把调用路由到本服务
+        self.tool_names = set()
+
+    def is_connected(self) -> bool:
+        return self.client is not None and self.client.is_connected()
+
+    def has_tool(self, tool_name: str) -> bool:
+        return tool_name in self.tool_names
+
+    def get_tools(self) -> List[Dict[str, Any]]:
+        if not self.is_connected():
+            return []
+        return self.client.get_available_tools()
+
+
+class ServerMCPPool:
+    """进程级服务端MCP服务池"""
+
+    def __init__(self) -> None:
+        self.config_path = get_project_dir() + "data/.mcp_server_settings.json"
+        self.slots: Dict[str, _ServerSlot] = {}
+        self._config_mtime: Optional[float] = None
+        self._config_loaded = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+    def load_config(self) -> Dict[str, Any]:
+        """加载MCP服务配置"""
+        try:
+            with open(self.config_path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            return config.get("mcpServers", {})
+        except Exception as e:
+            logger.bind(tag=TAG).error(
+                f"Error loading MCP config from {self.config_path}: {e}"
+            )
+            return {}
+
+    def _config_changed(self) -> bool:
+        try:
+            mtime = os.path.getmtime(self.config_path)
+        except OSError:
+            mtime = None
+        changed = not self._config_loaded or mtime != self._config_mtime
+        self._config_mtime = mtime
+        self._config_loaded = True
+        return changed
+
+    async def start(self) -> None:
+        """
+        启动配置中的全部MCP服务，已启动的服务直接复用
+
+        每个连接初始化时调用；只有首次调用或配置文件变化后才会真正启动、停止服务
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._start_lock = asyncio.Lock()
+        if asyncio.get_running_loop() is not self._loop:
+            await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(self.start(), self._loop)
+            )
+            return
+
+        async with self._start_lock:
+            if self._config_changed():
+                await self._sync_config()
+            if self._health_task is None or self._health_task.done():
+                self._health_task = asyncio.create_task(self._health_check_loop())
+
+    async def _sync_config(self) -> None:
+        """按配置文件增删服务，配置有变化的服务重启"""
+        if self._config_mtime is None:
+            logger.bind(tag=TAG).warning(
+                "请检查mcp服务配置文件：data/.mcp_server_settings.json"
+            )
+            config = {}
+        else:
+            config = self.load_config()
+
+        for name in [name for name in self.slots if name not in config]:
+            await self._stop_slot(self.slots.pop(name))
+
+        starting = []
+        for name, srv_config in config.items():
+            if not srv_config.get("command") and not srv_config.get("url"):
+                logger.bind(tag=TAG).warning(
+                    f"Skipping server {name}: neither command nor url specified"
+                )
+                continue
+            slot = self.slots.get(name)
+            if slot is not None and slot.config == srv_config:
+                continue
+            if slot is not None:
+                await self._stop_slot(slot)
+            slot = _ServerSlot(name, srv_config)
+            self.slots[name] = slot
+            starting.append(self._restart_slot(slot, slot.generation))
+        # 各服务并行启动
+        await asyncio.gather(*starting)
+
+    async def _start_client(self, slot: _ServerSlot) -> None:
+        logger.bind(tag=TAG).info(f"初始化服务端MCP客户端: {slot.name}")
+        client = ServerMCPClient(slot.config)
+        try:
+            await asyncio.wait_for(
+                client.initialize(logging_callback=self.logging_callback),
+                timeout=START_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            await client.cleanup()
+            raise RuntimeError(f"启动超时({START_TIMEOUT}s)")
+        if not client.is_connected():
+            await client.cleanup()
+            raise RuntimeError("连接失败")
+        slot.client = client
+        slot.tool_names = set(client.tools_dict)
+
+    async def _stop_slot(self, slot: _ServerSlot) -> None:
+        client, slot.client = slot.client, None
+        if client is None:
+            return
+        try:
+            await asyncio.wait_for(client.cleanup(), timeout=STOP_TIMEOUT)
+            logger.bind(tag=TAG).info(f"服务端MCP客户端已关闭: {slot.name}")
+        except (asyncio.TimeoutError, Exception) as e:
+            logger.bind(tag=TAG).error(f"关闭服务端MCP客户端 {slot.name} 时出错: {e}")
+
+    async def _restart_slot(self, slot: _ServerSlot, generation: int) -> bool:
+        """
+        重启服务；generation 与当前不一致说明别的调用已经重启过，直接返回
+
+        Returns:
+            bool: 服务当前是否可用
+        """
+        async with slot.lock:
+            if slot.generation != generation:
+                return slot.is_connected()
+            slot.generation += 1
+            await self._stop_slot(slot)
+            try:
+                await self._start_client(slot)
+                return True
+            except Exception as e:
+                logger.bind(tag=TAG).error(
+                    f"Failed to initialize MCP server {slot.name}: {e}"
+                )
+                return False
+
+    async def _health_check_loop(self) -> None:
+        """定时检查各服务，进程退出或ping失败的服务自动重启"""
+        while True:
+            await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+            for slot in list(self.slots.values()):
+                if slot.lock.locked():
+                    continue
+                generation = slot.generation
+                if slot.is_connected():
+                    try:
+                        await asyncio.wait_for(
+                            slot.client.session.send_ping(), timeout=PING_TIMEOUT
+                        )
+                        continue
+                    except Exception as e:
+                        logger.bind(tag=TAG).warning(
+                            f"服务端MCP服务 {slot.name} 健康检查失败: {e}"
+                        )
+                logger.bind(tag=TAG).info(f"重启服务端MCP服务: {slot.name}")
+                if await self._restart_slot(slot, generation):
+                    logger.bind(tag=TAG).info(f"成功重新连接 MCP 客户端: {slot.name}")
+
+    def get_all_tools(self) -> List[Dict[str, Any]]:
+        """获取所有可用服务的工具function定义"""
+        tools = []
+        for slot in self.slots.values():
+            tools.extend(slot.get_tools())
+        return tools
+
+    def is_mcp_tool(self, tool_name: str) -> bool:
+        """检查是否是MCP工具"""
+        return any(slot.has_tool(tool_name) for slot in self.slots.values())
+
+    async def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """执行工具调用，失败时重启对应服务后重试"""
+        if self._loop is None:
+            raise ValueError(f"工具 {tool_name} 在任意MCP服务中未找到")
+        if asyncio.get_running_loop() is not self._loop:
+            # 信号量和重启锁都属于服务池所在的事件循环
+            return await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(
+                    self.execute_tool(tool_name, arguments), self._loop
+                )
+            )
+
+        slot = next(
+            (slot for slot in self.slots.values() if slot.has_tool(tool_name)), None
+        )
+        if slot is None:
+            raise ValueError(f"工具 {tool_name} 在任意MCP服务中未找到")
+
+        max_retries = 3  # 最大重试次数
+        retry_interval = 2  # 重试间隔(秒)
+        for attempt in range(max_retries):
+            if slot.lock.locked():
+                # 服务正在重启，等重启完成
+                async with slot.lock:
+                    pass
+            generation = slot.generation
+            try:
+                if not slot.is_connected():
+                    raise RuntimeError(f"MCP服务 {slot.name} 未连接")
+                async with slot.semaphore:
+                    return await slot.client.call_tool(
+                        tool_name, arguments, progress_callback=self.progress_callback
+                    )
+            except Exception as e:
+                # 最后一次尝试失败时直接抛出异常
+                if attempt == max_retries - 1:
+                    raise
+
+                logger.bind(tag=TAG).warning(
+                    f"执行工具 {tool_name} 失败 (尝试 {attempt+1}/{max_retries}): {e}"
+                )
+                logger.bind(tag=TAG).info(
+                    f"重试前尝试重新连接 MCP 客户端 {slot.name}"
+                )
+                if await self._restart_slot(slot, generation):
+                    logger.bind(tag=TAG).info(f"成功重新连接 MCP 客户端: {slot.name}")
+
+                # 等待一段时间再重试
+                await asyncio.sleep(retry_interval)
+
+    async def shutdown(self) -> None:
+        """关闭全部MCP服务，进程退出时调用"""
+        if self._loop is None:
+            return
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for slot in list(self.slots.values()):
+            await self._stop_slot(slot)
+        self.slots.clear()
+        self._config_loaded = False
+
+    # 可选回调方法
+
+    async def logging_callback(self, params: LoggingMessageNotificationParams):
+        logger.bind(tag=TAG).info(f"[Server Log - {params.level.upper()}] {params.data}")
+
+    async def progress_callback(self, progress: float, total: float | None, message: str | None) -> None:
+        logger.bind(tag=TAG).info(f"[Progress {progress}/{total}]: {message}")
+
+
+# 全局单例
+_server_mcp_pool = None
+
+
+def get_server_mcp_pool() -> ServerMCPPool:
+    """获取全局服务端MCP服务池（单例模式）"""
+    global _server_mcp_pool
+    if _server_mcp_pool is None:
+        _server_mcp_pool = ServerMCPPool()
+    return _server_mcp_pool
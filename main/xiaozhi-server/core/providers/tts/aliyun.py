@@ -3,9 +3,11 @@ import json
 import hmac
 import hashlib
 import base64
+import asyncio
 import requests
 from datetime import datetime
 from core.providers.tts.base import TTSProviderBase
+from core.providers.tts.runtime import http_session
 from config.logger import setup_logging
 import time
 import uuid
@@ -84,6 +86,8 @@ class AccessToken:
 
 
 class TTSProvider(TTSProviderBase):
+    tts_cacheable = True
+
 
     def __init__(self, config, delete_audio_file):
         super().__init__(config, delete_audio_file)
@@ -163,10 +167,22 @@ class TTSProvider(TTSProviderBase):
         #              f"剩余 {remaining:.2f}秒")
         return time.time() > self.expire_time
 
+    async def _post(self, request_json):
+        async with http_session() as session:
+            async with session.post(
+                self.api_url, data=json.dumps(request_json), headers=self.header
+            ) as resp:
+                return (
+                    resp.status,
+                    resp.headers.get("Content-Type", ""),
+                    await resp.read(),
+                )
+
     async def text_to_speak(self, text, output_file):
         if self._is_token_expired():
             logger.warning("Token已过期，正在自动刷新...")
-            self._refresh_token()
+            # 获取Token是同步请求，放到线程中执行，避免阻塞事件循环
+            await asyncio.to_thread(self._refresh_token)
         request_json = {
             "appkey": self.appkey,
             "token": self.token,
@@ -181,25 +197,22 @@ class TTSProvider(TTSProviderBase):
 
         # print(self.api_url, json.dumps(request_json, ensure_ascii=False))
         try:
-            resp = requests.post(
-                self.api_url, json.dumps(request_json), headers=self.header
-            )
-            if resp.status_code == 401:  # Token过期特殊处理
-                self._refresh_token()
-                resp = requests.post(
-                    self.api_url, json.dumps(request_json), headers=self.header
-                )
+            status_code, content_type, content = await self._post(request_json)
+            if status_code == 401:  # Token过期特殊处理
+                await asyncio.to_thread(self._refresh_token)
+                request_json["token"] = self.token
+                status_code, content_type, content = await self._post(request_json)
             # 检查返回请求数据的mime类型是否是audio/***，是则保存到指定路径下；返回的是binary格式的
-            if resp.headers["Content-Type"].startswith("audio/"):
+            if content_type.startswith("audio/"):
                 if output_file:
                     with open(output_file, "wb") as f:
-                        f.write(resp.content)
+                        f.write(content)
                     return output_file
                 else:
-                    return resp.content
+                    return content
             else:
                 raise Exception(
-                    f"{__name__} status_code: {resp.status_code} response: {resp.content}"
+                    f"{__name__} status_code: {status_code} response: {content}"
                 )
         except Exception as e:
             raise Exception(f"{__name__} error: {e}")
@@ -6,6 +6,8 @@ import queue
 import asyncio
 import threading
 import traceback
+from collections import deque
+from concurrent.futures import Future
 from core.utils import p3
 from datetime import datetime
 from core.utils import textUtils
@@ -13,7 +15,11 @@ from typing import Callable, Any
 from abc import ABC, abstractmethod
 from config.logger import setup_logging
 from core.utils.tts import MarkdownCleaner
+from core.providers.tts.runtime import get_tts_runtime
+from core.utils.cache.tts_cache import TTSAudioCache, get_tts_audio_cache
+from core.utils.music_frame_store import get_music_frame_store
 from core.utils.output_counter import add_device_output
+from core.utils.connection_runtime import LoopQueue
 from core.handle.reportHandle import enqueue_tts_report
 from core.handle.sendAudioHandle import sendAudioMessage
 from core.utils.util import audio_bytes_to_data_stream, audio_to_data_stream
@@ -29,14 +35,22 @@ logger = setup_logging()
 
 
 class TTSProviderBase(ABC):
+    # 合成结果完全由服务配置决定的子类设为True，按整份配置的指纹区分缓存；
+    # 未声明的服务（音色等来自配置以外的状态）不使用TTS音频缓存
+    tts_cacheable = False
+
     def __init__(self, config, delete_audio_file):
         self.interface_type = InterfaceType.NON_STREAM
+        self.tts_cache_identity = (
+            TTSAudioCache.config_identity(config) if self.tts_cacheable else None
+        )
         self.conn = None
         self.delete_audio_file = delete_audio_file
         self.audio_file_type = "wav"
         self.output_file = config.get("output_dir", "tmp/")
         self.tts_text_queue = queue.Queue()
-        self.tts_audio_queue = queue.Queue()
+        # 由TTS线程投递、在事件循环上消费
+        self.tts_audio_queue = LoopQueue()
         self.tts_audio_first_sentence = True
         self.before_stop_play_files = []
 
@@ -69,6 +83,13 @@ class TTSProviderBase(ABC):
         self.processed_chars = 0
         self.is_first_sentence = True
 
+        # 非流式合成时最多同时合成的句子数，合成结果仍按句子顺序播放
+        max_parallel_synthesis = config.get("max_parallel_synthesis", 3)
+        self.max_parallel_synthesis = (
+            max(1, int(max_parallel_synthesis)) if max_parallel_synthesis else 3
+        )
+        self.tts_pending_segments = deque()
+
     def generate_filename(self, extension=".wav"):
         return os.path.join(
             self.output_file,
@@ -82,129 +103,185 @@ class TTSProviderBase(ABC):
     def handle_audio_file(self, file_audio: bytes, text):
         self.before_stop_play_files.append((file_audio, text))
 
-    def to_tts_stream(self, text, opus_handler: Callable[[bytes], None] = None) -> None:
-        text = MarkdownCleaner.clean_markdown(text)
-        max_repeat_time = 5
-        if self.delete_audio_file:
-            # 需要删除文件的直接转为音频数据
-            while max_repeat_time > 0:
-                try:
-                    audio_bytes = asyncio.run(self.text_to_speak(text, None))
-                    if audio_bytes:
-                        self.tts_audio_queue.put((SentenceType.FIRST, None, text))
-                        audio_bytes_to_data_stream(
-                            audio_bytes,
-                            file_type=self.audio_file_type,
-                            is_opus=True,
-                            callback=opus_handler,
-                        )
-                        break
-                    else:
-                        max_repeat_time -= 1
-                except Exception as e:
-                    logger.bind(tag=TAG).warning(
-                        f"语音生成失败{5 - max_repeat_time + 1}次: {text}，错误: {e}"
-                    )
-                    max_repeat_time -= 1
-            if max_repeat_time > 0:
-                logger.bind(tag=TAG).info(
-                    f"语音生成成功: {text}，重试{5 - max_repeat_time}次"
-                )
-            else:
-                logger.bind(tag=TAG).error(
-                    f"语音生成失败: {text}，请检查网络或服务是否正常"
-                )
-            return None
-        else:
-            tmp_file = self.generate_filename()
-            try:
-                while not os.path.exists(tmp_file) and max_repeat_time > 0:
-                    try:
-                        asyncio.run(self.text_to_speak(text, tmp_file))
-                    except Exception as e:
-                        logger.bind(tag=TAG).warning(
-                            f"语音生成失败{5 - max_repeat_time + 1}次: {text}，错误: {e}"
-                        )
-                        # 未执行成功，删除文件
-                        if os.path.exists(tmp_file):
-                            os.remove(tmp_file)
-                        max_repeat_time -= 1
+    async def _text_to_speak_with_retry(self, text, output_file, max_repeat_time=5):
+        """带重试的语音合成，运行在TTS运行时的事件循环上
 
-                if max_repeat_time > 0:
+        Returns:
+            output_file为空时返回音频数据，否则返回生成的文件路径；全部失败返回None
+        """
+        for attempt in range(1, max_repeat_time + 1):
+            try:
+                audio_bytes = await self.text_to_speak(text, output_file)
+                if output_file is None and audio_bytes:
                     logger.bind(tag=TAG).info(
-                        f"语音生成成功: {text}:{tmp_file}，重试{5 - max_repeat_time}次"
+                        f"语音生成成功: {text}，重试{attempt - 1}次"
                     )
-                else:
-                    logger.bind(tag=TAG).error(
-                        f"语音生成失败: {text}，请检查网络或服务是否正常"
+                    return audio_bytes
+                if output_file is not None and os.path.exists(output_file):
+                    logger.bind(tag=TAG).info(
+                        f"语音生成成功: {text}:{output_file}，重试{attempt - 1}次"
                     )
-                    self.tts_audio_queue.put((SentenceType.FIRST, None, text))
-                self._process_audio_file_stream(tmp_file, callback=opus_handler)
+                    return output_file
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.bind(tag=TAG).error(f"Failed to generate TTS file: {e}")
-                return None
-    
-    def to_tts(self, text):
-        text = MarkdownCleaner.clean_markdown(text)
-        max_repeat_time = 5
-        if self.delete_audio_file:
-            # 需要删除文件的直接转为音频数据
-            while max_repeat_time > 0:
-                try:
-                    audio_bytes = asyncio.run(self.text_to_speak(text, None))
-                    if audio_bytes:
-                        audio_datas = []
-                        audio_bytes_to_data_stream(
-                            audio_bytes,
-                            file_type=self.audio_file_type,
-                            is_opus=True,
-                            callback=lambda data: audio_datas.append(data)
-                        )
-                        return audio_datas
-                    else:
-                        max_repeat_time -= 1
-                except Exception as e:
-                    logger.bind(tag=TAG).warning(
-                        f"语音生成失败{5 - max_repeat_time + 1}次: {text}，错误: {e}"
-                    )
-                    max_repeat_time -= 1
-            if max_repeat_time > 0:
-                logger.bind(tag=TAG).info(
-                    f"语音生成成功: {text}，重试{5 - max_repeat_time}次"
+                logger.bind(tag=TAG).warning(
+                    f"语音生成失败{attempt}次: {text}，错误: {e}"
                 )
+                # 未执行成功，删除文件
+                if output_file and os.path.exists(output_file):
+                    os.remove(output_file)
+        logger.bind(tag=TAG).error(f"语音生成失败: {text}，请检查网络或服务是否正常")
+        return None
+
+    def _tts_cache_key(self, text, audio_format):
+        """生成TTS缓存键，同一服务、同一份配置和格式下相同文本的合成结果可以复用"""
+        return get_tts_audio_cache().make_key(
+            type(self).__module__,
+            self.tts_cache_identity,
+            audio_format,
+            text,
+        )
+
+    def _output_audio_format(self):
+        """合成结果转换后的音频帧格式，直接返回音频数据时固定编码为opus"""
+        if self.delete_audio_file or self.conn is None:
+            return "opus"
+        return getattr(self.conn, "audio_format", "opus")
+
+    def _synthesize(self, text, audio_format=None):
+        """提交一句话的合成任务，不等待结果；命中缓存时返回已完成的Future，结果为音频帧列表
+
+        Returns:
+            (future, output_file, cache_key): 合成结果的Future、输出文件路径（直接返回音频数据时为None）
+            和合成完成后写入缓存使用的键（命中缓存或不缓存时为None）
+        """
+        cache_key = self._tts_cache_key(
+            text, audio_format or self._output_audio_format()
+        )
+        cached_frames = get_tts_audio_cache().get(cache_key)
+        if cached_frames is not None:
+            future = Future()
+            future.set_result(cached_frames)
+            return future, None, None
+
+        output_file = None if self.delete_audio_file else self.generate_filename()
+        future = get_tts_runtime().submit(
+            self._text_to_speak_with_retry(text, output_file)
+        )
+        return future, output_file, cache_key
+
+    def _emit_tts_result(self, text, result, output_file, opus_handler, cache_key=None):
+        """把合成结果转为音频帧推送给播放队列，成功后写入缓存"""
+        try:
+            if isinstance(result, list):
+                # 命中缓存，直接推送音频帧
+                self.tts_audio_queue.put((SentenceType.FIRST, None, text))
+                if opus_handler:
+                    for frame in result:
+                        opus_handler(frame)
+                return
+
+            frames = []
+
+            def handler(data):
+                frames.append(data)
+                if opus_handler:
+                    opus_handler(data)
+
+            if output_file is None:
+                # 需要删除文件的直接转为音频数据
+                if result:
+                    self.tts_audio_queue.put((SentenceType.FIRST, None, text))
+                    audio_bytes_to_data_stream(
+                        result,
+                        file_type=self.audio_file_type,
+                        is_opus=True,
+                        callback=handler,
+                    )
+            elif result is None:
+                self.tts_audio_queue.put((SentenceType.FIRST, None, text))
             else:
-                logger.bind(tag=TAG).error(
-                    f"语音生成失败: {text}，请检查网络或服务是否正常"
-                )
+                self._process_audio_file_stream(output_file, callback=handler)
+
+            get_tts_audio_cache().put(cache_key, frames)
+        except Exception as e:
+            logger.bind(tag=TAG).error(f"Failed to generate TTS file: {e}")
+
+    def to_tts_stream(self, text, opus_handler: Callable[[bytes], None] = None) -> None:
+        text = MarkdownCleaner.clean_markdown(text)
+        future, output_file, cache_key = self._synthesize(text)
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.bind(tag=TAG).error(f"Failed to generate TTS file: {e}")
             return None
-        else:
-            tmp_file = self.generate_filename()
-            try:
-                while not os.path.exists(tmp_file) and max_repeat_time > 0:
-                    try:
-                        asyncio.run(self.text_to_speak(text, tmp_file))
-                    except Exception as e:
-                        logger.bind(tag=TAG).warning(
-                            f"语音生成失败{5 - max_repeat_time + 1}次: {text}，错误: {e}"
-                        )
-                        # 未执行成功，删除文件
-                        if os.path.exists(tmp_file):
-                            os.remove(tmp_file)
-                        max_repeat_time -= 1
+        self._emit_tts_result(text, result, output_file, opus_handler, cache_key)
+        return None
 
-                if max_repeat_time > 0:
-                    logger.bind(tag=TAG).info(
-                        f"语音生成成功: {text}:{tmp_file}，重试{5 - max_repeat_time}次"
-                    )
-                else:
-                    logger.bind(tag=TAG).error(
-                        f"语音生成失败: {text}，请检查网络或服务是否正常"
-                    )
+    def to_tts(self, text):
+        text = MarkdownCleaner.clean_markdown(text)
+        future, output_file, cache_key = self._synthesize(text, audio_format="opus")
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.bind(tag=TAG).error(f"Failed to generate TTS file: {e}")
+            return None
+        if isinstance(result, list):
+            return list(result)
+        if output_file is not None:
+            return output_file
+        if not result:
+            return None
+        audio_datas = []
+        audio_bytes_to_data_stream(
+            result,
+            file_type=self.audio_file_type,
+            is_opus=True,
+            callback=lambda data: audio_datas.append(data),
+        )
+        get_tts_audio_cache().put(cache_key, audio_datas)
+        return audio_datas
 
-                return tmp_file
-            except Exception as e:
-                logger.bind(tag=TAG).error(f"Failed to generate TTS file: {e}")
-                return None
+    def _submit_tts_segment(self, text, opus_handler: Callable[[bytes], None] = None):
+        """提交一句话并行合成，结果按提交顺序播放"""
+        text = MarkdownCleaner.clean_markdown(text)
+        # 并行合成的句子数达到上限时，先播放最早的一句
+        while len(self.tts_pending_segments) >= self.max_parallel_synthesis:
+            self._emit_next_tts_segment(opus_handler)
+        future, output_file, cache_key = self._synthesize(text)
+        self.tts_pending_segments.append((text, future, output_file, cache_key))
+
+    def _emit_next_tts_segment(self, opus_handler: Callable[[bytes], None] = None):
+        """等待最早提交的一句合成完成并播放"""
+        text, future, output_file, cache_key = self.tts_pending_segments.popleft()
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.bind(tag=TAG).error(f"Failed to generate TTS file: {e}")
+            return
+        if self.conn.client_abort:
+            return
+        self._emit_tts_result(text, result, output_file, opus_handler, cache_key)
+
+    def _flush_tts_segments(
+        self, opus_handler: Callable[[bytes], None] = None, wait=True
+    ):
+        """按顺序播放已提交的句子
+
+        Args:
+            wait: 为False时只播放已经合成完成的句子，遇到未完成的立即返回
+        """
+        while self.tts_pending_segments:
+            if not wait and not self.tts_pending_segments[0][1].done():
+                return
+            self._emit_next_tts_segment(opus_handler)
+
+    def _cancel_tts_segments(self):
+        """打断或开始新一轮对话时，丢弃尚未播放的句子"""
+        while self.tts_pending_segments:
+            _, future, _, _ = self.tts_pending_segments.popleft()
+            future.cancel()
 
     @abstractmethod
     async def text_to_speak(self, text, output_file):
@@ -258,25 +335,30 @@ class TTSProviderBase(ABC):
         )
         self.tts_priority_thread.start()
 
-        # 音频播放 消化线程
-        self.audio_play_priority_thread = threading.Thread(
-            target=self._audio_play_priority_thread, daemon=True
+        # 音频播放 消化任务，只是把音频按顺序交给事件循环发送，不需要单独的线程
+        self.audio_play_priority_task = conn.spawn_task(
+            self._audio_play_priority_task()
         )
-        self.audio_play_priority_thread.start()
 
     # 这里默认是非流式的处理方式
     # 流式处理方式请在子类中重写
     def tts_text_priority_thread(self):
         while not self.conn.stop_event.is_set():
             try:
-                message = self.tts_text_queue.get(timeout=1)
+                # 先播放已经合成完成的句子
+                self._flush_tts_segments(opus_handler=self.handle_opus, wait=False)
+                message = self.tts_text_queue.get(
+                    timeout=0.05 if self.tts_pending_segments else 1
+                )
                 if message.sentence_type == SentenceType.FIRST:
                     self.conn.client_abort = False
                 if self.conn.client_abort:
+                    self._cancel_tts_segments()
                     logger.bind(tag=TAG).info("收到打断信息，终止TTS文本处理线程")
                     continue
                 if message.sentence_type == SentenceType.FIRST:
                     # 初始化参数
+                    self._cancel_tts_segments()
                     self.tts_stop_request = False
                     self.processed_chars = 0
                     self.tts_text_buff = []
@@ -286,7 +368,9 @@ class TTSProviderBase(ABC):
                     self.tts_text_buff.append(message.content_detail)
                     segment_text = self._get_segment_text()
                     if segment_text:
-                        self.to_tts_stream(segment_text, opus_handler=self.handle_opus)
+                        self._submit_tts_segment(
+                            segment_text, opus_handler=self.handle_opus
+                        )
                 elif ContentType.FILE == message.content_type:
                     self._process_remaining_text_stream(opus_handler=self.handle_opus)
                     tts_file = message.content_file
@@ -308,21 +392,14 @@ class TTSProviderBase(ABC):
                 )
                 continue
 
-    def _audio_play_priority_thread(self):
+    async def _audio_play_priority_task(self):
         # 需要上报的文本和音频列表
         enqueue_text = None
         enqueue_audio = None
         while not self.conn.stop_event.is_set():
             text = None
             try:
-                try:
-                    sentence_type, audio_datas, text = self.tts_audio_queue.get(
-                        timeout=0.1
-                    )
-                except queue.Empty:
-                    if self.conn.stop_event.is_set():
-                        break
-                    continue
+                sentence_type, audio_datas, text = await self.tts_audio_queue.get()
 
                 if self.conn.client_abort:
                     logger.bind(tag=TAG).debug("收到打断信号，跳过当前音频数据")
@@ -342,18 +419,16 @@ class TTSProviderBase(ABC):
                     enqueue_audio.append(audio_datas)
 
                 # 发送音频
-                future = asyncio.run_coroutine_threadsafe(
-                    sendAudioMessage(self.conn, sentence_type, audio_datas, text),
-                    self.conn.loop,
-                )
-                future.result()
+                await sendAudioMessage(self.conn, sentence_type, audio_datas, text)
 
                 # 记录输出和报告
                 if self.conn.max_output_size > 0 and text:
                     add_device_output(self.conn.headers.get("device-id"), len(text))
 
+            except asyncio.CancelledError:
+                break
             except Exception as e:
-                logger.bind(tag=TAG).error(f"audio_play_priority_thread: {text} {e}")
+                logger.bind(tag=TAG).error(f"audio_play_priority_task: {text} {e}")
 
     async def start_session(self, session_id):
         pass
@@ -414,8 +489,16 @@ class TTSProviderBase(ABC):
             tts_file: 音频文件路径
             callback: 文件处理函数
         """
+        music_store = get_music_frame_store()
         if tts_file.endswith(".p3"):
             p3.decode_opus_from_file_stream(tts_file, callback=callback)
+        elif (
+            music_store is not None
+            and self.conn.audio_format != "pcm"
+            and music_store.stream_frames(tts_file, callback)
+        ):
+            # 音乐帧库中已有转码好的Opus帧，直接发送
+            pass
         elif self.conn.audio_format == "pcm":
             self.audio_to_pcm_data_stream(tts_file, callback=callback)
         else:
@@ -438,17 +521,19 @@ class TTSProviderBase(ABC):
     def _process_remaining_text_stream(
         self, opus_handler: Callable[[bytes], None] = None
     ):
-        """处理剩余的文本并生成语音
+        """处理剩余的文本并生成语音，返回前播放完所有已提交的句子
 
         Returns:
             bool: 是否成功处理了文本
         """
+        processed = False
         full_text = "".join(self.tts_text_buff)
         remaining_text = full_text[self.processed_chars :]
         if remaining_text:
             segment_text = textUtils.get_string_no_punctuation_or_emoji(remaining_text)
             if segment_text:
-                self.to_tts_stream(segment_text, opus_handler=opus_handler)
+                self._submit_tts_segment(segment_text, opus_handler=opus_handler)
                 self.processed_chars += len(full_text)
-                return True
-        return False
+                processed = True
+        self._flush_tts_segments(opus_handler=opus_handler)
+        return processed
@@ -1,8 +1,10 @@
-import requests
+from core.providers.tts.runtime import http_session
 from core.providers.tts.base import TTSProviderBase
 
 
 class TTSProvider(TTSProviderBase):
+    tts_cacheable = True
+
     def __init__(self, config, delete_audio_file):
         super().__init__(config, delete_audio_file)
         self.model = config.get("model")
@@ -29,10 +31,11 @@ class TTSProvider(TTSProviderBase):
         }
 
         try:
-            response = requests.request(
-                "POST", self.api_url, json=request_json, headers=headers
-            )
-            data = response.content
+            async with http_session() as session:
+                async with session.post(
+                    self.api_url, json=request_json, headers=headers
+                ) as response:
+                    data = await response.read()
             if output_file:
                 with open(output_file, "wb") as file_to_save:
                     file_to_save.write(data)
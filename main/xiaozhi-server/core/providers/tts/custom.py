@@ -1,7 +1,7 @@
 import os
 import json
 import uuid
-import requests
+from core.providers.tts.runtime import http_session, to_query_params
 from config.logger import setup_logging
 from datetime import datetime
 from core.providers.tts.base import TTSProviderBase
@@ -10,6 +10,8 @@ TAG = __name__
 logger = setup_logging()
 
 class TTSProvider(TTSProviderBase):
+    tts_cacheable = True
+
     def __init__(self, config, delete_audio_file):
         super().__init__(config, delete_audio_file)
         self.url = config.get("url")
@@ -38,17 +40,27 @@ class TTSProvider(TTSProviderBase):
                 v = v.replace("{prompt_text}", text)
             request_params[k] = v
 
-        if self.method.upper() == "POST":
-            resp = requests.post(self.url, json=request_params, headers=self.headers)
-        else:
-            resp = requests.get(self.url, params=request_params, headers=self.headers)
-        if resp.status_code == 200:
+        async with http_session() as session:
+            if self.method.upper() == "POST":
+                request = session.post(
+                    self.url, json=request_params, headers=self.headers
+                )
+            else:
+                request = session.get(
+                    self.url,
+                    params=to_query_params(request_params),
+                    headers=self.headers,
+                )
+            async with request as resp:
+                status_code = resp.status
+                content = await resp.read()
+        if status_code == 200:
             if output_file:
                 with open(output_file, "wb") as file:
-                    file.write(resp.content)
+                    file.write(content)
             else:
-                return resp.content
+                return content
         else:
-            error_msg = f"Custom TTS请求失败: {resp.status_code} - {resp.text}"
+            error_msg = f"Custom TTS请求失败: {status_code} - {content.decode(errors='ignore')}"
             logger.bind(tag=TAG).error(error_msg)
             raise Exception(error_msg)  # 抛出异常，让调用方捕获
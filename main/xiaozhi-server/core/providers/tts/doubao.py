@@ -1,7 +1,7 @@
 import uuid
 import json
 import base64
-import requests
+from core.providers.tts.runtime import http_session
 from core.utils.util import check_model_key
 from core.providers.tts.base import TTSProviderBase
 from config.logger import setup_logging
@@ -11,6 +11,8 @@ logger = setup_logging()
 
 
 class TTSProvider(TTSProviderBase):
+    tts_cacheable = True
+
     def __init__(self, config, delete_audio_file):
         super().__init__(config, delete_audio_file)
         if config.get("appid"):
@@ -67,11 +69,15 @@ class TTSProvider(TTSProviderBase):
         }
 
         try:
-            resp = requests.post(
-                self.api_url, json.dumps(request_json), headers=self.header
-            )
-            if "data" in resp.json():
-                data = resp.json()["data"]
+            async with http_session() as session:
+                async with session.post(
+                    self.api_url, data=json.dumps(request_json), headers=self.header
+                ) as resp:
+                    status_code = resp.status
+                    content = await resp.read()
+            resp_json = json.loads(content)
+            if "data" in resp_json:
+                data = resp_json["data"]
                 audio_bytes = base64.b64decode(data)
                 if output_file:
                     with open(output_file, "wb") as file_to_save:
@@ -80,7 +86,7 @@ class TTSProvider(TTSProviderBase):
                     return audio_bytes
             else:
                 raise Exception(
-                    f"{__name__} status_code: {resp.status_code} response: {resp.content}"
+                    f"{__name__} status_code: {status_code} response: {content}"
                 )
         except Exception as e:
             raise Exception(f"{__name__} error: {e}")
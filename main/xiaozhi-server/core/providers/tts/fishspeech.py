@@ -1,5 +1,5 @@
 import base64
-import requests
+from core.providers.tts.runtime import http_session
 import ormsgpack
 from pathlib import Path
 from pydantic import BaseModel, Field, conint, model_validator
@@ -78,6 +78,8 @@ def read_ref_text(ref_text):
 
 
 class TTSProvider(TTSProviderBase):
+    tts_cacheable = True
+
 
     def __init__(self, config, delete_audio_file):
         super().__init__(config, delete_audio_file)
@@ -161,19 +163,22 @@ class TTSProvider(TTSProviderBase):
 
         pydantic_data = ServeTTSRequest(**data)
 
-        response = requests.post(
-            self.api_url,
-            data=ormsgpack.packb(
-                pydantic_data, option=ormsgpack.OPT_SERIALIZE_PYDANTIC
-            ),
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/msgpack",
-            },
-        )
-
-        if response.status_code == 200:
-            audio_content = response.content
+        async with http_session() as session:
+            async with session.post(
+                self.api_url,
+                data=ormsgpack.packb(
+                    pydantic_data, option=ormsgpack.OPT_SERIALIZE_PYDANTIC
+                ),
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/msgpack",
+                },
+            ) as response:
+                status_code = response.status
+                content = await response.read()
+
+        if status_code == 200:
+            audio_content = content
 
             if output_file:
                 with open(output_file, "wb") as audio_file:
@@ -182,7 +187,7 @@ class TTSProvider(TTSProviderBase):
                 return audio_content
 
         else:
-            error_msg = f"Request failed with status code {response.status_code}"
+            error_msg = f"Request failed with status code {status_code}"
             print(error_msg)
-            print(response.json())
+            print(content.decode(errors="ignore"))
             raise Exception(error_msg)
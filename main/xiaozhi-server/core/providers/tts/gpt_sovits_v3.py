@@ -1,4 +1,4 @@
-import requests
+from core.providers.tts.runtime import http_session, to_query_params
 from config.logger import setup_logging
 from core.providers.tts.base import TTSProviderBase
 from core.utils.util import parse_string_to_list
@@ -8,6 +8,8 @@ logger = setup_logging()
 
 
 class TTSProvider(TTSProviderBase):
+    tts_cacheable = True
+
     def __init__(self, config, delete_audio_file):
         super().__init__(config, delete_audio_file)
         self.url = config.get("url")
@@ -51,14 +53,19 @@ class TTSProvider(TTSProviderBase):
             "if_sr": self.if_sr,
         }
 
-        resp = requests.get(self.url, params=request_params)
-        if resp.status_code == 200:
+        async with http_session() as session:
+            async with session.get(
+                self.url, params=to_query_params(request_params)
+            ) as resp:
+                status_code = resp.status
+                content = await resp.read()
+        if status_code == 200:
             if output_file:
                 with open(output_file, "wb") as file:
-                    file.write(resp.content)
+                    file.write(content)
             else:
-                return resp.content
+                return content
         else:
-            error_msg = f"GPT_SoVITS_V3 TTS请求失败: {resp.status_code} - {resp.text}"
+            error_msg = f"GPT_SoVITS_V3 TTS请求失败: {status_code} - {content.decode(errors='ignore')}"
             logger.bind(tag=TAG).error(error_msg)
             raise Exception(error_msg)
@@ -1,4 +1,4 @@
-import requests
+from core.providers.tts.runtime import http_session
 from core.utils.util import check_model_key
 from core.providers.tts.base import TTSProviderBase
 from config.logger import setup_logging
@@ -8,6 +8,8 @@ logger = setup_logging()
 
 
 class TTSProvider(TTSProviderBase):
+    tts_cacheable = True
+
     def __init__(self, config, delete_audio_file):
         super().__init__(config, delete_audio_file)
         self.api_key = config.get("api_key")
@@ -41,14 +43,17 @@ class TTSProvider(TTSProviderBase):
             "response_format": "wav",
             "speed": self.speed,
         }
-        response = requests.post(self.api_url, json=data, headers=headers)
-        if response.status_code == 200:
-            if output_file:
-                with open(output_file, "wb") as audio_file:
-                    audio_file.write(response.content)
-            else:
-                return response.content
+        async with http_session() as session:
+            async with session.post(
+                self.api_url, json=data, headers=headers
+            ) as response:
+                if response.status != 200:
+                    raise Exception(
+                        f"OpenAI TTS请求失败: {response.status} - {await response.text()}"
+                    )
+                content = await response.read()
+        if output_file:
+            with open(output_file, "wb") as audio_file:
+                audio_file.write(content)
         else:
-            raise Exception(
-                f"OpenAI TTS请求失败: {response.status_code} - {response.text}"
-            )
+            return content
@@ -0,0 +1,128 @@
+"""
+TTS异步运行时
+所有连接的TTS合成协程都提交到同一个常驻事件循环上执行，
+避免每句话在工作线程里 asyncio.run 新建事件循环和HTTP连接；
+循环内共享一个带连接池的 aiohttp 会话，请求之间复用TCP/TLS连接
+"""
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+import aiohttp
+from config.logger import setup_logging
+
+TAG = __name__
+logger = setup_logging()
+
+# 共享会话的连接上限（所有TTS服务合计）和单个主机的连接上限
+DEFAULT_CONNECTION_LIMIT = 100
+DEFAULT_CONNECTION_LIMIT_PER_HOST = 32
+DEFAULT_TIMEOUT = 30
+
+
+class TTSAsyncRuntime:
+    """在后台线程中运行的常驻事件循环"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        self._session = None
+        self._thread = threading.Thread(
+            target=self._run, name="tts-async-runtime", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """
+        从任意线程提交协程
+
+        Returns:
+            concurrent.futures.Future: 协程的执行结果
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def in_runtime(self):
+        """当前是否运行在该运行时的事件循环上"""
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """获取共享的HTTP会话，只能在运行时的事件循环内调用"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=DEFAULT_CONNECTION_LIMIT,
+                limit_per_host=DEFAULT_CONNECTION_LIMIT_PER_HOST,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def _close_session(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def stop(self):
+        """关闭共享会话并停止事件循环"""
+        try:
+            self.submit(self._close_session()).result(timeout=5)
+        except Exception as e:
+            logger.bind(tag=TAG).warning(f"关闭TTS共享会话失败: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def get_tts_runtime() -> TTSAsyncRuntime:
+    """获取进程内唯一的TTS运行时，首次调用时创建"""
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = TTSAsyncRuntime()
+    return _runtime
+
+
+@asynccontextmanager
+async def http_session():
+    """
+    获取用于TTS请求的HTTP会话
+    在运行时的事件循环内返回共享会话；在其他事件循环中（如性能测试直接调用
+    text_to_speak）临时创建一个会话，用完即关闭
+    """
+    runtime = _runtime
+    if runtime is not None and runtime.in_runtime():
+        yield await runtime.get_session()
+        return
+    async with aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT)
+    ) as session:
+        yield session
+
+
+def to_query_params(params):
+    """
+    按 requests 的规则把字典转换为查询参数：忽略None，列表展开为同名多值，
+    其他值转为字符串（aiohttp不接受布尔值作为参数）
+    """
+    query = []
+    for key, value in params.items():
+        if value is None:
+            continue
+        values = value if isinstance(value, (list, tuple)) else [value]
+        for item in values:
+            if item is not None:
+                query.append((key, str(item)))
+    return query
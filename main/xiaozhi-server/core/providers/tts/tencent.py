@@ -4,12 +4,14 @@ import time
 import uuid
 import json
 import base64
-import requests
+from core.providers.tts.runtime import http_session
 from datetime import datetime, timezone
 from core.providers.tts.base import TTSProviderBase
 
 
 class TTSProvider(TTSProviderBase):
+    tts_cacheable = True
+
     def __init__(self, config, delete_audio_file):
         super().__init__(config, delete_audio_file)
         self.appid = config.get("appid")
@@ -134,13 +136,16 @@ class TTSProvider(TTSProviderBase):
             headers = self._get_auth_headers(request_json)
 
             # 发送请求
-            resp = requests.post(
-                self.api_url, json.dumps(request_json), headers=headers
-            )
+            async with http_session() as session:
+                async with session.post(
+                    self.api_url, data=json.dumps(request_json), headers=headers
+                ) as resp:
+                    status_code = resp.status
+                    content = await resp.read()
 
             # 检查响应
-            if resp.status_code == 200:
-                response_data = resp.json()
+            if status_code == 200:
+                response_data = json.loads(content)
 
                 # 检查是否成功
                 if response_data.get("Response", {}).get("Error") is not None:
@@ -161,7 +166,7 @@ class TTSProvider(TTSProviderBase):
                     raise Exception(f"{__name__}: 没有返回音频数据: {response_data}")
             else:
                 raise Exception(
-                    f"{__name__} status_code: {resp.status_code} response: {resp.content}"
+                    f"{__name__} status_code: {status_code} response: {content}"
                 )
         except Exception as e:
             raise Exception(f"{__name__} error: {e}")
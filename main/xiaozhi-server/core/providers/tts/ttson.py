@@ -1,7 +1,7 @@
 import os
 import uuid
 import json
-import requests
+from core.providers.tts.runtime import http_session
 import shutil
 from datetime import datetime
 from core.providers.tts.base import TTSProviderBase
@@ -12,6 +12,8 @@ logger = setup_logging()
 
 
 class TTSProvider(TTSProviderBase):
+    tts_cacheable = True
+
     def __init__(self, config, delete_audio_file):
         super().__init__(config, delete_audio_file)
         self.url = config.get(
@@ -57,11 +59,14 @@ class TTSProvider(TTSProviderBase):
             }
         )
 
-        resp = requests.request("POST", url, data=payload)
-        if resp.status_code != 200:
-            logger.bind(tag=TAG).error(f"TTSON 请求失败: {resp.text}")
-            raise Exception(f"{__name__}: TTS请求失败")
-        resp_json = resp.json()
+        async with http_session() as session:
+            async with session.post(url, data=payload) as resp:
+                if resp.status != 200:
+                    logger.bind(tag=TAG).error(
+                        f"TTSON 请求失败: {await resp.text()}"
+                    )
+                    raise Exception(f"{__name__}: TTS请求失败")
+                resp_json = json.loads(await resp.read())
         try:
             result = (
                 resp_json["url"]
@@ -73,12 +78,14 @@ class TTSProvider(TTSProviderBase):
                 + resp_json["voice_path"]
             )
 
-            audio_content = requests.get(result)
+            async with http_session() as session:
+                async with session.get(result) as audio_resp:
+                    audio_content = await audio_resp.read()
             if output_file:
                 with open(output_file, "wb") as f:
-                    f.write(audio_content.content)
+                    f.write(audio_content)
             else:
-                return audio_content.content
+                return audio_content
             voice_path = resp_json.get("voice_path")
             des_path = output_file
             shutil.move(voice_path, des_path)
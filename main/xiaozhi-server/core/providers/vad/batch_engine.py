@@ -0,0 +1,220 @@
+"""
+Silero VAD 跨连接批量推理引擎
+把所有连接待检测的512采样点音频块收集成批，在独立线程中一次前向推理，
+每个连接维护独立的循环状态（state/context），结果通过Future返回
+"""
+
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, InvalidStateError
+
+import numpy as np
+from config.logger import setup_logging
+
+TAG = __name__
+logger = setup_logging()
+
+# 16kHz 下模型要求的单块采样点数与上下文长度
+CHUNK_SAMPLES = 512
+CONTEXT_SAMPLES = 64
+SAMPLE_RATE = 16000
+
+
+class _BatchRequest:
+    """一次提交（同一连接的若干音频块）对应的结果容器"""
+
+    __slots__ = ("future", "probs", "remaining")
+
+    def __init__(self, count):
+        self.future = Future()
+        self.probs = np.zeros(count, dtype=np.float32)
+        self.remaining = count
+
+
+class _StreamState:
+    """单个连接的循环状态"""
+
+    __slots__ = ("state", "context", "pending")
+
+    def __init__(self):
+        self.state = np.zeros((2, 128), dtype=np.float32)
+        self.context = np.zeros(CONTEXT_SAMPLES, dtype=np.float32)
+        # 待推理的 (请求, 块序号, 音频块)
+        self.pending = deque()
+
+
+class SileroBatchEngine:
+    """Silero VAD 批量推理引擎"""
+
+    def __init__(self, model_path, batch_size=32, max_wait_ms=4, num_threads=1):
+        """
+        Args:
+            model_path: silero_vad.onnx 路径
+            batch_size: 单批最多包含的连接数
+            max_wait_ms: 批次未满时最多等待的毫秒数
+            num_threads: onnxruntime 算子内线程数
+        """
+        import onnxruntime
+
+        opts = onnxruntime.SessionOptions()
+        opts.inter_op_num_threads = 1
+        opts.intra_op_num_threads = max(1, int(num_threads))
+        self.session = onnxruntime.InferenceSession(
+            model_path, providers=["CPUExecutionProvider"], sess_options=opts
+        )
+        self.batch_size = max(1, int(batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms) / 1000.0)
+        self._sr = np.array(SAMPLE_RATE, dtype=np.int64)
+
+        self._streams = OrderedDict()
+        self._ready = 0  # 有待推理块的连接数
+        self._cond = threading.Condition()
+        self._stopped = False
+
+        # 统计信息
+        self.batches = 0
+        self.frames = 0
+
+        self._worker = threading.Thread(
+            target=self._run, name="silero-vad-batch", daemon=True
+        )
+        self._worker.start()
+        logger.bind(tag=TAG).info(
+            f"VAD批量推理引擎已启动: batch_size={self.batch_size}, max_wait_ms={max_wait_ms}"
+        )
+
+    def submit(self, key, chunks: np.ndarray) -> Future:
+        """
+        提交某个连接的音频块
+
+        Args:
+            key: 连接标识，同一连接的块按提交顺序推理
+            chunks: int16 PCM数组，形状为 (n, 512)，结果返回前调用方不得修改
+
+        Returns:
+            Future: 结果为长度为n的语音概率数组
+        """
+        request = _BatchRequest(len(chunks))
+        if request.remaining == 0:
+            request.future.set_result(request.probs)
+            return request.future
+
+        with self._cond:
+            if self._stopped:
+                request.future.set_exception(RuntimeError("VAD批量推理引擎已停止"))
+                return request.future
+            stream = self._streams.get(key)
+            if stream is None:
+                stream = self._streams[key] = _StreamState()
+            if not stream.pending:
+                self._ready += 1
+            for index, chunk in enumerate(chunks):
+                stream.pending.append((request, index, chunk))
+            self._cond.notify()
+        return request.future
+
+    def release(self, key):
+        """释放连接的循环状态，未完成的请求会被取消"""
+        with self._cond:
+            stream = self._streams.pop(key, None)
+            if stream is None:
+                return
+            if stream.pending:
+                self._ready -= 1
+            for request, _, _ in stream.pending:
+                request.future.cancel()
+
+    def stop(self):
+        """停止工作线程"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._worker.join(timeout=1)
+
+    def _collect(self):
+        """按轮询顺序从每个就绪连接各取一块，组成一个批次"""
+        with self._cond:
+            while self._ready == 0 and not self._stopped:
+                self._cond.wait()
+            if self._stopped:
+                return None
+            # 批次未满时稍等片刻，让其他连接的块一起进入本批；
+            # 每次 submit 都会 notify，需等到凑满或超时，不能被第一个到达的块唤醒就出批
+            if self._ready < self.batch_size and self.max_wait > 0:
+                self._cond.wait_for(
+                    lambda: self._ready >= self.batch_size or self._stopped,
+                    timeout=self.max_wait,
+                )
+                if self._stopped:
+                    return None
+
+            batch = []
+            for key in list(self._streams.keys()):
+                stream = self._streams[key]
+                if not stream.pending:
+                    continue
+                batch.append((stream, stream.pending.popleft()))
+                if not stream.pending:
+                    self._ready -= 1
+                # 已取过块的连接移到队尾，保证各连接公平
+                self._streams.move_to_end(key)
+                if len(batch) >= self.batch_size:
+                    break
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                break
+            if not batch:
+                continue
+            try:
+                probs = self._infer(batch)
+            except Exception as e:
+                logger.bind(tag=TAG).error(f"VAD批量推理失败: {e}")
+                for _, (request, _, _) in batch:
+                    self._resolve(request.future, exception=e)
+                continue
+
+            for (_, (request, index, _)), prob in zip(batch, probs):
+                request.probs[index] = prob
+                request.remaining -= 1
+                if request.remaining == 0:
+                    self._resolve(request.future, result=request.probs)
+
+    @staticmethod
+    def _resolve(future, result=None, exception=None):
+        # 连接关闭时请求可能已被取消
+        if future.done():
+            return
+        try:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def _infer(self, batch):
+        """执行一次批量前向推理，并把新状态写回各连接"""
+        size = len(batch)
+        x = np.empty((size, CONTEXT_SAMPLES + CHUNK_SAMPLES), dtype=np.float32)
+        state = np.empty((2, size, 128), dtype=np.float32)
+        for row, (stream, (_, _, chunk)) in enumerate(batch):
+            x[row, :CONTEXT_SAMPLES] = stream.context
+            x[row, CONTEXT_SAMPLES:] = chunk
+            state[:, row, :] = stream.state
+        x[:, CONTEXT_SAMPLES:] *= 1.0 / 32768.0
+
+        out, new_state = self.session.run(
+            None, {"input": x, "state": state, "sr": self._sr}
+        )
+
+        for row, (stream, _) in enumerate(batch):
+            stream.state = new_state[:, row, :].copy()
+            stream.context = x[row, -CONTEXT_SAMPLES:].copy()
+
+        self.batches += 1
+        self.frames += size
+        return out.reshape(size, -1)[:, 0]
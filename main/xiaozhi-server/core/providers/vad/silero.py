@@ -1,9 +1,13 @@
+import os
 import time
+import asyncio
 import numpy as np
 import torch
 import opuslib_next
 from config.logger import setup_logging
 from core.providers.vad.base import VADProviderBase
+from core.utils.opus_decoder_pool import OpusDecoderPool
+from core.utils.model_host import RemoteVADEngine, get_model_host_client
 
 TAG = __name__
 logger = setup_logging()
@@ -12,14 +16,19 @@ logger = setup_logging()
 class VADProvider(VADProviderBase):
     def __init__(self, config):
         logger.bind(tag=TAG).info("SileroVAD", config)
-        self.model, _ = torch.hub.load(
-            repo_or_dir=config["model_dir"],
-            source="local",
-            model="silero_vad",
-            force_reload=False,
-        )
-
-        self.decoder = opuslib_next.Decoder(16000, 1)
+        # 多进程模式下模型已在宿主进程中加载，本进程不再加载
+        host_client = get_model_host_client()
+        self.model = None
+        if host_client is None or "VAD" not in host_client.modules:
+            self.model, _ = torch.hub.load(
+                repo_or_dir=config["model_dir"],
+                source="local",
+                model="silero_vad",
+                force_reload=False,
+            )
+
+        # 每个连接独立的解码器，避免多设备共用解码器导致状态串扰
+        self.decoder_pool = OpusDecoderPool(16000, 1, 960)
 
         # 处理空字符串的情况
         threshold = config.get("threshold", "0.5")
@@ -36,66 +45,130 @@ class VADProvider(VADProviderBase):
         # 至少要多少帧才算有语音
         self.frame_window_threshold = 3
 
-    def __del__(self):
-        if hasattr(self, 'decoder') and self.decoder is not None:
-            try:
-                del self.decoder
-            except Exception:
-                pass
+        # 跨连接批量推理，batch_size大于1时启用
+        self.batch_engine = None
+        batch_size = config.get("batch_size", "0")
+        batch_size = int(batch_size) if batch_size else 0
+        if self.model is None:
+            self.batch_engine = RemoteVADEngine(host_client)
+        elif batch_size > 1:
+            self.batch_engine = self._create_batch_engine(config, batch_size)
+
+    def _create_batch_engine(self, config, batch_size):
+        try:
+            from core.providers.vad.batch_engine import SileroBatchEngine
+
+            model_path = os.path.join(
+                config["model_dir"], "src", "silero_vad", "data", "silero_vad.onnx"
+            )
+            max_wait_ms = config.get("batch_max_wait_ms", "4")
+            return SileroBatchEngine(
+                model_path,
+                batch_size=batch_size,
+                max_wait_ms=float(max_wait_ms) if max_wait_ms else 4,
+            )
+        except Exception as e:
+            logger.bind(tag=TAG).warning(f"VAD批量推理引擎启动失败，使用逐块推理: {e}")
+            return None
+
+    def _take_chunks(self, conn, pcm_frame):
+        """写入新PCM，返回缓冲区开头所有完整512采样点块的零拷贝视图"""
+        conn.client_audio_buffer.extend(pcm_frame)  # 将新数据加入缓冲区
+        chunks = conn.client_audio_buffer.chunks(512)
+        if len(chunks) == 0:
+            return None
+        return chunks
+
+    def _update_voice_state(self, conn, speech_prob):
+        """根据单块语音概率更新连接的VAD状态，返回当前是否有声音"""
+        # 双阈值判断
+        if speech_prob >= self.vad_threshold:
+            is_voice = True
+        elif speech_prob <= self.vad_threshold_low:
+            is_voice = False
+        else:
+            is_voice = conn.last_is_voice
+
+        # 声音没低于最低值则延续前一个状态，判断为有声音
+        conn.last_is_voice = is_voice
+
+        # 更新滑动窗口
+        conn.client_voice_window.append(is_voice)
+        client_have_voice = (
+            conn.client_voice_window.count(True) >= self.frame_window_threshold
+        )
+
+        # 如果之前有声音，但本次没有声音，且与上次有声音的时间差已经超过了静默阈值，则认为已经说完一句话
+        if conn.client_have_voice and not client_have_voice:
+            stop_duration = time.time() * 1000 - conn.last_activity_time
+            if stop_duration >= self.silence_threshold_ms:
+                conn.client_voice_stop = True
+        if client_have_voice:
+            conn.client_have_voice = True
+            conn.last_activity_time = time.time() * 1000
+        return client_have_voice
 
     def is_vad(self, conn, opus_packet):
         # 手动模式：直接返回True，不进行实时VAD检测，所有音频都缓存
         if conn.client_listen_mode == "manual":
             return True
-            
-        try:
-            pcm_frame = self.decoder.decode(opus_packet, 960)
-            conn.client_audio_buffer.extend(pcm_frame)  # 将新数据加入缓冲区
 
-            # 处理缓冲区中的完整帧（每次处理512采样点）
+        try:
+            pcm_frame = self.decoder_pool.decode(id(conn), opus_packet)
+            chunks = self._take_chunks(conn, pcm_frame)
             client_have_voice = False
-            while len(conn.client_audio_buffer) >= 512 * 2:
-                # 提取前512个采样点（1024字节）
-                chunk = conn.client_audio_buffer[: 512 * 2]
-                conn.client_audio_buffer = conn.client_audio_buffer[512 * 2 :]
+            if chunks is None:
+                return client_have_voice
 
+            for chunk in chunks:
                 # 转换为模型需要的张量格式
-                audio_int16 = np.frombuffer(chunk, dtype=np.int16)
-                audio_float32 = audio_int16.astype(np.float32) / 32768.0
-                audio_tensor = torch.from_numpy(audio_float32)
-
+                audio_tensor = torch.from_numpy(chunk.astype(np.float32) / 32768.0)
                 # 检测语音活动
                 with torch.no_grad():
                     speech_prob = self.model(audio_tensor, 16000).item()
+                client_have_voice = self._update_voice_state(conn, speech_prob)
+            conn.client_audio_buffer.consume(chunks.size)
+
+            return client_have_voice
+        except opuslib_next.OpusError as e:
+            logger.bind(tag=TAG).info(f"解码错误: {e}")
+        except Exception as e:
+            logger.bind(tag=TAG).error(f"Error processing audio packet: {e}")
 
-                # 双阈值判断
-                if speech_prob >= self.vad_threshold:
-                    is_voice = True
-                elif speech_prob <= self.vad_threshold_low:
-                    is_voice = False
-                else:
-                    is_voice = conn.last_is_voice
-
-                # 声音没低于最低值则延续前一个状态，判断为有声音
-                conn.last_is_voice = is_voice
-
-                # 更新滑动窗口
-                conn.client_voice_window.append(is_voice)
-                client_have_voice = (
-                    conn.client_voice_window.count(True) >= self.frame_window_threshold
-                )
-
-                # 如果之前有声音，但本次没有声音，且与上次有声音的时间差已经超过了静默阈值，则认为已经说完一句话
-                if conn.client_have_voice and not client_have_voice:
-                    stop_duration = time.time() * 1000 - conn.last_activity_time
-                    if stop_duration >= self.silence_threshold_ms:
-                        conn.client_voice_stop = True
-                if client_have_voice:
-                    conn.client_have_voice = True
-                    conn.last_activity_time = time.time() * 1000
+    async def is_vad_async(self, conn, opus_packet):
+        if self.batch_engine is None:
+            return self.is_vad(conn, opus_packet)
+        if conn.client_listen_mode == "manual":
+            return True
+
+        try:
+            # 解码与推理都在工作线程中合批执行
+            pcm_frame = await asyncio.wrap_future(
+                self.decoder_pool.submit(id(conn), opus_packet)
+            )
+            chunks = self._take_chunks(conn, pcm_frame)
+            client_have_voice = False
+            if chunks is None:
+                return client_have_voice
+
+            # 与其他连接的音频块合批，在推理线程中执行，不阻塞事件循环
+            # 推理完成前该连接不会写入新数据，视图可直接交给推理线程
+            probs = await asyncio.wrap_future(
+                self.batch_engine.submit(id(conn), chunks)
+            )
+            conn.client_audio_buffer.consume(chunks.size)
+            for speech_prob in probs:
+                client_have_voice = self._update_voice_state(conn, float(speech_prob))
 
             return client_have_voice
+        except asyncio.CancelledError:
+            raise
         except opuslib_next.OpusError as e:
             logger.bind(tag=TAG).info(f"解码错误: {e}")
         except Exception as e:
             logger.bind(tag=TAG).error(f"Error processing audio packet: {e}")
+
+    def release(self, conn):
+        self.decoder_pool.release(id(conn))
+        if self.batch_engine is not None:
+            self.batch_engine.release(id(conn))
@@ -0,0 +1,256 @@
+"""
+流式音频解码
+边解码边输出16kHz单声道16位PCM块，不再把整个文件经ffmpeg解码进内存后才开始编码发送；
+WAV使用内置wave模块解码、soxr流式重采样（带抗混叠滤波），MP3/FLAC使用 miniaudio 原生解码，
+其他格式每个文件启动一个ffmpeg进程，从其标准输出管道边解码边读取；
+每次播放占用的内存与音频时长无关
+"""
+
+import io
+import wave
+import threading
+import subprocess
+from typing import Callable, Any, Iterator, Union
+
+import numpy as np
+from config.logger import setup_logging
+from core.utils.opus_encoder_pool import StreamingFrameEncoder
+
+try:
+    import miniaudio
+except ImportError:
+    miniaudio = None
+
+try:
+    import soxr
+except ImportError:
+    soxr = None
+
+TAG = __name__
+logger = setup_logging()
+
+TARGET_SAMPLE_RATE = 16000
+# 每次输出的PCM块时长，4帧60ms，首帧延迟与解码调用次数之间的折中
+CHUNK_MS = 240
+
+AudioSource = Union[str, bytes, bytearray]
+
+
+class StreamResampler:
+    """
+    流式重采样，使用soxr的带限插值，降采样前先做抗混叠低通滤波；
+    滤波器状态跨块保留，结束时调用 flush 取出滤波延迟内的剩余样本
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int = TARGET_SAMPLE_RATE):
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self._stream = None
+        if src_rate != dst_rate:
+            if soxr is None:
+                raise RuntimeError("未安装 soxr，无法重采样")
+            self._stream = soxr.ResampleStream(
+                src_rate, dst_rate, 1, dtype="float32", quality="HQ"
+            )
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if self._stream is None:
+            return samples
+        return self._stream.resample_chunk(samples.astype(np.float32, copy=False))
+
+    def flush(self) -> np.ndarray:
+        if self._stream is None:
+            return np.zeros(0, dtype=np.float32)
+        return self._stream.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+
+
+def _to_int16_bytes(samples: np.ndarray) -> bytes:
+    return np.clip(np.rint(samples), -32768, 32767).astype(np.int16).tobytes()
+
+
+def _pcm_to_float(raw: bytes, sample_width: int) -> np.ndarray:
+    """把wave读出的交错PCM转换为以16位为刻度的浮点数组"""
+    if sample_width == 1:
+        return (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) * 256
+    if sample_width == 2:
+        return np.frombuffer(raw, dtype=np.int16).astype(np.float32)
+    if sample_width == 3:
+        data = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        value = data[:, 0] | (data[:, 1] << 8) | (data[:, 2] << 16)
+        value = np.where(value & 0x800000, value - 0x1000000, value)
+        return value.astype(np.float32) / 256
+    if sample_width == 4:
+        return np.frombuffer(raw, dtype=np.int32).astype(np.float32) / 65536
+    raise ValueError(f"不支持的采样位宽: {sample_width}")
+
+
+def _iter_wav(source: AudioSource) -> Iterator[bytes]:
+    fileobj = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    with wave.open(fileobj, "rb") as wf:
+        channels = wf.getnchannels()
+        sample_width = wf.getsampwidth()
+        src_rate = wf.getframerate()
+        frames_per_chunk = max(1, src_rate * CHUNK_MS // 1000)
+        # 缺少soxr时在输出任何数据前抛出，由ffmpeg接手解码和重采样
+        resampler = StreamResampler(src_rate)
+        # 格式刚好匹配时直接输出，不做任何转换
+        passthrough = (
+            channels == 1 and sample_width == 2 and src_rate == TARGET_SAMPLE_RATE
+        )
+        while True:
+            raw = wf.readframes(frames_per_chunk)
+            if not raw:
+                break
+            if passthrough:
+                yield raw
+                continue
+            samples = _pcm_to_float(raw, sample_width)
+            if channels > 1:
+                samples = samples[: len(samples) // channels * channels]
+                samples = samples.reshape(-1, channels).mean(axis=1)
+            samples = resampler.process(samples)
+            if len(samples):
+                yield _to_int16_bytes(samples)
+        if not passthrough:
+            samples = resampler.flush()
+            if len(samples):
+                yield _to_int16_bytes(samples)
+
+
+def _iter_miniaudio(source: AudioSource) -> Iterator[bytes]:
+    frames_per_chunk = TARGET_SAMPLE_RATE * CHUNK_MS // 1000
+    kwargs = dict(
+        output_format=miniaudio.SampleFormat.SIGNED16,
+        nchannels=1,
+        sample_rate=TARGET_SAMPLE_RATE,
+        frames_to_read=frames_per_chunk,
+    )
+    if isinstance(source, (bytes, bytearray)):
+        stream = miniaudio.stream_memory(bytes(source), **kwargs)
+    else:
+        stream = miniaudio.stream_file(source, **kwargs)
+    for samples in stream:
+        yield samples.tobytes()
+
+
+def _iter_ffmpeg(source: AudioSource) -> Iterator[bytes]:
+    """通过ffmpeg管道解码，按块读取标准输出"""
+    from_bytes = isinstance(source, (bytes, bytearray))
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+    if not from_bytes:
+        # 不要从标准输入读取数据，否则FFmpeg会阻塞
+        cmd.append("-nostdin")
+    cmd += [
+        "-i",
+        "pipe:0" if from_bytes else source,
+        "-f",
+        "s16le",
+        "-ac",
+        "1",
+        "-ar",
+        str(TARGET_SAMPLE_RATE),
+        "pipe:1",
+    ]
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE if from_bytes else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    writer = None
+    if from_bytes:
+
+        def _write_input():
+            try:
+                process.stdin.write(source)
+            except (BrokenPipeError, OSError):
+                pass
+            finally:
+                try:
+                    process.stdin.close()
+                except OSError:
+                    pass
+
+        writer = threading.Thread(target=_write_input, daemon=True)
+        writer.start()
+
+    chunk_bytes = TARGET_SAMPLE_RATE * CHUNK_MS // 1000 * 2
+    try:
+        while True:
+            data = process.stdout.read(chunk_bytes)
+            if not data:
+                break
+            yield data
+        process.wait()
+        if process.returncode != 0:
+            error = process.stderr.read().decode("utf-8", errors="ignore").strip()
+            raise RuntimeError(f"ffmpeg解码失败: {error}")
+    finally:
+        # 调用方提前停止（如被打断）时结束ffmpeg进程
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        if writer is not None:
+            writer.join(timeout=1)
+        process.stdout.close()
+        process.stderr.close()
+
+
+def _is_wav(source: AudioSource, file_type: str) -> bool:
+    if file_type == "wav":
+        return True
+    if isinstance(source, (bytes, bytearray)):
+        return source[:4] == b"RIFF" and source[8:12] == b"WAVE"
+    return False
+
+
+def iter_pcm_chunks(source: AudioSource, file_type: str = None) -> Iterator[bytes]:
+    """
+    流式解码音频，逐块输出16kHz单声道16位小端PCM
+
+    Args:
+        source: 音频文件路径或音频二进制数据
+        file_type: 音频格式（文件后缀），为空时按文件后缀判断
+    """
+    if not file_type and isinstance(source, str):
+        file_type = source.rsplit(".", 1)[-1] if "." in source else None
+    file_type = (file_type or "").lower()
+
+    decoders = []
+    if _is_wav(source, file_type):
+        decoders.append(_iter_wav)
+    if miniaudio is not None and file_type in ("mp3", "flac", "wav"):
+        decoders.append(_iter_miniaudio)
+    decoders.append(_iter_ffmpeg)
+
+    for index, decoder in enumerate(decoders):
+        chunks = decoder(source)
+        try:
+            first = next(chunks)
+        except StopIteration:
+            return
+        except Exception as e:
+            chunks.close()
+            # 只在尚未输出任何数据时换用下一个解码器
+            if index == len(decoders) - 1:
+                raise
+            logger.bind(tag=TAG).debug(
+                f"{decoder.__name__} 无法解码 {file_type} 音频，改用下一个解码器: {e}"
+            )
+            continue
+        yield first
+        yield from chunks
+        return
+
+
+def stream_audio_to_frames(
+    source: AudioSource,
+    file_type: str = None,
+    is_opus: bool = True,
+    callback: Callable[[Any], Any] = None,
+) -> None:
+    """边解码边按60ms分帧编码，每得到一帧就回调一次"""
+    with StreamingFrameEncoder(is_opus=is_opus) as encoder:
+        for pcm in iter_pcm_chunks(source, file_type):
+            encoder.feed(pcm, callback)
+        encoder.flush(callback)
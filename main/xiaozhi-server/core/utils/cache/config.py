@@ -20,6 +20,9 @@ class CacheType(Enum):
     DEVICE_PROMPT = "device_prompt"
     VOICEPRINT_HEALTH = "voiceprint_health"  # 声纹识别健康检查
     AUDIO_DATA = "audio_data"  # 音频数据缓存
+    TTS_AUDIO = "tts_audio"  # TTS合成结果缓存
+    VISION_CONFIG = "vision_config"  # 视觉分析接口的设备私有配置
+    VLLM_PROVIDER = "vllm_provider"  # 视觉分析模型实例
 
 
 @dataclass
@@ -62,5 +65,14 @@ class CacheConfig:
             CacheType.AUDIO_DATA: cls(
                 strategy=CacheStrategy.TTL, ttl=600, max_size=100  # 10分钟过期
             ),
+            CacheType.TTS_AUDIO: cls(
+                strategy=CacheStrategy.LRU, ttl=None, max_size=500  # 超出后淘汰最久未用
+            ),
+            CacheType.VISION_CONFIG: cls(
+                strategy=CacheStrategy.TTL, ttl=300, max_size=1000  # 5分钟过期
+            ),
+            CacheType.VLLM_PROVIDER: cls(
+                strategy=CacheStrategy.LRU, ttl=None, max_size=64  # 超出后淘汰最久未用
+            ),
         }
         return configs.get(cache_type, cls())
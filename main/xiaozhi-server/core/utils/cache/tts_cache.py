@@ -0,0 +1,244 @@
+"""
+TTS音频缓存
+按 (TTS服务, 服务配置, 音频格式, 文本) 缓存已经编码好的音频帧列表，
+绑定提示、结束语、唤醒词回复等固定话术无需重复合成；
+内存层使用全局缓存管理器的LRU缓存，磁盘层以内存映射方式读取，服务重启后仍然有效
+"""
+
+import os
+import re
+import json
+import mmap
+import struct
+import hashlib
+import threading
+from typing import List, Optional
+from .config import CacheType
+from .manager import cache_manager
+
+# 磁盘文件格式：魔数 + 帧数，之后每帧为 4字节长度 + 帧数据
+FILE_MAGIC = b"XZTC"
+FILE_HEADER = struct.Struct("<4sI")
+FRAME_HEADER = struct.Struct("<I")
+
+
+class TTSAudioCache:
+    """两级TTS音频缓存"""
+
+    def __init__(
+        self,
+        enabled=True,
+        cache_dir="tmp/tts_cache",
+        max_disk_mb=256,
+        max_text_length=64,
+    ):
+        """
+        Args:
+            enabled: 是否启用缓存
+            cache_dir: 磁盘缓存目录
+            max_disk_mb: 磁盘缓存上限（MB），为0时只使用内存缓存
+            max_text_length: 只缓存不超过该长度的文本，避免大模型的长回复占满缓存
+        """
+        self.enabled = enabled
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = int(max_disk_mb) * 1024 * 1024
+        self.max_text_length = max_text_length
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "disk_evictions": 0,
+        }
+        self._disk_size = self._scan_disk_size() if self.max_disk_bytes else 0
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """去掉首尾空白并合并连续空白"""
+        return re.sub(r"\s+", " ", text or "").strip()
+
+    @staticmethod
+    def config_identity(config: dict) -> str:
+        """服务配置的指纹，音色、模型、语速、音量、接口地址等任一配置不同都视为不同的声音"""
+        raw = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def make_key(self, provider, identity, audio_format, text) -> Optional[str]:
+        """生成缓存键，服务未提供配置指纹、文本为空、过长或缓存未启用时返回None"""
+        if not self.enabled or identity is None:
+            return None
+        normalized = self.normalize_text(text)
+        if not normalized or len(normalized) > self.max_text_length:
+            return None
+        raw = "\x1f".join(
+            str(part) for part in (provider, identity, audio_format, normalized)
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: Optional[str]) -> Optional[List[bytes]]:
+        """查找缓存，先查内存再查磁盘"""
+        if key is None:
+            return None
+        frames = cache_manager.get(CacheType.TTS_AUDIO, key)
+        if frames is not None:
+            self._count("memory_hits")
+            return frames
+        frames = self._read_disk(key)
+        if frames is not None:
+            cache_manager.set(CacheType.TTS_AUDIO, key, frames)
+            self._count("disk_hits")
+            return frames
+        self._count("misses")
+        return None
+
+    def put(self, key: Optional[str], frames: List[bytes]) -> None:
+        """写入缓存"""
+        if key is None or not frames:
+            return
+        frames = [bytes(frame) for frame in frames]
+        cache_manager.set(CacheType.TTS_AUDIO, key, frames)
+        self._count("writes")
+        if self.max_disk_bytes:
+            self._write_disk(key, frames)
+
+    def get_stats(self) -> dict:
+        """缓存命中统计"""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        stats["disk_bytes"] = self._disk_size
+        return stats
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self._stats[name] += value
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.bin")
+
+    def _iter_files(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".bin"):
+                    yield os.path.join(root, name)
+
+    def _scan_disk_size(self):
+        total = 0
+        for path in self._iter_files():
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    def _read_disk(self, key):
+        if not self.max_disk_bytes:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mm:
+                magic, count = FILE_HEADER.unpack_from(mm, 0)
+                if magic != FILE_MAGIC:
+                    raise ValueError("缓存文件格式错误")
+                frames = []
+                offset = FILE_HEADER.size
+                for _ in range(count):
+                    (length,) = FRAME_HEADER.unpack_from(mm, offset)
+                    offset += FRAME_HEADER.size
+                    if offset + length > len(mm):
+                        raise ValueError("缓存文件不完整")
+                    frames.append(mm[offset : offset + length])
+                    offset += length
+            # 更新修改时间，淘汰时按最近使用排序
+            os.utime(path)
+            return frames
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, struct.error):
+            self._remove_file(path)
+            return None
+
+    def _write_disk(self, key, frames):
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        data = bytearray(FILE_HEADER.pack(FILE_MAGIC, len(frames)))
+        for frame in frames:
+            data += FRAME_HEADER.pack(len(frame))
+            data += frame
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 先写临时文件再改名，避免读到写了一半的文件
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            cache_manager.logger.warning(f"写入TTS磁盘缓存失败: {e}")
+            return
+        with self._lock:
+            self._disk_size += len(data)
+            over_limit = self._disk_size > self.max_disk_bytes
+        if over_limit:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """按最近使用时间淘汰，直到占用降到上限的90%"""
+        entries = []
+        for path in self._iter_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * 0.9
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            if self._remove_file(path):
+                total -= size
+                evicted += 1
+        with self._lock:
+            self._disk_size = total
+            self._stats["disk_evictions"] += evicted
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+
+# 全局单例
+_tts_audio_cache = None
+
+
+def get_tts_audio_cache(config: Optional[dict] = None) -> TTSAudioCache:
+    """
+    获取全局TTS音频缓存实例（单例模式）
+
+    Args:
+        config: 配置文件中的 tts_cache 配置，仅首次调用时生效
+    """
+    global _tts_audio_cache
+    if _tts_audio_cache is None:
+        config = config or {}
+        _tts_audio_cache = TTSAudioCache(
+            enabled=config.get("enabled", True),
+            cache_dir=config.get("cache_dir", "tmp/tts_cache"),
+            max_disk_mb=config.get("max_disk_mb", 256),
+            max_text_length=config.get("max_text_length", 64),
+        )
+    return _tts_audio_cache
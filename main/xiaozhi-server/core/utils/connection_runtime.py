@@ -0,0 +1,195 @@
+"""
+连接运行时
+所有连接共享进程级的有界线程池，不再每个连接创建自己的线程池和上报、ASR、音频发送线程；
+连接内的排队消费改为事件循环上的协程任务，连接配置改为浅拷贝的写时复制视图，
+并发设备数增加时线程数和内存只随真正在执行的任务增长
+"""
+
+import copy
+import queue
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from config.logger import setup_logging
+
+TAG = __name__
+logger = setup_logging()
+
+# 连接会就地修改的配置段，创建连接时复制；其余配置段只在整段替换时才与全局配置分离
+MUTABLE_CONFIG_SECTIONS = ("selected_module", "xiaozhi")
+
+
+def overlay_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    为连接生成配置视图，代替整份深拷贝
+
+    顶层是浅拷贝，连接对某个配置段整体赋值（如下发的私有配置）只影响自己；
+    会被就地修改的小配置段单独深拷贝，其余配置段与全局配置共享
+    """
+    overlay = dict(config)
+    for section in MUTABLE_CONFIG_SECTIONS:
+        if section in overlay:
+            overlay[section] = copy.deepcopy(overlay[section])
+    return overlay
+
+
+class LoopQueue:
+    """
+    在事件循环中消费、可从任意线程投递的队列
+
+    put/get_nowait/qsize 与 queue.Queue 用法一致，消费方使用 await get()，
+    没有数据时不占用线程
+    """
+
+    def __init__(self):
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiter: Optional[asyncio.Future] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """绑定消费所在的事件循环"""
+        self._loop = loop
+
+    def put(self, item):
+        with self._lock:
+            self._items.append(item)
+            waiter = self._waiter
+        if waiter is None or self._loop is None:
+            return
+        if _running_loop() is self._loop:
+            self._wakeup()
+        else:
+            self._loop.call_soon_threadsafe(self._wakeup)
+
+    def _wakeup(self):
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def get(self):
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._items:
+                    return self._items.popleft()
+                self._waiter = self._loop.create_future()
+                waiter = self._waiter
+            try:
+                await waiter
+            finally:
+                self._waiter = None
+
+    def get_nowait(self):
+        with self._lock:
+            if not self._items:
+                raise queue.Empty
+            return self._items.popleft()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class ConnectionExecutor:
+    """
+    连接级的线程池视图
+
+    任务提交到进程级共享线程池；关闭时只取消本连接还没开始执行的任务，
+    不影响其他连接
+    """
+
+    def __init__(self, pool: ThreadPoolExecutor):
+        self._pool = pool
+        self._futures = set()
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            future = self._pool.submit(fn, *args, **kwargs)
+            self._futures.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def shutdown(self, wait=False, cancel_futures=True):
+        with self._lock:
+            self._shutdown = True
+            futures = list(self._futures)
+        if cancel_futures:
+            for future in futures:
+                future.cancel()
+        if wait:
+            for future in futures:
+                if not future.cancelled():
+                    try:
+                        future.result()
+                    except Exception:
+                        pass
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._futures)
+
+
+class ConnectionRuntime:
+    """进程级连接运行时，持有所有连接共享的线程池"""
+
+    def __init__(self, max_workers: int = 128):
+        """
+        Args:
+            max_workers: 共享线程池的线程上限，执行大模型对话、函数调用等阻塞任务
+        """
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="conn-worker"
+        )
+
+    def create_executor(self) -> ConnectionExecutor:
+        """为一个连接创建线程池视图"""
+        return ConnectionExecutor(self.executor)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 全局单例
+_connection_runtime = None
+_connection_runtime_lock = threading.Lock()
+
+
+def get_connection_runtime(config: Optional[dict] = None) -> ConnectionRuntime:
+    """
+    获取全局连接运行时（单例模式）
+
+    Args:
+        config: 配置文件中的 connection_runtime 配置，仅首次调用时生效
+    """
+    global _connection_runtime
+    if _connection_runtime is None:
+        with _connection_runtime_lock:
+            if _connection_runtime is None:
+                config = config or {}
+                _connection_runtime = ConnectionRuntime(
+                    max_workers=int(config.get("max_workers", 128))
+                )
+    return _connection_runtime
@@ -0,0 +1,406 @@
+"""
+模型宿主进程
+多进程模式下，Silero VAD 和本地ASR模型只在宿主进程中加载一次，所有工作进程共用；
+工作进程把音频写入自己的共享内存区，通过队列只传递请求ID和数据位置，
+宿主进程按请求ID把结果发回对应工作进程的响应队列
+"""
+
+import os
+import asyncio
+import itertools
+import threading
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+from config.logger import setup_logging
+
+TAG = __name__
+logger = setup_logging()
+
+# 可以放到宿主进程中运行的本地模型
+HOSTED_VAD_TYPES = ("silero",)
+HOSTED_ASR_TYPES = ("fun_local", "sherpa_onnx_local")
+
+# 每个工作进程共享内存区的槽位，VAD音频块较小，一个槽位即可放下；
+# 放不下的数据（如一整句ASR音频）单独创建共享内存段
+SLOT_SIZE = 64 * 1024
+SLOT_COUNT = 256
+
+# 宿主进程重启后发给各工作进程的通知，工作进程收到后让未完成的请求失败
+HOST_RESTARTED = "__host_restarted__"
+
+
+def _module_type(config: dict, module: str) -> Optional[str]:
+    selected = config.get("selected_module", {}).get(module)
+    if not selected or selected not in config.get(module, {}):
+        return None
+    return config[module][selected].get("type", selected)
+
+
+def hosted_modules(config: dict) -> Dict[str, str]:
+    """
+    当前配置中需要放到宿主进程的模块
+
+    Returns:
+        dict: 模块名 -> 配置中选中的模块，如 {"VAD": "SileroVAD"}
+    """
+    modules = {}
+    if _module_type(config, "VAD") in HOSTED_VAD_TYPES:
+        modules["VAD"] = config["selected_module"]["VAD"]
+    if _module_type(config, "ASR") in HOSTED_ASR_TYPES:
+        asr_name = config["selected_module"]["ASR"]
+        # 流式识别每一帧都要调用识别器，留在工作进程中运行
+        if str(config["ASR"][asr_name].get("streaming", False)).lower() not in ("true", "1"):
+            modules["ASR"] = asr_name
+    return modules
+
+
+class SharedArena:
+    """固定槽位的共享内存区，由工作进程创建和分配，宿主进程按名称只读访问"""
+
+    def __init__(self, name: str = None, slot_size=SLOT_SIZE, slot_count=SLOT_COUNT):
+        self.slot_size = slot_size
+        self.slot_count = slot_count
+        if name is None:
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=slot_size * slot_count
+            )
+            self._owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        self._free = list(range(slot_count))
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def allocate(self) -> Optional[int]:
+        with self._lock:
+            return self._free.pop() if self._free else None
+
+    def release(self, slot: int):
+        with self._lock:
+            self._free.append(slot)
+
+    def view(self, slot: int, nbytes: int) -> memoryview:
+        offset = slot * self.slot_size
+        return self.shm.buf[offset : offset + nbytes]
+
+    def close(self):
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+class ModelHostClient:
+    """工作进程中的宿主进程客户端，按请求ID把响应分发给对应的Future"""
+
+    def __init__(self, worker_id: int, channels: dict, modules: Dict[str, str]):
+        """
+        Args:
+            worker_id: 工作进程编号
+            channels: 主进程创建的队列，requests 为宿主进程的请求队列，responses 为本进程的响应队列
+            modules: 宿主进程中加载的模块，模块名 -> 配置中选中的模块
+        """
+        self.worker_id = worker_id
+        self.modules = modules
+        self._requests = channels["requests"]
+        self._responses = channels["responses"]
+        self.arena = SharedArena()
+        # 请求ID带上进程号，工作进程重启后不会误收上一个进程遗留的响应
+        self._ids = zip(itertools.repeat(os.getpid()), itertools.count())
+        self._pending: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+        self._attach()
+        self._reader = threading.Thread(
+            target=self._read_responses, name="model-host-client", daemon=True
+        )
+        self._reader.start()
+
+    def _attach(self):
+        """向宿主进程登记本进程的共享内存区"""
+        self._requests.put(("attach", self.worker_id, None, None, self.arena.name))
+
+    def hosts(self, module: str, selected: str) -> bool:
+        """宿主进程是否加载了该模块"""
+        return self.modules.get(module) == selected
+
+    def call(self, op: str, data, extra=None) -> Future:
+        """
+        发送一个请求
+
+        Args:
+            op: 请求类型，vad 或 asr
+            data: 音频数据，bytes 或 numpy 数组
+            extra: 随请求传递的少量参数
+        """
+        payload = memoryview(data).cast("B")
+        nbytes = payload.nbytes
+        slot = self.arena.allocate() if nbytes <= self.arena.slot_size else None
+        if slot is not None:
+            self.arena.view(slot, nbytes)[:] = payload
+            ref = ("slot", slot, nbytes)
+            segment = None
+        else:
+            segment = shared_memory.SharedMemory(create=True, size=max(1, nbytes))
+            segment.buf[:nbytes] = payload
+            ref = ("shm", segment.name, nbytes)
+
+        future = Future()
+        request_id = next(self._ids)
+        with self._lock:
+            self._pending[request_id] = (future, slot, segment)
+        self._requests.put((op, self.worker_id, request_id, ref, extra))
+        return future
+
+    def send(self, op: str, extra=None):
+        """发送不需要响应的通知"""
+        self._requests.put((op, self.worker_id, None, None, extra))
+
+    def _finish(self, request_id):
+        with self._lock:
+            entry = self._pending.pop(request_id, None)
+        if entry is None:
+            return None
+        future, slot, segment = entry
+        if slot is not None:
+            self.arena.release(slot)
+        if segment is not None:
+            segment.close()
+            segment.unlink()
+        return future
+
+    def _read_responses(self):
+        while True:
+            message = self._responses.get()
+            if message is None:
+                break
+            request_id, ok, result = message
+            if request_id == HOST_RESTARTED:
+                self._fail_pending(RuntimeError("模型宿主进程已重启"))
+                self._attach()
+                continue
+            future = self._finish(request_id)
+            if future is None or future.done():
+                continue
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(RuntimeError(result))
+
+    def _fail_pending(self, error):
+        with self._lock:
+            request_ids = list(self._pending)
+        for request_id in request_ids:
+            future = self._finish(request_id)
+            if future is not None and not future.done():
+                future.set_exception(error)
+
+    def close(self):
+        self._fail_pending(RuntimeError("模型宿主客户端已关闭"))
+        self.arena.close()
+
+
+class RemoteVADEngine:
+    """与 SileroBatchEngine 接口一致，推理在宿主进程中跨工作进程合批执行"""
+
+    def __init__(self, client: ModelHostClient):
+        self.client = client
+
+    def submit(self, key, chunks: np.ndarray) -> Future:
+        if len(chunks) == 0:
+            future = Future()
+            future.set_result(np.zeros(0, dtype=np.float32))
+            return future
+        chunks = np.ascontiguousarray(chunks, dtype=np.int16)
+        return self.client.call("vad", chunks, (key, len(chunks)))
+
+    def release(self, key):
+        self.client.send("vad_release", key)
+
+    def stop(self):
+        pass
+
+
+def _load_vad_engine(config):
+    from core.providers.vad.batch_engine import SileroBatchEngine
+
+    vad_config = config["VAD"][config["selected_module"]["VAD"]]
+    model_path = os.path.join(
+        vad_config["model_dir"], "src", "silero_vad", "data", "silero_vad.onnx"
+    )
+    batch_size = vad_config.get("batch_size", "0")
+    batch_size = int(batch_size) if batch_size else 0
+    max_wait_ms = vad_config.get("batch_max_wait_ms", "4")
+    # 宿主进程总是合批推理
+    return SileroBatchEngine(
+        model_path,
+        batch_size=max(batch_size, 32),
+        max_wait_ms=float(max_wait_ms) if max_wait_ms else 4,
+    )
+
+
+class ModelHost:
+    """宿主进程中的请求分发"""
+
+    def __init__(self, config: dict, channels: dict, modules: Dict[str, str], stats):
+        self.config = config
+        self.requests = channels["requests"]
+        self.responses: List = channels["responses"]
+        self.modules = modules
+        self.stats = stats
+        self.arenas: Dict[int, SharedArena] = {}
+        # 已被替换但还不能关闭的共享内存区（VAD推理线程仍持有其中数据的零拷贝视图）
+        self.retired_arenas: List[SharedArena] = []
+        self.vad_engine = None
+        self.asr = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def load_models(self):
+        if "VAD" in self.modules:
+            self.vad_engine = _load_vad_engine(self.config)
+            logger.bind(tag=TAG).info(f"宿主进程已加载VAD: {self.modules['VAD']}")
+        if "ASR" in self.modules:
+            from core.utils.modules_initialize import initialize_asr
+
+            self.asr = initialize_asr(self.config)
+            logger.bind(tag=TAG).info(f"宿主进程已加载ASR: {self.modules['ASR']}")
+
+    def _read_payload(self, worker_id, ref):
+        kind, location, nbytes = ref
+        if kind == "slot":
+            return self.arenas[worker_id].view(location, nbytes), None
+        segment = shared_memory.SharedMemory(name=location)
+        return segment.buf[:nbytes], segment
+
+    def _reply(self, worker_id, request_id, ok, result):
+        self.responses[worker_id].put((request_id, ok, result))
+
+    def _handle_vad(self, worker_id, request_id, ref, extra):
+        key, count = extra
+        payload, segment = self._read_payload(worker_id, ref)
+        # 共享内存中的数据在响应之前不会被工作进程改写，直接交给推理线程
+        chunks = np.frombuffer(payload, dtype=np.int16).reshape(count, -1)
+        if segment is not None:
+            chunks = chunks.copy()
+            payload.release()
+            segment.close()
+        future = self.vad_engine.submit((worker_id, key), chunks)
+
+        def done(f):
+            if f.cancelled():
+                self._reply(worker_id, request_id, False, "VAD请求已取消")
+            elif f.exception() is not None:
+                self._reply(worker_id, request_id, False, str(f.exception()))
+            else:
+                self.stats.add("vad_frames", count)
+                self._reply(worker_id, request_id, True, f.result())
+
+        future.add_done_callback(done)
+
+    async def _handle_asr(self, worker_id, request_id, ref, session_id):
+        payload, segment = self._read_payload(worker_id, ref)
+        pcm = bytes(payload)
+        payload.release()
+        if segment is not None:
+            segment.close()
+        try:
+            result = await self.asr.speech_to_text([pcm], session_id, "pcm")
+            self.stats.add("asr_requests", 1)
+            self._reply(worker_id, request_id, True, result)
+        except Exception as e:
+            self._reply(worker_id, request_id, False, str(e))
+
+    def _attach(self, worker_id, name):
+        """登记工作进程新的共享内存区，先登记新区再关闭旧区"""
+        arena = SharedArena(name=name)
+        old = self.arenas.get(worker_id)
+        self.arenas[worker_id] = arena
+        if old is not None and old is not arena:
+            self.retired_arenas.append(old)
+        self._close_retired_arenas()
+
+    def _close_retired_arenas(self):
+        """关闭被替换的共享内存区，仍有视图未释放时保留到下次再试"""
+        pending = []
+        for arena in self.retired_arenas:
+            try:
+                arena.close()
+            except BufferError:
+                pending.append(arena)
+        self.retired_arenas = pending
+
+    def _dispatch(self, message):
+        op, worker_id, request_id, ref, extra = message
+        if self.retired_arenas:
+            self._close_retired_arenas()
+        try:
+            if op == "attach":
+                self._attach(worker_id, extra)
+            elif op == "vad_release":
+                if self.vad_engine is not None:
+                    self.vad_engine.release((worker_id, extra))
+            elif op == "vad":
+                self._handle_vad(worker_id, request_id, ref, extra)
+            elif op == "asr":
+                asyncio.run_coroutine_threadsafe(
+                    self._handle_asr(worker_id, request_id, ref, extra), self.loop
+                )
+            else:
+                self._reply(worker_id, request_id, False, f"未知的请求类型: {op}")
+        except Exception as e:
+            logger.bind(tag=TAG).error(f"处理模型请求失败: {op} {e}")
+            if request_id is not None:
+                self._reply(worker_id, request_id, False, str(e))
+
+    def serve(self):
+        # ASR接口是协程，在独立线程的事件循环中执行
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(
+            target=self.loop.run_forever, name="model-host-asr", daemon=True
+        ).start()
+        for responses in self.responses:
+            responses.put((HOST_RESTARTED, False, None))
+        while True:
+            message = self.requests.get()
+            if message is None:
+                break
+            self._dispatch(message)
+        if self.vad_engine is not None:
+            self.vad_engine.stop()
+        self.retired_arenas.extend(self.arenas.values())
+        self.arenas.clear()
+        self._close_retired_arenas()
+
+
+def run_model_host(config: dict, channels: dict, modules: Dict[str, str], stats, ready):
+    """宿主进程入口"""
+    host = ModelHost(config, channels, modules, stats)
+    host.load_models()
+    ready.set()
+    logger.bind(tag=TAG).info(f"模型宿主进程已启动: pid={os.getpid()}")
+    try:
+        host.serve()
+    except KeyboardInterrupt:
+        pass
+
+
+# 全局单例，只在多进程模式的工作进程中存在
+_model_host_client: Optional[ModelHostClient] = None
+
+
+def init_model_host_client(worker_id: int, channels: dict, modules: Dict[str, str]):
+    """工作进程启动时连接宿主进程"""
+    global _model_host_client
+    if _model_host_client is None and modules:
+        _model_host_client = ModelHostClient(worker_id, channels, modules)
+    return _model_host_client
+
+
+def get_model_host_client() -> Optional[ModelHostClient]:
+    """获取宿主进程客户端，单进程模式下为None"""
+    return _model_host_client
@@ -1,6 +1,7 @@
 from typing import Dict, Any
 from config.logger import setup_logging
 from core.utils import tts, llm, intent, memory, vad, asr
+from core.utils.model_host import get_model_host_client
 
 TAG = __name__
 logger = setup_logging()
@@ -120,6 +121,10 @@ def initialize_asr(config):
         if "type" not in config["ASR"][select_asr_module]
         else config["ASR"][select_asr_module]["type"]
     )
+    # 多进程模式下本地ASR模型已在宿主进程中加载，工作进程使用代理
+    client = get_model_host_client()
+    if client is not None and client.hosts("ASR", select_asr_module):
+        asr_type = "model_host"
     new_asr = asr.create_instance(
         asr_type,
         config["ASR"][select_asr_module],
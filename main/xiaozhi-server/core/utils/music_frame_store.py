@@ -0,0 +1,395 @@
+"""
+音乐Opus帧库
+把音乐目录中的歌曲一次性转码为Opus帧容器文件，播放时直接从内存映射中按帧读取发送，
+不再每次播放都解码、重采样和编码；后台线程定期增量刷新，只转码新增或修改过的歌曲
+
+容器文件格式（小端）：
+    文件头 | 帧数据 | 帧偏移索引（frame_count+1 个 uint64）
+文件头记录源文件的大小和修改时间，用于判断是否需要重新转码
+"""
+
+import os
+import mmap
+import queue
+import struct
+import threading
+from typing import Callable, Any, Dict, List, Optional
+
+import numpy as np
+from config.logger import setup_logging
+from core.utils.audio_decoder import iter_pcm_chunks
+from core.utils.opus_encoder_pool import StreamingFrameEncoder
+
+TAG = __name__
+logger = setup_logging()
+
+FRAME_FILE_MAGIC = b"XZOF"
+FRAME_FILE_VERSION = 1
+# 魔数、版本、帧时长(ms)、采样率、帧数、源文件大小、源文件修改时间(ns)、索引位置
+FRAME_FILE_HEADER = struct.Struct("<4sHHIIqqQ")
+FRAME_FILE_EXT = ".opf"
+STORE_DIR_NAME = ".opus_frames"
+# 本身就是Opus数据包的格式，无需转码
+PASSTHROUGH_EXT = (".p3",)
+
+
+class OpusFrameFile:
+    """以内存映射方式只读打开的Opus帧容器"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            (
+                magic,
+                version,
+                self.frame_duration,
+                self.sample_rate,
+                self.frame_count,
+                self.source_size,
+                self.source_mtime_ns,
+                index_offset,
+            ) = FRAME_FILE_HEADER.unpack_from(self._mm, 0)
+            if magic != FRAME_FILE_MAGIC or version != FRAME_FILE_VERSION:
+                raise ValueError(f"不是有效的Opus帧文件: {path}")
+            # 索引转为列表，避免数组引用映射内存导致无法关闭
+            self._offsets = np.frombuffer(
+                self._mm, dtype="<u8", count=self.frame_count + 1, offset=index_offset
+            ).tolist()
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self):
+        return self.frame_count
+
+    def __getitem__(self, index) -> bytes:
+        return self._mm[self._offsets[index] : self._offsets[index + 1]]
+
+    @property
+    def duration(self) -> float:
+        """时长（秒）"""
+        return self.frame_count * self.frame_duration / 1000
+
+    def iter_frames(self, start: int = 0):
+        for index in range(start, self.frame_count):
+            yield self[index]
+
+    def close(self):
+        mm = getattr(self, "_mm", None)
+        if mm is not None:
+            mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_frame_file_header(path: str):
+    """只读取文件头，返回 (源文件大小, 源文件修改时间)，文件无效时返回None"""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(FRAME_FILE_HEADER.size)
+        magic, version, _, _, _, size, mtime_ns, _ = FRAME_FILE_HEADER.unpack(header)
+        if magic != FRAME_FILE_MAGIC or version != FRAME_FILE_VERSION:
+            return None
+        return size, mtime_ns
+    except (OSError, struct.error):
+        return None
+
+
+def transcode_to_frame_file(
+    source_path: str, target_path: str, sample_rate=16000, frame_duration=60
+) -> int:
+    """
+    把音频文件转码为Opus帧容器，边解码边写入，内存占用与歌曲长度无关
+
+    Returns:
+        int: 帧数
+    """
+    stat = os.stat(source_path)
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    tmp_path = f"{target_path}.{threading.get_ident()}.tmp"
+    offsets = [FRAME_FILE_HEADER.size]
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(b"\x00" * FRAME_FILE_HEADER.size)
+
+            def write_frame(frame):
+                f.write(frame)
+                offsets.append(offsets[-1] + len(frame))
+
+            with StreamingFrameEncoder(
+                is_opus=True, sample_rate=sample_rate, frame_duration=frame_duration
+            ) as encoder:
+                for pcm in iter_pcm_chunks(source_path):
+                    encoder.feed(pcm, write_frame)
+                encoder.flush(write_frame)
+
+            index_offset = offsets[-1]
+            f.write(np.asarray(offsets, dtype="<u8").tobytes())
+            f.seek(0)
+            f.write(
+                FRAME_FILE_HEADER.pack(
+                    FRAME_FILE_MAGIC,
+                    FRAME_FILE_VERSION,
+                    frame_duration,
+                    sample_rate,
+                    len(offsets) - 1,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    index_offset,
+                )
+            )
+        os.replace(tmp_path, target_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return len(offsets) - 1
+
+
+class MusicFrameStore:
+    """音乐目录对应的Opus帧库"""
+
+    def __init__(self, music_dir: str, music_ext=(".mp3", ".wav", ".p3")):
+        self.music_dir = os.path.abspath(music_dir)
+        self.music_ext = tuple(ext.lower() for ext in music_ext)
+        self.store_dir = os.path.join(self.music_dir, STORE_DIR_NAME)
+        # 相对路径 -> (文件大小, 修改时间)，即当前音乐目录中的歌曲清单
+        self._sources: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._pending = queue.Queue()
+        self._queued = set()
+        self._worker = None
+        self._stop_event = threading.Event()
+        self._listeners: List[Callable[[List[str], List[str]], Any]] = []
+
+    def _relpath(self, source_path: str) -> Optional[str]:
+        path = os.path.abspath(source_path)
+        if not path.startswith(self.music_dir + os.sep):
+            return None
+        return os.path.relpath(path, self.music_dir)
+
+    def frame_path(self, relpath: str) -> str:
+        return os.path.join(self.store_dir, relpath + FRAME_FILE_EXT)
+
+    def list_sources(self, subdir: str = None) -> List[str]:
+        """当前已知的歌曲相对路径，可只列出某个子目录（如在线点歌的cache目录）"""
+        with self._lock:
+            paths = list(self._sources)
+        if subdir:
+            prefix = subdir.rstrip(os.sep) + os.sep
+            paths = [path for path in paths if path.startswith(prefix)]
+        return paths
+
+    def add_listener(self, callback: Callable[[List[str], List[str]], Any]):
+        """注册歌曲清单变化回调 callback(新增的相对路径, 删除的相对路径)"""
+        self._listeners.append(callback)
+
+    def _notify(self, added: List[str], removed: List[str]):
+        if not added and not removed:
+            return
+        for callback in self._listeners:
+            try:
+                callback(added, removed)
+            except Exception as e:
+                logger.bind(tag=TAG).error(f"歌曲清单变化回调失败: {e}")
+
+    def _scan(self) -> Dict[str, tuple]:
+        sources = {}
+        for root, dirs, files in os.walk(self.music_dir):
+            # 跳过帧库目录
+            dirs[:] = [d for d in dirs if d != STORE_DIR_NAME]
+            for name in files:
+                if not name.lower().endswith(self.music_ext):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                relpath = os.path.relpath(path, self.music_dir)
+                sources[relpath] = (stat.st_size, stat.st_mtime_ns)
+        return sources
+
+    def _is_fresh(self, relpath: str, signature: tuple) -> bool:
+        return read_frame_file_header(self.frame_path(relpath)) == signature
+
+    def refresh(self, transcode: bool = True) -> int:
+        """
+        增量刷新：扫描音乐目录，转码新增或修改过的歌曲，删除已不存在歌曲的帧文件
+
+        Args:
+            transcode: 为False时只更新歌曲清单，转码交给后台线程
+
+        Returns:
+            int: 本次转码的歌曲数量
+        """
+        sources = self._scan()
+        with self._lock:
+            previous = self._sources
+            self._sources = sources
+        self._notify(
+            [path for path in sources if path not in previous],
+            [path for path in previous if path not in sources],
+        )
+
+        transcoded = 0
+        for relpath, signature in sources.items():
+            if relpath.lower().endswith(PASSTHROUGH_EXT):
+                continue
+            if self._is_fresh(relpath, signature):
+                continue
+            if transcode:
+                if self._transcode(relpath):
+                    transcoded += 1
+            else:
+                self.schedule(os.path.join(self.music_dir, relpath))
+
+        self._remove_orphans(sources)
+        return transcoded
+
+    def _remove_orphans(self, sources):
+        if not os.path.isdir(self.store_dir):
+            return
+        for root, _, files in os.walk(self.store_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                if not name.endswith(FRAME_FILE_EXT):
+                    continue
+                relpath = os.path.relpath(path, self.store_dir)[: -len(FRAME_FILE_EXT)]
+                if relpath not in sources:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+    def _transcode(self, relpath: str) -> bool:
+        source_path = os.path.join(self.music_dir, relpath)
+        try:
+            frame_count = transcode_to_frame_file(source_path, self.frame_path(relpath))
+            logger.bind(tag=TAG).info(f"音乐帧库已更新: {relpath}，共{frame_count}帧")
+            return True
+        except Exception as e:
+            logger.bind(tag=TAG).warning(f"音乐转码失败: {relpath}，错误: {e}")
+            return False
+
+    def schedule(self, source_path: str):
+        """把一首歌加入后台转码队列，例如刚下载完成的在线歌曲"""
+        relpath = self._relpath(source_path)
+        if relpath is None or relpath.lower().endswith(PASSTHROUGH_EXT):
+            return
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return
+        with self._lock:
+            is_new = relpath not in self._sources
+            self._sources[relpath] = (stat.st_size, stat.st_mtime_ns)
+            queued = relpath in self._queued
+            self._queued.add(relpath)
+        if is_new:
+            self._notify([relpath], [])
+        if not queued:
+            self._pending.put(relpath)
+
+    def open_frames(self, source_path: str) -> Optional[OpusFrameFile]:
+        """打开歌曲对应的帧文件，帧文件不存在或已过期时返回None"""
+        relpath = self._relpath(source_path)
+        if relpath is None:
+            return None
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return None
+        frame_path = self.frame_path(relpath)
+        if read_frame_file_header(frame_path) != (stat.st_size, stat.st_mtime_ns):
+            return None
+        try:
+            return OpusFrameFile(frame_path)
+        except (OSError, ValueError):
+            return None
+
+    def stream_frames(
+        self, source_path: str, callback: Callable[[Any], Any]
+    ) -> bool:
+        """
+        直接从帧库发送歌曲的Opus帧
+
+        Returns:
+            bool: 帧库中没有该歌曲时返回False，并安排后台转码，调用方需自行解码播放
+        """
+        frame_file = self.open_frames(source_path)
+        if frame_file is None:
+            self.schedule(source_path)
+            return False
+        with frame_file:
+            for frame in frame_file.iter_frames():
+                callback(frame)
+        return True
+
+    def start(self, refresh_interval: float = 60):
+        """启动后台线程：先做一次全量增量刷新，之后按间隔刷新并处理转码队列"""
+        if self._worker is not None:
+            return
+        self._worker = threading.Thread(
+            target=self._run, args=(refresh_interval,), name="music-frame-store", daemon=True
+        )
+        self._worker.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self, refresh_interval):
+        self.refresh(transcode=False)
+        next_refresh = refresh_interval
+        while not self._stop_event.is_set():
+            try:
+                relpath = self._pending.get(timeout=1)
+            except queue.Empty:
+                next_refresh -= 1
+                if next_refresh <= 0:
+                    self.refresh(transcode=False)
+                    next_refresh = refresh_interval
+                continue
+            with self._lock:
+                self._queued.discard(relpath)
+                signature = self._sources.get(relpath)
+            if signature is not None and not self._is_fresh(relpath, signature):
+                self._transcode(relpath)
+
+
+# 全局单例
+_music_frame_store = None
+
+
+def get_music_frame_store(
+    music_dir: str = None, music_ext=(".mp3", ".wav", ".p3"), refresh_interval=60
+) -> Optional[MusicFrameStore]:
+    """
+    获取全局音乐帧库（单例模式）
+
+    Args:
+        music_dir: 音乐目录，首次传入时创建帧库并启动后台刷新；不传时只返回已有实例
+    """
+    global _music_frame_store
+    if _music_frame_store is None and music_dir:
+        _music_frame_store = MusicFrameStore(music_dir, music_ext)
+        _music_frame_store.start(refresh_interval)
+    return _music_frame_store
+
+
+if __name__ == "__main__":
+    # 离线转码整个音乐目录：python -m core.utils.music_frame_store ./music
+    import sys
+
+    store = MusicFrameStore(sys.argv[1] if len(sys.argv) > 1 else "./music")
+    count = store.refresh()
+    print(f"转码完成，共转码{count}首，歌曲总数{len(store.list_sources())}")
@@ -0,0 +1,185 @@
+"""
+Opus解码器池
+每个连接使用独立的解码器，避免多个设备共用一个解码器导致状态串扰；
+连接关闭后解码器重置并回收，新连接直接复用；
+异步解码请求在独立线程中合批处理，不占用事件循环
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+
+import opuslib_next
+from config.logger import setup_logging
+
+TAG = __name__
+logger = setup_logging()
+
+
+class OpusDecoderPool:
+    """按连接分配的Opus解码器池"""
+
+    def __init__(self, sample_rate=16000, channels=1, frame_size=960, max_idle=64):
+        """
+        Args:
+            sample_rate: 采样率
+            channels: 通道数
+            frame_size: 每个包解码的最大采样点数
+            max_idle: 最多保留的空闲解码器数量
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_size = frame_size
+        self.max_idle = max_idle
+
+        self._active = {}
+        self._idle = deque()
+        self._lock = threading.Lock()
+        # 连接当前的会话令牌，release 后失效；排队中的旧令牌请求直接丢弃
+        self._sessions = {}
+        # 工作线程正在使用的解码器；此时连接被释放的，等解码结束后再由工作线程重置回收
+        self._busy = set()
+        self._retired = set()
+
+        # 异步解码队列，由工作线程按批取出
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._worker = None
+
+    def acquire(self, key):
+        """获取连接对应的解码器，没有则复用空闲解码器或新建"""
+        with self._lock:
+            return self._acquire_locked(key)
+
+    def _acquire_session(self, key, session):
+        """仅当请求所属会话仍有效时获取解码器并标记为使用中，连接已释放返回None"""
+        with self._lock:
+            if self._sessions.get(key) is not session:
+                return None
+            decoder = self._acquire_locked(key)
+            self._busy.add(decoder)
+            return decoder
+
+    def _finish_decode(self, decoder):
+        """工作线程解码结束，解码期间连接已被释放的解码器在这里回收"""
+        with self._lock:
+            self._busy.discard(decoder)
+            if decoder in self._retired:
+                self._retired.discard(decoder)
+                self._recycle_locked(decoder)
+
+    def _recycle_locked(self, decoder):
+        """重置解码器并放回空闲队列，调用方需持有 _lock"""
+        if len(self._idle) >= self.max_idle:
+            return
+        try:
+            decoder.reset_state()
+        except Exception as e:
+            logger.bind(tag=TAG).debug(f"重置Opus解码器失败，丢弃: {e}")
+            return
+        self._idle.append(decoder)
+
+    def _acquire_locked(self, key):
+        decoder = self._active.get(key)
+        if decoder is None:
+            decoder = (
+                self._idle.pop()
+                if self._idle
+                else opuslib_next.Decoder(self.sample_rate, self.channels)
+            )
+            self._active[key] = decoder
+        return decoder
+
+    def release(self, key):
+        """连接关闭时回收解码器，并丢弃该连接仍在排队的解码请求"""
+        with self._cond:
+            stale = [item for item in self._pending if item[0] == key]
+            if stale:
+                self._pending = deque(item for item in self._pending if item[0] != key)
+        for _, _, _, future in stale:
+            future.cancel()
+        with self._lock:
+            self._sessions.pop(key, None)
+            decoder = self._active.pop(key, None)
+            if decoder is None:
+                return
+            if decoder in self._busy:
+                # 工作线程仍在用它解码，不能在这里重置状态
+                self._retired.add(decoder)
+                return
+            self._recycle_locked(decoder)
+
+    def decode(self, key, opus_packet) -> bytes:
+        """同步解码一个包"""
+        return self.acquire(key).decode(opus_packet, self.frame_size)
+
+    def decode_batch(self, items):
+        """
+        一次解码多个连接的包
+
+        Args:
+            items: (key, opus_packet) 列表，同一连接的包按列表顺序解码
+
+        Returns:
+            list: 与items一一对应的PCM数据，解码失败的位置为对应异常
+        """
+        results = []
+        for key, opus_packet in items:
+            try:
+                results.append(self.decode(key, opus_packet))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _decode_pending(self, batch):
+        """解码工作线程取出的请求，已释放连接的请求取消，不再重新分配解码器"""
+        for key, session, opus_packet, future in batch:
+            if future.done():
+                continue
+            decoder = None
+            try:
+                decoder = self._acquire_session(key, session)
+                if decoder is None:
+                    future.cancel()
+                    continue
+                result = decoder.decode(opus_packet, self.frame_size)
+            except Exception as e:
+                result = e
+            finally:
+                if decoder is not None:
+                    self._finish_decode(decoder)
+            try:
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+            except InvalidStateError:
+                pass
+
+    def submit(self, key, opus_packet) -> Future:
+        """提交异步解码请求，结果通过Future返回"""
+        future = Future()
+        with self._cond:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="opus-decoder-pool", daemon=True
+                )
+                self._worker.start()
+            with self._lock:
+                session = self._sessions.setdefault(key, object())
+            self._pending.append((key, session, opus_packet, future))
+            self._cond.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                batch = list(self._pending)
+                self._pending.clear()
+            self._decode_pending(batch)
+
+    @property
+    def active_count(self):
+        return len(self._active)
@@ -0,0 +1,340 @@
+"""
+Opus编码器池与PCM分帧编码
+按 (采样率, 通道数, 应用类型, 编码参数) 复用编码器，避免每段音频都新建编码器；
+PCM只在末尾补零一次，所有帧以同一块连续内存的零拷贝视图给出，
+编码时直接把每帧的内存地址交给libopus，不再逐帧切片、补零和复制；
+较长的音频可以放到后台进程池中编码
+"""
+
+import os
+import ctypes
+import asyncio
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Any, List, Optional
+
+import numpy as np
+import opuslib_next
+
+try:
+    # opuslib_next 的内部接口，requirements.txt 中固定了 opuslib_next==1.1.5；
+    # 版本变化导致接口不存在时退回公开的 Encoder.encode
+    from opuslib_next.api import c_int16_pointer
+    from opuslib_next.api.encoder import libopus_encode
+except ImportError:
+    c_int16_pointer = libopus_encode = None
+
+# 单帧Opus数据的最大字节数
+MAX_PACKET_BYTES = 4000
+# 超过该采样点数（16kHz约30秒）的音频交给进程池编码
+PROCESS_POOL_MIN_SAMPLES = 16000 * 30
+
+
+class OpusEncoderPool:
+    """Opus编码器池，归还时重置编码状态，编码参数保持不变"""
+
+    def __init__(self, max_idle=16):
+        """
+        Args:
+            max_idle: 每种配置最多保留的空闲编码器数量
+        """
+        self.max_idle = max_idle
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _make_key(sample_rate, channels, application, bitrate, complexity, signal):
+        return (sample_rate, channels, application, bitrate, complexity, signal)
+
+    def acquire(
+        self,
+        sample_rate=16000,
+        channels=1,
+        application=opuslib_next.APPLICATION_AUDIO,
+        bitrate=None,
+        complexity=None,
+        signal=None,
+    ) -> opuslib_next.Encoder:
+        """取出一个编码器，没有空闲的则新建"""
+        key = self._make_key(
+            sample_rate, channels, application, bitrate, complexity, signal
+        )
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop()
+
+        encoder = opuslib_next.Encoder(sample_rate, channels, application)
+        if bitrate is not None:
+            encoder.bitrate = bitrate
+        if complexity is not None:
+            encoder.complexity = complexity
+        if signal is not None:
+            encoder.signal = signal
+        encoder._pool_key = key
+        return encoder
+
+    def release(self, encoder: opuslib_next.Encoder):
+        """归还编码器"""
+        key = getattr(encoder, "_pool_key", None)
+        if key is None:
+            return
+        try:
+            encoder.reset_state()
+        except Exception:
+            return
+        with self._lock:
+            idle = self._idle.setdefault(key, deque())
+            if len(idle) < self.max_idle:
+                idle.append(encoder)
+
+    @contextmanager
+    def encoder(self, *args, **kwargs):
+        """以上下文方式借用编码器"""
+        encoder = self.acquire(*args, **kwargs)
+        try:
+            yield encoder
+        finally:
+            self.release(encoder)
+
+
+# 进程内共享的编码器池
+encoder_pool = OpusEncoderPool()
+
+
+def frame_pcm(raw_data, frame_size: int, channels: int = 1) -> np.ndarray:
+    """
+    把PCM数据切分为定长帧
+
+    Args:
+        raw_data: 16位PCM数据，bytes或int16数组
+        frame_size: 每帧每通道的采样点数
+        channels: 通道数
+
+    Returns:
+        np.ndarray: 形状为 (帧数, frame_size*channels) 的int16数组；长度刚好整除时
+        是原数据的零拷贝视图，否则只在末尾补零复制一次
+    """
+    if isinstance(raw_data, np.ndarray):
+        samples = raw_data.astype(np.int16, copy=False).reshape(-1)
+    else:
+        samples = np.frombuffer(raw_data, dtype=np.int16)
+    frame_len = frame_size * channels
+    frame_count = -(-len(samples) // frame_len)
+    if frame_count * frame_len != len(samples):
+        padded = np.zeros(frame_count * frame_len, dtype=np.int16)
+        padded[: len(samples)] = samples
+        samples = padded
+    return np.ascontiguousarray(samples).reshape(frame_count, frame_len)
+
+
+def encode_frames(
+    encoder: opuslib_next.Encoder,
+    frames: np.ndarray,
+    frame_size: int,
+    callback: Optional[Callable[[Any], Any]] = None,
+) -> Optional[List[bytes]]:
+    """
+    逐帧编码 frame_pcm 得到的帧，直接把每帧在连续内存中的地址传给libopus；
+    opuslib_next 内部接口不可用时逐帧调用 Encoder.encode
+
+    Args:
+        encoder: Opus编码器
+        frames: frame_pcm 返回的帧数组
+        frame_size: 每帧每通道的采样点数
+        callback: 每编码一帧回调一次；为空时返回全部帧的列表
+    """
+    frames = np.ascontiguousarray(frames, dtype=np.int16)
+    datas = None if callback else []
+    if len(frames) == 0:
+        return datas
+    state = getattr(encoder, "encoder_state", None)
+    if libopus_encode is None or state is None:
+        for frame in frames:
+            packet = encoder.encode(frame.tobytes(), frame_size)
+            if callback:
+                callback(packet)
+            else:
+                datas.append(packet)
+        return datas
+
+    base = frames.ctypes.data
+    stride = frames.strides[0]
+    output = (ctypes.c_char * MAX_PACKET_BYTES)()
+    for i in range(len(frames)):
+        result = libopus_encode(
+            state,
+            ctypes.cast(base + i * stride, c_int16_pointer),
+            frame_size,
+            output,
+            MAX_PACKET_BYTES,
+        )
+        if result < 0:
+            raise opuslib_next.OpusError(result)
+        packet = ctypes.string_at(output, result)
+        if callback:
+            callback(packet)
+        else:
+            datas.append(packet)
+    return datas
+
+
+def pcm_to_opus_frames(
+    raw_data,
+    sample_rate: int = 16000,
+    channels: int = 1,
+    frame_duration: int = 60,
+    application=opuslib_next.APPLICATION_AUDIO,
+    callback: Optional[Callable[[Any], Any]] = None,
+) -> Optional[List[bytes]]:
+    """把整段PCM编码为Opus帧，末帧不足时补零"""
+    frame_size = sample_rate * frame_duration // 1000
+    frames = frame_pcm(raw_data, frame_size, channels)
+    with encoder_pool.encoder(sample_rate, channels, application) as encoder:
+        return encode_frames(encoder, frames, frame_size, callback)
+
+
+def pcm_to_pcm_frames(
+    raw_data,
+    sample_rate: int = 16000,
+    channels: int = 1,
+    frame_duration: int = 60,
+    callback: Optional[Callable[[Any], Any]] = None,
+) -> Optional[List[bytes]]:
+    """把整段PCM按帧切分，末帧不足时补零"""
+    frame_size = sample_rate * frame_duration // 1000
+    frames = frame_pcm(raw_data, frame_size, channels)
+    datas = None if callback else []
+    for frame in frames:
+        frame_data = frame.tobytes()
+        if callback:
+            callback(frame_data)
+        else:
+            datas.append(frame_data)
+    return datas
+
+
+class StreamingFrameEncoder:
+    """
+    流式分帧编码：PCM分块送入，凑够整帧立即编码输出，结束时最后一帧补零输出，
+    用于边解码边发送，内存中只保留不足一帧的余量
+    """
+
+    def __init__(
+        self,
+        is_opus: bool = True,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        frame_duration: int = 60,
+        application=opuslib_next.APPLICATION_AUDIO,
+    ):
+        self.is_opus = is_opus
+        self.channels = channels
+        self.frame_size = sample_rate * frame_duration // 1000
+        self.frame_len = self.frame_size * channels
+        self._remainder = np.zeros(0, dtype=np.int16)
+        self._encoder = (
+            encoder_pool.acquire(sample_rate, channels, application)
+            if is_opus
+            else None
+        )
+
+    def feed(self, pcm, callback: Callable[[Any], Any]):
+        """送入一段PCM，输出其中的完整帧"""
+        if isinstance(pcm, np.ndarray):
+            samples = pcm.astype(np.int16, copy=False)
+        else:
+            samples = np.frombuffer(pcm, dtype=np.int16)
+        if len(self._remainder):
+            samples = np.concatenate((self._remainder, samples))
+        usable = len(samples) // self.frame_len * self.frame_len
+        if usable:
+            self._emit(samples[:usable].reshape(-1, self.frame_len), callback)
+        self._remainder = samples[usable:].copy()
+
+    def flush(self, callback: Callable[[Any], Any]):
+        """输出剩余数据，不足一帧补零"""
+        if len(self._remainder):
+            self._emit(
+                frame_pcm(self._remainder, self.frame_size, self.channels), callback
+            )
+            self._remainder = np.zeros(0, dtype=np.int16)
+
+    def _emit(self, frames, callback):
+        if self.is_opus:
+            encode_frames(self._encoder, frames, self.frame_size, callback)
+        else:
+            for frame in frames:
+                callback(frame.tobytes())
+
+    def close(self):
+        """归还编码器"""
+        if self._encoder is not None:
+            encoder_pool.release(self._encoder)
+            self._encoder = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """获取编码用的后台进程池，首次调用时创建"""
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=max(1, min(4, (os.cpu_count() or 2) // 2))
+                )
+    return _process_pool
+
+
+async def pcm_to_opus_frames_async(
+    raw_data,
+    sample_rate: int = 16000,
+    channels: int = 1,
+    frame_duration: int = 60,
+    application=opuslib_next.APPLICATION_AUDIO,
+) -> List[bytes]:
+    """
+    异步编码整段PCM，较长的音频交给进程池，避免长时间占用GIL影响其他连接；
+    较短的音频在线程池中编码，省去进程间传输数据的开销
+    """
+    loop = asyncio.get_running_loop()
+    if isinstance(raw_data, np.ndarray):
+        sample_count = raw_data.size
+    else:
+        sample_count = len(raw_data) // 2
+    if sample_count >= PROCESS_POOL_MIN_SAMPLES:
+        try:
+            return await loop.run_in_executor(
+                get_process_pool(),
+                pcm_to_opus_frames,
+                bytes(raw_data),
+                sample_rate,
+                channels,
+                frame_duration,
+                application,
+            )
+        except BrokenProcessPool:
+            # 进程池不可用（如子进程已崩溃）时退回线程编码
+            pass
+    return await loop.run_in_executor(
+        None,
+        pcm_to_opus_frames,
+        raw_data,
+        sample_rate,
+        channels,
+        frame_duration,
+        application,
+    )
@@ -6,9 +6,9 @@ Opus编码工具类
 import logging
 import traceback
 import numpy as np
-from opuslib_next import Encoder
 from opuslib_next import constants
 from typing import Optional, Callable, Any
+from core.utils.opus_encoder_pool import encoder_pool, encode_frames
 
 class OpusEncoderUtils:
     """PCM到Opus的编码器"""
@@ -38,13 +38,15 @@ class OpusEncoderUtils:
         self.buffer = np.array([], dtype=np.int16)
 
         try:
-            # 创建Opus编码器
-            self.encoder = Encoder(
-                sample_rate, channels, constants.APPLICATION_AUDIO  # 音频优化模式
+            # 从编码器池中取出Opus编码器
+            self.encoder = encoder_pool.acquire(
+                sample_rate,
+                channels,
+                constants.APPLICATION_AUDIO,  # 音频优化模式
+                bitrate=self.bitrate,
+                complexity=self.complexity,
+                signal=constants.SIGNAL_VOICE,  # 语音信号优化
             )
-            self.encoder.bitrate = self.bitrate
-            self.encoder.complexity = self.complexity
-            self.encoder.signal = constants.SIGNAL_VOICE  # 语音信号优化
         except Exception as e:
             logging.error(f"初始化Opus编码器失败: {e}")
             raise RuntimeError("初始化失败") from e
@@ -73,20 +75,19 @@ class OpusEncoderUtils:
         self._validate_pcm_data(new_samples)
 
         # 将新数据追加到缓冲区
-        self.buffer = np.append(self.buffer, new_samples)
+        if len(self.buffer):
+            samples = np.concatenate((self.buffer, new_samples))
+        else:
+            samples = new_samples
 
-        offset = 0
-
-        # 处理所有完整帧
-        while offset <= len(self.buffer) - self.total_frame_size:
-            frame = self.buffer[offset : offset + self.total_frame_size]
-            output = self._encode(frame)
-            if output:
-                callback(output)
-            offset += self.total_frame_size
+        # 一次性编码所有完整帧
+        offset = len(samples) // self.total_frame_size * self.total_frame_size
+        if offset:
+            frames = samples[:offset].reshape(-1, self.total_frame_size)
+            self._encode_frames(frames, callback)
 
         # 保留未处理的样本
-        self.buffer = self.buffer[offset:]
+        self.buffer = samples[offset:].copy()
 
         # 流结束时处理剩余数据
         if end_of_stream and len(self.buffer) > 0:
@@ -99,6 +100,17 @@ class OpusEncoderUtils:
                 callback(output)
             self.buffer = np.array([], dtype=np.int16)
 
+    def _encode_frames(self, frames: np.ndarray, callback: Callable[[Any], Any]):
+        """编码多帧音频数据"""
+        try:
+            # 编码器已释放，跳过编码
+            if not hasattr(self, 'encoder') or self.encoder is None:
+                return
+            encode_frames(self.encoder, frames, self.frame_size, callback)
+        except Exception as e:
+            logging.error(f"Opus编码失败: {e}")
+            traceback.print_exc()
+
     def _encode(self, frame: np.ndarray) -> Optional[bytes]:
         """编码一帧音频数据"""
         try:
@@ -130,10 +142,10 @@ class OpusEncoderUtils:
             # np.clip(pcm_shorts, -32768, 32767, out=pcm_shorts)
 
     def close(self):
-        """关闭编码器并释放资源"""
+        """关闭编码器，归还到编码器池"""
         if hasattr(self, 'encoder') and self.encoder:
             try:
-                del self.encoder
+                encoder_pool.release(self.encoder)
                 self.encoder = None
             except Exception as e:
                 logging.error(f"Error releasing Opus encoder: {e}")
\ No newline at end of file
@@ -1,3 +1,4 @@
+import io
 import struct
 
 def decode_opus_from_file(input_file):
@@ -36,7 +37,6 @@ def decode_opus_from_bytes(input_bytes):
     """
     从p3二进制数据中解码 Opus 数据，并返回一个 Opus 数据包的列表以及总时长。
     """
-    import io
     opus_datas = []
     total_frames = 0
     sample_rate = 16000  # 文件采样率
@@ -56,4 +56,35 @@ def decode_opus_from_bytes(input_bytes):
         total_frames += 1
 
     total_duration = (total_frames * frame_duration_ms) / 1000.0
-    return opus_datas, total_duration
\ No newline at end of file
+    return opus_datas, total_duration
+
+
+def _iter_opus_packets(f):
+    """逐个读取p3数据中的Opus数据包"""
+    while True:
+        # 读取头部（4字节）：[1字节类型，1字节保留，2字节长度]
+        header = f.read(4)
+        if len(header) < 4:
+            break
+        _, _, data_len = struct.unpack('>BBH', header)
+        opus_data = f.read(data_len)
+        if len(opus_data) != data_len:
+            raise ValueError(f"Data length({len(opus_data)}) mismatch({data_len}).")
+        yield opus_data
+
+
+def decode_opus_from_file_stream(input_file, callback):
+    """
+    从p3文件中流式读取 Opus 数据包，每读到一个包就回调一次，不把整个文件读入内存
+    """
+    with open(input_file, 'rb') as f:
+        for opus_data in _iter_opus_packets(f):
+            callback(opus_data)
+
+
+def decode_opus_from_bytes_stream(input_bytes, callback):
+    """
+    从p3二进制数据中流式读取 Opus 数据包，每读到一个包就回调一次
+    """
+    for opus_data in _iter_opus_packets(io.BytesIO(input_bytes)):
+        callback(opus_data)
@@ -0,0 +1,135 @@
+"""
+定长环形缓冲区
+底层为预分配的numpy数组，读写不产生逐帧的内存分配，未读数据始终连续存放，
+可直接返回零拷贝视图。int16类型用于缓存PCM，object类型用于缓存opus数据包。
+growable 模式下超出容量时扩容而不丢数据，用于不能截断的录音（如手动聆听模式）
+"""
+
+import numpy as np
+
+
+class RingBuffer:
+    """预分配、定容量的环形缓冲区，超出容量时丢弃最旧的数据（growable 时扩容）"""
+
+    def __init__(self, capacity: int, dtype=np.int16, growable: bool = False):
+        """
+        Args:
+            capacity: 最多保留的元素个数（PCM为采样点数，数据包为包个数）
+            dtype: 元素类型，np.int16 缓存PCM，object 缓存数据包
+            growable: 超出容量时按倍数扩容而不是丢弃最旧的数据
+        """
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        self.growable = growable
+        # 存储区为容量的两倍，写到末尾时把未读数据整体移回开头，保证未读数据连续
+        self._data = np.empty(self.capacity * 2, dtype=self.dtype)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    def _grow(self, needed):
+        """扩容到至少能容纳needed个元素，未读数据移到新存储区开头"""
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        size = len(self)
+        data = np.empty(capacity * 2, dtype=self.dtype)
+        data[:size] = self._data[self._start : self._end]
+        self._data = data
+        self.capacity = capacity
+        self._start, self._end = 0, size
+
+    def _reserve(self, count):
+        """为写入count个元素腾出连续空间"""
+        if self.growable and len(self) + count > self.capacity:
+            self._grow(len(self) + count)
+        if count >= self.capacity:
+            self.clear()
+            return
+        # 超出容量时丢弃最旧的数据
+        overflow = len(self) + count - self.capacity
+        if overflow > 0:
+            self.consume(overflow)
+        if self._end + count > len(self._data):
+            size = len(self)
+            self._data[:size] = self._data[self._start : self._end]
+            if self.dtype == object:
+                # 释放已移走位置上的引用
+                self._data[size : self._end] = None
+            self._start, self._end = 0, size
+
+    def append(self, item):
+        """写入单个元素"""
+        self._reserve(1)
+        self._data[self._end] = item
+        self._end += 1
+
+    def extend(self, data):
+        """批量写入，PCM可直接传入bytes"""
+        if self.dtype == object:
+            for item in data:
+                self.append(item)
+            return
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            data = np.frombuffer(data, dtype=self.dtype)
+        count = len(data)
+        if count == 0:
+            return
+        if count > self.capacity and not self.growable:
+            data = data[-self.capacity :]
+            count = self.capacity
+            self.clear()
+        self._reserve(count)
+        self._data[self._end : self._end + count] = data
+        self._end += count
+
+    def view(self):
+        """全部未读数据的零拷贝视图，下一次写入前有效"""
+        return self._data[self._start : self._end]
+
+    def tail(self, count):
+        """最近写入的count个元素的零拷贝视图，用于预录音窗口"""
+        count = min(int(count), len(self))
+        return self._data[self._end - count : self._end]
+
+    def chunks(self, size):
+        """开头所有完整块的零拷贝视图，形状为 (块数, size)"""
+        usable = len(self) // size * size
+        return self._data[self._start : self._start + usable].reshape(-1, size)
+
+    def consume(self, count):
+        """丢弃最旧的count个元素"""
+        count = min(int(count), len(self))
+        if self.dtype == object:
+            self._data[self._start : self._start + count] = None
+        self._start += count
+        if self._start == self._end:
+            self._start = self._end = 0
+
+    def keep_last(self, count):
+        """只保留最近写入的count个元素"""
+        if len(self) > count:
+            self.consume(len(self) - count)
+
+    def clear(self):
+        if self.dtype == object:
+            self._data[self._start : self._end] = None
+        self._start = self._end = 0
+
+    def tolist(self):
+        """复制出全部未读数据"""
+        return self.view().tolist()
+
+    def copy(self):
+        return self.tolist()
+
+    def tobytes(self):
+        return self.view().tobytes()
@@ -0,0 +1,427 @@
+"""
+歌曲搜索索引
+在内存中维护音乐库的倒排索引，按歌名、歌手和拼音的n-gram召回候选，再用编辑距离精排，
+点歌时不再逐个文件做字符串比较；索引随音乐帧库的目录变化事件增量更新，
+并提供top-k查询接口，意图识别只需把最相关的几首歌放进提示词
+"""
+
+import os
+import re
+import math
+import heapq
+import threading
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+from config.logger import setup_logging
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:
+    lazy_pinyin = None
+
+TAG = __name__
+logger = setup_logging()
+
+# 文件名中歌名与歌手的分隔符，与在线点歌保存的 “歌名 - 歌手” 一致
+ARTIST_SEPARATOR = " - "
+# 进入精排的候选数量
+RERANK_CANDIDATES = 16
+# 出现在超过该比例歌曲中的n-gram区分度太低，召回时跳过
+MAX_DF_RATIO = 0.05
+
+_CLEAN_PATTERN = re.compile(r"[^一-龥a-z0-9]")
+_TOKEN_PATTERN = re.compile(r"[一-龥]|[a-z0-9]+")
+# 文件名中常见的括号附注，如 (Live)、【伴奏】
+_BRACKET_PATTERN = re.compile(r"[(（\[【].*?[)）\]】]")
+
+
+class SongMatch(NamedTuple):
+    path: str  # 相对于音乐目录的路径
+    title: str
+    artist: str
+    score: float
+
+
+class _SongEntry(NamedTuple):
+    path: str
+    title: str
+    artist: str
+    title_key: str  # 归一化后的歌名
+    artist_key: str
+    title_pinyin: str
+    grams: tuple
+
+
+def normalize(text: str) -> str:
+    """转小写并去掉中文、字母、数字以外的字符"""
+    return _CLEAN_PATTERN.sub("", (text or "").lower())
+
+
+def parse_song_path(path: str):
+    """
+    从相对路径解析歌名和歌手
+
+    “歌名 - 歌手.mp3” 按分隔符拆分；否则以上级目录名作为歌手（cache目录除外）
+
+    Returns:
+        tuple: (歌名, 歌手)
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if ARTIST_SEPARATOR in stem:
+        title, artist = stem.split(ARTIST_SEPARATOR, 1)
+        return title.strip(), artist.strip()
+    parent = os.path.basename(os.path.dirname(path))
+    if parent and parent != "cache":
+        return stem.strip(), parent
+    return stem.strip(), ""
+
+
+_pinyin_cache: Dict[str, str] = {}
+
+
+def _char_pinyin(char: str) -> str:
+    """单个汉字的不带声调拼音，按字缓存；多音字取常用读音，查询与建索引保持一致即可"""
+    syllable = _pinyin_cache.get(char)
+    if syllable is None:
+        syllable = lazy_pinyin(char)[0]
+        _pinyin_cache[char] = syllable
+    return syllable
+
+
+def _tokens(key: str) -> List[str]:
+    """汉字逐字成词，连续的字母数字作为一个词"""
+    return _TOKEN_PATTERN.findall(key)
+
+
+def _pinyin_tokens(tokens: List[str]) -> List[str]:
+    if lazy_pinyin is None:
+        return []
+    return [_char_pinyin(t) if "一" <= t[0] <= "龥" else t for t in tokens]
+
+
+def _has_hanzi(tokens: List[str]) -> bool:
+    return any("一" <= t[0] <= "龥" for t in tokens)
+
+
+def _token_grams(prefix: str, tokens: List[str], with_words=True) -> List[str]:
+    """相邻两个词组成bigram；只有一个词时使用该词本身，英文单词也单独收录"""
+    if not tokens:
+        return []
+    if len(tokens) == 1:
+        return [prefix + tokens[0]]
+    grams = [f"{prefix}{a}\x1f{b}" for a, b in zip(tokens, tokens[1:])]
+    if with_words:
+        grams.extend(prefix + t for t in tokens if len(t) > 1)
+    return grams
+
+
+def _text_grams(key: str) -> set:
+    """一段归一化文本的字n-gram与拼音n-gram"""
+    tokens = _tokens(key)
+    grams = set(_token_grams("c:", tokens))
+    if _has_hanzi(tokens):
+        # 单个音节区分度太低，拼音只收录bigram
+        grams.update(_token_grams("p:", _pinyin_tokens(tokens), with_words=False))
+    return grams
+
+
+class _EditDistance:
+    """
+    位并行的编辑距离（Myers/Hyyrö算法），每个字符只需常数次整数位运算；
+    查询串的字符位图只在构造时计算一次，之后与多个候选比较
+    """
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self._peq = {}
+        for i, char in enumerate(pattern):
+            self._peq[char] = self._peq.get(char, 0) | (1 << i)
+        self._mask = (1 << len(pattern)) - 1
+        self._high = 1 << (len(pattern) - 1) if pattern else 0
+
+    def distance(self, text: str) -> int:
+        if not self.pattern:
+            return len(text)
+        peq, mask, high = self._peq, self._mask, self._high
+        pv, mv, distance = mask, 0, len(self.pattern)
+        for char in text:
+            eq = peq.get(char, 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | ~(xh | pv)
+            mh = pv & xh
+            if ph & high:
+                distance += 1
+            elif mh & high:
+                distance -= 1
+            ph = (ph << 1) | 1
+            pv = ((mh << 1) | ~(xv | ph)) & mask
+            mv = ph & xv & mask
+        return distance
+
+    def similarity(self, text: str, floor: float = -1.0) -> float:
+        """
+        基于编辑距离的相似度，取值0~1
+
+        Args:
+            floor: 调用方已有的得分；相似度上界不超过它时不再计算编辑距离，返回0
+        """
+        if not self.pattern or not text:
+            return 0.0
+        longest = max(len(self.pattern), len(text))
+        # 编辑距离不小于 长串长度-两串共有字符数，相似度上界为 共有字符数/长串长度；
+        # 先用长度估计共有字符数，不够再数一遍text中出现在查询串里的字符
+        common = min(len(self.pattern), len(text))
+        if common / longest <= floor:
+            return 0.0
+        if floor > 0:
+            common = min(common, sum(map(self._peq.__contains__, text)))
+            if common / longest <= floor:
+                return 0.0
+        return 1 - self.distance(text) / longest
+
+
+def similarity(a: str, b: str) -> float:
+    """基于编辑距离的相似度，取值0~1"""
+    return _EditDistance(a).similarity(b)
+
+
+def _kth_largest(scores: List[float], k: int) -> float:
+    """第k大的得分，不足k个时返回负无穷"""
+    if k <= 0 or len(scores) < k:
+        return float("-inf")
+    return heapq.nlargest(k, scores)[-1]
+
+
+class SongIndex:
+    """歌曲倒排索引，线程安全"""
+
+    def __init__(self):
+        self._entries: Dict[str, _SongEntry] = {}
+        self._postings: Dict[str, set] = defaultdict(set)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, path):
+        return path in self._entries
+
+    @staticmethod
+    def _make_entry(path: str) -> _SongEntry:
+        title, artist = parse_song_path(path)
+        title_key = normalize(title)
+        # 带括号附注的歌名同时按去掉附注后的歌名收录
+        bare_key = normalize(_BRACKET_PATTERN.sub("", title))
+        artist_key = normalize(artist)
+        grams = _text_grams(title_key) | _text_grams(bare_key) | _text_grams(artist_key)
+        title_pinyin = "".join(_pinyin_tokens(_tokens(bare_key or title_key)))
+        return _SongEntry(
+            path,
+            title,
+            artist,
+            bare_key or title_key,
+            artist_key,
+            title_pinyin,
+            tuple(grams),
+        )
+
+    def add(self, path: str):
+        entry = self._make_entry(path)
+        with self._lock:
+            if path in self._entries:
+                self._remove_locked(path)
+            self._entries[path] = entry
+            for gram in entry.grams:
+                self._postings[gram].add(path)
+
+    def remove(self, path: str):
+        with self._lock:
+            self._remove_locked(path)
+
+    def _remove_locked(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is None:
+            return
+        for gram in entry.grams:
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(path)
+                if not posting:
+                    del self._postings[gram]
+
+    def update(self, added=(), removed=()):
+        """应用一批目录变化事件"""
+        for path in removed:
+            self.remove(path)
+        for path in added:
+            self.add(path)
+
+    def rebuild(self, paths):
+        """用完整的歌曲清单重建索引"""
+        entries = [self._make_entry(path) for path in paths]
+        postings = defaultdict(set)
+        for entry in entries:
+            for gram in entry.grams:
+                postings[gram].add(entry.path)
+        with self._lock:
+            self._entries = {entry.path: entry for entry in entries}
+            self._postings = postings
+        logger.bind(tag=TAG).info(f"歌曲索引已重建，共{len(entries)}首")
+
+    def paths(self, subdir: str = None) -> List[str]:
+        with self._lock:
+            paths = list(self._entries)
+        if subdir:
+            prefix = subdir.rstrip(os.sep) + os.sep
+            paths = [path for path in paths if path.startswith(prefix)]
+        return paths
+
+    def _recall(self, grams) -> Dict[str, float]:
+        """按n-gram召回候选，返回 路径 -> 命中的idf权重占比"""
+        total = len(self._entries)
+        max_df = max(64, int(total * MAX_DF_RATIO))
+        weighted = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            df = len(posting) if posting else 0
+            weighted.append((df, math.log(1 + total / (1 + df)), posting))
+        query_weight = sum(weight for _, weight, _ in weighted) or 1.0
+        # 全部都是高频n-gram时仍然用它们召回，否则跳过
+        usable = [item for item in weighted if 0 < item[0] <= max_df]
+        if not usable:
+            usable = sorted(
+                (item for item in weighted if item[0]), key=lambda item: item[0]
+            )[:1]
+        # 召回集合可能有上千首，权重先归一化，累加时少一次遍历
+        scores = {}
+        get = scores.get
+        for _, weight, posting in usable:
+            weight /= query_weight
+            for path in posting:
+                scores[path] = get(path, 0.0) + weight
+        return scores
+
+    @staticmethod
+    def _literal_score(
+        entry: _SongEntry, query: _EditDistance, floor: float = -1.0
+    ) -> float:
+        """
+        按字面比较的精排得分，取值0~1
+
+        Args:
+            floor: 低于它的得分进不了结果，上界不超过它的比较直接跳过，此时返回的得分可能偏低
+        """
+        title, artist = entry.title_key, entry.artist_key
+        query_key = query.pattern
+        score = 0.0
+        # 查询中完整包含歌名，如 “周杰伦的晴天”；先算出这个下限，后面上界达不到的比较直接跳过
+        if len(title) >= 2 and (title in query_key or query_key in title):
+            overlap = min(len(title), len(query_key)) / max(len(title), len(query_key))
+            score = 0.85 + 0.15 * overlap
+        score = max(score, query.similarity(title, max(score, floor)))
+        if artist and len(query_key) > len(title):
+            # 查询比歌名长时才可能带了歌手
+            score = max(score, query.similarity(title + artist, max(score, floor)))
+            score = max(score, query.similarity(artist + title, max(score, floor)))
+        return score
+
+    @staticmethod
+    def _is_literal_hit(entry: _SongEntry, query_key: str) -> bool:
+        """查询就是这首歌的歌名，或完整带了歌名和歌手"""
+        title, artist = entry.title_key, entry.artist_key
+        if title == query_key:
+            return True
+        return (
+            bool(artist)
+            and len(title) >= 2
+            and title in query_key
+            and artist in query_key
+        )
+
+    def search(self, query: str, top_k: int = 5, subdir: str = None) -> List[SongMatch]:
+        """
+        查找最匹配的歌曲
+
+        Args:
+            query: 歌名，可以带歌手，如 “晴天 周杰伦”
+            top_k: 最多返回的结果数量
+            subdir: 只在某个子目录中查找，如 cache
+
+        Returns:
+            List[SongMatch]: 按得分从高到低排列
+        """
+        query_key = normalize(query)
+        if not query_key:
+            return []
+        tokens = _tokens(query_key)
+        query = _EditDistance(query_key)
+        pinyin = _EditDistance(
+            "".join(_pinyin_tokens(tokens)) if _has_hanzi(tokens) else ""
+        )
+        grams = _text_grams(query_key)
+        prefix = subdir.rstrip(os.sep) + os.sep if subdir else None
+        with self._lock:
+            recalled = self._recall(grams)
+            if prefix:
+                recalled = {p: s for p, s in recalled.items() if p.startswith(prefix)}
+            candidates = heapq.nlargest(
+                RERANK_CANDIDATES, recalled.items(), key=lambda item: item[1]
+            )
+            # [最终得分, 精排得分, 召回加分, 歌曲]；精排得分为主，召回得分用于区分同分的结果。
+            # 候选按召回得分从高到低精排，精排得分达不到当前第 top_k 名的比较不必算准
+            scored = []
+            leaders = []  # 当前前 top_k 名的最终得分（小顶堆）
+            for path, recall_score in candidates:
+                entry = self._entries[path]
+                bonus = 0.1 * min(recall_score, 1.0)
+                floor = -1.0
+                if leaders and len(leaders) >= top_k:
+                    floor = (leaders[0] - bonus) / 0.9
+                score = self._literal_score(entry, query, floor)
+                scored.append([0.9 * score + bonus, score, bonus, entry])
+                if len(leaders) < top_k:
+                    heapq.heappush(leaders, scored[-1][0])
+                elif leaders and scored[-1][0] > leaders[0]:
+                    heapq.heapreplace(leaders, scored[-1][0])
+
+            # 同音字（语音识别常见错误）按拼音比较，略低于字面完全匹配；
+            # 查询与某首歌的歌名一致，或同时带了完整的歌名和歌手时，不是同音字的问题，
+            # 拼音得分也排不到它前面，不再比较拼音
+            literal_hit = any(
+                self._is_literal_hit(item[3], query_key) for item in scored
+            )
+            if pinyin.pattern and not literal_hit:
+                kth = _kth_largest([item[0] for item in scored], top_k)
+                for item in scored:
+                    _, score, bonus, entry = item
+                    bound = max(score, (kth - bonus) / 0.9)
+                    if bound >= 0.95 or not entry.title_pinyin:
+                        continue
+                    score = pinyin.similarity(entry.title_pinyin, bound / 0.95) * 0.95
+                    if score > item[1]:
+                        item[0], item[1] = 0.9 * score + bonus, score
+                        kth = _kth_largest([item[0] for item in scored], top_k)
+
+            results = [
+                SongMatch(entry.path, entry.title, entry.artist, round(final, 4))
+                for final, _, _, entry in scored
+            ]
+        results.sort(key=lambda match: match.score, reverse=True)
+        return results[:top_k]
+
+
+# 全局单例
+_song_index = None
+_song_index_lock = threading.Lock()
+
+
+def get_song_index() -> SongIndex:
+    """获取全局歌曲索引（单例模式）"""
+    global _song_index
+    if _song_index is None:
+        with _song_index_lock:
+            if _song_index is None:
+                _song_index = SongIndex()
+    return _song_index
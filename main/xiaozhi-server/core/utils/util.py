@@ -7,11 +7,15 @@ import socket
 import asyncio
 import requests
 import subprocess
-import numpy as np
 import opuslib_next
 from io import BytesIO
 from core.utils import p3
-from pydub import AudioSegment
+from core.utils.audio_decoder import iter_pcm_chunks, stream_audio_to_frames
+from core.utils.opus_encoder_pool import (
+    pcm_to_opus_frames,
+    pcm_to_opus_frames_async,
+    pcm_to_pcm_frames,
+)
 from typing import Callable, Any
 
 TAG = __name__
@@ -273,17 +277,8 @@ def audio_to_data_stream(
     file_type = os.path.splitext(audio_file_path)[1]
     if file_type:
         file_type = file_type.lstrip(".")
-    # 读取音频文件，-nostdin 参数：不要从标准输入读取数据，否则FFmpeg会阻塞
-    audio = AudioSegment.from_file(
-        audio_file_path, format=file_type, parameters=["-nostdin"]
-    )
-
-    # 转换为单声道/16kHz采样率/16位小端编码（确保与编码器匹配）
-    audio = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
-
-    # 获取原始PCM数据（16位小端）
-    raw_data = audio.raw_data
-    pcm_to_data_stream(raw_data, is_opus, callback)
+    # 边解码边编码发送，转换为单声道/16kHz采样率/16位小端编码（确保与编码器匹配）
+    stream_audio_to_frames(audio_file_path, file_type, is_opus, callback)
 
 
 async def audio_to_data(
@@ -308,54 +303,18 @@ async def audio_to_data(
         if cached_result is not None:
             return cached_result
 
-    def _sync_audio_to_data():
-        # 获取文件后缀名
-        file_type = os.path.splitext(audio_file_path)[1]
-        if file_type:
-            file_type = file_type.lstrip(".")
-        # 读取音频文件，-nostdin 参数：不要从标准输入读取数据，否则FFmpeg会阻塞
-        audio = AudioSegment.from_file(
-            audio_file_path, format=file_type, parameters=["-nostdin"]
-        )
-
+    def _sync_audio_to_pcm():
         # 转换为单声道/16kHz采样率/16位小端编码（确保与编码器匹配）
-        audio = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
-
-        # 获取原始PCM数据（16位小端）
-        raw_data = audio.raw_data
-
-        # 初始化Opus编码器
-        encoder = opuslib_next.Encoder(16000, 1, opuslib_next.APPLICATION_AUDIO)
-
-        # 编码参数
-        frame_duration = 60  # 60ms per frame
-        frame_size = int(16000 * frame_duration / 1000)  # 960 samples/frame
-
-        datas = []
-        # 按帧处理所有音频数据（包括最后一帧可能补零）
-        for i in range(0, len(raw_data), frame_size * 2):  # 16bit=2bytes/sample
-            # 获取当前帧的二进制数据
-            chunk = raw_data[i : i + frame_size * 2]
-
-            # 如果最后一帧不足，补零
-            if len(chunk) < frame_size * 2:
-                chunk += b"\x00" * (frame_size * 2 - len(chunk))
-
-            if is_opus:
-                # 转换为numpy数组处理
-                np_frame = np.frombuffer(chunk, dtype=np.int16)
-                # 编码Opus数据
-                frame_data = encoder.encode(np_frame.tobytes(), frame_size)
-            else:
-                frame_data = chunk if isinstance(chunk, bytes) else bytes(chunk)
-
-            datas.append(frame_data)
-
-        return datas
+        return b"".join(iter_pcm_chunks(audio_file_path))
 
     loop = asyncio.get_running_loop()
-    # 在单独的线程中执行同步的音频处理操作
-    result = await loop.run_in_executor(None, _sync_audio_to_data)
+    # 在单独的线程中执行同步的音频解码操作
+    raw_data = await loop.run_in_executor(None, _sync_audio_to_pcm)
+    if is_opus:
+        # 较长的音频会交给后台进程池编码
+        result = await pcm_to_opus_frames_async(raw_data)
+    else:
+        result = pcm_to_pcm_frames(raw_data)
 
     # 将结果存入缓存，使用配置中定义的TTL（10分钟）
     if use_cache:
@@ -374,41 +333,16 @@ def audio_bytes_to_data_stream(
         # 直接用p3解码
         return p3.decode_opus_from_bytes_stream(audio_bytes, callback)
     else:
-        # 其他格式用pydub
-        audio = AudioSegment.from_file(
-            BytesIO(audio_bytes), format=file_type, parameters=["-nostdin"]
-        )
-        audio = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
-        raw_data = audio.raw_data
-        pcm_to_data_stream(raw_data, is_opus, callback)
+        # 其他格式边解码边编码
+        stream_audio_to_frames(audio_bytes, file_type, is_opus, callback)
 
 
 def pcm_to_data_stream(raw_data, is_opus=True, callback: Callable[[Any], Any] = None):
-    # 初始化Opus编码器
-    encoder = opuslib_next.Encoder(16000, 1, opuslib_next.APPLICATION_AUDIO)
-
-    # 编码参数
-    frame_duration = 60  # 60ms per frame
-    frame_size = int(16000 * frame_duration / 1000)  # 960 samples/frame
-
-    # 按帧处理所有音频数据（包括最后一帧可能补零）
-    for i in range(0, len(raw_data), frame_size * 2):  # 16bit=2bytes/sample
-        # 获取当前帧的二进制数据
-        chunk = raw_data[i : i + frame_size * 2]
-
-        # 如果最后一帧不足，补零
-        if len(chunk) < frame_size * 2:
-            chunk += b"\x00" * (frame_size * 2 - len(chunk))
-
-        if is_opus:
-            # 转换为numpy数组处理
-            np_frame = np.frombuffer(chunk, dtype=np.int16)
-            # 编码Opus数据
-            frame_data = encoder.encode(np_frame.tobytes(), frame_size)
-            callback(frame_data)
-        else:
-            frame_data = chunk if isinstance(chunk, bytes) else bytes(chunk)
-            callback(frame_data)
+    # 按60ms分帧，最后一帧不足时补零；Opus编码器从编码器池中复用
+    if is_opus:
+        pcm_to_opus_frames(raw_data, frame_duration=60, callback=callback)
+    else:
+        pcm_to_pcm_frames(raw_data, frame_duration=60, callback=callback)
 
 
 def opus_datas_to_wav_bytes(opus_datas, sample_rate=16000, channels=1):
@@ -40,8 +40,16 @@ TAG = __name__
 
 
 class WebSocketServer:
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, stats=None, reuse_port=False):
+        """
+        Args:
+            config: 配置
+            stats: 连接数统计，多进程模式下写入共享内存
+            reuse_port: 多进程模式下多个工作进程监听同一端口
+        """
         self.config = config
+        self.stats = stats
+        self.reuse_port = reuse_port
         self.logger = setup_logging()
         self.config_lock = asyncio.Lock()
         modules = initialize_modules(
@@ -76,7 +84,11 @@ class WebSocketServer:
         # logger.info(f"当前活动连接数: {len(self.active_connections)}")
 
         async with websockets.serve(
-            self._handle_connection, host, port, process_request=self._http_response
+            self._handle_connection,
+            host,
+            port,
+            process_request=self._http_response,
+            reuse_port=self.reuse_port or None,
         ):
             await asyncio.Future()
 
@@ -125,11 +137,16 @@ class WebSocketServer:
             self._intent,
             self,  # 传入server实例
         )
+        if self.stats is not None:
+            self.stats.add("active_connections")
+            self.stats.add("total_connections")
         try:
             await handler.handle_connection(websocket)
         except Exception as e:
             self.logger.bind(tag=TAG).error(f"处理连接时出错: {e}")
         finally:
+            if self.stats is not None:
+                self.stats.add("active_connections", -1)
             # 强制关闭连接（如果还没有关闭的话）
             try:
                 # 安全地检查WebSocket状态并关闭
@@ -0,0 +1,302 @@
+"""
+多进程工作模式
+主进程只运行HTTP服务并管理子进程：多个工作进程通过 SO_REUSEPORT 监听同一个websocket端口，
+由内核把设备连接分散到各进程；本地VAD/ASR模型只在模型宿主进程中加载一次。
+各进程的连接数等统计写入共享内存，主进程汇总后通过 /xiaozhi/stats 接口返回
+"""
+
+import os
+import sys
+import time
+import signal
+import asyncio
+import multiprocessing
+from typing import Dict, List, Optional
+
+import psutil
+from config.logger import setup_logging
+from core.utils.model_host import hosted_modules, run_model_host
+
+TAG = __name__
+logger = setup_logging()
+
+# 每个工作进程在共享统计数组中的字段
+WORKER_FIELDS = ("pid", "active_connections", "total_connections", "started_at")
+# 模型宿主进程的统计字段
+HOST_FIELDS = ("pid", "vad_frames", "asr_requests", "started_at")
+# 子进程退出后重新拉起前的等待时间（秒）
+RESTART_DELAY = 2
+
+
+class SharedStats:
+    """共享内存中的一组计数器，每个字段只由一个进程写入"""
+
+    def __init__(self, ctx, fields, rows=1):
+        self.fields = fields
+        self.rows = rows
+        self._values = ctx.Array("q", len(fields) * rows, lock=False)
+
+    def _index(self, name, row):
+        return row * len(self.fields) + self.fields.index(name)
+
+    def set(self, name, value, row=0):
+        self._values[self._index(name, row)] = int(value)
+
+    def add(self, name, value=1, row=0):
+        self._values[self._index(name, row)] += int(value)
+
+    def get(self, name, row=0) -> int:
+        return self._values[self._index(name, row)]
+
+    def row(self, row=0) -> Dict[str, int]:
+        return {name: self.get(name, row) for name in self.fields}
+
+    def view(self, row) -> "StatsView":
+        return StatsView(self, row)
+
+
+class StatsView:
+    """SharedStats 中某一行的视图，交给工作进程更新自己的计数"""
+
+    def __init__(self, stats: SharedStats, row: int):
+        self.stats = stats
+        self.row = row
+
+    def set(self, name, value):
+        self.stats.set(name, value, self.row)
+
+    def add(self, name, value=1):
+        self.stats.add(name, value, self.row)
+
+
+# 按PID缓存的进程对象，cpu_percent 需要同一个对象两次采样之间的差值
+_processes: Dict[int, psutil.Process] = {}
+
+
+def _process_usage(pid) -> Dict[str, float]:
+    try:
+        process = _processes.get(pid)
+        if process is None or not process.is_running():
+            process = _processes[pid] = psutil.Process(pid)
+        return {
+            "rss_mb": round(process.memory_info().rss / 1024 / 1024, 1),
+            "cpu_percent": process.cpu_percent(interval=None),
+            "threads": process.num_threads(),
+        }
+    except (psutil.Error, ValueError):
+        return {}
+
+
+def _start_stats(stats: StatsView):
+    stats.set("pid", os.getpid())
+    stats.set("started_at", int(time.time()))
+
+
+def run_worker(worker_id: int, config: dict, channels: Optional[dict], modules, stats):
+    """工作进程入口"""
+    from core.utils.model_host import init_model_host_client
+
+    _start_stats(stats)
+    client = None
+    if channels is not None:
+        client = init_model_host_client(worker_id, channels, modules)
+    try:
+        asyncio.run(_worker_main(config, stats))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if client is not None:
+            client.close()
+
+
+async def _worker_main(config: dict, stats: StatsView):
+    # 延迟导入，避免主进程加载连接相关模块
+    from core.websocket_server import WebSocketServer
+    from core.utils.gc_manager import get_gc_manager
+    from core.utils.cache.tts_cache import get_tts_audio_cache
+    from core.utils.connection_runtime import get_connection_runtime
+    from core.providers.tools.server_mcp.mcp_pool import get_server_mcp_pool
+
+    get_tts_audio_cache(config.get("tts_cache"))
+    connection_runtime = get_connection_runtime(config.get("connection_runtime"))
+    server_mcp_pool = get_server_mcp_pool()
+    mcp_pool_task = asyncio.create_task(server_mcp_pool.start())
+    gc_manager = get_gc_manager(interval_seconds=300)
+    await gc_manager.start()
+
+    ws_server = WebSocketServer(config, stats=stats, reuse_port=True)
+    ws_task = asyncio.create_task(ws_server.start())
+    logger.bind(tag=TAG).info(f"工作进程已启动: pid={os.getpid()}")
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+    await stop_event.wait()
+
+    ws_task.cancel()
+    mcp_pool_task.cancel()
+    await gc_manager.stop()
+    connection_runtime.shutdown()
+    await server_mcp_pool.shutdown()
+    await asyncio.wait([ws_task], timeout=3.0)
+
+
+class WorkerManager:
+    """在主进程中启动、监控工作进程和模型宿主进程"""
+
+    def __init__(self, config: dict, workers: int):
+        self.config = config
+        self.workers = workers
+        self.ctx = multiprocessing.get_context("spawn")
+        self.modules = hosted_modules(config)
+        self.worker_stats = SharedStats(self.ctx, WORKER_FIELDS, workers)
+        self.host_stats = SharedStats(self.ctx, HOST_FIELDS)
+        self.channels: Optional[dict] = None
+        self.host: Optional[multiprocessing.Process] = None
+        self.processes: List[Optional[multiprocessing.Process]] = [None] * workers
+        self.restarts = 0
+        self._stopping = False
+
+    @staticmethod
+    def supported() -> bool:
+        """SO_REUSEPORT 只在类Unix系统上可用"""
+        return sys.platform != "win32"
+
+    def _worker_channels(self, worker_id):
+        if self.channels is None:
+            return None
+        return {
+            "requests": self.channels["requests"],
+            "responses": self.channels["responses"][worker_id],
+        }
+
+    def _start_host(self):
+        ready = self.ctx.Event()
+        self.host_stats.set("pid", 0)
+        self.host = self.ctx.Process(
+            target=run_model_host,
+            args=(self.config, self.channels, self.modules, self.host_stats.view(0), ready),
+            name="xiaozhi-model-host",
+            daemon=True,
+        )
+        self.host.start()
+        self.host_stats.set("pid", self.host.pid)
+        self.host_stats.set("started_at", int(time.time()))
+        return ready
+
+    def _start_worker(self, worker_id):
+        process = self.ctx.Process(
+            target=run_worker,
+            args=(
+                worker_id,
+                self.config,
+                self._worker_channels(worker_id),
+                self.modules,
+                self.worker_stats.view(worker_id),
+            ),
+            name=f"xiaozhi-worker-{worker_id}",
+            daemon=True,
+        )
+        # 进程异常退出时上次的连接数已无意义
+        self.worker_stats.set("active_connections", 0, worker_id)
+        process.start()
+        self.processes[worker_id] = process
+
+    async def start(self):
+        if self.modules:
+            self.channels = {
+                "requests": self.ctx.Queue(),
+                "responses": [self.ctx.Queue() for _ in range(self.workers)],
+            }
+            ready = self._start_host()
+            # 模型加载完成后再启动工作进程，避免设备连上时模型还不可用
+            await asyncio.get_running_loop().run_in_executor(None, ready.wait)
+            logger.bind(tag=TAG).info(f"模型宿主进程已加载: {self.modules}")
+        for worker_id in range(self.workers):
+            self._start_worker(worker_id)
+        logger.bind(tag=TAG).info(f"已启动{self.workers}个工作进程")
+
+    async def supervise(self):
+        """子进程意外退出时重新拉起"""
+        while not self._stopping:
+            await asyncio.sleep(RESTART_DELAY)
+            if self.host is not None and not self.host.is_alive():
+                logger.bind(tag=TAG).error(
+                    f"模型宿主进程已退出(exitcode={self.host.exitcode})，正在重启"
+                )
+                self.restarts += 1
+                self._start_host()
+            for worker_id, process in enumerate(self.processes):
+                if process is not None and not process.is_alive():
+                    logger.bind(tag=TAG).error(
+                        f"工作进程{worker_id}已退出(exitcode={process.exitcode})，正在重启"
+                    )
+                    self.restarts += 1
+                    self._start_worker(worker_id)
+
+    def stop(self):
+        self._stopping = True
+        for process in self.processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            if process is not None:
+                process.join(timeout=5)
+        if self.host is not None:
+            self.channels["requests"].put(None)
+            self.host.join(timeout=5)
+            if self.host.is_alive():
+                self.host.terminate()
+
+    def snapshot(self) -> dict:
+        """汇总各进程的统计信息"""
+        workers = []
+        for worker_id, process in enumerate(self.processes):
+            row = self.worker_stats.row(worker_id)
+            row["worker_id"] = worker_id
+            row["alive"] = process is not None and process.is_alive()
+            row.update(_process_usage(row["pid"]) if row["alive"] else {})
+            workers.append(row)
+        snapshot = {
+            "mode": "multi_process",
+            "workers": workers,
+            "active_connections": sum(w["active_connections"] for w in workers),
+            "total_connections": sum(w["total_connections"] for w in workers),
+            "restarts": self.restarts,
+            "master": _process_usage(os.getpid()),
+        }
+        if self.host is not None:
+            host = self.host_stats.row()
+            host["alive"] = self.host.is_alive()
+            host["modules"] = self.modules
+            host.update(_process_usage(host["pid"]) if host["alive"] else {})
+            snapshot["model_host"] = host
+        snapshot["rss_mb"] = round(
+            sum(
+                item.get("rss_mb", 0)
+                for item in workers + [snapshot["master"], snapshot.get("model_host", {})]
+            ),
+            1,
+        )
+        return snapshot
+
+
+def single_process_stats() -> SharedStats:
+    """单进程模式下的统计，接口返回格式与多进程模式一致"""
+    stats = SharedStats(multiprocessing.get_context(), WORKER_FIELDS)
+    _start_stats(stats.view(0))
+    return stats
+
+
+def single_process_snapshot(stats: SharedStats) -> dict:
+    row = stats.row()
+    row.update(_process_usage(row["pid"]))
+    return {
+        "mode": "single_process",
+        "workers": [row],
+        "active_connections": row["active_connections"],
+        "total_connections": row["total_connections"],
+        "restarts": 0,
+        "rss_mb": row.get("rss_mb", 0),
+    }
@@ -0,0 +1,137 @@
+import os
+import time
+import wave
+import asyncio
+import logging
+import statistics
+
+import numpy as np
+from tabulate import tabulate
+from core.utils.asr import create_instance as create_stt_instance
+
+# 设置全局日志级别为WARNING，抑制INFO级别日志
+logging.basicConfig(level=logging.WARNING)
+
+description = "本地FunASR批量识别吞吐与延迟测试"
+
+MODEL_DIR = "models/SenseVoiceSmall"
+OUTPUT_DIR = "tmp/"
+# 同时说完一句话的设备数
+CONCURRENCY_LEVELS = [1, 4, 8, 16, 32]
+# 每个设备连续识别的句数
+UTTERANCES_PER_DEVICE = 3
+BATCH_SIZE = 16
+BATCH_MAX_WAIT_MS = 10
+
+
+def _load_test_audio():
+    """读取 config/assets 下的wav提示音作为测试语句，统一转换为16kHz单声道PCM"""
+    wav_root = os.path.join(os.getcwd(), "config", "assets")
+    samples = []
+    for file_name in sorted(os.listdir(wav_root)):
+        if not file_name.endswith(".wav"):
+            continue
+        with wave.open(os.path.join(wav_root, file_name), "rb") as f:
+            if f.getsampwidth() != 2:
+                continue
+            channels, rate = f.getnchannels(), f.getframerate()
+            pcm = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+        pcm = pcm.reshape(-1, channels).mean(axis=1)
+        if rate != 16000:
+            positions = np.arange(0, len(pcm), rate / 16000)
+            pcm = np.interp(positions, np.arange(len(pcm)), pcm)
+        samples.append(pcm.astype(np.int16).tobytes())
+    return samples
+
+
+class ASRBatchPerformanceTester:
+    def __init__(self):
+        self.samples = _load_test_audio()
+        self.results = []
+
+    async def _device(self, asr, device_index, latencies):
+        """模拟一个设备：说完一句后等待识别结果，再说下一句"""
+        for i in range(UTTERANCES_PER_DEVICE):
+            pcm = self.samples[(device_index + i) % len(self.samples)]
+            start = time.perf_counter()
+            await asr.speech_to_text([pcm], f"bench-{device_index}", "pcm")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    async def _run_level(self, asr, concurrency):
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(self._device(asr, i, latencies) for i in range(concurrency))
+        )
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        return {
+            "throughput": len(latencies) / elapsed,
+            "p50": statistics.median(latencies),
+            "p99": latencies[max(0, int(len(latencies) * 0.99) - 1)],
+        }
+
+    async def run(self):
+        if not self.samples:
+            print("config/assets 下没有可用的wav文件，无法测试")
+            return
+        modes = [
+            ("逐句识别", {"batch_size": 0}),
+            (
+                "批量识别",
+                {"batch_size": BATCH_SIZE, "batch_max_wait_ms": BATCH_MAX_WAIT_MS},
+            ),
+        ]
+        for mode_name, extra in modes:
+            config = {"type": "fun_local", "model_dir": MODEL_DIR, "output_dir": OUTPUT_DIR}
+            config.update(extra)
+            asr = create_stt_instance("fun_local", config, True)
+            # 预热，排除首次推理的初始化耗时
+            await asr.speech_to_text([self.samples[0]], "warmup", "pcm")
+
+            for concurrency in CONCURRENCY_LEVELS:
+                print(f"测试 {mode_name}，同时识别的设备数: {concurrency}")
+                batches_before = asr.batch_engine.batches if asr.batch_engine else 0
+                result = await self._run_level(asr, concurrency)
+                utterances = concurrency * UTTERANCES_PER_DEVICE
+                if asr.batch_engine:
+                    batches = asr.batch_engine.batches - batches_before
+                    avg_batch = f"{utterances / max(batches, 1):.1f}"
+                else:
+                    avg_batch = "1.0"
+                self.results.append(
+                    [
+                        mode_name,
+                        concurrency,
+                        f"{result['throughput']:.2f}",
+                        f"{result['p50']:.0f}",
+                        f"{result['p99']:.0f}",
+                        avg_batch,
+                    ]
+                )
+
+            if asr.batch_engine is not None:
+                asr.batch_engine.stop()
+
+        self._print_results()
+
+    def _print_results(self):
+        print("\n" + "=" * 50)
+        print("FunASR 批量识别性能测试结果")
+        print("=" * 50)
+        headers = ["模式", "并发设备数", "吞吐(句/秒)", "P50延迟(ms)", "P99延迟(ms)", "平均批大小"]
+        print(tabulate(self.results, headers=headers, tablefmt="grid"))
+        print("\n测试说明:")
+        print(f"- 每个设备连续识别{UTTERANCES_PER_DEVICE}句，测试音频取自 config/assets")
+        print(f"- 批量识别: batch_size={BATCH_SIZE}, batch_max_wait_ms={BATCH_MAX_WAIT_MS}")
+        print("- 延迟：从提交整句音频到拿到识别文本的时间")
+        print("\n测试完成！")
+
+
+async def main():
+    tester = ASRBatchPerformanceTester()
+    await tester.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
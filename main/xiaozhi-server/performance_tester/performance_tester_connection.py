@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import asyncio
+import logging
+
+import psutil
+import websockets
+from tabulate import tabulate
+
+# 设置全局日志级别为WARNING，抑制INFO级别日志
+logging.basicConfig(level=logging.WARNING)
+
+description = "设备连接压力测试（服务进程内存与线程数）"
+
+# 需要先启动服务端；可通过环境变量指定地址和服务进程PID
+SERVER_URL = os.environ.get("XIAOZHI_WS_URL", "ws://127.0.0.1:8000/xiaozhi/v1/")
+SERVER_PID = os.environ.get("XIAOZHI_SERVER_PID")
+# 依次增加到的并发连接数
+CONNECTION_LEVELS = [50, 100, 200, 500]
+# 每批新建连接后等待后台初始化完成的时间（秒）
+SETTLE_SECONDS = 5
+
+HELLO_MESSAGE = {
+    "type": "hello",
+    "version": 1,
+    "transport": "websocket",
+    "audio_params": {
+        "format": "opus",
+        "sample_rate": 16000,
+        "channels": 1,
+        "frame_duration": 60,
+    },
+}
+
+
+def _find_server_process():
+    """按PID或监听端口找到服务进程"""
+    if SERVER_PID:
+        return psutil.Process(int(SERVER_PID))
+    port = int(SERVER_URL.split(":")[2].split("/")[0])
+    for conn in psutil.net_connections(kind="tcp"):
+        if conn.status == psutil.CONN_LISTEN and conn.laddr.port == port and conn.pid:
+            return psutil.Process(conn.pid)
+    raise RuntimeError(
+        f"未找到监听端口{port}的服务进程，请通过环境变量 XIAOZHI_SERVER_PID 指定"
+    )
+
+
+class ConnectionLoadTester:
+    def __init__(self):
+        self.results = []
+        self.clients = []
+
+    @staticmethod
+    def _sample(process):
+        """服务进程当前的RSS(MB)与线程数"""
+        return process.memory_info().rss / 1024 / 1024, process.num_threads()
+
+    async def _open_client(self, index):
+        headers = {
+            "device-id": f"loadtest-{index:05d}",
+            "client-id": f"loadtest-client-{index:05d}",
+        }
+        ws = await websockets.connect(
+            SERVER_URL, additional_headers=headers, open_timeout=30
+        )
+        await ws.send(json.dumps(HELLO_MESSAGE))
+        return ws
+
+    async def _drain(self, ws):
+        """持续读取服务端消息，避免发送缓冲区堆积"""
+        try:
+            async for _ in ws:
+                pass
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    async def run(self):
+        process = _find_server_process()
+        base_rss, base_threads = self._sample(process)
+        print(f"服务进程 {process.pid}: 初始RSS {base_rss:.1f}MB，线程数 {base_threads}")
+        drain_tasks = []
+        failed = 0
+        for level in CONNECTION_LEVELS:
+            print(f"增加连接到 {level} 个...")
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *(self._open_client(i) for i in range(len(self.clients), level)),
+                return_exceptions=True,
+            )
+            connect_time = time.perf_counter() - start
+            for ws in results:
+                if isinstance(ws, Exception):
+                    failed += 1
+                    continue
+                self.clients.append(ws)
+                drain_tasks.append(asyncio.create_task(self._drain(ws)))
+            await asyncio.sleep(SETTLE_SECONDS)
+            rss, threads = self._sample(process)
+            active = len(self.clients)
+            self.results.append(
+                [
+                    active,
+                    f"{connect_time:.2f}",
+                    f"{rss:.1f}",
+                    threads,
+                    f"{(rss - base_rss) * 1024 / max(active, 1):.1f}",
+                    f"{(threads - base_threads) / max(active, 1):.2f}",
+                ]
+            )
+
+        for ws in self.clients:
+            await ws.close()
+        for task in drain_tasks:
+            task.cancel()
+        await asyncio.sleep(SETTLE_SECONDS)
+        rss, threads = self._sample(process)
+        self._print_results(failed, rss, threads)
+
+    def _print_results(self, failed, rss, threads):
+        print("\n" + "=" * 50)
+        print("设备连接压力测试结果")
+        print("=" * 50)
+        headers = [
+            "连接数",
+            "建连耗时(s)",
+            "RSS(MB)",
+            "线程数",
+            "每连接内存(KB)",
+            "每连接线程数",
+        ]
+        print(tabulate(self.results, headers=headers, tablefmt="grid"))
+        print(f"\n建连失败: {failed}，全部断开后 RSS {rss:.1f}MB，线程数 {threads}")
+        print("\n测试说明:")
+        print("- 每连接内存/线程数：相对初始状态的增量除以当前连接数")
+        print("- 服务端需关闭设备认证，或把测试设备加入白名单")
+        print("\n测试完成！")
+
+
+async def main():
+    tester = ConnectionLoadTester()
+    await tester.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+import time
+import asyncio
+import logging
+
+import numpy as np
+import opuslib_next
+from tabulate import tabulate
+from core.utils.opus_encoder_pool import pcm_to_opus_frames, pcm_to_opus_frames_async
+
+# 设置全局日志级别为WARNING，抑制INFO级别日志
+logging.basicConfig(level=logging.WARNING)
+
+description = "PCM转Opus分帧编码吞吐测试"
+
+SAMPLE_RATE = 16000
+FRAME_SIZE = 960
+# 测试音频时长（秒）：短句、普通回复、长音乐
+DURATIONS = [3, 30, 300]
+ROUNDS = 5
+
+
+def legacy_pcm_to_opus(raw_data):
+    """改造前的实现：每次新建编码器，逐帧切片、补零并经numpy转换"""
+    encoder = opuslib_next.Encoder(SAMPLE_RATE, 1, opuslib_next.APPLICATION_AUDIO)
+    datas = []
+    for i in range(0, len(raw_data), FRAME_SIZE * 2):
+        chunk = raw_data[i : i + FRAME_SIZE * 2]
+        if len(chunk) < FRAME_SIZE * 2:
+            chunk += b"\x00" * (FRAME_SIZE * 2 - len(chunk))
+        np_frame = np.frombuffer(chunk, dtype=np.int16)
+        datas.append(encoder.encode(np_frame.tobytes(), FRAME_SIZE))
+    return datas
+
+
+class OpusPerformanceTester:
+    def __init__(self):
+        self.results = []
+
+    @staticmethod
+    def _build_pcm(seconds):
+        """生成带噪声的测试音频，长度刻意不整除帧长以覆盖补零路径"""
+        t = np.arange(SAMPLE_RATE * seconds + 123) / SAMPLE_RATE
+        signal = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.05 * np.random.randn(len(t))
+        return (np.clip(signal, -1, 1) * 32767).astype(np.int16).tobytes()
+
+    @staticmethod
+    def _measure(func, raw_data):
+        best = float("inf")
+        frames = 0
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            frames = len(func(raw_data))
+            best = min(best, time.perf_counter() - start)
+        return best, frames
+
+    async def _measure_async(self, raw_data, concurrency=4):
+        """并发编码多段长音频，对比进程池与单线程顺序编码的总耗时"""
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(pcm_to_opus_frames_async(raw_data) for _ in range(concurrency))
+        )
+        return time.perf_counter() - start
+
+    async def run(self):
+        for seconds in DURATIONS:
+            raw_data = self._build_pcm(seconds)
+            print(f"测试 {seconds} 秒音频...")
+            legacy_time, legacy_frames = self._measure(legacy_pcm_to_opus, raw_data)
+            new_time, new_frames = self._measure(pcm_to_opus_frames, raw_data)
+            assert legacy_frames == new_frames, "帧数不一致"
+            audio_seconds = len(raw_data) / 2 / SAMPLE_RATE
+            self.results.append(
+                [
+                    f"{seconds}s",
+                    new_frames,
+                    f"{legacy_time * 1000:.1f}",
+                    f"{new_time * 1000:.1f}",
+                    f"{audio_seconds / legacy_time:.0f}x",
+                    f"{audio_seconds / new_time:.0f}x",
+                    f"{legacy_time / new_time:.2f}",
+                ]
+            )
+
+        long_pcm = self._build_pcm(DURATIONS[-1])
+        concurrency = 4
+        sequential = self._measure(legacy_pcm_to_opus, long_pcm)[0] * concurrency
+        pooled = await self._measure_async(long_pcm, concurrency)
+        self._print_results(concurrency, sequential, pooled)
+
+    def _print_results(self, concurrency, sequential, pooled):
+        print("\n" + "=" * 50)
+        print("PCM转Opus编码性能测试结果")
+        print("=" * 50)
+        headers = [
+            "音频时长",
+            "帧数",
+            "原实现耗时(ms)",
+            "新实现耗时(ms)",
+            "原实现实时倍数",
+            "新实现实时倍数",
+            "加速比",
+        ]
+        print(tabulate(self.results, headers=headers, tablefmt="grid"))
+        print(
+            f"\n{concurrency}段{DURATIONS[-1]}秒音频：原实现顺序编码 {sequential:.2f}s，"
+            f"进程池并发编码 {pooled:.2f}s"
+        )
+        print("\n测试说明:")
+        print(f"- 每项取{ROUNDS}次中的最快一次")
+        print("- 实时倍数：每秒耗时可编码的音频秒数")
+        print("\n测试完成！")
+
+
+async def main():
+    tester = OpusPerformanceTester()
+    await tester.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
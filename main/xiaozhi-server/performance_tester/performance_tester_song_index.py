@@ -0,0 +1,176 @@
+import time
+import random
+import asyncio
+import difflib
+import logging
+import statistics
+
+from tabulate import tabulate
+from core.utils.song_index import SongIndex
+
+# 设置全局日志级别为WARNING，抑制INFO级别日志
+logging.basicConfig(level=logging.WARNING)
+
+description = "歌曲索引查询延迟测试"
+
+# 曲库规模
+LIBRARY_SIZES = [1000, 10000, 100000]
+QUERIES_PER_TYPE = 200
+# 每条查询重复测几轮，P99取自全部样本；单轮200个样本的P99只相当于次慢的一次，受调度抖动影响大
+MEASURE_ROUNDS = 5
+# 查询延迟目标：P99低于1ms
+TARGET_P99_MS = 1.0
+# 原实现逐个文件比较，太慢，只测少量查询
+LEGACY_QUERIES = 3
+
+# 常用字范围内随机取字组成词表，歌名由1~3个词组成，接近真实曲库的用字分布
+CHAR_POOL_SIZE = 1500
+VOCABULARY_SIZE = 5000
+
+
+def legacy_find_best_match(potential_song, music_files):
+    """改造前的实现：逐个文件用difflib计算相似度"""
+    best_match = None
+    highest_score = 0
+    for music_file in music_files:
+        clean_name = music_file.rsplit(".", 1)[0].lower()
+        matcher = difflib.SequenceMatcher(None, potential_song, clean_name)
+        score = matcher.ratio() * 0.6 + matcher.quick_ratio() * 0.4
+        if potential_song in clean_name or clean_name in potential_song:
+            score = max(score, 0.85)
+        if score > highest_score and score > 0.6:
+            highest_score = score
+            best_match = music_file
+    return best_match
+
+
+class SongIndexPerformanceTester:
+    def __init__(self):
+        self.results = []
+        self.misses = []
+        self.rng = random.Random(42)
+        self.chars = [
+            chr(code) for code in self.rng.sample(range(0x4E00, 0x6000), CHAR_POOL_SIZE)
+        ]
+        self.words = [
+            "".join(self.rng.sample(self.chars, self.rng.randint(1, 3)))
+            for _ in range(VOCABULARY_SIZE)
+        ]
+        self.homophones = self._build_homophones()
+
+    def _build_homophones(self):
+        """同音字表，用于模拟语音识别的同音错字；未安装pypinyin时为空"""
+        try:
+            from pypinyin import lazy_pinyin
+        except ImportError:
+            return {}
+        groups = {}
+        for char in self.chars:
+            groups.setdefault(lazy_pinyin(char)[0], []).append(char)
+        homophones = {}
+        for chars in groups.values():
+            for i, char in enumerate(chars[1:], 1):
+                homophones[char] = chars[i - 1]
+        return homophones
+
+    def _build_library(self, size):
+        artists = [
+            "".join(self.rng.sample(self.chars, self.rng.randint(2, 3)))
+            for _ in range(max(10, size // 20))
+        ]
+        library = set()
+        while len(library) < size:
+            title = "".join(self.rng.sample(self.words, self.rng.randint(1, 3)))
+            library.add(f"{title} - {self.rng.choice(artists)}.mp3")
+        return sorted(library)
+
+    def _make_queries(self, library):
+        picks = self.rng.sample(library, min(QUERIES_PER_TYPE, len(library)))
+        exact, homophone, with_artist = [], [], []
+        for path in picks:
+            title, artist = path[:-4].split(" - ", 1)
+            # 曲库中可能有同名歌曲，只按歌名查询时要求歌名一致即可
+            exact.append((title, title))
+            with_artist.append((f"{artist}的{title}", path))
+            # 只替换第一个有同音字的字
+            query = title
+            for i, char in enumerate(title):
+                if char in self.homophones:
+                    query = title[:i] + self.homophones[char] + title[i + 1 :]
+                    break
+            homophone.append((query, title))
+        return {"精确歌名": exact, "同音字": homophone, "歌手+歌名": with_artist}
+
+    @staticmethod
+    def _measure(index, queries):
+        latencies = []
+        hits = 0
+        for round_index in range(MEASURE_ROUNDS):
+            for query, expected in queries:
+                start = time.perf_counter()
+                matches = index.search(query, top_k=5)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if round_index > 0:
+                    continue
+                if matches and expected in (matches[0].path, matches[0].title):
+                    hits += 1
+        latencies.sort()
+        return (
+            statistics.median(latencies),
+            latencies[int(len(latencies) * 0.99) - 1],
+            hits / len(queries),
+        )
+
+    async def run(self):
+        legacy = None
+        for size in LIBRARY_SIZES:
+            print(f"测试曲库规模 {size} 首...")
+            library = self._build_library(size)
+            index = SongIndex()
+            start = time.perf_counter()
+            index.rebuild(library)
+            build_time = time.perf_counter() - start
+            for name, queries in self._make_queries(library).items():
+                p50, p99, accuracy = self._measure(index, queries)
+                if p99 >= TARGET_P99_MS:
+                    self.misses.append(f"{size}首 {name} P99 {p99:.3f}ms")
+                self.results.append(
+                    [
+                        size,
+                        name,
+                        f"{build_time:.2f}",
+                        f"{p50:.3f}",
+                        f"{p99:.3f}",
+                        f"{accuracy:.1%}",
+                    ]
+                )
+            if size == LIBRARY_SIZES[-1]:
+                queries = self._make_queries(library)["精确歌名"][:LEGACY_QUERIES]
+                start = time.perf_counter()
+                for query, _ in queries:
+                    legacy_find_best_match(query, library)
+                legacy = (time.perf_counter() - start) / len(queries) * 1000
+        self._print_results(legacy)
+
+    def _print_results(self, legacy):
+        print("\n" + "=" * 50)
+        print("歌曲索引查询性能测试结果")
+        print("=" * 50)
+        headers = ["曲库规模", "查询类型", "建索引(s)", "P50(ms)", "P99(ms)", "Top1准确率"]
+        print(tabulate(self.results, headers=headers, tablefmt="grid"))
+        print(f"\n原实现在{LIBRARY_SIZES[-1]}首曲库中单次查询耗时: {legacy:.1f}ms")
+        if self.misses:
+            print(f"\n未达到P99<{TARGET_P99_MS}ms目标: {'；'.join(self.misses)}")
+        print("\n测试说明:")
+        print("- 同音字：把歌名中的部分字替换为同音字，模拟语音识别错误")
+        print("- 歌手+歌名：查询形如“歌手的歌名”")
+        print("\n测试完成！")
+
+
+async def main():
+    tester = SongIndexPerformanceTester()
+    await tester.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,166 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from types import SimpleNamespace
+
+import numpy as np
+import opuslib_next
+from tabulate import tabulate
+from core.utils.vad import create_instance as create_vad_instance
+from core.utils.ring_buffer import RingBuffer
+
+# 设置全局日志级别为WARNING，抑制INFO级别日志
+logging.basicConfig(level=logging.WARNING)
+
+description = "VAD并发吞吐与事件循环延迟测试"
+
+MODEL_DIR = "models/snakers4_silero-vad"
+CONCURRENCY_LEVELS = [1, 50, 100, 200, 400]
+TEST_SECONDS = 5
+PACKET_MS = 60  # 设备每60ms上报一个opus包
+
+
+class VADPerformanceTester:
+    def __init__(self):
+        self.packets = self._build_opus_packets()
+        self.results = []
+
+    def _build_opus_packets(self, seconds=3):
+        """生成一段带语音起伏的测试音频并编码为opus包"""
+        sample_rate = 16000
+        t = np.arange(sample_rate * seconds) / sample_rate
+        envelope = (np.sin(2 * np.pi * 0.5 * t) > 0).astype(np.float32)
+        signal = envelope * 0.3 * np.sin(2 * np.pi * 220 * t)
+        signal += 0.01 * np.random.randn(len(t))
+        pcm = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+
+        encoder = opuslib_next.Encoder(sample_rate, 1, opuslib_next.APPLICATION_VOIP)
+        frame_size = 960
+        packets = []
+        for i in range(0, len(pcm) - frame_size + 1, frame_size):
+            packets.append(encoder.encode(pcm[i : i + frame_size].tobytes(), frame_size))
+        return packets
+
+    @staticmethod
+    def _new_conn():
+        return SimpleNamespace(
+            client_listen_mode="auto",
+            client_audio_buffer=RingBuffer(16000, np.int16),
+            client_voice_window=deque(maxlen=5),
+            client_have_voice=False,
+            client_voice_stop=False,
+            last_is_voice=False,
+            last_activity_time=0.0,
+        )
+
+    async def _monitor_loop_lag(self, lags, stop_event, interval=0.01):
+        """定时唤醒并记录实际唤醒时间与预期时间的偏差"""
+        loop = asyncio.get_running_loop()
+        while not stop_event.is_set():
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, loop.time() - expected))
+
+    async def _device(self, vad, conn, stop_event, counter, use_async):
+        """模拟一个实时上报音频的设备"""
+        # 错开各设备的起始时间
+        await asyncio.sleep(np.random.uniform(0, PACKET_MS / 1000))
+        index = 0
+        next_time = time.monotonic()
+        while not stop_event.is_set():
+            packet = self.packets[index % len(self.packets)]
+            index += 1
+            if use_async:
+                await vad.is_vad_async(conn, packet)
+            else:
+                vad.is_vad(conn, packet)
+            counter[0] += 960 / 512
+            next_time += PACKET_MS / 1000
+            await asyncio.sleep(max(0.0, next_time - time.monotonic()))
+
+    async def _run_level(self, vad, concurrency, use_async):
+        stop_event = asyncio.Event()
+        lags = []
+        counter = [0]
+        conns = [self._new_conn() for _ in range(concurrency)]
+        tasks = [
+            asyncio.create_task(
+                self._device(vad, conn, stop_event, counter, use_async)
+            )
+            for conn in conns
+        ]
+        monitor = asyncio.create_task(self._monitor_loop_lag(lags, stop_event))
+
+        start = time.monotonic()
+        await asyncio.sleep(TEST_SECONDS)
+        stop_event.set()
+        await asyncio.gather(*tasks, monitor, return_exceptions=True)
+        elapsed = time.monotonic() - start
+
+        for conn in conns:
+            vad.release(conn)
+
+        lags_ms = np.array(lags) * 1000 if lags else np.zeros(1)
+        return {
+            "frames_per_second": counter[0] / elapsed,
+            "p50_lag_ms": float(np.percentile(lags_ms, 50)),
+            "p99_lag_ms": float(np.percentile(lags_ms, 99)),
+        }
+
+    async def run(self):
+        modes = [
+            ("逐块推理", {"batch_size": 0}, False),
+            ("批量推理", {"batch_size": 64, "batch_max_wait_ms": 4}, True),
+        ]
+        for mode_name, extra, use_async in modes:
+            config = {
+                "model_dir": MODEL_DIR,
+                "threshold": 0.5,
+                "threshold_low": 0.3,
+                "min_silence_duration_ms": 200,
+            }
+            config.update(extra)
+            vad = create_vad_instance("silero", config)
+            if use_async and vad.batch_engine is None:
+                print(f"{mode_name} 不可用（需要onnxruntime），已跳过")
+                continue
+
+            for concurrency in CONCURRENCY_LEVELS:
+                print(f"测试 {mode_name}，并发设备数: {concurrency}")
+                result = await self._run_level(vad, concurrency, use_async)
+                self.results.append(
+                    [
+                        mode_name,
+                        concurrency,
+                        f"{result['frames_per_second']:.0f}",
+                        f"{result['p50_lag_ms']:.2f}",
+                        f"{result['p99_lag_ms']:.2f}",
+                    ]
+                )
+
+            if vad.batch_engine is not None:
+                vad.batch_engine.stop()
+
+        self._print_results()
+
+    def _print_results(self):
+        print("\n" + "=" * 50)
+        print("VAD 并发性能测试结果")
+        print("=" * 50)
+        headers = ["模式", "并发设备数", "帧/秒", "P50循环延迟(ms)", "P99循环延迟(ms)"]
+        print(tabulate(self.results, headers=headers, tablefmt="grid"))
+        print("\n测试说明:")
+        print(f"- 每个设备每{PACKET_MS}ms上报一个opus包，每轮持续{TEST_SECONDS}秒")
+        print("- 帧/秒：每秒完成检测的512采样点音频块数")
+        print("- 循环延迟：10ms定时器的实际唤醒偏差，反映事件循环被阻塞的程度")
+        print("\n测试完成！")
+
+
+async def main():
+    tester = VADPerformanceTester()
+    await tester.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
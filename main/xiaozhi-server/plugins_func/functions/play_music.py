@@ -4,10 +4,10 @@ import re
 import time
 import random
 import asyncio
-import difflib
 import traceback
-from pathlib import Path
 from core.utils import p3
+from core.utils.music_frame_store import get_music_frame_store
+from core.utils.song_index import get_song_index
 from core.handle.sendAudioHandle import send_stt_message
 from plugins_func.register import register_function, ToolType, ActionResponse, Action
 from core.providers.tts.dto.dto import TTSMessageDTO, SentenceType, ContentType
@@ -20,6 +20,9 @@ from core.handle.saveLyricsHandle import save_lyrics
 TAG = __name__
 
 MUSIC_CACHE = {}
+# 歌曲匹配的最低得分与候选数量
+MATCH_THRESHOLD = 0.6
+MATCH_TOP_K = 5
 
 play_music_function_desc = {
     "type": "function",
@@ -105,71 +108,55 @@ def _extract_song_name(text):
     return None
 
 
-def _find_best_match(conn, potential_song, music_files):
+def _find_best_match(conn, potential_song):
     """查找最匹配的歌曲（增强版）"""
+    # 通过歌曲索引按歌名、歌手和拼音查找，不再逐个文件比较
+    matches = [
+        match
+        for match in MUSIC_CACHE["song_index"].search(potential_song, top_k=MATCH_TOP_K)
+        if match.score >= MATCH_THRESHOLD
+    ]
+    conn.logger.bind(tag=TAG).debug(
+        f"歌曲索引查询: {potential_song} -> "
+        f"{[(match.path, match.score) for match in matches]}"
+    )
+    if not matches:
+        return None
     # 优先匹配cache目录
-    cache_dir = os.path.join(MUSIC_CACHE['music_dir'], 'cache')
-    cache_files = [f for f in os.listdir(cache_dir) if f.lower().endswith(('.mp3', '.wav'))]
-    
-    # 检查缓存目录精确匹配
-    clean_query = re.sub(r'[^\u4e00-\u9fa5\w\s]', '', potential_song).strip().lower().replace('。', '').replace('.', '')  # 同时处理中英文句号  # 去除两端特殊字符
-    conn.logger.bind(tag=TAG).debug(f"缓存查询中: {clean_query}")
-    for f in cache_files:
-        song_part = f.split(' - ', 1)[0].strip().lower().replace('。', '').replace('.', '')  # 清理缓存文件名中的标点
-        # 先精确匹配再模糊匹配
-        if clean_query == song_part:
-            return os.path.join('cache', f)
-        if difflib.SequenceMatcher(None, clean_query, song_part).ratio() >= 0.6:  # 降低模糊匹配阈值
-            conn.logger.bind(tag=TAG).debug(f"完整匹配路径: {cache_dir}\{f}")
-            conn.logger.bind(tag=TAG).debug(f"缓存模糊匹配成功: {clean_query} vs {song_part}")
-            return os.path.join('cache', f)
-            return os.path.join('cache', f)
-    
-    best_match = None
-    highest_score = 0
-    potential_song = re.sub(r'[^\u4e00-\u9fa5\w\s]', '', potential_song).lower()  # 保留中文字符
-
-    for music_file in music_files:
-        song_name = os.path.splitext(music_file)[0]
-        clean_name = re.sub(r'[^\w\s]', '', song_name).lower()
-        
-        # 使用组合相似度算法
-        seq_ratio = difflib.SequenceMatcher(None, potential_song, clean_name).ratio()
-        partial_ratio = difflib.SequenceMatcher(None, potential_song, clean_name).quick_ratio()
-        score = (seq_ratio * 0.6 + partial_ratio * 0.4)  # 组合权重
-        
-        # 增加绝对匹配检测
-        if potential_song in clean_name or clean_name in potential_song:
-            score = max(score, 0.85)
-            
-        if score > highest_score and score > 0.6:  
-            highest_score = score
-            best_match = music_file
-            conn.logger.bind(tag=TAG).debug(f"新最佳匹配: {song_name} 得分: {score:.2f}")
-    
-    # 如果缓存没找到再匹配主目录
-    return best_match if highest_score >= 0.6 else None
+    cache_prefix = "cache" + os.sep
+    for match in matches:
+        if match.path.startswith(cache_prefix):
+            return match.path
+    return matches[0].path
 
 
 def get_music_files(music_dir, music_ext):
-    music_dir = Path(music_dir)
-    music_files = []
-    music_file_names = []
-    for file in music_dir.rglob("*"):
-        # 判断是否是文件
-        if file.is_file():
-            # 获取文件扩展名
-            ext = file.suffix.lower()
-            # 判断扩展名是否在列表中
-            if ext in music_ext:
-                # 添加相对路径
-                music_files.append(str(file.relative_to(music_dir)))
-                music_file_names.append(
-                    os.path.splitext(str(file.relative_to(music_dir)))[0]
-                )
+    # 歌曲清单由音乐帧库增量维护，不再每次遍历目录
+    frame_store = get_music_frame_store(music_dir, music_ext)
+    music_files = [
+        path
+        for path in frame_store.list_sources()
+        if path.lower().endswith(tuple(music_ext))
+    ]
+    music_file_names = [os.path.splitext(path)[0] for path in music_files]
     return music_files, music_file_names
 
 
+def get_music_prompt_names(conn, text, top_k=None):
+    """给意图识别使用：只返回与用户输入最相关的几首歌名，而不是整个音乐库"""
+    music_cache = initialize_music_handler(conn)
+    if top_k is None:
+        top_k = music_cache["prompt_top_k"]
+    return [
+        os.path.splitext(match.path)[0]
+        for match in music_cache["song_index"].search(text, top_k=top_k)
+    ]
+
+
+def _on_music_files_changed(added, removed):
+    MUSIC_CACHE["song_index"].update(added, removed)
+
+
 def initialize_music_handler(conn):
     global MUSIC_CACHE
     if MUSIC_CACHE == {}:
@@ -188,14 +175,22 @@ def initialize_music_handler(conn):
             MUSIC_CACHE["music_dir"] = os.path.abspath("./music")
             MUSIC_CACHE["music_ext"] = (".mp3", ".wav", ".p3")
             MUSIC_CACHE["refresh_time"] = 60
-        # 获取音乐文件列表
-        MUSIC_CACHE["music_files"], MUSIC_CACHE["music_file_names"] = get_music_files(
-            MUSIC_CACHE["music_dir"], MUSIC_CACHE["music_ext"]
+        MUSIC_CACHE["prompt_top_k"] = MUSIC_CACHE.get("music_config", {}).get(
+            "prompt_top_k", 10
         )
         MUSIC_CACHE["scan_time"] = time.time()
         MUSIC_CACHE["music_cache_dir"] = os.path.abspath(os.path.join(MUSIC_CACHE["music_dir"], "cache"))
         os.makedirs(MUSIC_CACHE["music_cache_dir"], exist_ok=True)
         MUSIC_CACHE["download_api"] = "https://api.vkeys.cn/v2/music/tencent"
+        # 后台把音乐目录转码为Opus帧库，播放时直接读取
+        MUSIC_CACHE["frame_store"] = get_music_frame_store(
+            MUSIC_CACHE["music_dir"], MUSIC_CACHE["music_ext"], MUSIC_CACHE["refresh_time"]
+        )
+        MUSIC_CACHE["frame_store"].refresh(transcode=False)
+        # 建立歌曲索引，之后随帧库的目录变化事件增量更新
+        MUSIC_CACHE["song_index"] = get_song_index()
+        MUSIC_CACHE["frame_store"].add_listener(_on_music_files_changed)
+        MUSIC_CACHE["song_index"].rebuild(MUSIC_CACHE["frame_store"].list_sources())
     return MUSIC_CACHE
 
 def _detect_audio_type(file_path):
@@ -331,7 +326,7 @@ async def handle_online_song_command(conn, song_name):
         processed_song_name = re.sub(r'[^\u4e00-\u9fa5a-zA-Z0-9_]', '', song_name.strip()) or "unknown"
         # 优先使用缓存匹配逻辑
         conn.logger.bind(tag=TAG).info(f"查询缓存中: {processed_song_name}")
-        cache_match = _find_best_match(conn, song_name, MUSIC_CACHE["music_files"])
+        cache_match = _find_best_match(conn, song_name)
         if cache_match:
             conn.logger.bind(tag=TAG).info(f"已匹配到缓存文件: {cache_match}")
             await play_online_music(conn, specific_file=cache_match, song_name=song_name)
@@ -439,6 +434,9 @@ async def handle_online_song_command(conn, song_name):
         if final_cache_path != mp3_cache_path:
             raise ValueError("文件格式转换失败")
 
+        # 新下载的歌曲加入帧库转码队列
+        MUSIC_CACHE["frame_store"].schedule(mp3_cache_path)
+
         text = f"正在播放在线歌曲: {api_song_name}"
         await send_stt_message(conn, text)
         temp_dir = MUSIC_CACHE["music_cache_dir"]
@@ -490,7 +488,7 @@ async def handle_music_command(conn, text):
         potential_song = _extract_song_name(clean_text)
         if potential_song:
             conn.logger.bind(tag=TAG).debug(f"提取到的歌曲名: {potential_song}")
-            best_match = _find_best_match(potential_song, MUSIC_CACHE["music_files"])
+            best_match = _find_best_match(conn, potential_song)
             if best_match:
                 conn.logger.bind(tag=TAG).info(f"找到最匹配的歌曲: {best_match}")
                 await play_local_music(conn, specific_file=best_match)